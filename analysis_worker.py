@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+📬 Analysis Worker
+
+Worker rq que consome as filas de análise do chatbot (triage, vision,
+transcript, title, clipper, reprocess) enfileiradas pela API via
+app.services.analysis_queue. Roda fora do gunicorn: deploys da API não
+matam mais análises em andamento, e o pool escala por réplicas.
+
+Cada processo executa um job por vez (fork por job) e consome as filas
+em ordem de prioridade:
+    chatbot_analysis_high → chatbot_analysis → chatbot_analysis_low
+
+Jobs abandonados por workers mortos são re-enfileirados na subida e
+periodicamente por uma thread (at-least-once).
+
+Uso:
+    python analysis_worker.py [--name NOME] [--burst]
+
+Exemplo:
+    docker compose up -d --scale analysis-worker=3
+"""
+
+import os
+import sys
+import logging
+import argparse
+import threading
+
+# Adicionar diretório app ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    stream=sys.stdout
+)
+logger = logging.getLogger('analysis_worker')
+
+# Reduzir verbosidade de bibliotecas
+logging.getLogger('urllib3').setLevel(logging.WARNING)
+logging.getLogger('requests').setLevel(logging.WARNING)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chatbot Analysis Worker (rq)')
+    parser.add_argument('--name', '-n', type=str, default=None,
+                        help='Nome do worker no rq (default: gerado)')
+    parser.add_argument('--burst', action='store_true',
+                        help='Processa as filas e encerra quando vazias')
+    args = parser.parse_args()
+
+    from rq import Queue, Worker
+    from app.services.analysis_queue import (
+        QUEUE_NAMES, get_rq_connection, run_requeue_loop,
+    )
+
+    connection = get_rq_connection()
+    connection.ping()
+
+    # Primeira passada na subida, depois a cada ANALYSIS_REQUEUE_INTERVAL_SECONDS
+    # (jobs de um worker recém-morto só saem de StartedJobRegistry ~90s depois)
+    if not args.burst:
+        threading.Thread(
+            target=run_requeue_loop, args=(connection,),
+            name="analysis-requeue", daemon=True,
+        ).start()
+
+    queues = [Queue(name, connection=connection) for name in QUEUE_NAMES]
+    worker = Worker(queues, connection=connection, name=args.name)
+    logger.info(f"🚀 Analysis worker {worker.name} escutando: {', '.join(QUEUE_NAMES)}")
+
+    # with_scheduler: executa os retries agendados (Retry com interval)
+    worker.work(with_scheduler=True, burst=args.burst)
+    logger.info("👋 Analysis worker finalizado")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,9 +3,10 @@ AI Config Module
 
 Módulo helper para interagir com o AI Control Center.
 Fornece funções para:
-1. Buscar configurações de serviços de IA
+1. Buscar configurações de serviços de IA (com cache em memória)
 2. Registrar uso de tokens
 3. Descriptografar API keys
+4. Reutilizar clientes OpenAI/Anthropic e a sessão HTTP das APIs de LLM
 
 Uso:
     from app.ai_config import get_ai_config, log_token_usage
@@ -33,7 +34,11 @@ Uso:
 import requests
 import logging
 import os
-from typing import Optional, Dict, Any
+import copy
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any, Tuple
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
@@ -50,6 +55,13 @@ DB_URL = os.getenv('DATABASE_URL')  # Para acesso direto ao banco
 # Se True, vai direto ao banco sem tentar API (evita logs de erro desnecessários)
 USE_DIRECT_DB = os.getenv('AI_CONFIG_USE_DIRECT_DB', 'false').lower() in ('true', '1', 'yes')
 
+# 🆕 v4.8.0: Cache em memória das configurações (ROLLBACK: 'false' busca a cada chamada)
+AI_CONFIG_CACHE_ENABLED = os.getenv('AI_CONFIG_CACHE', 'true').lower() == 'true'
+CACHE_TTL = int(os.getenv('AI_CONFIG_CACHE_TTL', 300))              # fresco: serve direto
+CACHE_STALE_TTL = int(os.getenv('AI_CONFIG_CACHE_STALE_TTL', 3600))  # stale: serve e revalida em background
+CACHE_NEGATIVE_TTL = int(os.getenv('AI_CONFIG_CACHE_NEGATIVE_TTL', 30))  # "não configurado"
+CACHE_ERROR_BACKOFF = int(os.getenv('AI_CONFIG_CACHE_ERROR_BACKOFF', 30))  # API/banco falhou: próxima tentativa
+
 # ============================================================================
 # Função Principal: Buscar Configuração de Serviço
 # ============================================================================
@@ -60,9 +72,19 @@ def get_ai_config(service_key: str, use_cache: bool = True) -> Optional[Dict[str
     
     Pode buscar via API (recomendado) ou diretamente no banco (fallback).
     
+    🆕 v4.8.0: Com use_cache, a configuração fica em memória no processo:
+    - até CACHE_TTL: servida direto
+    - até CACHE_STALE_TTL: servida e recarregada em background
+    - depois disso (ou sem cache): carregada uma única vez mesmo com
+      várias threads pedindo o mesmo service_key (single-flight)
+    Serviço não encontrado/desativado também é cacheado (CACHE_NEGATIVE_TTL).
+    Se a API e o banco falham, a versão anterior continua valendo e a
+    próxima tentativa fica para daqui a CACHE_ERROR_BACKOFF segundos.
+    Alterações no AI Control Center valem em até CACHE_TTL.
+    
     Args:
         service_key: Identificador do serviço (ex: 'content_planner')
-        use_cache: Se True, usa cache em memória (TODO: implementar)
+        use_cache: Se True, usa cache em memória
     
     Returns:
         dict com estrutura:
@@ -93,6 +115,38 @@ def get_ai_config(service_key: str, use_cache: bool = True) -> Optional[Dict[str
         >>> if config:
         >>>     print(f"Using {config['model']['name']} from {config['provider']['name']}")
     """
+    if not use_cache or not AI_CONFIG_CACHE_ENABLED:
+        return _load_ai_config(service_key)
+    
+    cached = _get_from_cache(service_key)
+    if cached is not None:
+        value, age = cached
+        if value is None:
+            if age < CACHE_NEGATIVE_TTL:
+                return None
+        elif age < CACHE_TTL:
+            return copy.deepcopy(value)
+        elif age < CACHE_STALE_TTL:
+            _refresh_in_background(service_key)
+            return copy.deepcopy(value)
+    
+    value = _load_single_flight(service_key)
+    return copy.deepcopy(value) if value is not None else None
+
+
+class _ConfigUnavailable(Exception):
+    """API/banco falharam (diferente de "serviço não configurado", que é None)."""
+
+
+def _load_ai_config(service_key: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Busca a configuração na API (ou no banco), sem cache.
+    
+    Args:
+        raise_errors: Se True, falhas de API/banco levantam _ConfigUnavailable
+            em vez de retornar None (usado pelo cache para não confundir
+            erro com serviço não configurado)
+    """
     try:
         # Se configurado para ir direto ao banco, pula a API
         if USE_DIRECT_DB:
@@ -104,7 +158,11 @@ def get_ai_config(service_key: str, use_cache: bool = True) -> Optional[Dict[str
             return None
         
         # Método 1: Buscar via API (RECOMENDADO)
-        config = _get_config_via_api(service_key)
+        api_error = None
+        try:
+            config = _get_config_via_api(service_key)
+        except _ConfigUnavailable as e:
+            config, api_error = None, e
         
         if config:
             logger.info(f"✅ Configuração carregada via API: {service_key} -> {config.get('model', {}).get('name', 'N/A')}")
@@ -112,7 +170,12 @@ def get_ai_config(service_key: str, use_cache: bool = True) -> Optional[Dict[str
         
         # Método 2: Buscar diretamente no banco (FALLBACK)
         logger.warning(f"⚠️ API falhou, tentando acesso direto ao banco...")
-        config = _get_config_via_db(service_key)
+        try:
+            config = _get_config_via_db(service_key)
+        except _ConfigUnavailable:
+            if api_error is not None:
+                raise  # Nenhuma fonte respondeu
+            config = None  # API respondeu 404
         
         if config:
             logger.info(f"✅ Configuração carregada via DB: {service_key} -> {config.get('model', {}).get('name', 'N/A')}")
@@ -121,13 +184,23 @@ def get_ai_config(service_key: str, use_cache: bool = True) -> Optional[Dict[str
         logger.error(f"❌ Configuração não encontrada para serviço: {service_key}")
         return None
         
+    except _ConfigUnavailable:
+        if raise_errors:
+            raise
+        return None
     except Exception as e:
         logger.error(f"❌ Erro ao buscar configuração: {str(e)}", exc_info=True)
+        if raise_errors:
+            raise _ConfigUnavailable(str(e)) from e
         return None
 
 
 def _get_config_via_api(service_key: str) -> Optional[Dict[str, Any]]:
-    """Busca configuração via API endpoint (método preferido)."""
+    """
+    Busca configuração via API endpoint (método preferido).
+    
+    None = serviço não encontrado; falhas levantam _ConfigUnavailable.
+    """
     try:
         url = f"{API_BASE}/api/ai-config/service/{service_key}"
         
@@ -147,24 +220,30 @@ def _get_config_via_api(service_key: str) -> Optional[Dict[str, Any]]:
             return None
         else:
             logger.error(f"❌ Erro API: {response.status_code} - {response.text}")
-            return None
+            raise _ConfigUnavailable(f"API {response.status_code}")
             
     except requests.exceptions.Timeout:
         logger.error("❌ Timeout ao chamar API de configuração")
-        return None
+        raise _ConfigUnavailable("timeout")
     except requests.exceptions.ConnectionError:
         logger.error("❌ Erro de conexão com API de configuração")
-        return None
+        raise _ConfigUnavailable("connection error")
+    except _ConfigUnavailable:
+        raise
     except Exception as e:
         logger.error(f"❌ Erro ao chamar API: {str(e)}")
-        return None
+        raise _ConfigUnavailable(str(e)) from e
 
 
 def _get_config_via_db(service_key: str) -> Optional[Dict[str, Any]]:
-    """Busca configuração diretamente no banco (fallback)."""
+    """
+    Busca configuração diretamente no banco (fallback).
+    
+    None = serviço não encontrado/inativo; falhas levantam _ConfigUnavailable.
+    """
     if not DB_URL:
         logger.error("❌ DATABASE_URL não configurada")
-        return None
+        raise _ConfigUnavailable("DATABASE_URL não configurada")
     
     try:
         conn = psycopg2.connect(DB_URL)
@@ -204,7 +283,7 @@ def _get_config_via_db(service_key: str) -> Optional[Dict[str, Any]]:
         
         if not api_key:
             logger.error(f"❌ Falha ao descriptografar API key para: {service_key}")
-            return None
+            raise _ConfigUnavailable("falha ao descriptografar API key")
         
         # Montar estrutura de resposta
         return {
@@ -227,12 +306,14 @@ def _get_config_via_db(service_key: str) -> Optional[Dict[str, Any]]:
             }
         }
         
+    except _ConfigUnavailable:
+        raise
     except psycopg2.Error as e:
         logger.error(f"❌ Erro de banco de dados: {str(e)}")
-        return None
+        raise _ConfigUnavailable(str(e)) from e
     except Exception as e:
         logger.error(f"❌ Erro ao buscar config via DB: {str(e)}")
-        return None
+        raise _ConfigUnavailable(str(e)) from e
 
 
 def _decrypt_api_key(encrypted_key: str) -> Optional[str]:
@@ -514,23 +595,152 @@ def validate_service_config(service_key: str) -> Dict[str, Any]:
 
 
 # ============================================================================
-# Cache (TODO: Implementar)
+# Cache
 # ============================================================================
 
-# TODO: Implementar cache em memória para configurações
-# Pode usar Redis ou simples dict com TTL
-# Isso reduz chamadas ao banco/API
+# service_key → (carregado_em, config ou None)
+_config_cache: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+_cache_lock = threading.Lock()
+# service_key → Event dos carregamentos em andamento (single-flight)
+_inflight: Dict[str, threading.Event] = {}
 
-_config_cache = {}
-CACHE_TTL = 300  # 5 minutos
 
-def _get_from_cache(key: str) -> Optional[Dict[str, Any]]:
-    """Busca configuração do cache."""
-    # TODO: Implementar
-    pass
+def _get_from_cache(key: str) -> Optional[Tuple[Optional[Dict[str, Any]], float]]:
+    """Retorna (config, idade em segundos) ou None se não está no cache."""
+    entry = _config_cache.get(key)
+    if entry is None:
+        return None
+    loaded_at, value = entry
+    return value, time.monotonic() - loaded_at
 
-def _set_in_cache(key: str, value: Dict[str, Any], ttl: int = CACHE_TTL):
-    """Salva configuração no cache."""
-    # TODO: Implementar
-    pass
 
+def _set_in_cache(key: str, value: Optional[Dict[str, Any]], fresh_for: Optional[float] = None):
+    """
+    Salva configuração no cache (None = não configurado, cache negativo).
+    
+    fresh_for: segundos até a entrada precisar de recarga (default: o TTL
+    inteiro); usado como backoff quando a recarga falhou.
+    """
+    loaded_at = time.monotonic()
+    if fresh_for is not None:
+        ttl = CACHE_TTL if value is not None else CACHE_NEGATIVE_TTL
+        loaded_at -= max(0, ttl - fresh_for)
+    with _cache_lock:
+        _config_cache[key] = (loaded_at, value)
+
+
+def _load_single_flight(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Carrega a configuração com no máximo uma busca em andamento por service_key.
+    
+    Quem chega durante a busca espera o resultado. Serviço não encontrado
+    ou desativado substitui a versão anterior (cache negativo). Se a busca
+    FALHA, a versão anterior (ou a ausência dela) continua valendo por
+    CACHE_ERROR_BACKOFF segundos antes de uma nova tentativa.
+    """
+    with _cache_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+    
+    if not leader:
+        event.wait(timeout=15)
+        cached = _config_cache.get(key)
+        return cached[1] if cached else None
+    
+    try:
+        try:
+            value = _load_ai_config(key, raise_errors=True)
+        except _ConfigUnavailable as e:
+            previous = _config_cache.get(key)
+            value = previous[1] if previous else None
+            if value is not None:
+                logger.warning(f"⚠️ [AI CONFIG] Falha ao recarregar {key} ({e}), mantendo versão em cache")
+            _set_in_cache(key, value, fresh_for=CACHE_ERROR_BACKOFF)
+            return value
+        _set_in_cache(key, value)
+        return value
+    finally:
+        with _cache_lock:
+            _inflight.pop(key, None)
+        event.set()
+
+
+def _refresh_in_background(key: str):
+    """Stale-while-revalidate: recarrega sem bloquear quem pediu."""
+    if key in _inflight:
+        return
+    threading.Thread(
+        target=_load_single_flight, args=(key,),
+        name=f"ai-config-refresh-{key}", daemon=True,
+    ).start()
+
+
+def invalidate_ai_config(service_key: Optional[str] = None):
+    """
+    Remove configuração(ões) do cache deste processo.
+    
+    Args:
+        service_key: Serviço alterado (None = todos)
+    """
+    with _cache_lock:
+        if service_key:
+            _config_cache.pop(service_key, None)
+        else:
+            _config_cache.clear()
+
+
+# ============================================================================
+# 🆕 v4.8.0: Clientes LLM reutilizáveis
+# ============================================================================
+
+# (provider, hash da key, base_url) → cliente do SDK
+_llm_clients: Dict[Tuple[str, str, Optional[str]], Any] = {}
+_llm_clients_lock = threading.Lock()
+_llm_http_session = None
+
+
+def get_llm_client(provider: str, api_key: str, base_url: Optional[str] = None):
+    """
+    Cliente OpenAI/Anthropic compartilhado por (provider, api_key, base_url).
+    
+    Os SDKs mantêm pool de conexões HTTP próprio; criar um cliente por
+    chamada refazia TLS e configuração a cada requisição. Os clientes são
+    thread-safe.
+    """
+    cache_key = (provider, hashlib.sha256((api_key or '').encode()).hexdigest(), base_url)
+    client = _llm_clients.get(cache_key)
+    if client is not None:
+        return client
+    
+    with _llm_clients_lock:
+        client = _llm_clients.get(cache_key)
+        if client is None:
+            if provider == 'anthropic':
+                import anthropic
+                client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
+            else:
+                import openai
+                client = openai.OpenAI(api_key=api_key, base_url=base_url)
+            _llm_clients[cache_key] = client
+            logger.info(f"🔌 [AI CONFIG] Cliente {provider} criado ({len(_llm_clients)} em uso)")
+    return client
+
+
+def get_llm_http_session() -> requests.Session:
+    """
+    requests.Session compartilhada para chamadas HTTP diretas às APIs de LLM
+    (keep-alive: sem novo handshake TLS por chamada).
+    """
+    global _llm_http_session
+    if _llm_http_session is None:
+        with _llm_clients_lock:
+            if _llm_http_session is None:
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _llm_http_session = session
+    return _llm_http_session
@@ -90,6 +90,9 @@ def create_app():
 
     import atexit
     atexit.register(close_db_pool)
+    # 🆕 v4.8.0: Drain dos triggers em background antes de fechar o pool (atexit é LIFO)
+    from app.services.background_executor import shutdown_background_executor
+    atexit.register(shutdown_background_executor)
 
     return app
 
@@ -10,7 +10,8 @@ Endpoints:
     GET /api/admin/pipeline/steps/<step_id> - Detalhes de um step
     GET /api/admin/pipeline/steps/<step_id>/payloads - Payloads de um step
     GET /api/admin/pipeline/steps/<step_id>/artifacts - Artifacts de um step
-    GET /api/admin/pipeline/stats - Estatísticas gerais
+    GET /api/admin/pipeline/stats - Estatísticas gerais (rollups por minuto/hora)
+    POST /api/admin/pipeline/stats/rebuild - Recalcula rollups a partir das tabelas brutas
 
 Versão: 1.0.0
 Data: 23/Jan/2026
@@ -25,6 +26,10 @@ from flask import Blueprint, jsonify, request
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+from app.services.pipeline_stats_rollup import (
+    STATS_ROLLUPS_ENABLED, read_pipeline_stats, rebuild_rollups
+)
+
 logger = logging.getLogger(__name__)
 
 pipeline_admin_bp = Blueprint('pipeline_admin', __name__, url_prefix='/api/admin/pipeline')
@@ -395,6 +400,11 @@ def get_stats():
     
     Query params:
         - period: Período (today, week, month, all) - default: today
+        - source: 'raw' força as agregações sobre as tabelas brutas
+    
+    🆕 Lê dos rollups (pipeline_stats_rollup) - O(buckets) em vez de varrer
+    pipeline_runs/pipeline_steps. total_videos passa a contar runs com vídeo
+    de saída (não URLs distintas).
     
     Returns:
         {
@@ -423,6 +433,16 @@ def get_stats():
             start_date = None
         
         conn = get_db_connection()
+        
+        if STATS_ROLLUPS_ENABLED and request.args.get('source') != 'raw':
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    stats = read_pipeline_stats(cur, start_date)
+                conn.commit()
+                return jsonify(stats)
+            finally:
+                conn.close()
+        
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             # Filtro de data
             date_filter = "AND r.created_at >= %s" if start_date else ""
@@ -479,6 +499,35 @@ def get_stats():
         return jsonify({"error": str(e)}), 500
 
 
+@pipeline_admin_bp.route('/stats/rebuild', methods=['POST'])
+def rebuild_stats():
+    """
+    Recalcula os rollups de estatísticas a partir das tabelas brutas.
+    
+    Usado no backfill inicial e para corrigir divergências.
+    
+    Body (opcional):
+        - since: Data inicial (ISO format). Sem since, recalcula tudo.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        since = datetime.fromisoformat(data['since']) if data.get('since') else None
+        
+        conn = get_db_connection()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                counts = rebuild_rollups(cur, since)
+            conn.commit()
+        finally:
+            conn.close()
+        
+        return jsonify({"success": True, "buckets": counts})
+        
+    except Exception as e:
+        logger.error(f"Erro ao recalcular rollups: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 # =============================================================================
 # SEARCH
 # =============================================================================
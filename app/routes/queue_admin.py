@@ -15,8 +15,9 @@ Endpoints:
     DELETE /api/admin/queues/rules/<id> - Remove regra
     POST /api/admin/queues/rules/reorder - Reordena prioridades
     
-    POST /api/admin/queues/simulate - Simula roteamento
+    POST /api/admin/queues/simulate - Simula roteamento (ou benchmark com jobs sintéticos)
     GET /api/admin/queues/stats - Estatísticas gerais
+    GET /api/admin/queues/background - Fila do BackgroundExecutor (por processo)
 
 Versão: 1.0.0
 Data: 23/Jan/2026
@@ -24,8 +25,11 @@ Data: 23/Jan/2026
 
 import os
 import json
+import time
+import random
 import logging
 import redis
+from collections import Counter
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
 
@@ -33,6 +37,8 @@ from flask import Blueprint, jsonify, request
 import psycopg2
 from psycopg2.extras import RealDictCursor, Json
 
+from app.services.pipeline_stats_rollup import STATS_ROLLUPS_ENABLED, read_routing_stats
+
 logger = logging.getLogger(__name__)
 
 queue_admin_bp = Blueprint('queue_admin', __name__, url_prefix='/api/admin/queues')
@@ -52,6 +58,15 @@ def get_redis_connection():
     return redis.from_url(redis_url)
 
 
+def _invalidate_router_cache():
+    """🆕 v4.8.0: Regras/workers mudaram → QueueRouter deste processo recarrega na próxima decisão."""
+    try:
+        from app.video_orchestrator.services.queue_router_service import get_queue_router
+        get_queue_router().invalidate()
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao invalidar cache do QueueRouter: {e}")
+
+
 # =============================================================================
 # WORKERS
 # =============================================================================
@@ -199,6 +214,7 @@ def update_worker(worker_id: str):
             
             worker = cur.fetchone()
             conn.commit()
+            _invalidate_router_cache()
             
             if not worker:
                 return jsonify({"error": "Worker não encontrado"}), 404
@@ -232,6 +248,7 @@ def toggle_worker(worker_id: str):
             
             result = cur.fetchone()
             conn.commit()
+            _invalidate_router_cache()
             
             if not result:
                 return jsonify({"error": "Worker não encontrado"}), 404
@@ -324,6 +341,7 @@ def create_rule():
             
             rule = cur.fetchone()
             conn.commit()
+            _invalidate_router_cache()
         
         conn.close()
         
@@ -375,6 +393,7 @@ def update_rule(rule_id: str):
             
             rule = cur.fetchone()
             conn.commit()
+            _invalidate_router_cache()
             
             if not rule:
                 return jsonify({"error": "Regra não encontrada"}), 404
@@ -402,6 +421,7 @@ def delete_rule(rule_id: str):
             cur.execute("DELETE FROM routing_rules WHERE id = %s RETURNING id", (rule_id,))
             deleted = cur.fetchone()
             conn.commit()
+            _invalidate_router_cache()
             
             if not deleted:
                 return jsonify({"error": "Regra não encontrada"}), 404
@@ -432,6 +452,7 @@ def toggle_rule(rule_id: str):
             
             result = cur.fetchone()
             conn.commit()
+            _invalidate_router_cache()
             
             if not result:
                 return jsonify({"error": "Regra não encontrada"}), 404
@@ -456,6 +477,48 @@ def toggle_rule(rule_id: str):
 # SIMULADOR DE ROTEAMENTO
 # =============================================================================
 
+SIMULATE_BENCHMARK_MAX_JOBS = 200000
+
+
+def _simulate_benchmark(data: Dict[str, Any], applies_to: str) -> Dict[str, Any]:
+    """Roteia jobs sintéticos com QueueRouterService.simulate e mede a vazão."""
+    from app.video_orchestrator.services.queue_router_service import get_queue_router
+    
+    jobs = max(1, min(int(data.get('jobs', 10000)), SIMULATE_BENCHMARK_MAX_JOBS))
+    max_duration = float(data.get('max_duration', 600))
+    max_segments = max(1, int(data.get('max_segments', 40)))
+    template_ids = data.get('template_ids') or [None]
+    rng = random.Random(data.get('seed', 42))
+    
+    contexts = [
+        {
+            'video_duration': rng.uniform(0, max_duration),
+            'segments': rng.randint(1, max_segments),
+            'template_id': rng.choice(template_ids),
+        }
+        for _ in range(jobs)
+    ]
+    
+    router = get_queue_router()
+    router.simulate(contexts[:1], applies_to)  # Aquecer snapshots (regras, workers, filas)
+    
+    started = time.perf_counter()
+    decisions = router.simulate(contexts, applies_to)
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "status": "success",
+        "mode": "benchmark",
+        "applies_to": applies_to,
+        "jobs": jobs,
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "jobs_per_second": int(jobs / elapsed) if elapsed > 0 else None,
+        "decisions_by_worker": dict(Counter(d['worker_id'] for d in decisions)),
+        "decisions_by_rule": dict(Counter(d['rule_id'] or 'none' for d in decisions)),
+        "fallbacks": sum(1 for d in decisions if d['was_fallback']),
+    }
+
+
 @queue_admin_bp.route('/simulate', methods=['POST'])
 def simulate_routing():
     """
@@ -468,15 +531,30 @@ def simulate_routing():
         "template_id": "xxx-yyy-zzz",
         "applies_to": "matting"
     }
+    
+    🆕 v4.8.0: Modo benchmark — avalia N jobs sintéticos com as regras
+    compiladas do QueueRouter (sem logar decisões):
+    {
+        "benchmark": true,
+        "jobs": 10000,
+        "applies_to": "matting",
+        "max_duration": 600,
+        "max_segments": 40,
+        "template_ids": ["xxx-yyy-zzz"],
+        "seed": 42
+    }
     """
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
         
         video_duration = data.get('video_duration', 0)
         segments = data.get('segments', 1)
         template_id = data.get('template_id')
         applies_to = data.get('applies_to', 'matting')
         
+        if data.get('benchmark'):
+            return jsonify(_simulate_benchmark(data, applies_to)), 200
+        
         conn = get_db_connection()
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             # Buscar regras ativas ordenadas por prioridade
@@ -646,7 +724,12 @@ def simulate_routing():
 
 @queue_admin_bp.route('/stats', methods=['GET'])
 def get_stats():
-    """Obtém estatísticas gerais de filas e workers."""
+    """
+    Obtém estatísticas gerais de filas e workers.
+    
+    🆕 Decisões de roteamento do dia vêm dos rollups (routing_rollups)
+    em vez de COUNT/GROUP BY sobre routing_logs.
+    """
     try:
         conn = get_db_connection()
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
@@ -666,26 +749,33 @@ def get_stats():
             cur.execute("SELECT COUNT(*) as total FROM routing_rules WHERE enabled = true")
             rules_count = cur.fetchone()['total']
             
-            # Jobs roteados hoje
-            cur.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    COUNT(DISTINCT selected_worker_id) as workers_used
-                FROM routing_logs 
-                WHERE created_at > CURRENT_DATE
-            """)
-            routing_today = cur.fetchone()
-            
-            # Jobs por worker hoje
-            cur.execute("""
-                SELECT selected_worker_id, COUNT(*) as count
-                FROM routing_logs 
-                WHERE created_at > CURRENT_DATE
-                GROUP BY selected_worker_id
-                ORDER BY count DESC
-            """)
-            jobs_by_worker = cur.fetchall()
-        
+            if STATS_ROLLUPS_ENABLED:
+                today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+                routing = read_routing_stats(cur, today)
+                routing_today = routing['routing_today']
+                jobs_by_worker = routing['jobs_by_worker']
+            else:
+                # Jobs roteados hoje
+                cur.execute("""
+                    SELECT 
+                        COUNT(*) as total,
+                        COUNT(DISTINCT selected_worker_id) as workers_used
+                    FROM routing_logs 
+                    WHERE created_at > CURRENT_DATE
+                """)
+                routing_today = cur.fetchone()
+                
+                # Jobs por worker hoje
+                cur.execute("""
+                    SELECT selected_worker_id, COUNT(*) as count
+                    FROM routing_logs 
+                    WHERE created_at > CURRENT_DATE
+                    GROUP BY selected_worker_id
+                    ORDER BY count DESC
+                """)
+                jobs_by_worker = cur.fetchall()
+        
+        conn.commit()
         conn.close()
         
         # Filas Redis
@@ -714,6 +804,19 @@ def get_stats():
         return jsonify({"error": str(e)}), 500
 
 
+@queue_admin_bp.route('/background', methods=['GET'])
+def get_background_stats():
+    """
+    Métricas do BackgroundExecutor dos triggers do chatbot.
+
+    Os números são do processo gunicorn que atendeu a requisição.
+    """
+    from app.services.background_executor import get_background_executor
+    stats = get_background_executor().stats()
+    stats['pid'] = os.getpid()
+    return jsonify(stats), 200
+
+
 @queue_admin_bp.route('/redis', methods=['GET'])
 def get_redis_info():
     """Obtém informações das filas Redis."""
@@ -14,6 +14,7 @@ Frontend conecta via:
 const eventSource = new EventSource('/api/video/job/{jobId}/stream');
 """
 
+import os
 import json
 import time
 import queue
@@ -22,31 +23,63 @@ from typing import Generator, Dict, Any, Optional
 from flask import Blueprint, Response, request, g
 from functools import wraps
 import logging
-import redis
 
 logger = logging.getLogger(__name__)
 
 # Blueprint
 sse_bp = Blueprint('sse', __name__)
 
-# Redis para pub/sub (se disponível)
-try:
-    import os
-    REDIS_HOST = os.environ.get('REDIS_HOST', 'redis')
-    REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
-    REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', None)
-    redis_client = redis.Redis(
-        host=REDIS_HOST, 
-        port=REDIS_PORT, 
-        password=REDIS_PASSWORD,
-        decode_responses=True
-    )
-    redis_client.ping()
-    REDIS_AVAILABLE = True
-    logger.info("✅ SSE: Redis disponível para pub/sub")
-except Exception as e:
-    REDIS_AVAILABLE = False
-    logger.warning(f"⚠️ SSE: Redis não disponível, usando fallback polling: {e}")
+
+# 🆕 v4.8.0: Client próprio do SSE, separado do pool compartilhado de
+# video_orchestrator.queue: cada stream segura uma conexão de pub/sub por até
+# 300s, e ~100 espectadores esgotariam o BlockingConnectionPool usado por
+# enqueue, caches, cancelamento e leases. Host padrão 'redis' (o mesmo de
+# antes), independente do padrão 'localhost' de queue.
+SSE_REDIS_HOST = os.environ.get('REDIS_HOST', 'redis')
+SSE_REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
+SSE_REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', None)
+# Após falha de conexão, não tentar de novo antes disso
+SSE_REDIS_RETRY_AFTER_SECONDS = 5
+
+_sse_redis_client = None
+_sse_redis_lock = threading.Lock()
+_sse_redis_unavailable_until = 0.0
+
+
+def _get_redis_client():
+    """
+    Redis para pub/sub (None → fallback em memória).
+
+    Criado na primeira chamada (não no import) e reaproveitado pelo processo;
+    o pool dele não tem limite, como o client dedicado anterior.
+    """
+    global _sse_redis_client, _sse_redis_unavailable_until
+
+    if _sse_redis_client is not None:
+        return _sse_redis_client
+    if time.time() < _sse_redis_unavailable_until:
+        return None
+
+    with _sse_redis_lock:
+        if _sse_redis_client is not None:
+            return _sse_redis_client
+        try:
+            import redis
+            client = redis.Redis(
+                host=SSE_REDIS_HOST,
+                port=SSE_REDIS_PORT,
+                password=SSE_REDIS_PASSWORD,
+                decode_responses=True
+            )
+            client.ping()
+            _sse_redis_client = client
+            logger.info("✅ SSE: Redis disponível para pub/sub")
+            return client
+        except Exception as e:
+            _sse_redis_unavailable_until = time.time() + SSE_REDIS_RETRY_AFTER_SECONDS
+            logger.warning(f"⚠️ SSE: Redis não disponível, usando fallback polling: {e}")
+            return None
+
 
 # In-memory event storage (fallback quando Redis não disponível)
 # job_id -> list of events
@@ -87,7 +120,8 @@ def emit_job_event(job_id: str, event_type: str, data: Dict[str, Any]) -> None:
         **data
     }
     
-    if REDIS_AVAILABLE:
+    redis_client = _get_redis_client()
+    if redis_client:
         # Publicar no Redis
         channel = f"job:{job_id}:events"
         try:
@@ -123,7 +157,8 @@ def get_job_events_generator(job_id: str, timeout: int = 300) -> Generator[str,
     # Enviar evento de conexão
     yield format_sse({"status": "connected", "job_id": job_id}, "connection")
     
-    if REDIS_AVAILABLE:
+    redis_client = _get_redis_client()
+    if redis_client:
         # Usar Redis pub/sub
         pubsub = redis_client.pubsub()
         channel = f"job:{job_id}:events"
@@ -25,10 +25,15 @@ Autor: Claude + Vinicius
 Data: 08/Fev/2026
 """
 
+import os
 import logging
 import json
 import uuid
-from typing import Optional, Dict, Any
+import time
+import queue
+import atexit
+import threading
+from typing import Optional, Dict, Any, List, Tuple
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
@@ -36,6 +41,13 @@ logger = logging.getLogger(__name__)
 # Tabela já criada?
 _table_ensured = False
 
+# 🆕 v4.8.0: Consultas ao cache LLM gravadas em lote por uma thread (ROLLBACK:
+# 'false' volta ao INSERT síncrono, com conexão nova, em toda consulta)
+LLM_CACHE_LOOKUP_LOG_ASYNC = os.environ.get('LLM_CACHE_LOOKUP_LOG_ASYNC', 'true').lower() == 'true'
+LLM_CACHE_LOOKUP_LOG_BATCH_SIZE = int(os.environ.get('LLM_CACHE_LOOKUP_LOG_BATCH_SIZE', 200))
+LLM_CACHE_LOOKUP_LOG_FLUSH_SECONDS = float(os.environ.get('LLM_CACHE_LOOKUP_LOG_FLUSH_SECONDS', 2.0))
+LLM_CACHE_LOOKUP_LOG_QUEUE_MAX = 10000
+
 
 # ═══════════════════════════════════════════════════════════════
 # CUSTOS POR UNIDADE (para estimativa automática)
@@ -162,6 +174,7 @@ def log_ai_usage(
             - "transcription"       → Transcrição (AssemblyAI)
             - "chatbot_llm"         → Chatbot (GPT-4o-mini)
             - "router_llm"          → Router (GPT-4o-mini)
+            - "llm_cache"           → Consulta ao cache de respostas LLM (custo 0)
         provider: "openai", "assemblyai", "modal", "ffmpeg_local"
         model: Nome do modelo ("gpt-4o-mini", "raft_small", "whisper")
         project_id: ID do projeto (opcional)
@@ -233,10 +246,203 @@ def log_ai_usage(
         return None
 
 
+class _UsageLogBatcher:
+    """
+    Grava linhas de ai_usage_log fora do caminho da chamada.
+
+    submit() só enfileira; uma thread daemon grava em lotes (uma conexão,
+    um INSERT multi-linha). Fila cheia ou lote com erro descartam as linhas
+    com aviso — são métricas, não custo.
+    """
+
+    _COLUMNS = ("id, project_id, conversation_id, service_type, provider, model, "
+                "tokens_in, tokens_out, duration_ms, cost_usd, input_units, output_units, metadata")
+
+    def __init__(self):
+        self._queue: "queue.Queue[Tuple]" = queue.Queue(maxsize=LLM_CACHE_LOOKUP_LOG_QUEUE_MAX)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, row: Tuple) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"⚠️ [COST] Fila de log cheia, linha descartada ({self.dropped} no total)")
+
+    def flush(self) -> None:
+        """Grava tudo o que está na fila (usado no shutdown)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def _ensure_thread(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="ai_usage_log_batcher", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + LLM_CACHE_LOOKUP_LOG_FLUSH_SECONDS
+            while len(batch) < LLM_CACHE_LOOKUP_LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple]) -> None:
+        _ensure_table()
+        try:
+            from app.db import get_db_connection
+            conn = get_db_connection()
+            try:
+                cursor = conn.cursor()
+                values_sql = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(batch))
+                cursor.execute(
+                    f"INSERT INTO ai_usage_log ({self._COLUMNS}) VALUES {values_sql}",
+                    [value for row in batch for value in row],
+                )
+                conn.commit()
+                cursor.close()
+            finally:
+                conn.close()
+            logger.debug(f"💰 [COST] {len(batch)} consultas ao cache LLM gravadas")
+        except Exception as e:
+            logger.warning(f"⚠️ [COST] Falha ao gravar {len(batch)} consultas ao cache LLM: {e}")
+
+
+_lookup_log = _UsageLogBatcher()
+
+
+def log_llm_cache_lookup(
+    service_type: str,
+    model: str,
+    hit: bool,
+    tokens_in: int = 0,
+    tokens_out: int = 0,
+    project_id: Optional[str] = None,
+    duration_ms: int = 0,
+) -> None:
+    """
+    🆕 v4.8.0: Registra uma consulta ao cache de respostas LLM.
+
+    Linhas com service_type="llm_cache" e custo 0 (o custo real da chamada,
+    em caso de miss, continua sendo registrado pelo serviço). Em hits,
+    metadata.saved_cost_usd guarda o custo que foi evitado.
+
+    Só enfileira: a gravação é em lote, fora da chamada (hits não pagam
+    um round-trip ao banco). Com LLM_CACHE_LOOKUP_LOG_ASYNC=false grava na hora.
+
+    Args:
+        service_type: Serviço que fez a chamada (ex: "triage_llm")
+        model: Modelo da requisição
+        hit: True se a resposta veio do cache
+        tokens_in/tokens_out: Tokens da resposta original (evitados em hits)
+    """
+    saved_cost = estimate_openai_cost(model, tokens_in, tokens_out) if hit else 0.0
+    metadata = {
+        "cache_service": service_type,
+        "hit": hit,
+        "saved_tokens_in": tokens_in if hit else 0,
+        "saved_tokens_out": tokens_out if hit else 0,
+        "saved_cost_usd": saved_cost,
+    }
+
+    if not LLM_CACHE_LOOKUP_LOG_ASYNC:
+        log_ai_usage(
+            service_type="llm_cache",
+            provider="cache",
+            model=model,
+            project_id=project_id,
+            duration_ms=duration_ms,
+            cost_usd=0.0,
+            metadata=metadata,
+        )
+        return
+
+    _lookup_log.submit((
+        str(uuid.uuid4()), project_id, None, "llm_cache", "cache", model or "",
+        0, 0, duration_ms, 0.0, 0, 0, json.dumps(metadata, ensure_ascii=False),
+    ))
+
+
 # ═══════════════════════════════════════════════════════════════
 # CONSULTAS
 # ═══════════════════════════════════════════════════════════════
 
+def get_llm_cache_stats(days: int = 7) -> Dict:
+    """🆕 v4.8.0: Hit rate e custo evitado do cache de respostas LLM, por serviço."""
+    _ensure_table()
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT
+                metadata->>'cache_service' AS cache_service,
+                COUNT(*) FILTER (WHERE (metadata->>'hit')::boolean) AS hits,
+                COUNT(*) FILTER (WHERE NOT (metadata->>'hit')::boolean) AS misses,
+                COALESCE(SUM((metadata->>'saved_cost_usd')::numeric), 0) AS saved_cost_usd
+            FROM ai_usage_log
+            WHERE service_type = 'llm_cache'
+              AND created_at >= NOW() - make_interval(days => %s)
+            GROUP BY 1
+            ORDER BY saved_cost_usd DESC
+        """, (days,))
+
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        services = {}
+        total_hits = total_misses = 0
+        total_saved = 0.0
+        for row in rows:
+            hits, misses, saved = row[1] or 0, row[2] or 0, float(row[3] or 0)
+            services[row[0]] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "saved_cost_usd": round(saved, 6),
+            }
+            total_hits += hits
+            total_misses += misses
+            total_saved += saved
+
+        lookups = total_hits + total_misses
+        return {
+            "days": days,
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_rate": round(total_hits / lookups, 4) if lookups else 0.0,
+            "saved_cost_usd": round(total_saved, 6),
+            "services": services,
+        }
+
+    except Exception as e:
+        logger.error(f"❌ [COST] Erro ao consultar cache LLM: {e}")
+        return {"days": days, "hits": 0, "misses": 0, "hit_rate": 0.0, "saved_cost_usd": 0, "services": {}}
+
+
 def get_project_costs(project_id: str) -> Dict:
     """Retorna resumo de custos de um projeto."""
     _ensure_table()
@@ -0,0 +1,324 @@
+"""
+📬 Analysis Queue — Fila durável (rq) para os triggers de análise do chatbot.
+
+Os triggers (triage, vision, transcript, title, clipper, reprocess) rodavam
+dentro do processo gunicorn da API: um deploy ou reciclagem de worker
+(--timeout 120) matava análises em andamento sem aviso, e elas disputavam
+CPU e conexões com as requisições HTTP.
+
+Agora cada disparo vira um job rq no Redis, executado por um pool separado
+(analysis_worker.py), que escala independente da API:
+
+- Prioridade por fila: chatbot_analysis_high → chatbot_analysis → chatbot_analysis_low
+  (o worker consome nessa ordem)
+- Chave de idempotência por (tipo de análise, projeto): enquanto um job
+  está na fila ou rodando, novos disparos iguais são ignorados
+- At-least-once: Retry para exceções e re-enfileiramento periódico de
+  jobs abandonados (worker morto no meio) pelo analysis_worker (a cada
+  ANALYSIS_REQUEUE_INTERVAL_SECONDS, não só na subida: o heartbeat do rq
+  mantém o job em StartedJobRegistry por ~90s após a morte do worker).
+  As análises são idempotentes (resultado em project_config + fingerprint).
+- Exclusividade na execução: o job reserva a mesma chave do
+  BackgroundExecutor (com o id do job rq como dono), então nunca roda
+  junto com uma execução in-process, e um job re-enfileirado retoma a
+  reserva deixada pela execução que morreu em vez de se achar duplicado
+
+Sem rq/Redis ou sem analysis_worker ativo, o disparo cai no
+BackgroundExecutor do próprio processo (comportamento anterior).
+
+Uso:
+    from app.services.analysis_queue import dispatch_analysis
+    dispatch_analysis('vision_analysis', project_id, conversation_id, batch_id=batch_id)
+
+Data: 18/Out/2026
+"""
+
+import os
+import time
+import logging
+import importlib
+from typing import Any, Dict, Optional
+
+from app.services.background_executor import (
+    get_background_executor, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    from redis import Redis
+    from rq import Queue, Retry, Worker
+    from rq.job import Job
+    RQ_AVAILABLE = True
+except ImportError:
+    RQ_AVAILABLE = False
+
+# Feature flag (ROLLBACK: 'false' mantém tudo no BackgroundExecutor da API)
+ANALYSIS_QUEUE_ENABLED = os.environ.get('ANALYSIS_QUEUE', 'true').lower() == 'true'
+ANALYSIS_JOB_TIMEOUT = int(os.environ.get('ANALYSIS_JOB_TIMEOUT', 1800))
+ANALYSIS_JOB_RETRIES = int(os.environ.get('ANALYSIS_JOB_RETRIES', 2))
+ANALYSIS_MAX_ABANDON_REQUEUES = int(os.environ.get('ANALYSIS_MAX_ABANDON_REQUEUES', 3))
+ANALYSIS_REQUEUE_INTERVAL_SECONDS = int(os.environ.get('ANALYSIS_REQUEUE_INTERVAL_SECONDS', 60))
+IDEMPOTENCY_PREFIX = 'analysis:idem'
+
+QUEUE_BY_PRIORITY = {
+    PRIORITY_HIGH: 'chatbot_analysis_high',
+    PRIORITY_NORMAL: 'chatbot_analysis',
+    PRIORITY_LOW: 'chatbot_analysis_low',
+}
+# Ordem de consumo no analysis_worker
+QUEUE_NAMES = [QUEUE_BY_PRIORITY[p] for p in sorted(QUEUE_BY_PRIORITY)]
+
+# analysis_type → (módulo, função, prioridade)
+ANALYSIS_RUNNERS = {
+    'asset_triage': ('app.services.asset_triage_trigger', '_run_asset_triage', PRIORITY_HIGH),
+    'vision_analysis': ('app.services.vision_analysis_trigger', '_run_vision_analysis', PRIORITY_NORMAL),
+    'transcript_analysis': ('app.services.transcript_analysis_trigger', '_run_transcript_analysis', PRIORITY_NORMAL),
+    'reprocess': ('app.services.asset_reprocess_service', '_run_reprocess_pipeline', PRIORITY_NORMAL),
+    'title_director': ('app.services.title_director_trigger', '_run_title_director', PRIORITY_LOW),
+    'video_clipper': ('app.services.video_clipper_trigger', '_run_video_clipper', PRIORITY_LOW),
+}
+
+
+def analysis_key(analysis_type: str, project_id: str) -> str:
+    """Chave de exclusividade/idempotência (mesma do BackgroundExecutor)."""
+    return f"{analysis_type}:{project_id}"
+
+
+def _resolve_runner(analysis_type: str):
+    module_name, func_name, _ = ANALYSIS_RUNNERS[analysis_type]
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONEXÃO
+# ═══════════════════════════════════════════════════════════════
+
+_connection = None
+_workers_checked_at = 0.0
+_workers_available = False
+
+
+def get_rq_connection():
+    """
+    Conexão Redis para o rq (bytes — sem decode_responses, exigido pelo rq).
+    """
+    global _connection
+    if _connection is None:
+        _connection = Redis(
+            host=os.environ.get('REDIS_HOST', 'localhost'),
+            port=int(os.environ.get('REDIS_PORT', 6379)),
+            password=os.environ.get('REDIS_PASSWORD', None),
+        )
+    return _connection
+
+
+def _analysis_workers_available(connection) -> bool:
+    """True se há analysis_worker escutando (cache de 15s)."""
+    global _workers_checked_at, _workers_available
+    now = time.time()
+    if now - _workers_checked_at > 15:
+        _workers_checked_at = now
+        try:
+            queue = Queue(QUEUE_BY_PRIORITY[PRIORITY_NORMAL], connection=connection)
+            _workers_available = Worker.count(queue=queue) > 0
+        except Exception as e:
+            logger.warning(f"⚠️ [ANALYSIS-QUEUE] Falha ao consultar workers: {e}")
+            _workers_available = False
+    return _workers_available
+
+
+# ═══════════════════════════════════════════════════════════════
+# DISPARO
+# ═══════════════════════════════════════════════════════════════
+
+def dispatch_analysis(
+    analysis_type: str,
+    project_id: str,
+    conversation_id: str,
+    dedup: bool = True,
+    **kwargs,
+) -> bool:
+    """
+    Dispara uma análise: fila rq se disponível, senão BackgroundExecutor.
+
+    Args:
+        analysis_type: Chave de ANALYSIS_RUNNERS
+        project_id / conversation_id: Repassados ao runner
+        dedup: False para disparos explícitos que não devem ser ignorados
+        **kwargs: Argumentos extras do runner (batch_id, user_input)
+
+    Returns:
+        True se enfileirada; False se ignorada (duplicada) ou recusada
+    """
+    priority = ANALYSIS_RUNNERS[analysis_type][2]
+    key = analysis_key(analysis_type, project_id) if dedup else None
+
+    if ANALYSIS_QUEUE_ENABLED and RQ_AVAILABLE:
+        status = _enqueue_rq(analysis_type, project_id, conversation_id, key, priority, kwargs)
+        if status is not None:
+            return status
+
+    return get_background_executor().submit(
+        _resolve_runner(analysis_type), project_id, conversation_id,
+        name=f"{analysis_type}-{project_id[:8]}",
+        priority=priority,
+        dedup_key=key,
+        **kwargs,
+    )
+
+
+def _enqueue_rq(analysis_type: str, project_id: str, conversation_id: str,
+                key: Optional[str], priority: int, kwargs: Dict[str, Any]) -> Optional[bool]:
+    """
+    Enfileira no rq. Retorna None se a fila não pode ser usada (fallback).
+    """
+    try:
+        connection = get_rq_connection()
+        if not _analysis_workers_available(connection):
+            return None
+
+        queue = Queue(QUEUE_BY_PRIORITY[priority], connection=connection)
+        idem_key = f"{IDEMPOTENCY_PREFIX}:{key}" if key else None
+
+        if idem_key:
+            existing_id = connection.get(idem_key)
+            if existing_id:
+                existing_id = existing_id.decode() if isinstance(existing_id, bytes) else existing_id
+                try:
+                    existing = Job.fetch(existing_id, connection=connection)
+                    if existing.get_status(refresh=True) in ('queued', 'started', 'scheduled', 'deferred'):
+                        logger.info(
+                            f"⏭️ [ANALYSIS-QUEUE] {analysis_type} já na fila para "
+                            f"project={project_id[:8]} (job={existing_id[:8]})"
+                        )
+                        return False
+                except Exception:
+                    pass  # Job expirou/sumiu → pode enfileirar de novo
+
+        job = queue.enqueue(
+            run_analysis_job,
+            analysis_type, project_id, conversation_id, kwargs, key is not None,
+            job_timeout=ANALYSIS_JOB_TIMEOUT,
+            retry=Retry(max=ANALYSIS_JOB_RETRIES, interval=[15, 60]) if ANALYSIS_JOB_RETRIES else None,
+            result_ttl=3600,
+            failure_ttl=7 * 24 * 3600,
+            description=f"{analysis_type} project={project_id[:8]}",
+            meta={'analysis_type': analysis_type, 'project_id': project_id, 'idempotency_key': idem_key},
+        )
+        if idem_key:
+            connection.set(idem_key, job.id, ex=ANALYSIS_JOB_TIMEOUT * (ANALYSIS_JOB_RETRIES + 2))
+
+        logger.info(
+            f"📬 [ANALYSIS-QUEUE] {analysis_type} enfileirada em {queue.name}: "
+            f"project={project_id[:8]} job={job.id[:8]}"
+        )
+        return True
+
+    except Exception as e:
+        logger.warning(f"⚠️ [ANALYSIS-QUEUE] Falha ao enfileirar {analysis_type} ({e}), usando executor local")
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════
+# EXECUÇÃO (analysis_worker)
+# ═══════════════════════════════════════════════════════════════
+
+def run_analysis_job(analysis_type: str, project_id: str, conversation_id: str,
+                     kwargs: Optional[Dict[str, Any]] = None,
+                     dedup: bool = True) -> Dict[str, Any]:
+    """
+    Entry point dos jobs rq (roda no analysis_worker).
+
+    Reserva a chave de exclusividade do BackgroundExecutor: se outra
+    execução do mesmo tipo está rodando para o projeto, este job termina
+    sem fazer nada (a outra já cobre o disparo). Disparos explícitos
+    (dedup=False) rodam sem reserva, como no executor.
+
+    A chave de idempotência só é liberada quando o job não volta mais à
+    fila: com um Retry pendente, o job agendado continua sendo "o" job
+    do disparo e novos disparos iguais seguem deduplicados.
+    """
+    from rq import get_current_job
+
+    runner = _resolve_runner(analysis_type)
+    key = analysis_key(analysis_type, project_id)
+    job = get_current_job()
+    t0 = time.time()
+
+    if not dedup:
+        runner(project_id, conversation_id, **(kwargs or {}))
+    else:
+        try:
+            with get_background_executor().exclusive(key, owner=job.id if job else None) as claimed:
+                if not claimed:
+                    logger.info(f"⏭️ [ANALYSIS-QUEUE] {key} já em execução em outro processo")
+                    _release_idempotency_key(key)
+                    return {'status': 'skipped', 'reason': 'already_running'}
+                runner(project_id, conversation_id, **(kwargs or {}))
+        except Exception:
+            if not (job and (job.retries_left or 0) > 0):
+                _release_idempotency_key(key)
+            raise
+        _release_idempotency_key(key)
+
+    elapsed = time.time() - t0
+    logger.info(f"✅ [ANALYSIS-QUEUE] {key} concluída em {elapsed:.1f}s")
+    return {'status': 'completed', 'elapsed_s': round(elapsed, 1)}
+
+
+def _release_idempotency_key(key: str) -> None:
+    try:
+        get_rq_connection().delete(f"{IDEMPOTENCY_PREFIX}:{key}")
+    except Exception as e:
+        logger.warning(f"⚠️ [ANALYSIS-QUEUE] Falha ao liberar idempotência {key}: {e}")
+
+
+def requeue_abandoned_jobs(connection=None) -> int:
+    """
+    Re-enfileira jobs abandonados (worker morto durante a execução).
+
+    O rq move jobs cujo worker sumiu de StartedJobRegistry para
+    FailedJobRegistry; aqui eles voltam para a fila (até
+    ANALYSIS_MAX_ABANDON_REQUEUES vezes por job) — garantia at-least-once.
+    """
+    from rq.registry import FailedJobRegistry, StartedJobRegistry
+
+    connection = connection or get_rq_connection()
+    requeued = 0
+    for name in QUEUE_NAMES:
+        queue = Queue(name, connection=connection)
+        StartedJobRegistry(queue=queue).cleanup()
+        failed = FailedJobRegistry(queue=queue)
+        for job_id in failed.get_job_ids():
+            try:
+                job = Job.fetch(job_id, connection=connection)
+            except Exception:
+                continue
+            exc_info = job.exc_info or ''
+            if not exc_info.startswith('Moved to FailedJobRegistry'):
+                continue  # Falha real do runner, não abandono
+            attempts = int(job.meta.get('abandon_requeues', 0))
+            if attempts >= ANALYSIS_MAX_ABANDON_REQUEUES:
+                continue
+            job.meta['abandon_requeues'] = attempts + 1
+            job.save_meta()
+            failed.requeue(job_id)
+            requeued += 1
+            logger.warning(
+                f"🔁 [ANALYSIS-QUEUE] Job abandonado re-enfileirado: {job.description} "
+                f"(tentativa {attempts + 1}/{ANALYSIS_MAX_ABANDON_REQUEUES})"
+            )
+    return requeued
+
+
+def run_requeue_loop(connection=None, should_run=lambda: True) -> None:
+    """Loop de re-enfileiramento de jobs abandonados (thread daemon do analysis_worker)."""
+    while should_run():
+        try:
+            requeued = requeue_abandoned_jobs(connection)
+            if requeued:
+                logger.warning(f"🔁 [ANALYSIS-QUEUE] {requeued} job(s) abandonado(s) re-enfileirado(s)")
+        except Exception as e:
+            logger.error(f"❌ [ANALYSIS-QUEUE] Falha ao re-enfileirar jobs abandonados: {e}")
+        time.sleep(ANALYSIS_REQUEUE_INTERVAL_SECONDS)
@@ -0,0 +1,184 @@
+"""
+🗂️ Asset Analysis Cache — Resultados de análise por conteúdo do asset.
+
+Vision, Transcript e Triage buscavam todos os assets do projeto e
+rodavam Modal RAFT + LLM sobre o conjunto inteiro a cada disparo.
+Adicionar 1 b-roll a um projeto de 20 vídeos custava 20 análises.
+
+Aqui cada asset ganha um hash de conteúdo (bucket + file_path + campos
+de conteúdo do metadata + o que mais a análise consome, ex: transcrição,
+opções, idioma). Então:
+
+- Análises por asset (Vision Director) ficam em asset_analysis_cache,
+  chaveadas por (content_hash, analysis_type), e só assets novos ou
+  alterados voltam para o Modal/LLM.
+- Análises de projeto (Triage, Transcript), que precisam enxergar todos
+  os assets juntos (retakes, ordem, narrativa), guardam um fingerprint
+  do conjunto de entrada no próprio resultado em project_config. Se o
+  fingerprint não mudou, a chamada LLM é pulada.
+
+Tabela (criada automaticamente no primeiro uso):
+    asset_analysis_cache (content_hash, analysis_type) → result JSONB
+
+Uso:
+    key = asset_content_hash(asset, {'num_frames': 8, 'language': lang})
+    cached = get_cached_results('vision', [key, ...])
+    store_results('vision', [(key, asset_id, result), ...])
+
+    fp = inputs_fingerprint([key, ...], retakes, format_detected)
+
+Data: 18/Out/2026
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' volta a analisar todos os assets em todo disparo)
+ASSET_ANALYSIS_CACHE_ENABLED = os.environ.get('ASSET_ANALYSIS_CACHE', 'true').lower() == 'true'
+# Versão da chave (incrementar invalida todo o cache, ex: mudança de prompt)
+ASSET_ANALYSIS_CACHE_VERSION = 'v1'
+
+# Campos do metadata que identificam o conteúdo do arquivo (quando presentes)
+CONTENT_METADATA_KEYS = ('content_sha1', 'sha1', 'etag', 'size', 'file_size', 'duration_ms')
+
+_table_ensured = False
+
+
+def _digest(obj: Any) -> str:
+    raw = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def asset_content_hash(asset: Dict, extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash do conteúdo de um asset + parâmetros da análise.
+
+    O arquivo no B2 é imutável por file_path; campos de conteúdo do
+    metadata (sha1, size...) entram quando existem. `extra` inclui tudo
+    mais que muda o resultado (transcrição, num_frames, idioma).
+    """
+    metadata = asset.get('metadata') or {}
+    return _digest({
+        'v': ASSET_ANALYSIS_CACHE_VERSION,
+        'bucket': asset.get('bucket'),
+        'file_path': asset.get('file_path'),
+        'content': {k: metadata.get(k) for k in CONTENT_METADATA_KEYS if metadata.get(k) is not None},
+        'extra': extra or {},
+    })
+
+
+def inputs_fingerprint(content_hashes: List[str], *context: Any) -> str:
+    """Fingerprint de uma análise de projeto (conjunto de assets + contexto)."""
+    return _digest({
+        'v': ASSET_ANALYSIS_CACHE_VERSION,
+        'assets': sorted(content_hashes),
+        'context': list(context),
+    })
+
+
+# ═══════════════════════════════════════════════════════════════
+# TABELA
+# ═══════════════════════════════════════════════════════════════
+
+def _ensure_table():
+    """Cria tabela asset_analysis_cache se não existir."""
+    global _table_ensured
+    if _table_ensured:
+        return
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS asset_analysis_cache (
+                content_hash VARCHAR(64) NOT NULL,
+                analysis_type VARCHAR(50) NOT NULL,
+                asset_id UUID,
+                result JSONB NOT NULL,
+                created_at TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (content_hash, analysis_type)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_asset_analysis_cache_asset
+                ON asset_analysis_cache(asset_id);
+        """)
+        conn.commit()
+        cursor.close()
+        conn.close()
+        _table_ensured = True
+        logger.info("🗂️ [ANALYSIS-CACHE] Tabela asset_analysis_cache OK")
+    except Exception as e:
+        logger.error(f"❌ [ANALYSIS-CACHE] Falha ao criar tabela: {e}")
+
+
+# ═══════════════════════════════════════════════════════════════
+# LEITURA / ESCRITA
+# ═══════════════════════════════════════════════════════════════
+
+def get_cached_results(analysis_type: str, content_hashes: List[str]) -> Dict[str, Dict]:
+    """Retorna {content_hash: result} para os hashes já analisados."""
+    if not ASSET_ANALYSIS_CACHE_ENABLED or not content_hashes:
+        return {}
+    _ensure_table()
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT content_hash, result
+            FROM asset_analysis_cache
+            WHERE analysis_type = %s AND content_hash = ANY(%s)
+        """, (analysis_type, list(content_hashes)))
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+    except Exception as e:
+        logger.warning(f"⚠️ [ANALYSIS-CACHE] Falha ao consultar ({analysis_type}): {e}")
+        return {}
+
+    hits = {}
+    for content_hash, result in rows:
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except (TypeError, ValueError):
+                continue
+        if isinstance(result, dict):
+            hits[content_hash] = result
+    return hits
+
+
+def store_results(analysis_type: str, entries: List[Tuple[str, str, Dict]]) -> None:
+    """Grava [(content_hash, asset_id, result), ...] (sobrescreve o existente)."""
+    if not ASSET_ANALYSIS_CACHE_ENABLED or not entries:
+        return
+    _ensure_table()
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        for content_hash, asset_id, result in entries:
+            cursor.execute("""
+                INSERT INTO asset_analysis_cache
+                    (content_hash, analysis_type, asset_id, result)
+                VALUES (%s, %s, %s, %s::jsonb)
+                ON CONFLICT (content_hash, analysis_type)
+                DO UPDATE SET result = EXCLUDED.result,
+                              asset_id = EXCLUDED.asset_id,
+                              created_at = NOW()
+            """, (content_hash, analysis_type, asset_id,
+                  json.dumps(result, ensure_ascii=False, default=str)))
+        conn.commit()
+        cursor.close()
+        conn.close()
+        logger.info(f"🗂️ [ANALYSIS-CACHE] {len(entries)} resultado(s) {analysis_type} salvos")
+    except Exception as e:
+        logger.warning(f"⚠️ [ANALYSIS-CACHE] Falha ao gravar ({analysis_type}): {e}")
@@ -17,7 +17,6 @@ Fluxo determinístico — sem LLM envolvida.
 
 import json
 import logging
-import threading
 import uuid as uuid_module
 from typing import Optional
 
@@ -29,7 +28,7 @@ def trigger_reprocess_async(
     conversation_id: str,
 ) -> None:
     """
-    Dispara reprocessamento com novos assets em background thread.
+    Dispara reprocessamento com novos assets na fila de análises.
     
     Args:
         project_id: ID do projeto
@@ -39,13 +38,8 @@ def trigger_reprocess_async(
         f"🔄 [REPROCESS] Disparando reprocessamento async "
         f"project={project_id[:8]}, conv={conversation_id[:8]}"
     )
-    thread = threading.Thread(
-        target=_run_reprocess_pipeline,
-        args=(project_id, conversation_id),
-        daemon=True,
-        name=f"reprocess_{project_id[:8]}",
-    )
-    thread.start()
+    from app.services.analysis_queue import dispatch_analysis
+    dispatch_analysis('reprocess', project_id, conversation_id)
 
 
 def _run_reprocess_pipeline(
@@ -66,11 +60,17 @@ def _run_reprocess_pipeline(
         # ═══ 1. Asset Triage (sync) ═══
         logger.info(f"🔄 [REPROCESS] Step 1/4: Asset Triage para project={project_id[:8]}")
         try:
-            from app.services.asset_triage_trigger import _run_asset_triage
-            _run_asset_triage(
-                project_id=project_id,
-                conversation_id=conversation_id,
-            )
+            from app.services.asset_triage_trigger import _run_asset_triage, triage_dedup_key
+            from app.services.background_executor import get_background_executor
+            # Mesma exclusividade da triagem disparada pelo chat
+            with get_background_executor().exclusive(triage_dedup_key(project_id)) as claimed:
+                if claimed:
+                    _run_asset_triage(
+                        project_id=project_id,
+                        conversation_id=conversation_id,
+                    )
+                else:
+                    logger.info(f"⏭️ [REPROCESS] Triagem já em execução para project={project_id[:8]}")
             logger.info(f"✅ [REPROCESS] Asset Triage concluída")
         except Exception as e:
             logger.error(f"❌ [REPROCESS] Asset Triage falhou: {e}")
@@ -268,6 +268,10 @@ def _trigger_replay(job_id: str, step_name: str) -> Optional[str]:
         jm._jobs_cache[new_job_id] = new_job
         jm._persist_job(new_job)
 
+        # 🆕 v4.8.0: Linhagem indexada (parent_job_id / root_job_id)
+        from app.video_orchestrator.replay_lineage import record_replay_lineage
+        record_replay_lineage(new_job_id, job_id)
+
         # 4. Salvar PipelineState
         sm = StateManager(db_connection_func=get_direct_db_connection)
         replay_options = {
@@ -20,16 +20,27 @@ import base64
 import logging
 import tempfile
 import subprocess
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
 import requests
 
+from app.services.llm_response_cache import cached_chat_completion_post
+
 logger = logging.getLogger(__name__)
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 TRIAGE_LLM_MODEL = os.getenv('TRIAGE_LLM_MODEL', 'gpt-4o-mini')
 TRIAGE_LLM_MAX_TOKENS = int(os.getenv('TRIAGE_LLM_MAX_TOKENS', '4096'))
 
+# 🆕 v4.8.0: Extração de frames em paralelo + cache por (asset_id, seek)
+# ROLLBACK: TRIAGE_PARALLEL_FRAMES=false volta à extração sequencial
+TRIAGE_PARALLEL_FRAMES = os.getenv('TRIAGE_PARALLEL_FRAMES', 'true').lower() == 'true'
+TRIAGE_FRAME_MAX_PARALLEL = int(os.getenv('TRIAGE_FRAME_MAX_PARALLEL', '6'))
+TRIAGE_FRAME_CACHE = os.getenv('TRIAGE_FRAME_CACHE', 'true').lower() == 'true'
+TRIAGE_FRAME_CACHE_TTL_SECONDS = int(os.getenv('TRIAGE_FRAME_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+TRIAGE_FRAME_CACHE_PREFIX = 'triage:frame'
+
 # Idioma padrão para respostas de IA (será configurável por projeto futuramente)
 DEFAULT_RESPONSE_LANGUAGE = os.getenv('AI_RESPONSE_LANGUAGE', 'Portuguese (pt-BR)')
 
@@ -219,6 +230,7 @@ class AssetTriageService:
         assets: List[Dict],
         video_urls: Dict[str, str],
         project_id: Optional[str] = None,
+        url_resolver: Optional[Callable[[Dict], Optional[str]]] = None,
     ) -> Dict:
         """
         Analisa e classifica todos os assets de um projeto.
@@ -227,6 +239,8 @@ class AssetTriageService:
             assets: Lista de assets do projeto (de project_assets)
             video_urls: Mapa {asset_id: signed_url} para download de vídeos
             project_id: ID do projeto (para resolver locale)
+            url_resolver: Gera a URL de um asset sob demanda (assinatura B2 feita
+                          dentro do pool de extração, só para quem precisa de frame)
 
         Returns:
             Resultado da triagem com classificações, retakes, ordem, roteamento
@@ -241,57 +255,15 @@ class AssetTriageService:
         logger.info(f"📋 [TRIAGE] Analisando {len(assets)} assets... (lang={self._response_language})")
 
         # ─── 1. Coletar thumbnails (cacheados ou extrair) ─────
-        frames = {}
-        cached_count = 0
-        extracted_count = 0
-
-        for asset in assets:
-            if asset.get('asset_type') != 'video':
-                asset['has_frame'] = False
-                continue
-
-            # Tentar usar thumbnail cacheado (extraído durante upload)
-            cached_thumb = (asset.get('metadata') or {}).get('thumbnail_b64')
-            if cached_thumb:
-                frames[asset['id']] = {
-                    'base64_data': cached_thumb,
-                    'mime_type': 'image/jpeg',
-                }
-                asset['has_frame'] = True
-                cached_count += 1
-                logger.info(
-                    f"  🖼️ Cache: {asset.get('filename', '?')[:40]}"
-                )
-                continue
-
-            # Fallback: extrair agora (se não foi cacheado durante upload)
-            if asset['id'] in video_urls:
-                url = video_urls[asset['id']]
-                duration_ms = asset.get('duration_ms', 0)
-                seek_s = max(
-                    1.0, (duration_ms / 1000) * 0.25
-                ) if duration_ms else 1.0
-
-                frame = self._extract_thumbnail(url, seek_s)
-                if frame:
-                    frames[asset['id']] = frame
-                    asset['has_frame'] = True
-                    extracted_count += 1
-                    logger.info(
-                        f"  🖼️ Extraído: {asset.get('filename', '?')[:40]}"
-                    )
-                else:
-                    asset['has_frame'] = False
-                    logger.warning(
-                        f"  ⚠️ Sem frame: {asset.get('filename', '?')[:40]}"
-                    )
-            else:
-                asset['has_frame'] = False
+        frames, counts = self._collect_frames(assets, video_urls, url_resolver)
+        cached_count = counts['metadata']
+        extracted_count = counts['extracted']
 
         frame_time_ms = int((time.time() - t0) * 1000)
         logger.info(
             f"📋 [TRIAGE] Frames: {len(frames)}/{len(assets)} "
-            f"(cache={cached_count}, extraídos={extracted_count}) "
+            f"(cache={cached_count}, frame_cache={counts['frame_cache']}, "
+            f"extraídos={extracted_count}) "
             f"em {frame_time_ms}ms"
         )
 
@@ -328,6 +300,7 @@ class AssetTriageService:
             "tokens_out": llm_result.get("tokens_out", 0),
             "total_assets": len(assets),
             "frames_extracted": len(frames),
+            "frames_from_cache": cached_count + counts['frame_cache'],
             # Dados da triagem (LLM)
             "assets": classified_assets,
             "retakes": retakes,
@@ -348,6 +321,128 @@ class AssetTriageService:
 
         return result
 
+    # ───────────────────────────────────────────────────────────
+    # FRAME COLLECTION (metadata → cache Redis → ffmpeg em paralelo)
+    # ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _seek_seconds(asset: Dict) -> float:
+        """Posição do frame: 25% da duração (mínimo 1s)."""
+        duration_ms = asset.get('duration_ms', 0)
+        return max(1.0, (duration_ms / 1000) * 0.25) if duration_ms else 1.0
+
+    @staticmethod
+    def _frame_cache_key(asset_id: str, seek_s: float) -> str:
+        return f"{TRIAGE_FRAME_CACHE_PREFIX}:{asset_id}:{int(round(seek_s * 1000))}"
+
+    def _collect_frames(
+        self,
+        assets: List[Dict],
+        video_urls: Dict[str, str],
+        url_resolver: Optional[Callable[[Dict], Optional[str]]] = None,
+    ) -> Tuple[Dict[str, Dict], Dict[str, int]]:
+        """
+        Coleta 1 frame por vídeo e marca asset['has_frame'].
+
+        Ordem: thumbnail do upload (metadata) → cache Redis por
+        (asset_id, seek) → extração. A extração roda num pool limitado
+        (TRIAGE_FRAME_MAX_PARALLEL) e cada tarefa faz assinatura da URL,
+        seek do ffmpeg e base64 — re-triagem após um novo upload só
+        extrai o frame do asset novo.
+
+        Returns:
+            ({asset_id: frame}, {"metadata", "frame_cache", "extracted"})
+        """
+        frames = {}
+        counts = {'metadata': 0, 'frame_cache': 0, 'extracted': 0}
+        pending = []  # (asset, seek_s)
+
+        for asset in assets:
+            asset['has_frame'] = False
+            if asset.get('asset_type') != 'video':
+                continue
+
+            # Tentar usar thumbnail cacheado (extraído durante upload)
+            cached_thumb = (asset.get('metadata') or {}).get('thumbnail_b64')
+            if cached_thumb:
+                frames[asset['id']] = {
+                    'base64_data': cached_thumb,
+                    'mime_type': 'image/jpeg',
+                }
+                asset['has_frame'] = True
+                counts['metadata'] += 1
+                logger.info(f"  🖼️ Cache: {asset.get('filename', '?')[:40]}")
+                continue
+
+            if asset['id'] in video_urls or url_resolver:
+                pending.append((asset, self._seek_seconds(asset)))
+
+        if not pending:
+            return frames, counts
+
+        # Frames já extraídos em triagens anteriores
+        redis_client = None
+        if TRIAGE_FRAME_CACHE:
+            from app.video_orchestrator.queue import get_redis_client
+            redis_client = get_redis_client()
+        if redis_client:
+            keys = [self._frame_cache_key(a['id'], seek_s) for a, seek_s in pending]
+            try:
+                values = redis_client.mget(keys)
+            except Exception as e:
+                logger.warning(f"⚠️ [TRIAGE] Falha ao consultar cache de frames: {e}")
+                values = [None] * len(keys)
+            misses = []
+            for (asset, seek_s), value in zip(pending, values):
+                if value:
+                    frames[asset['id']] = {'base64_data': value, 'mime_type': 'image/jpeg'}
+                    asset['has_frame'] = True
+                    counts['frame_cache'] += 1
+                else:
+                    misses.append((asset, seek_s))
+            pending = misses
+
+        def _extract(item: Tuple[Dict, float]) -> Optional[Dict]:
+            asset, seek_s = item
+            url = video_urls.get(asset['id'])
+            if not url and url_resolver:
+                try:
+                    url = url_resolver(asset)
+                except Exception as e:
+                    logger.warning(f"  ⚠️ Falha URL {asset.get('filename', '?')[:40]}: {e}")
+            if not url:
+                logger.warning(f"  ⚠️ Sem URL: {asset.get('filename', '?')[:40]}")
+                return None
+            return self._extract_thumbnail(url, seek_s)
+
+        max_parallel = min(TRIAGE_FRAME_MAX_PARALLEL, len(pending))
+        if TRIAGE_PARALLEL_FRAMES and max_parallel > 1:
+            with ThreadPoolExecutor(max_workers=max_parallel,
+                                    thread_name_prefix='triage-frame') as executor:
+                results = list(executor.map(_extract, pending))
+        else:
+            results = [_extract(item) for item in pending]
+
+        for (asset, seek_s), frame in zip(pending, results):
+            if not frame:
+                logger.warning(f"  ⚠️ Sem frame: {asset.get('filename', '?')[:40]}")
+                continue
+            frames[asset['id']] = frame
+            asset['has_frame'] = True
+            counts['extracted'] += 1
+            logger.info(f"  🖼️ Extraído: {asset.get('filename', '?')[:40]}")
+            if redis_client:
+                try:
+                    redis_client.set(
+                        self._frame_cache_key(asset['id'], seek_s),
+                        frame['base64_data'],
+                        ex=TRIAGE_FRAME_CACHE_TTL_SECONDS,
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ [TRIAGE] Falha ao gravar frame no cache: {e}")
+
+        return frames, counts
+
     # ───────────────────────────────────────────────────────────
     # FRAME EXTRACTION (ffmpeg direto da URL)
     # ───────────────────────────────────────────────────────────
@@ -471,7 +566,7 @@ class AssetTriageService:
                     })
 
             # Chamar OpenAI API
-            response = requests.post(
+            response = cached_chat_completion_post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -487,6 +582,7 @@ class AssetTriageService:
                     "temperature": 0.2,
                 },
                 timeout=60,
+                service_type="triage_llm",
             )
 
             time_ms = int((time.time() - t0) * 1000)
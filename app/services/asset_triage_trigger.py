@@ -3,9 +3,9 @@
 
 Quando o usuário ativa "Classificar Uploads" no chatbot:
   1. Busca TODOS os assets do projeto (vídeos, áudios, imagens)
-  2. Gera URLs temporárias do B2 para vídeos
+  2. Gera URLs temporárias do B2 para vídeos (sob demanda, só sem frame)
   3. Coleta transcrições existentes de project_assets.metadata
-  4. Extrai 1 frame por vídeo (ffmpeg direto da URL, sem Modal)
+  4. Extrai 1 frame por vídeo (ffmpeg direto da URL, sem Modal, em paralelo)
   5. Chama GPT-4o-mini com frames + transcrições (1 chamada única)
   6. Classifica, detecta retakes, verifica ordem
   7. Salva em project_config.asset_triage_result
@@ -16,7 +16,6 @@ Data: 08/Fev/2026
 """
 
 import logging
-import threading
 import json
 import uuid
 import time
@@ -30,21 +29,26 @@ def trigger_asset_triage_async(
     conversation_id: str,
     batch_id: str = None,
 ) -> None:
-    """Dispara triagem de assets em background thread."""
-    thread = threading.Thread(
-        target=_run_asset_triage,
-        args=(project_id, conversation_id, batch_id),
-        daemon=True,
-        name=f"asset-triage-{project_id[:8]}",
-    )
-    thread.start()
+    """
+    Dispara triagem de assets (fila analysis_worker ou BackgroundExecutor).
+
+    🆕 v4.8.0: Uma triagem por projeto por vez (dedup_key), substituindo o
+    flag asset_triage_running que era gravado em project_config.
+    """
+    from app.services.analysis_queue import dispatch_analysis
+    submitted = dispatch_analysis('asset_triage', project_id, conversation_id, batch_id=batch_id)
     logger.info(
-        f"📋 [TRIAGE-TRIGGER] Background thread iniciada: "
+        f"📋 [TRIAGE-TRIGGER] {'Enfileirada' if submitted else 'Ignorada (já em execução)'}: "
         f"project={project_id[:8]}... conv={conversation_id[:8]}... "
         f"batch={batch_id[:8] if batch_id else 'none'}"
     )
 
 
+def triage_dedup_key(project_id: str) -> str:
+    """Chave de exclusividade da triagem de um projeto (BackgroundExecutor)."""
+    return f"asset_triage:{project_id}"
+
+
 def _run_asset_triage(
     project_id: str,
     conversation_id: str,
@@ -60,71 +64,71 @@ def _run_asset_triage(
             if batch_id:
                 logger.info(f"📋 [TRIAGE-TRIGGER] batch_id resolvido: {batch_id[:8]}")
 
-        # ─── 0b. Guard: Lock atômico para evitar execução concorrente ───
-        # Usa UPDATE ... SET flag = true WHERE flag IS NULL para garantir
-        # que apenas UMA thread executa a triage por projeto.
-        # Também verifica se o resultado já existe (re-check duplicado).
+        # ─── 0b. Buscar TODOS os assets do projeto ────────────
+        assets = _get_project_assets(project_id)
+        if not assets:
+            _send_error_message(
+                conversation_id,
+                "Não encontrei uploads no projeto para classificar. "
+                "Faça upload de vídeos ou áudios primeiro."
+            )
+            return
+
+        # 🆕 v4.8.0: Fingerprint do conjunto de assets (conteúdo + transcrição).
+        # A triagem cruza todos os assets (retakes, ordem), então só é refeita
+        # quando o conjunto muda — ex: novo upload.
+        from app.services.asset_analysis_cache import (
+            ASSET_ANALYSIS_CACHE_ENABLED, asset_content_hash, inputs_fingerprint,
+        )
+        input_fingerprint = inputs_fingerprint([
+            asset_content_hash(a, {'text': a.get('transcription_text', '')})
+            for a in assets
+        ])
+
+        # ─── 0c. Guard: resultado já existe (re-check duplicado) ───
+        # A exclusividade por projeto (uma triagem por vez) é garantida pelo
+        # BackgroundExecutor via triage_dedup_key.
         try:
             from app.db import get_db_connection
             conn = get_db_connection()
             cur = conn.cursor()
 
-            # 1) Verificar se resultado já existe
+            # Verificar se resultado já existe para o mesmo conjunto de assets
+            # (resultados sem fingerprint, anteriores ao v4.8.0, nunca re-executam)
             cur.execute(
-                "SELECT project_config->>'asset_triage_result' FROM projects WHERE project_id = %s",
+                "SELECT project_config->'asset_triage_result' IS NOT NULL "
+                "AND project_config->'asset_triage_result' != 'null'::jsonb, "
+                "project_config->'asset_triage_result'->>'input_fingerprint' "
+                "FROM projects WHERE project_id = %s",
                 (project_id,)
             )
             row = cur.fetchone()
-            if row and row[0] and row[0] != 'null':
-                cur.close()
-                conn.close()
+            if row and row[0]:
+                stored_fingerprint = row[1]
+                if (
+                    not ASSET_ANALYSIS_CACHE_ENABLED
+                    or not stored_fingerprint
+                    or stored_fingerprint == input_fingerprint
+                ):
+                    cur.close()
+                    conn.close()
+                    logger.info(
+                        f"⏭️ [TRIAGE-TRIGGER] Triage já executada para project={project_id[:8]}, "
+                        f"pulando re-execução (guard: resultado existe)"
+                    )
+                    return
                 logger.info(
-                    f"⏭️ [TRIAGE-TRIGGER] Triage já executada para project={project_id[:8]}, "
-                    f"pulando re-execução (guard: resultado existe)"
+                    f"🔄 [TRIAGE-TRIGGER] Assets mudaram desde a última triagem, "
+                    f"re-classificando project={project_id[:8]}"
                 )
-                return
-
-            # 2) Lock atômico: tentar setar flag "triage_running"
-            # Só prosseguir se conseguir setar (ou se já estiver setada por nós)
-            cur.execute("""
-                UPDATE projects
-                SET project_config = jsonb_set(
-                    COALESCE(project_config, '{}'::jsonb),
-                    '{asset_triage_running}',
-                    'true'::jsonb
-                )
-                WHERE project_id = %s
-                AND (
-                    project_config->>'asset_triage_running' IS NULL
-                    OR project_config->>'asset_triage_running' = 'false'
-                )
-                RETURNING project_id
-            """, (project_id,))
-            locked = cur.fetchone()
-            conn.commit()
+
             cur.close()
             conn.close()
-
-            if not locked:
-                logger.info(
-                    f"⏭️ [TRIAGE-TRIGGER] Triage já em execução para project={project_id[:8]}, "
-                    f"pulando (guard: lock atômico)"
-                )
-                return
         except Exception as guard_err:
             logger.warning(f"⚠️ [TRIAGE-TRIGGER] Falha no guard de deduplicação: {guard_err}")
             # Continuar mesmo se o guard falhar — melhor duplicar do que não executar
 
-        # ─── 1. Buscar TODOS os assets do projeto ────────────
-        assets = _get_project_assets(project_id)
-        if not assets:
-            _send_error_message(
-                conversation_id,
-                "Não encontrei uploads no projeto para classificar. "
-                "Faça upload de vídeos ou áudios primeiro."
-            )
-            return
-
+        # ─── 1. Contar assets por tipo ────────────────────────
         video_count = sum(1 for a in assets if a.get('asset_type') == 'video')
         audio_count = sum(1 for a in assets if a.get('asset_type') == 'audio')
         image_count = sum(1 for a in assets if a.get('asset_type') == 'image')
@@ -134,20 +138,17 @@ def _run_asset_triage(
             f"{image_count} imagem(ns)"
         )
 
-        # ─── 2. Gerar URLs do B2 para vídeos ─────────────────
-        video_urls = {}
-        for asset in assets:
-            if asset.get('asset_type') == 'video':
-                url = _generate_download_url(
-                    asset['bucket'], asset['file_path']
+        # ─── 2. URLs do B2 para vídeos ───────────────────────
+        # 🆕 v4.8.0: Assinadas sob demanda dentro do pool de extração de frames,
+        # apenas para vídeos sem thumbnail (upload) nem frame em cache
+        def _resolve_video_url(asset: dict) -> Optional[str]:
+            url = _generate_download_url(asset['bucket'], asset['file_path'])
+            if not url:
+                logger.warning(
+                    f"⚠️ [TRIAGE-TRIGGER] Falha URL: "
+                    f"{asset['file_path'][:60]}"
                 )
-                if url:
-                    video_urls[asset['id']] = url
-                else:
-                    logger.warning(
-                        f"⚠️ [TRIAGE-TRIGGER] Falha URL: "
-                        f"{asset['file_path'][:60]}"
-                    )
+            return url
 
         # ─── 3. SSE: triage iniciando ─────────────────────────
         n = len(assets)
@@ -190,8 +191,9 @@ def _run_asset_triage(
 
         result = service.analyze(
             assets=assets,
-            video_urls=video_urls,
+            video_urls={},
             project_id=project_id,
+            url_resolver=_resolve_video_url,
         )
 
         elapsed = time.time() - t0
@@ -204,6 +206,7 @@ def _run_asset_triage(
             return
 
         # ─── 5. Persistir resultado ──────────────────────────
+        result['input_fingerprint'] = input_fingerprint
         _persist_triage_result(project_id, result)
 
         # ─── 5b. Registrar custos ────────────────────────────
@@ -279,9 +282,6 @@ def _run_asset_triage(
         summary = _format_triage_message(result, elapsed)
         _send_triage_message(conversation_id, summary, result)
 
-        # Limpar lock atômico (resultado salvo já serve como guard permanente)
-        _clear_triage_lock(project_id)
-
         logger.info(
             f"✅ [TRIAGE-TRIGGER] Completo em {elapsed:.1f}s | "
             f"{len(assets)} assets | format={result.get('format_detected')}"
@@ -297,8 +297,6 @@ def _run_asset_triage(
             conversation_id,
             "Ocorreu um erro durante a classificação dos uploads."
         )
-        # Limpar lock atômico em caso de erro
-        _clear_triage_lock(project_id)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -525,29 +523,6 @@ def _format_triage_message(result: dict, elapsed: float) -> str:
     return "\n".join(lines)
 
 
-# ═══════════════════════════════════════════════════════════════
-# HELPER — LOCK ATÔMICO
-# ═══════════════════════════════════════════════════════════════
-
-
-def _clear_triage_lock(project_id: str) -> None:
-    """Remove o flag asset_triage_running do project_config."""
-    try:
-        from app.db import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE projects
-            SET project_config = project_config - 'asset_triage_running'
-            WHERE project_id = %s
-        """, (project_id,))
-        conn.commit()
-        cursor.close()
-        conn.close()
-    except Exception as e:
-        logger.warning(f"⚠️ [TRIAGE-TRIGGER] Erro ao limpar lock: {e}")
-
-
 # ═══════════════════════════════════════════════════════════════
 # HELPER — RESOLVER BATCH_ID
 # ═══════════════════════════════════════════════════════════════
@@ -0,0 +1,397 @@
+"""
+🧵 Background Executor — Pool único e limitado para os triggers do chatbot.
+
+Cada trigger (triage, vision, transcript, title, clipper, reprocess)
+criava um threading.Thread por requisição, sem limite. Com uma rajada de
+ações no chat, um worker do gunicorn acabava com centenas de threads
+segurando conexões do banco e chamadas ao Modal.
+
+Aqui todos compartilham um pool por processo:
+
+- BACKGROUND_MAX_WORKERS threads fixas consomem uma fila de prioridade
+  (menor número = mais urgente; FIFO dentro da mesma prioridade)
+- Fila limitada (BACKGROUND_MAX_QUEUE): acima disso a tarefa é recusada
+- Deduplicação por chave (ex: "asset_triage:<project_id>"): enquanto uma
+  tarefa com a mesma chave está na fila ou rodando, novas são ignoradas.
+  A chave também é reservada no Redis (SET NX + TTL curto renovado por
+  uma thread de heartbeat enquanto a tarefa está na fila/rodando), valendo
+  entre os workers do gunicorn — substitui flags ad-hoc em project_config.
+  Se o processo morre, a chave expira em BACKGROUND_DEDUP_TTL_SECONDS.
+- Métricas de fila (get_background_executor().stats())
+- Drain no shutdown (atexit): para de aceitar e espera as tarefas em
+  andamento por até BACKGROUND_DRAIN_TIMEOUT segundos
+
+Uso:
+    from app.services.background_executor import (
+        get_background_executor, PRIORITY_HIGH,
+    )
+
+    get_background_executor().submit(
+        _run_asset_triage, project_id, conversation_id,
+        name=f"asset-triage-{project_id[:8]}",
+        priority=PRIORITY_HIGH,
+        dedup_key=f"asset_triage:{project_id}",
+    )
+
+Data: 18/Out/2026
+"""
+
+import os
+import time
+import uuid
+import queue
+import logging
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' volta a criar uma thread por tarefa, sem limite)
+BACKGROUND_EXECUTOR_ENABLED = os.environ.get('BACKGROUND_EXECUTOR', 'true').lower() == 'true'
+BACKGROUND_MAX_WORKERS = int(os.environ.get('BACKGROUND_MAX_WORKERS', 6))
+BACKGROUND_MAX_QUEUE = int(os.environ.get('BACKGROUND_MAX_QUEUE', 100))
+BACKGROUND_DRAIN_TIMEOUT = float(os.environ.get('BACKGROUND_DRAIN_TIMEOUT', 25))
+# TTL da reserva da chave no Redis: renovado a cada TTL/3 pelo heartbeat enquanto
+# o processo segura a chave; se o processo morrer, a chave expira neste prazo
+BACKGROUND_DEDUP_TTL_SECONDS = int(os.environ.get('BACKGROUND_DEDUP_TTL_SECONDS', 90))
+BACKGROUND_DEDUP_PREFIX = 'bg:dedup'
+
+# Renova/libera só se o valor ainda é o token deste processo (a chave pode ter
+# expirado e sido reservada por outro)
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Prioridades (menor = mais urgente)
+PRIORITY_HIGH = 0      # usuário esperando no chat (triagem)
+PRIORITY_NORMAL = 5    # análises (vision, transcript, reprocess)
+PRIORITY_LOW = 9       # derivados (título, clipper)
+
+
+class _Task:
+    __slots__ = ('fn', 'args', 'kwargs', 'name', 'priority', 'dedup_key', 'enqueued_at')
+
+    def __init__(self, fn, args, kwargs, name, priority, dedup_key):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.name = name
+        self.priority = priority
+        self.dedup_key = dedup_key
+        self.enqueued_at = time.time()
+
+
+class BackgroundExecutor:
+    """Pool de threads com fila de prioridade, deduplicação e drain."""
+
+    def __init__(self, max_workers: int = BACKGROUND_MAX_WORKERS,
+                 max_queue: int = BACKGROUND_MAX_QUEUE):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(1, max_queue)
+        self._queue: 'queue.PriorityQueue' = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._keys: set = set()
+        self._tokens: Dict[str, str] = {}   # chave → token no Redis (só as reservadas lá)
+        self._threads: list = []
+        self._heartbeat: Optional[threading.Thread] = None
+        self._accepting = True
+        self._queued = 0
+        self._running = 0
+        self._counters = {
+            'submitted': 0, 'completed': 0, 'failed': 0,
+            'deduplicated': 0, 'rejected': 0,
+        }
+        self._total_wait_s = 0.0
+
+    # ─── Deduplicação ─────────────────────────────────────────
+
+    def _claim(self, key: Optional[str], reserve_slot: bool = False,
+               owner: Optional[str] = None) -> str:
+        """
+        Reserva a chave (processo + Redis) e, opcionalmente, uma vaga na fila.
+
+        A checagem de capacidade e a reserva local acontecem sob o mesmo lock,
+        então duas submissões simultâneas não passam ambas do limite.
+
+        owner: identificador estável do dono (ex: id do job rq). Se a chave no
+        Redis já pertence a esse owner (execução anterior morreu sem
+        liberar), ela é retomada em vez de tratada como duplicada.
+
+        Returns:
+            'claimed', 'duplicate' (chave em uso) ou 'full' (fila cheia)
+        """
+        with self._lock:
+            if key is not None and key in self._keys:
+                return 'duplicate'
+            if reserve_slot and self._queued >= self.max_queue:
+                return 'full'
+            if key is not None:
+                self._keys.add(key)
+            if reserve_slot:
+                self._queued += 1
+
+        if key is None or self._claim_redis(key, owner):
+            return 'claimed'
+
+        with self._lock:
+            self._keys.discard(key)
+            if reserve_slot:
+                self._queued -= 1
+        return 'duplicate'
+
+    def _claim_redis(self, key: str, owner: Optional[str] = None) -> bool:
+        client = _redis_client()
+        if client is None:
+            return True
+        redis_key = f"{BACKGROUND_DEDUP_PREFIX}:{key}"
+        token = owner or f"{os.getpid()}:{uuid.uuid4().hex[:12]}"
+        try:
+            if not client.set(redis_key, token, nx=True, ex=BACKGROUND_DEDUP_TTL_SECONDS):
+                if not owner or not client.eval(_RENEW_SCRIPT, 1, redis_key, token,
+                                                BACKGROUND_DEDUP_TTL_SECONDS):
+                    return False
+                logger.info(f"♻️ [BG-EXECUTOR] Chave {key} retomada pelo mesmo dono ({owner})")
+        except Exception as e:
+            logger.warning(f"⚠️ [BG-EXECUTOR] Redis indisponível para dedup ({e}), só local")
+            return True
+        with self._lock:
+            self._tokens[key] = token
+        self._ensure_heartbeat()
+        return True
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            self._keys.discard(key)
+            token = self._tokens.pop(key, None)
+        client = _redis_client()
+        if client is not None and token is not None:
+            try:
+                client.eval(_RELEASE_SCRIPT, 1, f"{BACKGROUND_DEDUP_PREFIX}:{key}", token)
+            except Exception as e:
+                logger.warning(f"⚠️ [BG-EXECUTOR] Falha ao liberar chave {key}: {e}")
+
+    def _ensure_heartbeat(self) -> None:
+        """Inicia (uma vez) a thread que renova as chaves reservadas no Redis."""
+        with self._lock:
+            if self._heartbeat is not None:
+                return
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True,
+                                               name="bg-executor-heartbeat")
+        self._heartbeat.start()
+
+    def _heartbeat_loop(self) -> None:
+        interval = max(1.0, BACKGROUND_DEDUP_TTL_SECONDS / 3)
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                held = list(self._tokens.items())
+            client = _redis_client()
+            if client is None or not held:
+                continue
+            for key, token in held:
+                try:
+                    if not client.eval(_RENEW_SCRIPT, 1, f"{BACKGROUND_DEDUP_PREFIX}:{key}",
+                                       token, BACKGROUND_DEDUP_TTL_SECONDS):
+                        logger.warning(f"⚠️ [BG-EXECUTOR] Reserva de {key} perdida no Redis (expirou)")
+                except Exception as e:
+                    logger.warning(f"⚠️ [BG-EXECUTOR] Falha ao renovar chave {key}: {e}")
+
+    @contextmanager
+    def exclusive(self, key: str, owner: Optional[str] = None):
+        """
+        Executa um bloco inline com a mesma reserva de chave das tarefas.
+
+        Yields True se a chave foi obtida (o bloco deve rodar), False se já
+        há uma tarefa com essa chave na fila ou rodando. Com owner, uma
+        reserva deixada pelo mesmo owner (processo morto) é retomada.
+        """
+        claimed = self._claim(key, owner=owner) == 'claimed'
+        try:
+            yield claimed
+        finally:
+            if claimed:
+                self._release(key)
+
+    # ─── Submissão ────────────────────────────────────────────
+
+    def submit(self, fn: Callable, *args, name: str = None,
+               priority: int = PRIORITY_NORMAL, dedup_key: Optional[str] = None,
+               **kwargs) -> bool:
+        """
+        Enfileira fn(*args, **kwargs).
+
+        Returns:
+            True se enfileirada; False se deduplicada, fila cheia ou em shutdown
+        """
+        name = name or getattr(fn, '__name__', 'task')
+
+        if not BACKGROUND_EXECUTOR_ENABLED:
+            threading.Thread(target=fn, args=args, kwargs=kwargs,
+                             daemon=True, name=name).start()
+            return True
+
+        if not self._accepting:
+            logger.warning(f"⚠️ [BG-EXECUTOR] Shutdown em andamento, recusando {name}")
+            return False
+
+        claim = self._claim(dedup_key, reserve_slot=True)
+        if claim == 'full':
+            with self._lock:
+                self._counters['rejected'] += 1
+            logger.error(f"❌ [BG-EXECUTOR] Fila cheia ({self.max_queue}), recusando {name}")
+            return False
+        if claim == 'duplicate':
+            with self._lock:
+                self._counters['deduplicated'] += 1
+            logger.info(f"⏭️ [BG-EXECUTOR] {name} já na fila/em execução (chave={dedup_key})")
+            return False
+
+        self._ensure_threads()
+        task = _Task(fn, args, kwargs, name, priority, dedup_key)
+        self._queue.put((priority, next(self._seq), task))
+        with self._lock:
+            self._counters['submitted'] += 1
+        logger.info(
+            f"🧵 [BG-EXECUTOR] {name} enfileirada (prioridade={priority}, "
+            f"fila={self._queued}, rodando={self._running}/{self.max_workers})"
+        )
+        return True
+
+    def _ensure_threads(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.max_workers):
+                thread = threading.Thread(target=self._worker_loop, daemon=True,
+                                          name=f"bg-executor-{i}")
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker_loop(self) -> None:
+        while True:
+            _, _, task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait_s += time.time() - task.enqueued_at
+            t0 = time.time()
+            try:
+                task.fn(*task.args, **task.kwargs)
+                with self._lock:
+                    self._counters['completed'] += 1
+            except Exception as e:
+                with self._lock:
+                    self._counters['failed'] += 1
+                logger.error(f"❌ [BG-EXECUTOR] {task.name} falhou: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                if task.dedup_key:
+                    self._release(task.dedup_key)
+                self._queue.task_done()
+                logger.info(f"🧵 [BG-EXECUTOR] {task.name} terminou em {time.time() - t0:.1f}s")
+
+    # ─── Métricas / shutdown ──────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        """Profundidade da fila, tarefas rodando e contadores."""
+        with self._lock:
+            started = self._counters['completed'] + self._counters['failed'] + self._running
+            return {
+                'enabled': BACKGROUND_EXECUTOR_ENABLED,
+                'accepting': self._accepting,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queued': self._queued,
+                'running': self._running,
+                'active_keys': len(self._keys),
+                'avg_wait_ms': int(self._total_wait_s / started * 1000) if started else 0,
+                **self._counters,
+            }
+
+    def shutdown(self, timeout: float = BACKGROUND_DRAIN_TIMEOUT) -> None:
+        """Para de aceitar tarefas e espera a fila esvaziar (até timeout)."""
+        self._accepting = False
+        if not self._threads:
+            return
+
+        pending = self._queue.qsize() + self._running
+        if pending:
+            logger.info(f"⏳ [BG-EXECUTOR] Drenando {pending} tarefa(s) (timeout={timeout:.0f}s)...")
+        deadline = time.time() + timeout
+        while (self._queue.qsize() or self._running) and time.time() < deadline:
+            time.sleep(0.2)
+
+        # Tarefas que não chegaram a rodar liberam suas chaves (outro processo pode assumir)
+        abandoned = 0
+        while True:
+            try:
+                _, _, task = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None:
+                with self._lock:
+                    self._queued -= 1
+                if task.dedup_key:
+                    self._release(task.dedup_key)
+            abandoned += 1
+            self._queue.task_done()
+        for _ in self._threads:
+            self._queue.put((float('inf'), next(self._seq), None))
+
+        if abandoned or self._running:
+            logger.warning(
+                f"⚠️ [BG-EXECUTOR] Shutdown: {abandoned} tarefa(s) descartada(s), "
+                f"{self._running} ainda rodando"
+            )
+
+
+def _redis_client():
+    """Cliente Redis compartilhado (None se indisponível)."""
+    global _redis, _redis_checked_at
+    now = time.time()
+    if _redis is None and now - _redis_checked_at > 30:
+        _redis_checked_at = now
+        from app.video_orchestrator.queue import get_redis_client
+        _redis = get_redis_client()
+    return _redis
+
+
+_redis = None
+_redis_checked_at = 0.0
+
+# Singleton
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_background_executor() -> BackgroundExecutor:
+    """Retorna instância singleton do BackgroundExecutor (uma por processo)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = BackgroundExecutor()
+    return _executor
+
+
+def shutdown_background_executor() -> None:
+    """Drain do executor (registrado via atexit em app.main)."""
+    if _executor is not None:
+        _executor.shutdown()
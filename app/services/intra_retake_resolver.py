@@ -21,12 +21,20 @@ Data: 09/Fev/2026
 """
 
 import re
+import math
+import bisect
 import uuid
 import logging
 from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Inserções/omissões de palavras toleradas no match fuzzy (0 = só posicional)
+FUZZY_BAND = 1
+# Rolling hash (Mersenne 2^61 - 1)
+_HASH_MOD = (1 << 61) - 1
+_HASH_BASE = 1_000_003
+
 
 # ═══════════════════════════════════════════════════════════════
 # TEXT MATCHING
@@ -84,25 +92,221 @@ def _find_phrase_occurrences(
 def _find_fuzzy_occurrences(
     word_texts: List[str],
     phrase_words: List[str],
+    band: Optional[int] = None,
 ) -> List[Tuple[int, int]]:
     """
     Fallback: busca com tolerância a palavras levemente diferentes.
 
-    Aceita match se >= 80% das palavras coincidem na posição.
+    Aceita match se >= 80% das palavras da frase coincidem.
+
+    🆕 Alinhamento em banda: além de trocas na mesma posição, tolera até
+    `band` palavras inseridas/omitidas pela transcrição (com band=0 equivale
+    à comparação posicional antiga). Em vez de comparar a frase com todas
+    as janelas, as posições candidatas vêm de um índice palavra → posições
+    (votos por diagonal); só as que podem atingir o limiar são alinhadas.
+
+    Ocorrências sobrepostas são reduzidas à de maior score.
     """
     phrase_len = len(phrase_words)
+    if phrase_len == 0 or not word_texts:
+        return []
+
+    band = FUZZY_BAND if band is None else max(0, band)
     threshold = 0.8
-    occurrences = []
+    min_matches = math.ceil(threshold * phrase_len - 1e-9)
+    n = len(word_texts)
+
+    # 1. Votos por início de alinhamento (diagonal = posição no texto - posição na frase)
+    positions: Dict[str, List[int]] = {}
+    for idx, text in enumerate(word_texts):
+        positions.setdefault(text, []).append(idx)
+
+    votes: Dict[int, int] = {}
+    for k, word in enumerate(phrase_words):
+        for t in positions.get(word, ()):
+            start = t - k
+            if -band <= start <= n - phrase_len + band:
+                votes[start] = votes.get(start, 0) + 1
+
+    # 2. Filtro: um alinhamento em banda só usa matches das diagonais [i - band, i + band]
+    candidates = sorted(
+        i for i in set(
+            start + delta for start in votes for delta in range(-band, band + 1)
+        )
+        if 0 <= i <= n - phrase_len + band
+        and sum(votes.get(i + d, 0) for d in range(-band, band + 1)) >= min_matches
+    )
 
-    for i in range(len(word_texts) - phrase_len + 1):
-        window = word_texts[i:i + phrase_len]
-        matches = sum(1 for a, b in zip(window, phrase_words) if a == b)
-        score = matches / phrase_len
+    # 3. Alinhamento em banda nos candidatos
+    scored = []
+    for i in candidates:
+        matches, span = _banded_alignment(word_texts, i, phrase_words, band)
+        if matches >= min_matches:
+            scored.append((i, i + span - 1, matches / phrase_len))
+
+    # 4. Sem sobreposição: mantém o maior score (empate → janela mais próxima do tamanho da frase)
+    occurrences: List[Tuple[int, int, float]] = []
+    for start, end, score in scored:
+        if occurrences and start <= occurrences[-1][1]:
+            prev_start, prev_end, prev_score = occurrences[-1]
+            prev_key = (prev_score, -abs(prev_end - prev_start + 1 - phrase_len))
+            if (score, -abs(end - start + 1 - phrase_len)) > prev_key:
+                occurrences[-1] = (start, end, score)
+            continue
+        occurrences.append((start, end, score))
 
-        if score >= threshold:
-            occurrences.append((i, i + phrase_len - 1))
+    return [(start, end) for start, end, _ in occurrences]
 
-    return occurrences
+
+def _banded_alignment(
+    word_texts: List[str],
+    start: int,
+    phrase_words: List[str],
+    band: int,
+) -> Tuple[int, int]:
+    """
+    Alinha phrase_words ao texto a partir de `start` permitindo até `band`
+    inserções/omissões (LCS em banda, O(len(frase) * band)).
+
+    Returns:
+        (matches, span) — palavras coincidentes e tamanho da janela no texto
+    """
+    m = len(phrase_words)
+    n = len(word_texts)
+    max_span = min(m + band, n - start)
+    neg = -1
+
+    # dp[j] = matches alinhando phrase[:k] com texto[start:start + j] (j em [k-band, k+band])
+    prev = {0: 0}
+    for k in range(1, m + 1):
+        cur = {}
+        for j in range(max(0, k - band), min(k + band, max_span) + 1):
+            best = neg
+            if j - 1 in prev and prev[j - 1] >= 0:
+                hit = 1 if word_texts[start + j - 1] == phrase_words[k - 1] else 0
+                best = prev[j - 1] + hit
+            if j in prev and prev[j] > best:
+                best = prev[j]  # palavra da frase omitida no texto
+            if j - 1 in cur and cur[j - 1] > best:
+                best = cur[j - 1]  # palavra extra no texto
+            cur[j] = best
+        prev = cur
+
+    best_matches, best_span = 0, m
+    for j in range(max(1, m - band), min(m + band, max_span) + 1):
+        value = prev.get(j, neg)
+        if value > best_matches or (value == best_matches and abs(j - m) < abs(best_span - m)):
+            best_matches, best_span = value, j
+    return best_matches, best_span
+
+
+# ═══════════════════════════════════════════════════════════════
+# ROLLING HASH (Rabin–Karp sobre a sequência de palavras)
+# ═══════════════════════════════════════════════════════════════
+
+class _WordHasher:
+    """
+    Hash polinomial de prefixos sobre ids de palavras.
+
+    Permite comparar quaisquer dois trechos em O(1) (com verificação exata
+    opcional), base das buscas de repetição em tempo quase linear.
+    """
+
+    def __init__(self, token_ids: List[int]):
+        self.n = len(token_ids)
+        self.prefix = [0] * (self.n + 1)
+        self.power = [1] * (self.n + 1)
+        for i, token in enumerate(token_ids):
+            self.prefix[i + 1] = (self.prefix[i] * _HASH_BASE + token + 1) % _HASH_MOD
+            self.power[i + 1] = (self.power[i] * _HASH_BASE) % _HASH_MOD
+
+    def get(self, start: int, length: int) -> int:
+        """Hash de token_ids[start:start + length]."""
+        return (self.prefix[start + length] - self.prefix[start] * self.power[length]) % _HASH_MOD
+
+
+def _tokenize(word_texts: List[str]) -> List[int]:
+    """Mapeia cada palavra normalizada para um id inteiro."""
+    vocab: Dict[str, int] = {}
+    return [vocab.setdefault(text, len(vocab)) for text in word_texts]
+
+
+def _common_length(hasher: _WordHasher, a: int, b: int, limit: int, backward: bool = False) -> int:
+    """
+    Maior m <= limit tal que os trechos de tamanho m em a e b coincidem
+    (para frente a partir de a/b, ou para trás terminando antes de a/b).
+    Busca binária sobre o hash: O(log limit).
+    """
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if backward:
+            same = hasher.get(a - mid, mid) == hasher.get(b - mid, mid)
+        else:
+            same = hasher.get(a, mid) == hasher.get(b, mid)
+        if same:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _find_maximal_repeats(token_ids: List[int], min_len: int) -> List[Tuple[int, int, int]]:
+    """
+    Encontra repetições máximas não sobrepostas de >= min_len palavras.
+
+    Seed-and-extend: cada k-grama (k = min_len) é ligado à sua primeira
+    ocorrência NÃO sobreposta (q >= p + min_len); o par é estendido para os
+    dois lados por busca binária no rolling hash, limitado para que as duas
+    ocorrências não se sobreponham. Pares na mesma diagonal (offset) já
+    cobertos por uma extensão anterior são pulados, então cada repetição é
+    reportada uma vez.
+
+    Ligar à primeira ocorrência não sobreposta (e não à próxima) é o que
+    encontra repetições de período menor que min_len ("eu vou eu vou eu
+    vou eu vou", "não não não ..."): a próxima ocorrência do k-grama
+    estaria a 1-2 palavras e o par seria descartado por sobreposição.
+
+    Returns:
+        Lista de (start_primeira, start_segunda, tamanho)
+    """
+    n = len(token_ids)
+    if n < min_len * 2:
+        return []
+
+    hasher = _WordHasher(token_ids)
+    occurrences: Dict[int, List[int]] = {}  # hash do k-grama → posições (crescentes)
+    for p in range(n - min_len + 1):
+        occurrences.setdefault(hasher.get(p, min_len), []).append(p)
+
+    seeds: List[Tuple[int, int]] = []
+    for positions in occurrences.values():
+        if len(positions) < 2:
+            continue
+        for i, p in enumerate(positions):
+            j = bisect.bisect_left(positions, p + min_len, i + 1)
+            if j < len(positions):
+                seeds.append((p, positions[j]))
+    seeds.sort()
+
+    repeats = []
+    diagonal_end: Dict[int, int] = {}  # offset → fim (exclusivo) da última extensão
+    for p, q in seeds:
+        offset = q - p
+        if diagonal_end.get(offset, -1) > p:
+            continue
+        if token_ids[p:p + min_len] != token_ids[q:q + min_len]:
+            continue  # colisão de hash
+
+        left = _common_length(hasher, p, q, min(p, offset - min_len), backward=True)
+        start = p - left
+        right_limit = min(n - q, offset - left) - min_len
+        right = _common_length(hasher, p + min_len, q + min_len, max(0, right_limit))
+        length = left + min_len + right
+        diagonal_end[offset] = start + length
+        repeats.append((start, start + offset, length))
+
+    return repeats
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -218,6 +422,30 @@ def _get_timestamp(word: Dict, field: str) -> float:
 # MAIN RESOLVER
 # ═══════════════════════════════════════════════════════════════
 
+def _is_contained(
+    intervals: List[Tuple[int, int, int]],
+    longest: int,
+    first: int,
+    second: int,
+    length: int,
+) -> bool:
+    """
+    True se alguma repetição já reportada (first, second, length) contém as
+    duas ocorrências desta. intervals está ordenado por first; só olha os
+    que começam até `first` e ainda podem alcançar first + length.
+    """
+    idx = bisect.bisect_right(intervals, (first, float('inf'), float('inf')))
+    end = first + length
+    while idx > 0:
+        idx -= 1
+        f, s, l = intervals[idx]
+        if f + longest < end:
+            break  # Nenhum intervalo mais à esquerda alcança o fim
+        if f + l >= end and s <= second and second + length <= s + l:
+            return True
+    return False
+
+
 def detect_repeated_phrases(
     assets_words: Dict[str, List[Dict]],
     min_phrase_len: int = 4,
@@ -226,9 +454,34 @@ def detect_repeated_phrases(
     """
     🆕 Detecção DETERMINÍSTICA de frases repetidas (fallback da LLM).
 
-    Escaneia cada transcrição com sliding window de N-grams.
-    Se encontra uma sequência de >= min_phrase_len palavras que aparece
-    >= 2 vezes, reporta como intra-retake (mantém a primeira, remove a segunda).
+    Procura sequências de >= min_phrase_len palavras que aparecem >= 2 vezes
+    (sem sobreposição) e reporta como intra-retake (mantém a primeira,
+    remove a segunda).
+
+    🆕 Repetições máximas via rolling hash (_find_maximal_repeats) em tempo
+    quase linear — a versão anterior testava todo tamanho × início × início
+    posterior (cúbico no número de palavras) e travava em takes de 40 min.
+    Repetições cujas duas ocorrências estão dentro de uma repetição já
+    reportada são ignoradas (checagem por intervalo, linear no tamanho da
+    repetição — antes guardava o hash de todo sub-trecho, O(L²)); repetições
+    maiores que max_phrase_len são reportadas em blocos de até
+    max_phrase_len palavras (cada bloco aparece nas duas ocorrências).
+
+    Diferenças de saída em relação à varredura anterior:
+    - Repetição > max_phrase_len: antes saíam janelas de 15 palavras
+      deslizando pelo trecho (e sub-frases não contidas nelas); agora saem
+      blocos consecutivos de até max_phrase_len.
+    - Repetição em sequência de período curto ("não não não ..." com mais
+      de 2 × min_phrase_len palavras): antes saía o maior quadrado
+      (até max_phrase_len); agora sai o menor período >= min_phrase_len.
+      O trecho continua detectado — muda só o repeated_text.
+    - No resolve, o fuzzy (FUZZY_BAND=1, sobreposições colapsadas no maior
+      score) pode casar frases com 1 palavra inserida/omitida que antes
+      não casavam, e devolve uma ocorrência por trecho em vez de janelas
+      sobrepostas.
+    - Sub-frase de uma repetição reportada que também se repete em outra
+      posição (ex.: 3ª ocorrência) agora sai como detecção própria; antes
+      era descartada só por ter o mesmo texto.
 
     Não é semântico — é puramente textual. Mas garante que repetições
     óbvias sejam capturadas mesmo se a LLM falhar.
@@ -244,38 +497,43 @@ def detect_repeated_phrases(
             continue
 
         word_texts = [_normalize(w.get('text', '')) for w in words]
+        token_ids = _tokenize(word_texts)
         detections = []
-        already_found = set()  # Evitar duplicar detecções
-
-        # Tentar do maior para o menor para pegar a frase mais longa primeiro
-        for phrase_len in range(min(max_phrase_len, len(word_texts) // 2), min_phrase_len - 1, -1):
-            for i in range(len(word_texts) - phrase_len + 1):
-                window = tuple(word_texts[i:i + phrase_len])
+        # Repetições já reportadas (first, second, length), ordenadas por first
+        found_intervals: List[Tuple[int, int, int]] = []
+        longest_found = 0
+
+        # Do maior para o menor (mesma ordem da varredura anterior)
+        repeats = sorted(
+            _find_maximal_repeats(token_ids, min_phrase_len),
+            key=lambda r: (-r[2], r[0])
+        )
 
-                # Já encontramos? Ou parte de uma detecção maior?
-                window_key = ' '.join(window)
-                if any(window_key in af for af in already_found):
-                    continue
+        for first, second, length in repeats:
+            if _is_contained(found_intervals, longest_found, first, second, length):
+                continue  # Parte de uma detecção maior
+
+            for offset in range(first, first + length, max_phrase_len):
+                block_len = min(max_phrase_len, first + length - offset)
+                if block_len < min_phrase_len:
+                    # Último bloco curto demais: usa as últimas max_phrase_len palavras
+                    offset = first + length - min(length, max_phrase_len)
+                    block_len = min(length, max_phrase_len)
+                orig_text = ' '.join(w.get('text', '') for w in words[offset:offset + block_len])
+                detections.append({
+                    'repeated_text': orig_text,
+                    'keep_occurrence': 1,
+                    'remove_occurrence': 2,
+                    'reason': 'Repetição detectada automaticamente (fallback determinístico)',
+                })
+                logger.info(
+                    f"🔍 [DETERMINISTIC] Asset {asset_id[:8]}: "
+                    f"frase repetida detectada ({block_len} palavras): "
+                    f"'{orig_text[:50]}...'"
+                )
 
-                # Buscar segunda ocorrência (não sobreposta)
-                for j in range(i + phrase_len, len(word_texts) - phrase_len + 1):
-                    candidate = tuple(word_texts[j:j + phrase_len])
-                    if candidate == window:
-                        # Encontrou repetição! Reconstruir texto original
-                        orig_text = ' '.join(w.get('text', '') for w in words[i:i + phrase_len])
-                        detections.append({
-                            'repeated_text': orig_text,
-                            'keep_occurrence': 1,
-                            'remove_occurrence': 2,
-                            'reason': 'Repetição detectada automaticamente (fallback determinístico)',
-                        })
-                        already_found.add(window_key)
-                        logger.info(
-                            f"🔍 [DETERMINISTIC] Asset {asset_id[:8]}: "
-                            f"frase repetida detectada ({phrase_len} palavras): "
-                            f"'{orig_text[:50]}...'"
-                        )
-                        break  # Não precisa buscar mais ocorrências desta frase
+            bisect.insort(found_intervals, (first, second, length))
+            longest_found = max(longest_found, length)
 
         if detections:
             results.append({
@@ -408,3 +666,115 @@ def resolve_intra_retakes(
             )
 
     return results
+
+
+# Para uso direto como script (benchmark em transcrições sintéticas)
+if __name__ == "__main__":
+    import random
+    import time
+
+    def _legacy_detect(word_texts, min_len=4, max_len=15):
+        """Varredura anterior (todo tamanho × início × início posterior)."""
+        found = []
+        already_found = set()
+        for phrase_len in range(min(max_len, len(word_texts) // 2), min_len - 1, -1):
+            for i in range(len(word_texts) - phrase_len + 1):
+                window = tuple(word_texts[i:i + phrase_len])
+                window_key = ' '.join(window)
+                if any(window_key in af for af in already_found):
+                    continue
+                for j in range(i + phrase_len, len(word_texts) - phrase_len + 1):
+                    if tuple(word_texts[j:j + phrase_len]) == window:
+                        found.append(window_key)
+                        already_found.add(window_key)
+                        break
+        return found
+
+    def _legacy_fuzzy(word_texts, phrase_words):
+        phrase_len = len(phrase_words)
+        return [
+            (i, i + phrase_len - 1)
+            for i in range(len(word_texts) - phrase_len + 1)
+            if sum(1 for a, b in zip(word_texts[i:i + phrase_len], phrase_words) if a == b) / phrase_len >= 0.8
+        ]
+
+    def _synthetic_words(n_words, n_retakes, seed=7):
+        """Transcrição com vocabulário amplo e retakes plantados (6-12 palavras)."""
+        rng = random.Random(seed)
+        vocab = [f"palavra{i}" for i in range(2000)]
+        texts = [rng.choice(vocab) for _ in range(n_words)]
+        for _ in range(n_retakes):
+            size = rng.randint(6, 12)
+            src = rng.randrange(0, n_words - size * 3)
+            dst = rng.randrange(src + size, min(n_words - size, src + size + 200))
+            texts[dst:dst + size] = texts[src:src + size]
+        return [{"text": t, "start": i * 400, "end": i * 400 + 350} for i, t in enumerate(texts)]
+
+    def _speech_words(rng, n_words):
+        """Fala real tem vocabulário pequeno: repetições curtas e gaguejos."""
+        vocab = ("eu vou que a o de não é isso então tipo assim né "
+                 "aqui da do para com uma um").split()
+        size = rng.randint(3, len(vocab))
+        return [rng.choice(vocab[:size]) for _ in range(n_words)]
+
+    print("\n🔍 Intra-Retake Resolver - Benchmark\n")
+    print("=" * 60)
+
+    # Paridade em entradas periódicas e de vocabulário pequeno
+    periodic = ["eu vou eu vou eu vou eu vou", "não não não não não não não não",
+                "a gente a gente a gente a gente", " ".join(["não"] * 12)]
+    for text in periodic:
+        texts = [_normalize(t) for t in text.split()]
+        result = detect_repeated_phrases({"asset": [{"text": t} for t in texts]})
+        new_phrases = [_normalize(d["repeated_text"]) for r in result for d in r["detections"]]
+        print(f"   '{text[:30]}': anterior {_legacy_detect(texts)} | novo {new_phrases}")
+
+    rng = random.Random(11)
+    lost = same = 0
+    for _ in range(300):
+        texts = _speech_words(rng, rng.randint(20, 120))
+        result = detect_repeated_phrases({"asset": [{"text": t} for t in texts]})
+        new_phrases = [_normalize(d["repeated_text"]) for r in result for d in r["detections"]]
+        legacy_phrases = _legacy_detect(texts)
+        lost += bool(legacy_phrases) and not new_phrases
+        same += set(legacy_phrases) == set(new_phrases)
+    print(f"   300 transcrições de vocabulário pequeno: {same} com as mesmas frases, "
+          f"{lost} detectadas só pela versão anterior")
+
+    # 150 palavras/min: 2 min, 7 min, 40 min, 2 h
+    for n_words in (300, 1000, 6000, 18000):
+        words = _synthetic_words(n_words, n_retakes=max(2, n_words // 300))
+        texts = [_normalize(w["text"]) for w in words]
+
+        t0 = time.perf_counter()
+        result = detect_repeated_phrases({"asset": words})
+        new_s = time.perf_counter() - t0
+        new_phrases = [_normalize(d["repeated_text"]) for r in result for d in r["detections"]]
+
+        line = f"   {n_words:>6} palavras: novo {new_s * 1000:8.1f}ms ({len(new_phrases)} frases)"
+        if n_words <= 1000:
+            t0 = time.perf_counter()
+            legacy_phrases = _legacy_detect(texts)
+            legacy_s = time.perf_counter() - t0
+            same = set(legacy_phrases) == set(new_phrases)
+            line += (f" | anterior {legacy_s * 1000:8.1f}ms "
+                     f"({legacy_s / new_s:.0f}x, mesmas frases: {same})")
+        print(line)
+
+    # Fuzzy: mesma detecção posicional, agora com banda de 1 palavra
+    words = _synthetic_words(6000, n_retakes=20)
+    texts = [_normalize(w["text"]) for w in words]
+    phrase = texts[3000:3012]
+    phrase[5] = "trocada"
+    t0 = time.perf_counter()
+    legacy_occ = _legacy_fuzzy(texts, phrase)
+    legacy_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new_occ = _find_fuzzy_occurrences(texts, phrase)
+    new_s = time.perf_counter() - t0
+    dropped = phrase[:3] + phrase[4:]  # transcrição omitiu uma palavra
+    print(f"   fuzzy 6000 palavras: anterior {legacy_s * 1000:.1f}ms {legacy_occ} | "
+          f"banda {new_s * 1000:.1f}ms {new_occ}")
+    print(f"   fuzzy com palavra omitida: anterior {_legacy_fuzzy(texts, dropped + ['x'])} | "
+          f"banda {_find_fuzzy_occurrences(texts, dropped + ['x'])}")
+    print("=" * 60)
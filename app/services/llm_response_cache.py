@@ -0,0 +1,192 @@
+"""
+🆕 v4.8.0: LLM Response Cache - Respostas de chat completion por hash da requisição
+
+Os diretores (triage, vision, transcript, clipper, títulos, classificador
+de frases) mandam prompts montados só a partir dos dados do projeto e
+parseiam JSON da resposta. Replays e jobs re-tentados repetiam exatamente
+a mesma requisição e pagavam latência e custo de novo.
+
+A chave é o sha256 do corpo canônico da requisição (modelo, mensagens —
+incluindo imagens —, temperature, max_tokens, response_format...) + endpoint.
+O Redis guarda hash → corpo da resposta (TTL LLM_RESPONSE_CACHE_TTL_SECONDS).
+
+Quando NÃO usa o cache:
+- temperature > 0, a menos que LLM_RESPONSE_CACHE_SAMPLED=true ou o
+  chamador passe cache_sampled=True (reaproveitar uma amostra anterior).
+  Só o classificador de frases passa: replays do mesmo job devem manter a
+  mesma classificação. Nos diretores, re-rodar é pedir uma nova amostra.
+- respostas com erro HTTP, conteúdo vazio ou truncadas (finish_reason=length)
+
+Hits devolvem usage zerado (o serviço registra custo 0) e cada consulta
+é registrada via ai_cost_tracker.log_llm_cache_lookup, gravada em lote fora
+da chamada (hit rate e custo evitado: get_llm_cache_stats).
+
+Uso:
+    response = cached_chat_completion_post(
+        OPENAI_CHAT_COMPLETIONS_URL, headers=..., json=payload, timeout=60,
+        service_type="triage_llm",
+    )
+    # mesmo contrato de requests.Response: status_code, text, json()
+"""
+
+import os
+import time
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from app.utils.json_payload import encode_json
+from app.utils.redis_json_cache import RedisJSONCache
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' chama sempre o provider)
+LLM_RESPONSE_CACHE_ENABLED = os.environ.get('LLM_RESPONSE_CACHE', 'true').lower() == 'true'
+# Cachear também chamadas com temperature > 0 (todas, não só as que pedem cache_sampled)
+LLM_RESPONSE_CACHE_SAMPLED = os.environ.get('LLM_RESPONSE_CACHE_SAMPLED', 'false').lower() == 'true'
+LLM_RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('LLM_RESPONSE_CACHE_TTL_SECONDS', 14 * 24 * 3600))
+LLM_RESPONSE_CACHE_PREFIX = 'llm:response_cache'
+# Versão do formato da chave (incrementar invalida todo o cache)
+LLM_RESPONSE_KEY_VERSION = 'v1'
+
+OPENAI_CHAT_COMPLETIONS_URL = 'https://api.openai.com/v1/chat/completions'
+
+# Campos que não mudam a resposta
+_IGNORED_REQUEST_FIELDS = ('user', 'stream', 'metadata')
+
+
+def llm_request_key(request: Dict[str, Any], endpoint: str = OPENAI_CHAT_COMPLETIONS_URL) -> str:
+    """Hash canônico da requisição (chaves ordenadas)."""
+    body = {k: v for k, v in request.items() if k not in _IGNORED_REQUEST_FIELDS}
+    raw = encode_json({'endpoint': endpoint, 'request': body}, sort_keys=True)
+    return hashlib.sha256(LLM_RESPONSE_KEY_VERSION.encode() + b'|' + raw).hexdigest()
+
+
+def is_cacheable(request: Dict[str, Any], cache_sampled: bool = False) -> bool:
+    """Determinística (temperature 0) ou amostragem explicitamente aceita."""
+    if not LLM_RESPONSE_CACHE_ENABLED:
+        return False
+    temperature = request.get('temperature', 1)
+    return float(temperature or 0) == 0 or cache_sampled or LLM_RESPONSE_CACHE_SAMPLED
+
+
+def response_content(body: Dict[str, Any]) -> str:
+    """Conteúdo da primeira choice ('' se ausente)."""
+    choices = body.get('choices') or [{}]
+    return ((choices[0] or {}).get('message') or {}).get('content') or ''
+
+
+def _is_complete(body: Dict[str, Any]) -> bool:
+    choices = body.get('choices') or []
+    return bool(choices) and choices[0].get('finish_reason') != 'length' and bool(response_content(body))
+
+
+class LLMResponseCache(RedisJSONCache):
+    """
+    Índice hash da requisição → corpo da resposta (Redis).
+
+    Sem Redis o cache fica desabilitado e todas as chamadas vão ao provider.
+    """
+
+    PREFIX = LLM_RESPONSE_CACHE_PREFIX
+    LOG_TAG = 'LLM CACHE'
+
+    def __init__(self, redis_client=None, ttl_seconds: int = LLM_RESPONSE_CACHE_TTL_SECONDS):
+        super().__init__(redis_client, ttl_seconds)
+
+    def _build_entry(self, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Somente respostas completas (com conteúdo e não truncadas)."""
+        if not _is_complete(body):
+            return None
+        return {**body, '_cached_at': time.time()}
+
+
+# Singleton
+_llm_response_cache = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Retorna instância singleton do LLMResponseCache."""
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache()
+    return _llm_response_cache
+
+
+def record_lookup(service_type: str, model: str, hit: bool, usage: Optional[Dict[str, Any]] = None,
+                  project_id: Optional[str] = None) -> None:
+    """Registra hit/miss no ai_cost_tracker (falha silenciosa)."""
+    usage = usage or {}
+    try:
+        from app.services.ai_cost_tracker import log_llm_cache_lookup
+        log_llm_cache_lookup(
+            service_type=service_type,
+            model=model or '',
+            hit=hit,
+            tokens_in=usage.get('prompt_tokens', 0) or 0,
+            tokens_out=usage.get('completion_tokens', 0) or 0,
+            project_id=project_id,
+        )
+    except Exception as e:
+        logger.debug(f"⚠️ [LLM CACHE] Falha ao registrar consulta: {e}")
+
+
+def cached_body(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Corpo de um hit: usage zerado (nada foi pago) e marcado como cache."""
+    body = {k: v for k, v in entry.items() if not k.startswith('_')}
+    body['usage'] = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    body['cached'] = True
+    return body
+
+
+class CachedResponse:
+    """Resposta servida do cache com a interface usada de requests.Response."""
+
+    status_code = 200
+
+    def __init__(self, body: Dict[str, Any]):
+        self._body = body
+
+    def json(self) -> Dict[str, Any]:
+        return self._body
+
+    @property
+    def text(self) -> str:
+        return encode_json(self._body).decode('utf-8')
+
+
+def cached_chat_completion_post(url: str, headers: Dict[str, str], json: Dict[str, Any],
+                                timeout: float, service_type: str,
+                                project_id: Optional[str] = None,
+                                cache_sampled: bool = False):
+    """
+    POST de chat completion com cache (substitui get_llm_http_session().post).
+
+    Args:
+        url, headers, json, timeout: Mesmos de requests.post
+        service_type: Serviço chamador (métricas no ai_cost_tracker)
+        project_id: Projeto (métricas)
+        cache_sampled: Aceita reaproveitar resposta com temperature > 0
+    """
+    from app.ai_config import get_llm_http_session
+
+    if not is_cacheable(json, cache_sampled=cache_sampled):
+        return get_llm_http_session().post(url, headers=headers, json=json, timeout=timeout)
+
+    cache = get_llm_response_cache()
+    request_hash = llm_request_key(json, url)
+    entry = cache.get(request_hash)
+    if entry is not None:
+        logger.info(f"♻️ [LLM CACHE] Hit {service_type} ({json.get('model')}) {request_hash[:12]}")
+        record_lookup(service_type, json.get('model'), True, entry.get('usage'), project_id)
+        return CachedResponse(cached_body(entry))
+
+    response = get_llm_http_session().post(url, headers=headers, json=json, timeout=timeout)
+    if response.status_code == 200:
+        try:
+            body = response.json()
+        except ValueError:
+            return response
+        cache.put(request_hash, body)
+        record_lookup(service_type, json.get('model'), False, None, project_id)
+    return response
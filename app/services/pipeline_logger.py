@@ -32,6 +32,11 @@ from uuid import UUID, uuid4
 import psycopg2
 from psycopg2.extras import RealDictCursor, Json
 
+# 🆕 Rollups por minuto/hora para os dashboards admin
+from app.services.pipeline_stats_rollup import (
+    STATS_ROLLUPS_ENABLED, record_run_completion, record_step_completion
+)
+
 logger = logging.getLogger(__name__)
 
 # Versão do backend (pode ser sobrescrita via env)
@@ -131,6 +136,20 @@ class PipelineLogger:
                 self._conn.rollback()
             raise
     
+    def _record_rollup(self, record_fn, row: Optional[Dict[str, Any]]):
+        """Atualiza rollups do dashboard (falha aqui nunca afeta o pipeline)."""
+        if not STATS_ROLLUPS_ENABLED or not row:
+            return
+        try:
+            conn = self._get_connection()
+            with conn.cursor() as cur:
+                record_fn(cur, dict(row))
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ [PipelineLogger] Erro ao atualizar rollup: {e}")
+            if self._conn:
+                self._conn.rollback()
+    
     def _create_run(self) -> str:
         """Cria um novo run no banco e retorna o ID."""
         # Calcular run_number
@@ -437,18 +456,26 @@ class PipelineLogger:
             error_code: Código de erro (se failed)
         """
         try:
-            self._execute(
+            # Estado anterior (prev) vem do snapshot pré-UPDATE → rollup idempotente
+            row = self._execute(
                 """
-                UPDATE pipeline_steps SET
+                UPDATE pipeline_steps s SET
                     status = %s,
                     completed_at = NOW(),
-                    duration_ms = EXTRACT(EPOCH FROM (NOW() - started_at)) * 1000,
+                    duration_ms = EXTRACT(EPOCH FROM (NOW() - s.started_at)) * 1000,
                     error_message = %s,
                     error_code = %s
-                WHERE id = %s
+                FROM pipeline_steps prev, pipeline_runs r
+                WHERE s.id = %s AND prev.id = s.id AND r.id = s.run_id
+                RETURNING s.step_name, s.status, s.duration_ms,
+                          prev.status AS previous_status,
+                          prev.duration_ms AS previous_duration_ms,
+                          r.created_at AS run_created_at
                 """,
-                (status, error_message, error_code, step_id)
+                (status, error_message, error_code, step_id),
+                fetch=True
             )
+            self._record_rollup(record_step_completion, row)
             emoji = '✅' if status == 'completed' else '❌' if status == 'failed' else '⏭️'
             logger.info(f"   📊 [Step] {emoji} Completo (status={status})")
         except Exception as e:
@@ -481,20 +508,29 @@ class PipelineLogger:
             error_code: Código de erro
         """
         try:
-            self._execute(
+            # Estado anterior (prev) vem do snapshot pré-UPDATE → rollup idempotente
+            row = self._execute(
                 """
-                UPDATE pipeline_runs SET
+                UPDATE pipeline_runs r SET
                     status = %s,
                     completed_at = NOW(),
-                    total_duration_ms = EXTRACT(EPOCH FROM (NOW() - started_at)) * 1000,
-                    output_video_url = COALESCE(%s, output_video_url),
+                    total_duration_ms = EXTRACT(EPOCH FROM (NOW() - r.started_at)) * 1000,
+                    output_video_url = COALESCE(%s, r.output_video_url),
                     output_video_duration_ms = %s,
                     error_message = %s,
                     error_code = %s
-                WHERE id = %s
+                FROM pipeline_runs prev
+                WHERE r.id = %s AND prev.id = r.id
+                RETURNING r.created_at, r.phase, r.worker_id, r.status,
+                          r.total_duration_ms, r.output_video_url,
+                          prev.status AS previous_status,
+                          prev.total_duration_ms AS previous_duration_ms,
+                          prev.output_video_url AS previous_output_url
                 """,
-                (status, output_url, output_duration_ms, error_message, error_code, self.run_id)
+                (status, output_url, output_duration_ms, error_message, error_code, self.run_id),
+                fetch=True
             )
+            self._record_rollup(record_run_completion, row)
             emoji = '✅' if status == 'completed' else '❌' if status == 'failed' else '🚫'
             logger.info(f"📊 [PipelineLogger] Run {emoji} completo (status={status})")
         except Exception as e:
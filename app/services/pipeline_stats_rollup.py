@@ -0,0 +1,485 @@
+"""
+📈 Pipeline Stats Rollup — Agregados por minuto/hora para os dashboards admin.
+
+Os endpoints /api/admin/pipeline/stats e /api/admin/queues/stats faziam
+COUNT(*) FILTER / GROUP BY sobre pipeline_runs, pipeline_steps e
+routing_logs a cada refresh, varrendo meses de histórico.
+
+Aqui os agregados são mantidos incrementalmente no momento em que o evento
+termina (PipelineLogger.complete_run / complete_step, decisão do
+QueueRouterService), em duas granularidades:
+
+- 'minute': janela recente (bordas de períodos não alinhados à hora)
+- 'hour':   histórico completo
+
+A leitura soma buckets, então o custo é O(buckets) e não O(runs).
+
+Tabelas (criadas automaticamente no primeiro uso):
+    pipeline_run_rollups    (bucket, phase, worker_id, status)
+    pipeline_step_rollups   (bucket, step_name, status)
+    routing_rollups         (bucket, selected_worker_id)
+
+Índice parcial dos runs ativos (idx_pipeline_runs_active), no deploy:
+    python -m app.services.pipeline_stats_rollup
+
+Uso:
+    from app.services.pipeline_stats_rollup import record_run_completion
+
+    with conn.cursor() as cur:
+        record_run_completion(cur, row)   # row = RETURNING do UPDATE do run
+    conn.commit()
+
+Data: 18/Out/2026
+"""
+
+import os
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' volta para as queries sobre as tabelas brutas)
+STATS_ROLLUPS_ENABLED = os.environ.get('PIPELINE_STATS_ROLLUPS', 'true').lower() == 'true'
+# Retenção dos buckets por minuto (os por hora ficam para sempre)
+MINUTE_RETENTION_HOURS = int(os.environ.get('PIPELINE_STATS_MINUTE_RETENTION_HOURS', 48))
+# Intervalo mínimo entre limpezas dos buckets por minuto (por processo)
+PRUNE_INTERVAL_SECONDS = 600
+
+GRANULARITIES = ('minute', 'hour')
+TERMINAL_RUN_STATUSES = ('completed', 'failed', 'cancelled')
+TERMINAL_STEP_STATUSES = ('completed', 'failed', 'skipped')
+
+# Tabelas já criadas?
+_tables_ensured = False
+_last_prune = 0.0
+
+
+# ═══════════════════════════════════════════════════════════════
+# TABELAS
+# ═══════════════════════════════════════════════════════════════
+
+def ensure_rollup_tables(cur) -> None:
+    """Cria as tabelas de rollup se não existirem."""
+    global _tables_ensured
+    if _tables_ensured:
+        return
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pipeline_run_rollups (
+            granularity VARCHAR(10) NOT NULL,
+            bucket_start TIMESTAMPTZ NOT NULL,
+            phase INTEGER NOT NULL DEFAULT 0,
+            worker_id VARCHAR(100) NOT NULL DEFAULT 'unknown',
+            status VARCHAR(20) NOT NULL,
+            run_count BIGINT NOT NULL DEFAULT 0,
+            duration_ms_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            duration_ms_count BIGINT NOT NULL DEFAULT 0,
+            video_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket_start, phase, worker_id, status)
+        );
+
+        CREATE TABLE IF NOT EXISTS pipeline_step_rollups (
+            granularity VARCHAR(10) NOT NULL,
+            bucket_start TIMESTAMPTZ NOT NULL,
+            step_name VARCHAR(100) NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            step_count BIGINT NOT NULL DEFAULT 0,
+            duration_ms_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            duration_ms_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket_start, step_name, status)
+        );
+
+        CREATE TABLE IF NOT EXISTS routing_rollups (
+            granularity VARCHAR(10) NOT NULL,
+            bucket_start TIMESTAMPTZ NOT NULL,
+            selected_worker_id VARCHAR(100) NOT NULL,
+            decision_count BIGINT NOT NULL DEFAULT 0,
+            fallback_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (granularity, bucket_start, selected_worker_id)
+        );
+    """)
+    _tables_ensured = True
+    logger.info("📈 [ROLLUP] Tabelas de rollup OK")
+
+
+def ensure_active_runs_index() -> None:
+    """
+    Cria o índice parcial dos runs ativos (pending/running) em pipeline_runs.
+
+    Roda no deploy (__main__), não na transação do primeiro complete_run:
+    CREATE INDEX comum bloqueia escrita na tabela enquanto o índice é
+    construído. CONCURRENTLY exige autocommit (conexão própria).
+    """
+    from app.db import get_db_connection
+    conn = get_db_connection()
+    try:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pipeline_runs_active
+                ON pipeline_runs(status) WHERE status IN ('pending', 'running')
+        """)
+        cursor.close()
+    finally:
+        conn.close()
+    logger.info("📈 [ROLLUP] Índice idx_pipeline_runs_active OK")
+
+
+# ═══════════════════════════════════════════════════════════════
+# ESCRITA (incremental)
+# ═══════════════════════════════════════════════════════════════
+
+def _upsert_run(cur, created_at, phase, worker_id, status, count: int,
+                duration_ms: Optional[float], has_video: bool) -> None:
+    sign = 1 if count > 0 else -1
+    duration_sum = sign * float(duration_ms) if duration_ms is not None and status == 'completed' else 0.0
+    duration_count = sign if duration_ms is not None and status == 'completed' else 0
+    video = sign if has_video else 0
+
+    for granularity in GRANULARITIES:
+        cur.execute("""
+            INSERT INTO pipeline_run_rollups (
+                granularity, bucket_start, phase, worker_id, status,
+                run_count, duration_ms_sum, duration_ms_count, video_count
+            ) VALUES (%s, date_trunc(%s, %s::timestamptz), %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (granularity, bucket_start, phase, worker_id, status) DO UPDATE SET
+                run_count = pipeline_run_rollups.run_count + EXCLUDED.run_count,
+                duration_ms_sum = pipeline_run_rollups.duration_ms_sum + EXCLUDED.duration_ms_sum,
+                duration_ms_count = pipeline_run_rollups.duration_ms_count + EXCLUDED.duration_ms_count,
+                video_count = pipeline_run_rollups.video_count + EXCLUDED.video_count
+        """, (
+            granularity, granularity, created_at, phase or 0, worker_id or 'unknown', status,
+            count, duration_sum, duration_count, video
+        ))
+
+
+def record_run_completion(cur, row: Dict[str, Any]) -> None:
+    """
+    Atualiza os rollups quando um run chega a um status final.
+
+    Args:
+        cur: Cursor da mesma conexão que fez o UPDATE (commit fica com quem chama)
+        row: created_at, phase, worker_id, status, total_duration_ms,
+            output_video_url e previous_* (estado anterior ao UPDATE).
+            Se o run já estava em status final, o bucket anterior é
+            decrementado (complete_run chamado duas vezes não conta em dobro).
+    """
+    if not row or row.get('status') not in TERMINAL_RUN_STATUSES:
+        return
+    ensure_rollup_tables(cur)
+
+    if row.get('previous_status') in TERMINAL_RUN_STATUSES:
+        _upsert_run(cur, row['created_at'], row.get('phase'), row.get('worker_id'),
+                    row['previous_status'], -1, row.get('previous_duration_ms'),
+                    bool(row.get('previous_output_url')))
+
+    _upsert_run(cur, row['created_at'], row.get('phase'), row.get('worker_id'),
+                row['status'], 1, row.get('total_duration_ms'),
+                bool(row.get('output_video_url')))
+    _maybe_prune(cur)
+
+
+def _upsert_step(cur, bucket_at, step_name, status, count: int,
+                 duration_ms: Optional[float]) -> None:
+    sign = 1 if count > 0 else -1
+    duration_sum = sign * float(duration_ms) if duration_ms is not None else 0.0
+    duration_count = sign if duration_ms is not None else 0
+
+    for granularity in GRANULARITIES:
+        cur.execute("""
+            INSERT INTO pipeline_step_rollups (
+                granularity, bucket_start, step_name, status,
+                step_count, duration_ms_sum, duration_ms_count
+            ) VALUES (%s, date_trunc(%s, %s::timestamptz), %s, %s, %s, %s, %s)
+            ON CONFLICT (granularity, bucket_start, step_name, status) DO UPDATE SET
+                step_count = pipeline_step_rollups.step_count + EXCLUDED.step_count,
+                duration_ms_sum = pipeline_step_rollups.duration_ms_sum + EXCLUDED.duration_ms_sum,
+                duration_ms_count = pipeline_step_rollups.duration_ms_count + EXCLUDED.duration_ms_count
+        """, (granularity, granularity, bucket_at, step_name, status,
+              count, duration_sum, duration_count))
+
+
+def record_step_completion(cur, row: Dict[str, Any]) -> None:
+    """
+    Atualiza os rollups quando um step termina.
+
+    O bucket é o created_at do run (mesmo filtro de período do dashboard).
+
+    Args:
+        row: run_created_at, step_name, status, duration_ms e
+            previous_status / previous_duration_ms
+    """
+    if not row or row.get('status') not in TERMINAL_STEP_STATUSES:
+        return
+    ensure_rollup_tables(cur)
+
+    bucket_at = row.get('run_created_at')
+    if row.get('previous_status') in TERMINAL_STEP_STATUSES:
+        _upsert_step(cur, bucket_at, row['step_name'], row['previous_status'], -1,
+                     row.get('previous_duration_ms'))
+    _upsert_step(cur, bucket_at, row['step_name'], row['status'], 1, row.get('duration_ms'))
+
+
+def record_routing_decision(cur, selected_worker_id: str, was_fallback: bool) -> None:
+    """Incrementa o contador de decisões do worker no bucket atual."""
+    ensure_rollup_tables(cur)
+    for granularity in GRANULARITIES:
+        cur.execute("""
+            INSERT INTO routing_rollups (
+                granularity, bucket_start, selected_worker_id, decision_count, fallback_count
+            ) VALUES (%s, date_trunc(%s, NOW()), %s, 1, %s)
+            ON CONFLICT (granularity, bucket_start, selected_worker_id) DO UPDATE SET
+                decision_count = routing_rollups.decision_count + 1,
+                fallback_count = routing_rollups.fallback_count + EXCLUDED.fallback_count
+        """, (granularity, granularity, selected_worker_id or 'unknown', 1 if was_fallback else 0))
+
+
+def _maybe_prune(cur) -> None:
+    """Remove buckets por minuto fora da retenção (no máximo a cada PRUNE_INTERVAL_SECONDS)."""
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return
+    _last_prune = now
+    for table in ('pipeline_run_rollups', 'pipeline_step_rollups', 'routing_rollups'):
+        cur.execute(
+            f"DELETE FROM {table} WHERE granularity = 'minute' "
+            f"AND bucket_start < NOW() - make_interval(hours => %s)",
+            (MINUTE_RETENTION_HOURS,)
+        )
+
+
+# ═══════════════════════════════════════════════════════════════
+# LEITURA
+# ═══════════════════════════════════════════════════════════════
+
+def _bucket_filter(start_date: Optional[datetime]) -> Tuple[str, List[Any]]:
+    """
+    Monta o filtro de buckets para [start_date, agora].
+
+    Horas completas vêm dos buckets por hora; a hora parcial do início vem
+    dos buckets por minuto (se ainda dentro da retenção - senão a hora
+    inteira é incluída).
+    """
+    if start_date is None:
+        return "granularity = 'hour'", []
+
+    minute_start = start_date.replace(second=0, microsecond=0)
+    first_full_hour = minute_start.replace(minute=0)
+    if first_full_hour < minute_start:
+        first_full_hour += timedelta(hours=1)
+
+    retention_edge = datetime.utcnow() - timedelta(hours=MINUTE_RETENTION_HOURS)
+    if first_full_hour == minute_start or minute_start < retention_edge:
+        return "granularity = 'hour' AND bucket_start >= date_trunc('hour', %s::timestamptz)", [minute_start]
+
+    return (
+        "((granularity = 'hour' AND bucket_start >= %s) OR "
+        "(granularity = 'minute' AND bucket_start >= %s AND bucket_start < %s))",
+        [first_full_hour, minute_start, first_full_hour]
+    )
+
+
+def _avg(total: float, count: int) -> Optional[float]:
+    return (total / count) if count else None
+
+
+def read_pipeline_stats(cur, start_date: Optional[datetime]) -> Dict[str, Any]:
+    """
+    Estatísticas no formato de /api/admin/pipeline/stats a partir dos rollups.
+
+    Runs ainda em andamento (pending/running) não estão nos rollups e são
+    contados direto em pipeline_runs (índice parcial idx_pipeline_runs_active).
+    """
+    ensure_rollup_tables(cur)
+    bucket_filter, params = _bucket_filter(start_date)
+
+    cur.execute(f"""
+        SELECT worker_id, status,
+               SUM(run_count) AS runs,
+               SUM(duration_ms_sum) AS duration_sum,
+               SUM(duration_ms_count) AS duration_count,
+               SUM(video_count) AS videos
+        FROM pipeline_run_rollups
+        WHERE {bucket_filter}
+        GROUP BY worker_id, status
+    """, params)
+    run_rows = cur.fetchall()
+
+    active_filter = "AND created_at >= %s" if start_date else ""
+    cur.execute(f"""
+        SELECT COALESCE(worker_id, 'unknown') AS worker_id, status, COUNT(*) AS runs
+        FROM pipeline_runs
+        WHERE status IN ('pending', 'running') {active_filter}
+        GROUP BY 1, 2
+    """, [start_date] if start_date else [])
+    active_rows = cur.fetchall()
+
+    totals = {'completed': 0, 'failed': 0, 'running': 0, 'pending': 0}
+    total_runs = 0
+    videos = 0
+    duration_sum, duration_count = 0.0, 0
+    by_worker: Dict[str, Dict[str, Any]] = {}
+
+    for row in list(run_rows) + list(active_rows):
+        runs = int(row['runs'] or 0)
+        status = row['status']
+        worker = by_worker.setdefault(row['worker_id'], {
+            'worker_id': row['worker_id'], 'count': 0, 'completed': 0,
+            '_duration_sum': 0.0, '_duration_count': 0,
+        })
+        worker['count'] += runs
+        total_runs += runs
+        if status in totals:
+            totals[status] += runs
+        if status == 'completed':
+            worker['completed'] += runs
+            worker['_duration_sum'] += float(row.get('duration_sum') or 0)
+            worker['_duration_count'] += int(row.get('duration_count') or 0)
+            duration_sum += float(row.get('duration_sum') or 0)
+            duration_count += int(row.get('duration_count') or 0)
+        videos += int(row.get('videos') or 0)
+
+    for worker in by_worker.values():
+        worker['avg_duration'] = _avg(worker.pop('_duration_sum'), worker.pop('_duration_count'))
+
+    cur.execute(f"""
+        SELECT step_name,
+               SUM(step_count) AS total,
+               SUM(step_count) FILTER (WHERE status = 'failed') AS failed,
+               SUM(duration_ms_sum) AS duration_sum,
+               SUM(duration_ms_count) AS duration_count
+        FROM pipeline_step_rollups
+        WHERE {bucket_filter}
+        GROUP BY step_name
+        ORDER BY failed DESC NULLS LAST
+    """, params)
+    by_step = {}
+    for row in cur.fetchall():
+        by_step[row['step_name']] = {
+            'step_name': row['step_name'],
+            'total': int(row['total'] or 0),
+            'failed': int(row['failed'] or 0),
+            'avg_duration': _avg(float(row['duration_sum'] or 0), int(row['duration_count'] or 0)),
+        }
+
+    return {
+        'total_runs': total_runs,
+        'completed_runs': totals['completed'],
+        'failed_runs': totals['failed'],
+        'running_runs': totals['running'],
+        'pending_runs': totals['pending'],
+        'avg_duration_ms': _avg(duration_sum, duration_count),
+        # Runs com vídeo de saída (o COUNT DISTINCT por URL não é agregável)
+        'total_videos': videos,
+        'by_worker': by_worker,
+        'by_step': by_step,
+        'source': 'rollups',
+    }
+
+
+def read_routing_stats(cur, start_date: datetime) -> Dict[str, Any]:
+    """Decisões de roteamento por worker desde start_date (formato de /api/admin/queues/stats)."""
+    ensure_rollup_tables(cur)
+    bucket_filter, params = _bucket_filter(start_date)
+    cur.execute(f"""
+        SELECT selected_worker_id, SUM(decision_count) AS count
+        FROM routing_rollups
+        WHERE {bucket_filter}
+        GROUP BY selected_worker_id
+        ORDER BY count DESC
+    """, params)
+    jobs_by_worker = [
+        {'selected_worker_id': row['selected_worker_id'], 'count': int(row['count'] or 0)}
+        for row in cur.fetchall()
+    ]
+    return {
+        'routing_today': {
+            'total': sum(j['count'] for j in jobs_by_worker),
+            'workers_used': len([j for j in jobs_by_worker if j['count'] > 0]),
+        },
+        'jobs_by_worker': jobs_by_worker,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# BACKFILL
+# ═══════════════════════════════════════════════════════════════
+
+def rebuild_rollups(cur, since: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Recalcula os rollups a partir das tabelas brutas (backfill / correção).
+
+    Substitui os buckets do período (a partir de since, ou tudo). Os buckets
+    por minuto só são recalculados dentro da retenção.
+    """
+    ensure_rollup_tables(cur)
+    retention_edge = datetime.utcnow() - timedelta(hours=MINUTE_RETENTION_HOURS)
+    counts = {}
+
+    for granularity in GRANULARITIES:
+        edge = since
+        if granularity == 'minute':
+            edge = max(since, retention_edge) if since else retention_edge
+        since_filter = "AND r.created_at >= date_trunc(%s, %s::timestamptz)" if edge else ""
+        bucket_filter = "AND bucket_start >= date_trunc(%s, %s::timestamptz)" if edge else ""
+        edge_params = [granularity, edge] if edge else []
+
+        cur.execute(f"DELETE FROM pipeline_run_rollups WHERE granularity = %s {bucket_filter}",
+                    [granularity] + edge_params)
+        cur.execute(f"""
+            INSERT INTO pipeline_run_rollups (
+                granularity, bucket_start, phase, worker_id, status,
+                run_count, duration_ms_sum, duration_ms_count, video_count
+            )
+            SELECT %s, date_trunc(%s, r.created_at), COALESCE(r.phase, 0),
+                   COALESCE(r.worker_id, 'unknown'), r.status,
+                   COUNT(*),
+                   COALESCE(SUM(r.total_duration_ms) FILTER (WHERE r.status = 'completed'), 0),
+                   COUNT(r.total_duration_ms) FILTER (WHERE r.status = 'completed'),
+                   COUNT(*) FILTER (WHERE r.output_video_url IS NOT NULL)
+            FROM pipeline_runs r
+            WHERE r.status IN ('completed', 'failed', 'cancelled') {since_filter}
+            GROUP BY 2, 3, 4, 5
+        """, [granularity, granularity] + edge_params)
+        counts[f'runs_{granularity}'] = cur.rowcount
+
+        cur.execute(f"DELETE FROM pipeline_step_rollups WHERE granularity = %s {bucket_filter}",
+                    [granularity] + edge_params)
+        cur.execute(f"""
+            INSERT INTO pipeline_step_rollups (
+                granularity, bucket_start, step_name, status,
+                step_count, duration_ms_sum, duration_ms_count
+            )
+            SELECT %s, date_trunc(%s, r.created_at), s.step_name, s.status,
+                   COUNT(*), COALESCE(SUM(s.duration_ms), 0), COUNT(s.duration_ms)
+            FROM pipeline_steps s
+            JOIN pipeline_runs r ON r.id = s.run_id
+            WHERE s.status IN ('completed', 'failed', 'skipped') {since_filter}
+            GROUP BY 2, 3, 4
+        """, [granularity, granularity] + edge_params)
+        counts[f'steps_{granularity}'] = cur.rowcount
+
+        cur.execute(f"DELETE FROM routing_rollups WHERE granularity = %s {bucket_filter}",
+                    [granularity] + edge_params)
+        cur.execute(f"""
+            INSERT INTO routing_rollups (
+                granularity, bucket_start, selected_worker_id, decision_count, fallback_count
+            )
+            SELECT %s, date_trunc(%s, r.created_at), COALESCE(r.selected_worker_id, 'unknown'),
+                   COUNT(*), COUNT(*) FILTER (WHERE r.was_fallback)
+            FROM routing_logs r
+            WHERE 1=1 {since_filter}
+            GROUP BY 2, 3
+        """, [granularity, granularity] + edge_params)
+        counts[f'routing_{granularity}'] = cur.rowcount
+
+    logger.info(f"📈 [ROLLUP] Rebuild concluído: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ensure_active_runs_index()
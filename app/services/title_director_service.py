@@ -28,6 +28,8 @@ from typing import Dict, Optional
 
 import requests
 
+from app.services.llm_response_cache import cached_chat_completion_post
+
 logger = logging.getLogger(__name__)
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
@@ -354,11 +356,12 @@ class TitleDirectorService:
             'response_format': {'type': 'json_object'},
         }
 
-        response = requests.post(
+        response = cached_chat_completion_post(
             'https://api.openai.com/v1/chat/completions',
             headers=headers,
             json=payload,
             timeout=30,
+            service_type='title_director',
         )
 
         if response.status_code != 200:
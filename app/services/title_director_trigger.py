@@ -20,7 +20,6 @@ Data: 11/Fev/2026
 """
 
 import logging
-import threading
 import json
 import time
 from typing import Optional
@@ -33,16 +32,19 @@ def trigger_title_director_async(
     conversation_id: str,
     user_input: Optional[str] = None,
 ) -> None:
-    """Dispara geração de título em background thread."""
-    thread = threading.Thread(
-        target=_run_title_director,
-        args=(project_id, conversation_id, user_input),
-        daemon=True,
-        name=f"title-director-{project_id[:8]}",
+    """
+    Dispara geração de título na fila de análises.
+
+    Gerações automáticas (sem user_input) são deduplicadas por projeto;
+    pedidos explícitos do usuário sempre entram na fila.
+    """
+    from app.services.analysis_queue import dispatch_analysis
+    submitted = dispatch_analysis(
+        'title_director', project_id, conversation_id,
+        dedup=not user_input, user_input=user_input,
     )
-    thread.start()
     logger.info(
-        f"🏷️ [TITLE-TRIGGER] Background thread iniciada: "
+        f"🏷️ [TITLE-TRIGGER] {'Enfileirada' if submitted else 'Ignorada (já em execução)'}: "
         f"project={project_id[:8]}... conv={conversation_id[:8]}... "
         f"user_input={'sim' if user_input else 'não'}"
     )
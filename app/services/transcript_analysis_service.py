@@ -24,6 +24,8 @@ from typing import Dict, List, Optional
 
 import requests
 
+from app.services.llm_response_cache import cached_chat_completion_post
+
 logger = logging.getLogger(__name__)
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
@@ -352,7 +354,7 @@ class TranscriptAnalysisService:
             )
 
             # Chamar OpenAI API (texto puro, sem imagens)
-            response = requests.post(
+            response = cached_chat_completion_post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -368,6 +370,7 @@ class TranscriptAnalysisService:
                     "temperature": 0.3,
                 },
                 timeout=90,
+                service_type="transcript_analysis_llm",
             )
 
             time_ms = int((time.time() - t0) * 1000)
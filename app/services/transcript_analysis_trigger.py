@@ -17,7 +17,6 @@ Data: 09/Fev/2026
 """
 
 import logging
-import threading
 import json
 import uuid
 import time
@@ -31,16 +30,11 @@ def trigger_transcript_analysis_async(
     conversation_id: str,
     batch_id: str = None,
 ) -> None:
-    """Dispara análise de transcrição em background thread."""
-    thread = threading.Thread(
-        target=_run_transcript_analysis,
-        args=(project_id, conversation_id, batch_id),
-        daemon=True,
-        name=f"transcript-analysis-{project_id[:8]}",
-    )
-    thread.start()
+    """Dispara análise de transcrição na fila de análises (uma por projeto por vez)."""
+    from app.services.analysis_queue import dispatch_analysis
+    submitted = dispatch_analysis('transcript_analysis', project_id, conversation_id, batch_id=batch_id)
     logger.info(
-        f"🎙️ [TRANSCRIPT-TRIGGER] Background thread iniciada: "
+        f"🎙️ [TRANSCRIPT-TRIGGER] {'Enfileirada' if submitted else 'Ignorada (já em execução)'}: "
         f"project={project_id[:8]}... conv={conversation_id[:8]}..."
     )
 
@@ -144,12 +138,40 @@ def _run_transcript_analysis(
             if triage_data else 'unknown'
         )
 
-        result = service.analyze(
-            assets=assets_with_transcriptions,
-            retakes=retakes,
-            format_detected=format_detected,
-            response_language=response_language,
+        # 🆕 v4.8.0: A análise cruza todas as transcrições (narrativa, retakes,
+        # ordem), então é refeita inteira quando algum asset muda — mas se o
+        # conjunto de entrada é o mesmo da última análise, reaproveita o resultado.
+        from app.services.asset_analysis_cache import (
+            ASSET_ANALYSIS_CACHE_ENABLED, asset_content_hash, inputs_fingerprint,
+        )
+        input_fingerprint = inputs_fingerprint(
+            [
+                asset_content_hash(a, {
+                    'text': a.get('transcription_text', ''),
+                    'words': len(a.get('words') or []),
+                    'classification': a.get('classification'),
+                })
+                for a in assets_with_transcriptions
+            ],
+            retakes, format_detected, response_language,
         )
+        stored = _get_stored_analysis(project_id) if ASSET_ANALYSIS_CACHE_ENABLED else None
+        reused = bool(stored) and stored.get('input_fingerprint') == input_fingerprint
+
+        if reused:
+            result = stored
+            logger.info(
+                f"♻️ [TRANSCRIPT-TRIGGER] Transcrições inalteradas desde a última análise, "
+                f"reaproveitando resultado (sem chamada LLM)"
+            )
+        else:
+            result = service.analyze(
+                assets=assets_with_transcriptions,
+                retakes=retakes,
+                format_detected=format_detected,
+                response_language=response_language,
+            )
+            result['input_fingerprint'] = input_fingerprint
 
         elapsed = time.time() - t0
 
@@ -161,90 +183,91 @@ def _run_transcript_analysis(
             )
             return
 
-        # ─── 5b. Resolver intra-retakes (DETERMINÍSTICO) ──────────────
-        # Padrão híbrido: LLM detectou frases repetidas (semântico),
-        # agora o IntraRetakeResolver calcula timestamps e segmentos
-        # usando os word timestamps reais do AssemblyAI.
-        # Montar dict asset_id → words[] do AssemblyAI (usado por LLM e fallback)
-        assets_words = {
-            a['id']: a.get('words', [])
-            for a in assets_with_transcriptions
-            if a.get('words')
-        }
-
-        llm_intra = result.get('intra_retakes', [])
+        if not reused:
+            # ─── 5b. Resolver intra-retakes (DETERMINÍSTICO) ──────────────
+            # Padrão híbrido: LLM detectou frases repetidas (semântico),
+            # agora o IntraRetakeResolver calcula timestamps e segmentos
+            # usando os word timestamps reais do AssemblyAI.
+            # Montar dict asset_id → words[] do AssemblyAI (usado por LLM e fallback)
+            assets_words = {
+                a['id']: a.get('words', [])
+                for a in assets_with_transcriptions
+                if a.get('words')
+            }
 
-        # 🆕 Fallback determinístico: se a LLM não detectou, escanear automaticamente
-        if not llm_intra and assets_words:
-            try:
-                from app.services.intra_retake_resolver import detect_repeated_phrases
-                deterministic_detections = detect_repeated_phrases(assets_words)
-                if deterministic_detections:
-                    llm_intra = deterministic_detections
-                    logger.info(
-                        f"🔍 [TRANSCRIPT-TRIGGER] Fallback determinístico: "
-                        f"{len(deterministic_detections)} asset(s) com repetições detectadas "
-                        f"(LLM não detectou)"
+            llm_intra = result.get('intra_retakes', [])
+
+            # 🆕 Fallback determinístico: se a LLM não detectou, escanear automaticamente
+            if not llm_intra and assets_words:
+                try:
+                    from app.services.intra_retake_resolver import detect_repeated_phrases
+                    deterministic_detections = detect_repeated_phrases(assets_words)
+                    if deterministic_detections:
+                        llm_intra = deterministic_detections
+                        logger.info(
+                            f"🔍 [TRANSCRIPT-TRIGGER] Fallback determinístico: "
+                            f"{len(deterministic_detections)} asset(s) com repetições detectadas "
+                            f"(LLM não detectou)"
+                        )
+                except Exception as det_err:
+                    logger.warning(
+                        f"⚠️ [TRANSCRIPT-TRIGGER] Fallback determinístico falhou: {det_err}"
                     )
-            except Exception as det_err:
-                logger.warning(
-                    f"⚠️ [TRANSCRIPT-TRIGGER] Fallback determinístico falhou: {det_err}"
-                )
 
-        if llm_intra:
-            try:
-                from app.services.intra_retake_resolver import resolve_intra_retakes
-
-                resolved = resolve_intra_retakes(llm_intra, assets_words)
-
-                if resolved:
-                    # Substituir detecções semânticas por segmentos determinísticos
-                    result['intra_retakes'] = resolved
-                    logger.info(
-                        f"🔧 [TRANSCRIPT-TRIGGER] IntraRetakeResolver: "
-                        f"{len(resolved)} asset(s) com segmentos resolvidos"
-                    )
-                else:
-                    # Resolver não encontrou matches — limpar para não propagar dados ruins
-                    result['intra_retakes'] = []
+            if llm_intra:
+                try:
+                    from app.services.intra_retake_resolver import resolve_intra_retakes
+
+                    resolved = resolve_intra_retakes(llm_intra, assets_words)
+
+                    if resolved:
+                        # Substituir detecções semânticas por segmentos determinísticos
+                        result['intra_retakes'] = resolved
+                        logger.info(
+                            f"🔧 [TRANSCRIPT-TRIGGER] IntraRetakeResolver: "
+                            f"{len(resolved)} asset(s) com segmentos resolvidos"
+                        )
+                    else:
+                        # Resolver não encontrou matches — limpar para não propagar dados ruins
+                        result['intra_retakes'] = []
+                        logger.warning(
+                            f"⚠️ [TRANSCRIPT-TRIGGER] Resolver não encontrou matches, "
+                            f"limpando intra_retakes"
+                        )
+                except Exception as resolver_err:
                     logger.warning(
-                        f"⚠️ [TRANSCRIPT-TRIGGER] Resolver não encontrou matches, "
-                        f"limpando intra_retakes"
+                        f"⚠️ [TRANSCRIPT-TRIGGER] IntraRetakeResolver falhou: "
+                        f"{resolver_err} — mantendo sem intra_retakes"
                     )
-            except Exception as resolver_err:
-                logger.warning(
-                    f"⚠️ [TRANSCRIPT-TRIGGER] IntraRetakeResolver falhou: "
-                    f"{resolver_err} — mantendo sem intra_retakes"
-                )
-                result['intra_retakes'] = []
+                    result['intra_retakes'] = []
 
-        # ─── 6. Persistir resultado ───────────────────────────────────
-        _persist_analysis_result(project_id, result)
+            # ─── 6. Persistir resultado ───────────────────────────────────
+            _persist_analysis_result(project_id, result)
 
-        # ─── 6b. Registrar custos ─────────────────────────────────────
-        try:
-            from app.services.ai_cost_tracker import log_ai_usage
-            log_ai_usage(
-                service_type="transcript_analysis_llm",
-                provider="openai",
-                model=result.get('model', 'gpt-4o-mini'),
-                project_id=project_id,
-                conversation_id=conversation_id,
-                tokens_in=result.get('tokens_in', 0),
-                tokens_out=result.get('tokens_out', 0),
-                duration_ms=result.get('llm_time_ms', 0),
-                input_units=len(assets_with_transcriptions),
-                metadata={
-                    'total_assets': len(assets_with_transcriptions),
-                    'total_words': total_words,
-                    'format_detected': format_detected,
-                    'sound_bites_found': len(result.get('sound_bites', [])),
-                },
-            )
-        except Exception as cost_err:
-            logger.warning(
-                f"⚠️ [TRANSCRIPT-TRIGGER] Cost tracking: {cost_err}"
-            )
+            # ─── 6b. Registrar custos ─────────────────────────────────────
+            try:
+                from app.services.ai_cost_tracker import log_ai_usage
+                log_ai_usage(
+                    service_type="transcript_analysis_llm",
+                    provider="openai",
+                    model=result.get('model', 'gpt-4o-mini'),
+                    project_id=project_id,
+                    conversation_id=conversation_id,
+                    tokens_in=result.get('tokens_in', 0),
+                    tokens_out=result.get('tokens_out', 0),
+                    duration_ms=result.get('llm_time_ms', 0),
+                    input_units=len(assets_with_transcriptions),
+                    metadata={
+                        'total_assets': len(assets_with_transcriptions),
+                        'total_words': total_words,
+                        'format_detected': format_detected,
+                        'sound_bites_found': len(result.get('sound_bites', [])),
+                    },
+                )
+            except Exception as cost_err:
+                logger.warning(
+                    f"⚠️ [TRANSCRIPT-TRIGGER] Cost tracking: {cost_err}"
+                )
 
         # ─── 7. NÃO enviar mensagem individual no chat ─────────────
         # Os resultados ficam salvos em project_config.
@@ -380,6 +403,33 @@ def _get_triage_data(project_id: str) -> Optional[dict]:
         return None
 
 
+def _get_stored_analysis(project_id: str) -> Optional[dict]:
+    """Busca o transcript_analysis_result salvo (para reaproveitamento)."""
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT project_config->'transcript_analysis_result'
+            FROM projects
+            WHERE project_id = %s
+        """, (project_id,))
+        row = cursor.fetchone()
+        cursor.close()
+        conn.close()
+
+        if not row or not row[0]:
+            return None
+
+        data = row[0] if isinstance(row[0], dict) else json.loads(row[0])
+        return data if isinstance(data, dict) else None
+    except Exception as e:
+        logger.warning(
+            f"⚠️ [TRANSCRIPT-TRIGGER] Erro ao ler resultado salvo: {e}"
+        )
+        return None
+
+
 def _get_assets_with_transcriptions(
     project_id: str,
     asset_ids: List[str],
@@ -30,6 +30,8 @@ from typing import Dict, List, Optional
 
 import requests
 
+from app.services.llm_response_cache import cached_chat_completion_post
+
 logger = logging.getLogger(__name__)
 
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
@@ -830,7 +832,7 @@ class VideoClipperService:
                 response_language=response_language,
             )
 
-            response = requests.post(
+            response = cached_chat_completion_post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -846,6 +848,7 @@ class VideoClipperService:
                     "temperature": 0.3,
                 },
                 timeout=90,
+                service_type="video_clipper_overlay",
             )
 
             time_ms = int((time.time() - t0) * 1000)
@@ -1085,7 +1088,7 @@ class VideoClipperService:
                 response_language=response_lang,
             )
 
-            response = requests.post(
+            response = cached_chat_completion_post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -1101,6 +1104,7 @@ class VideoClipperService:
                     "temperature": 0.3,
                 },
                 timeout=90,
+                service_type="video_clipper_llm",
             )
 
             time_ms = int((time.time() - t0) * 1000)
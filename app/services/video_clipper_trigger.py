@@ -16,7 +16,6 @@ Data: 09/Fev/2026
 """
 
 import logging
-import threading
 import json
 import uuid
 import time
@@ -29,16 +28,11 @@ def trigger_video_clipper_async(
     project_id: str,
     conversation_id: str,
 ) -> None:
-    """Dispara geração de EDL em background thread."""
-    thread = threading.Thread(
-        target=_run_video_clipper,
-        args=(project_id, conversation_id),
-        daemon=True,
-        name=f"video-clipper-{project_id[:8]}",
-    )
-    thread.start()
+    """Dispara geração de EDL na fila de análises (uma por projeto por vez)."""
+    from app.services.analysis_queue import dispatch_analysis
+    submitted = dispatch_analysis('video_clipper', project_id, conversation_id)
     logger.info(
-        f"🎬 [CLIPPER-TRIGGER] Background thread iniciada: "
+        f"🎬 [CLIPPER-TRIGGER] {'Enfileirado' if submitted else 'Ignorado (já em execução)'}: "
         f"project={project_id[:8]}... conv={conversation_id[:8]}..."
     )
 
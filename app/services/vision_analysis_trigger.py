@@ -7,7 +7,8 @@ Arquitetura Híbrida v3:
 
 Quando o usuário ativa "Análise Visual" no chatbot:
   1. Busca TODOS os vídeos do projeto (project_assets)
-  2. Para cada vídeo (em paralelo):
+  2. Para cada vídeo novo ou alterado (em paralelo; os demais vêm do
+     asset_analysis_cache por hash de conteúdo):
      a. Gera URL temporária do B2
      b. Chama Modal CPU (RAFT + frames)
      c. Chama LLM API (análise semântica)
@@ -20,10 +21,10 @@ Data: 08/Fev/2026
 """
 
 import logging
-import threading
 import json
 import uuid
 import time
+import threading
 from typing import Optional, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -32,24 +33,42 @@ logger = logging.getLogger(__name__)
 # Máximo de vídeos processados em paralelo
 # Reduzido de 5→3 para evitar cold start overload no Modal (Starter plan)
 # O retry com backoff no _call_motion_analyzer compensa a concorrência menor
+# 🆕 v4.8.0: Limite do PROCESSO (pool único), não de cada análise
 MAX_PARALLEL_VIDEOS = 3
 
+_video_pool: Optional[ThreadPoolExecutor] = None
+_video_pool_lock = threading.Lock()
+
+
+def _get_video_pool() -> ThreadPoolExecutor:
+    """
+    🆕 v4.8.0: Pool único para os vídeos de todas as análises do processo.
+
+    Antes cada análise criava o próprio pool de MAX_PARALLEL_VIDEOS: com N
+    análises em paralelo eram N × 3 threads chamando o Modal. Análises
+    simultâneas agora dividem as mesmas 3 vagas (os vídeos esperam na fila).
+    """
+    global _video_pool
+    if _video_pool is None:
+        with _video_pool_lock:
+            if _video_pool is None:
+                _video_pool = ThreadPoolExecutor(
+                    max_workers=MAX_PARALLEL_VIDEOS,
+                    thread_name_prefix="vision_video",
+                )
+    return _video_pool
+
 
 def trigger_vision_analysis_async(
     project_id: str,
     conversation_id: str,
     batch_id: str = None,
 ) -> None:
-    """Dispara análise visual em background thread."""
-    thread = threading.Thread(
-        target=_run_vision_analysis,
-        args=(project_id, conversation_id, batch_id),
-        daemon=True,
-        name=f"vision-analysis-{project_id[:8]}",
-    )
-    thread.start()
+    """Dispara análise visual na fila de análises (uma por projeto por vez)."""
+    from app.services.analysis_queue import dispatch_analysis
+    submitted = dispatch_analysis('vision_analysis', project_id, conversation_id, batch_id=batch_id)
     logger.info(
-        f"👁️ [VISION-TRIGGER] Background thread iniciada: "
+        f"👁️ [VISION-TRIGGER] {'Enfileirada' if submitted else 'Ignorada (já em execução)'}: "
         f"project={project_id[:8]}... conv={conversation_id[:8]}... "
         f"batch={batch_id[:8] if batch_id else 'none'}"
     )
@@ -104,9 +123,45 @@ def _run_vision_analysis(
 
         logger.info(f"👁️ [VISION-TRIGGER] {len(videos)} vídeo(s) para analisar")
 
+        # Resolver idioma de resposta para o projeto
+        try:
+            from app.services.asset_triage_service import get_project_locale
+            response_language = get_project_locale(project_id)
+        except Exception:
+            response_language = 'Portuguese (pt-BR)'
+
+        # ─── 1b. Reusar análises de vídeos que não mudaram ───
+        # 🆕 v4.8.0: Só vídeos novos/alterados voltam para Modal RAFT + LLM
+        from app.services.asset_analysis_cache import (
+            asset_content_hash, get_cached_results, store_results,
+        )
+        analysis_params = {"num_frames": 8, "language": response_language}
+        content_hashes = {
+            v['id']: asset_content_hash(v, analysis_params) for v in videos
+        }
+        cached = get_cached_results('vision', list(content_hashes.values()))
+        cached_results = []
+        pending_videos = []
+        for video in videos:
+            hit = cached.get(content_hashes[video['id']])
+            if hit:
+                cached_results.append({
+                    **hit,
+                    'asset_id': video['id'],
+                    'file_path': video['file_path'],
+                    'from_cache': True,
+                })
+            else:
+                pending_videos.append(video)
+        if cached_results:
+            logger.info(
+                f"👁️ [VISION-TRIGGER] {len(cached_results)}/{len(videos)} vídeo(s) "
+                f"reaproveitados do cache, {len(pending_videos)} para analisar"
+            )
+
         # ─── 2. Gerar URLs do B2 ─────────────────────────────
         video_urls = []
-        for video in videos:
+        for video in pending_videos:
             url = _generate_download_url(video['bucket'], video['file_path'])
             if url:
                 video_urls.append({**video, 'url': url})
@@ -114,12 +169,12 @@ def _run_vision_analysis(
             else:
                 logger.warning(f"⚠️ [VISION-TRIGGER] Falha URL: {video['file_path']}")
 
-        if not video_urls:
+        if not video_urls and not cached_results:
             _send_error_message(conversation_id, "Erro ao gerar URLs dos vídeos.")
             return
 
         # ─── 3. Typing indicator + SSE para visualizer ────────
-        n = len(video_urls)
+        n = len(video_urls) + len(cached_results)
         _send_typing_message(
             conversation_id,
             f"Analisando {n} vídeo{'s' if n > 1 else ''} com IA visual..."
@@ -154,15 +209,10 @@ def _run_vision_analysis(
         )
         service = get_visual_director_service()
 
-        # Resolver idioma de resposta para o projeto
-        try:
-            from app.services.asset_triage_service import get_project_locale
-            response_language = get_project_locale(project_id)
-        except Exception:
-            response_language = 'Portuguese (pt-BR)'
-
         results = []
-        if len(video_urls) == 1:
+        if not video_urls:
+            pass
+        elif len(video_urls) == 1:
             # Caso simples: 1 vídeo
             result = service.analyze(
                 video_url=video_urls[0]['url'],
@@ -173,52 +223,60 @@ def _run_vision_analysis(
             result['file_path'] = video_urls[0]['file_path']
             results.append(result)
         else:
-            # Múltiplos vídeos: paralelo
-            with ThreadPoolExecutor(max_workers=MAX_PARALLEL_VIDEOS) as executor:
-                futures = {}
-                for v in video_urls:
-                    future = executor.submit(
-                        service.analyze,
-                        video_url=v['url'],
-                        options={"num_frames": 8},
-                        response_language=response_language,
-                    )
-                    futures[future] = v
-
-                completed_count = 0
-                for future in as_completed(futures):
-                    v = futures[future]
-                    try:
-                        result = future.result()
-                        result['asset_id'] = v['id']
-                        result['file_path'] = v['file_path']
-                        results.append(result)
-                        completed_count += 1
-                    except Exception as e:
-                        logger.error(f"❌ [VISION-TRIGGER] Falha vídeo {v['id']}: {e}")
-                        results.append({
-                            'status': 'error',
-                            'error': str(e),
-                            'asset_id': v['id'],
-                            'file_path': v['file_path'],
-                        })
-                        completed_count += 1
-                    # 🆕 v4.7.1: Emitir progresso por vídeo
-                    try:
-                        from app.routes.chat_sse import emit_chat_event
-                        file_name = v.get('file_path', '').split('/')[-1][:30]
-                        emit_chat_event(conversation_id, 'upload_step_progress', {
-                            'step': 'vision_analysis',
-                            'current': completed_count,
-                            'total': n,
-                            'message': f"Vídeo {completed_count}/{n} analisado: {file_name}",
-                            'asset_id': v['id'],
-                        })
-                    except Exception:
-                        pass
+            # Múltiplos vídeos: paralelo (🆕 v4.8.0: no pool único do processo)
+            executor = _get_video_pool()
+            futures = {}
+            for v in video_urls:
+                future = executor.submit(
+                    service.analyze,
+                    video_url=v['url'],
+                    options={"num_frames": 8},
+                    response_language=response_language,
+                )
+                futures[future] = v
+
+            completed_count = 0
+            for future in as_completed(futures):
+                v = futures[future]
+                try:
+                    result = future.result()
+                    result['asset_id'] = v['id']
+                    result['file_path'] = v['file_path']
+                    results.append(result)
+                    completed_count += 1
+                except Exception as e:
+                    logger.error(f"❌ [VISION-TRIGGER] Falha vídeo {v['id']}: {e}")
+                    results.append({
+                        'status': 'error',
+                        'error': str(e),
+                        'asset_id': v['id'],
+                        'file_path': v['file_path'],
+                    })
+                    completed_count += 1
+                # 🆕 v4.7.1: Emitir progresso por vídeo
+                try:
+                    from app.routes.chat_sse import emit_chat_event
+                    file_name = v.get('file_path', '').split('/')[-1][:30]
+                    emit_chat_event(conversation_id, 'upload_step_progress', {
+                        'step': 'vision_analysis',
+                        'current': completed_count,
+                        'total': n,
+                        'message': f"Vídeo {completed_count}/{n} analisado: {file_name}",
+                        'asset_id': v['id'],
+                    })
+                except Exception:
+                    pass
 
         elapsed = time.time() - t0
 
+        # Guardar análises novas no cache por conteúdo do asset
+        store_results('vision', [
+            (content_hashes[r['asset_id']], r['asset_id'], r)
+            for r in results if r.get('status') == 'success'
+        ])
+        analyzed_successful = [r for r in results if r.get('status') == 'success']
+        results = cached_results + results
+
         # ─── 5. Verificar resultados ──────────────────────────
         successful = [r for r in results if r.get('status') == 'success']
         failed = [r for r in results if r.get('status') != 'success']
@@ -237,7 +295,7 @@ def _run_vision_analysis(
         else:
             combined = {
                 "videos": successful,
-                "total_videos": len(video_urls),
+                "total_videos": len(results),
                 "successful": len(successful),
                 "failed": len(failed),
             }
@@ -246,7 +304,8 @@ def _run_vision_analysis(
         # ─── 6b. Registrar custos ────────────────────────────
         try:
             from app.services.ai_cost_tracker import log_ai_usage
-            for r in successful:
+            # Resultados do cache não geraram custo neste disparo
+            for r in analyzed_successful:
                 # Motion analysis (Modal CPU)
                 motion_ms = r.get('motion_time_ms', 0)
                 if motion_ms > 0:
@@ -303,14 +362,15 @@ def _run_vision_analysis(
                 'metadata': {
                     'videos_analyzed': len(successful),
                     'videos_failed': len(failed),
-                    'total_videos': len(video_urls),
+                    'videos_from_cache': len(cached_results),
+                    'total_videos': len(results),
                     'elapsed_s': round(elapsed, 1),
                     'engines': list(set(r.get('engine', '?') for r in successful)),
                     'models': list(set(r.get('model', '?') for r in successful)),
-                    'total_motion_ms': sum(r.get('motion_time_ms', 0) for r in successful),
-                    'total_llm_ms': sum(r.get('llm_time_ms', 0) for r in successful),
-                    'total_tokens_in': sum(r.get('tokens_in', 0) for r in successful),
-                    'total_tokens_out': sum(r.get('tokens_out', 0) for r in successful),
+                    'total_motion_ms': sum(r.get('motion_time_ms', 0) for r in analyzed_successful),
+                    'total_llm_ms': sum(r.get('llm_time_ms', 0) for r in analyzed_successful),
+                    'total_tokens_in': sum(r.get('tokens_in', 0) for r in analyzed_successful),
+                    'total_tokens_out': sum(r.get('tokens_out', 0) for r in analyzed_successful),
                 },
             })
         except Exception:
@@ -337,7 +397,8 @@ def _run_vision_analysis(
 
         logger.info(
             f"✅ [VISION-TRIGGER] Total: {elapsed:.1f}s | "
-            f"{len(successful)}/{len(video_urls)} vídeos OK"
+            f"{len(successful)}/{len(results)} vídeos OK "
+            f"({len(cached_results)} do cache)"
         )
 
         # ─── 8. Verificar se VideoClipper pode ser disparado ────
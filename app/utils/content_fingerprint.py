@@ -0,0 +1,100 @@
+"""
+🆕 v4.8.0: Content Fingerprint - Hash do CONTEÚDO de um arquivo por URL/path
+
+Caches endereçados por conteúdo (transcription_cache, matting_segment_cache)
+não podem usar a URL como chave: paths por job são sobrescritos em replays
+e o mesmo arquivo aparece com URLs diferentes.
+
+Ordem de tentativa:
+1. Arquivo local (volume compartilhado): sha256 em streaming
+2. HEAD no B2: header X-Bz-Content-Sha1 (sem baixar o arquivo)
+3. allow_etag: ETag forte + Content-Length (servidores fora do B2)
+4. download: GET em streaming e sha256
+
+Uso:
+    fingerprint = content_fingerprint(url)                      # B2/local
+    fingerprint = content_fingerprint(url, download=True, max_bytes=...)
+    # None → conteúdo não identificado (o chamador ignora o cache)
+"""
+
+import os
+import re
+import hashlib
+import logging
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_SHA1_RE = re.compile(r'^[0-9a-f]{40}$')
+_READ_CHUNK_BYTES = 1 << 20
+
+
+def _sha256_stream(chunks: Iterable[bytes], max_bytes: Optional[int] = None) -> str:
+    """sha256 de um stream de bytes (ValueError se passar de max_bytes)."""
+    digest = hashlib.sha256()
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        if max_bytes is not None and total > max_bytes:
+            raise ValueError(f"arquivo maior que {max_bytes // (1024 * 1024)}MB")
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _b2_content_sha1(headers) -> Optional[str]:
+    """SHA1 informado pelo B2 (X-Bz-Content-Sha1, com ou sem 'unverified:')."""
+    sha1 = (headers.get('X-Bz-Content-Sha1') or '').lower()
+    if sha1.startswith('unverified:'):
+        sha1 = sha1[len('unverified:'):]
+    return sha1 if _SHA1_RE.match(sha1) else None
+
+
+def content_fingerprint(
+    url: str,
+    allow_etag: bool = False,
+    download: bool = False,
+    max_bytes: Optional[int] = None,
+) -> Optional[str]:
+    """
+    Hash do conteúdo do arquivo ('sha256:...', 'sha1:...' ou 'etag:...').
+
+    Args:
+        url: URL http(s) ou path local
+        allow_etag: Aceita ETag forte + Content-Length quando não há SHA1 do B2
+        download: Sem SHA1 (nem ETag), baixa em streaming e calcula sha256
+        max_bytes: Limite para o sha256 local/baixado (acima disso → None)
+
+    Returns:
+        Fingerprint, ou None se o conteúdo não pôde ser identificado
+    """
+    if not url:
+        return None
+
+    if os.path.isfile(url):
+        try:
+            with open(url, 'rb') as f:
+                return 'sha256:' + _sha256_stream(iter(lambda: f.read(_READ_CHUNK_BYTES), b''), max_bytes)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ [FINGERPRINT] Falha ao ler {url}: {e}")
+            return None
+
+    import requests
+    try:
+        head = requests.head(url, timeout=10, allow_redirects=True)
+        if head.status_code == 200:
+            sha1 = _b2_content_sha1(head.headers)
+            if sha1:
+                return 'sha1:' + sha1
+
+            etag = (head.headers.get('ETag') or '').strip('"')
+            if allow_etag and etag and not etag.startswith('W/'):
+                return f"etag:{etag}:{head.headers.get('Content-Length', '')}"
+
+        if not download:
+            return None
+        with requests.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            return 'sha256:' + _sha256_stream(response.iter_content(chunk_size=_READ_CHUNK_BYTES), max_bytes)
+    except Exception as e:
+        logger.warning(f"⚠️ [FINGERPRINT] Fingerprint indisponível para {url[:80]}: {e}")
+        return None
@@ -0,0 +1,292 @@
+"""
+📦 JSON Payload - Codificação única de payloads grandes (render / subtitle)
+
+🆕 v4.8.0: Vídeos longos geram payloads v-editor de dezenas de MB (milhares
+de PNGs de palavras). Antes, o mesmo dict era percorrido recursivamente para
+converter URLs, copiado por chunk e serializado de novo em cada
+requests.post(json=...).
+
+Este módulo centraliza o caminho do payload:
+1. Serializa UMA vez com encoder rápido (orjson, fallback json stdlib)
+2. Converte URLs externas → internas em uma única passada sobre os bytes
+3. Comprime opcionalmente em gzip (PAYLOAD_GZIP_REQUESTS=true)
+4. Mantém os bytes prontos para reuso em retries e submissões de chunks
+
+Uso:
+    encoded = EncodedPayload.encode(payload, url_map=EXTERNAL_TO_INTERNAL_URL_MAP)
+    response = encoded.post(url, timeout=60)
+
+    # Chunks: tracks serializadas uma vez, cabeçalho por chunk
+    tracks_raw = encode_json(payload["tracks"], url_map=...)
+    body = splice_json(chunk_header, {"tracks": tracks_raw})
+"""
+
+import os
+import gzip
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Compressão do corpo da requisição (o serviço de destino precisa aceitar
+# Content-Encoding: gzip - por isso desligado por padrão)
+GZIP_REQUEST_BODIES = os.environ.get('PAYLOAD_GZIP_REQUESTS', 'false').lower() == 'true'
+GZIP_MIN_BYTES = int(os.environ.get('PAYLOAD_GZIP_MIN_BYTES', 64 * 1024))
+GZIP_LEVEL = int(os.environ.get('PAYLOAD_GZIP_LEVEL', 5))
+
+
+def encode_json(obj: Any, url_map: Optional[Dict[str, str]] = None,
+                sort_keys: bool = False) -> bytes:
+    """
+    Serializa objeto para bytes JSON (UTF-8, compacto).
+
+    Args:
+        obj: Estrutura serializável
+        url_map: Mapa {prefixo_externo: prefixo_interno} aplicado nos bytes
+        sort_keys: Ordena as chaves (saída canônica, para hashes de conteúdo)
+
+    Returns:
+        Bytes JSON prontos para envio
+    """
+    raw = None
+    if ORJSON_AVAILABLE:
+        try:
+            option = orjson.OPT_NON_STR_KEYS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            raw = orjson.dumps(obj, option=option)
+        except TypeError as e:
+            # Tipos que o orjson não suporta (ex: int > 64 bits) → stdlib
+            logger.debug(f"⚠️ [JSON] orjson falhou ({e}), usando json stdlib")
+
+    if raw is None:
+        raw = json.dumps(obj, ensure_ascii=False, separators=(',', ':'),
+                         sort_keys=sort_keys).encode('utf-8')
+
+    if url_map:
+        raw = rewrite_urls(raw, url_map)
+
+    return raw
+
+
+def decode_json(data: Any) -> Any:
+    """Desserializa bytes/str JSON (orjson quando disponível)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
+
+
+def rewrite_urls(raw: bytes, url_map: Dict[str, str]) -> bytes:
+    """
+    Substitui prefixos de URL diretamente nos bytes JSON (uma passada por prefixo).
+
+    Equivale a percorrer o payload convertendo cada string, mas sem recriar
+    dicts/listas. Os prefixos não contêm caracteres escapados pelo JSON,
+    então a substituição nos bytes é segura.
+    """
+    for external, internal in url_map.items():
+        external_b = external.encode('utf-8')
+        if external_b in raw:
+            raw = raw.replace(external_b, internal.encode('utf-8'))
+    return raw
+
+
+def splice_json(obj: Dict[str, Any], raw_fields: Dict[str, bytes],
+                url_map: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Serializa um dict pequeno e anexa campos já codificados (sem re-serializar).
+
+    Args:
+        obj: Campos "leves" (cabeçalho do chunk, metadados)
+        raw_fields: {chave: bytes JSON já codificados} (ex: tracks)
+        url_map: Conversão de URLs aplicada apenas ao cabeçalho
+
+    Returns:
+        Bytes JSON de um objeto com obj + raw_fields
+    """
+    head = encode_json({k: v for k, v in obj.items() if k not in raw_fields}, url_map=url_map)
+    parts = [head[:-1]]  # remove '}'
+    first = head == b'{}'
+    for key, raw in raw_fields.items():
+        if not first:
+            parts.append(b',')
+        first = False
+        parts.append(encode_json(key))
+        parts.append(b':')
+        parts.append(raw)
+    parts.append(b'}')
+    return b''.join(parts)
+
+
+class EncodedPayload:
+    """
+    Payload JSON já codificado, reutilizável entre tentativas e destinos.
+
+    raw: bytes JSON sem compressão (também usado para logs de debug)
+    body: bytes enviados na requisição (gzip se habilitado e grande o bastante)
+    """
+
+    def __init__(self, raw: bytes, compress: Optional[bool] = None):
+        self.raw = raw
+        self._compress = GZIP_REQUEST_BODIES if compress is None else compress
+        self._body: Optional[bytes] = None
+        self._gzipped = False
+
+    @classmethod
+    def encode(cls, obj: Any, url_map: Optional[Dict[str, str]] = None,
+               compress: Optional[bool] = None) -> 'EncodedPayload':
+        """Serializa uma vez e retorna o payload pronto para envio."""
+        return cls(encode_json(obj, url_map=url_map), compress=compress)
+
+    @property
+    def body(self) -> bytes:
+        """Corpo da requisição (comprimido sob demanda, uma única vez)."""
+        if self._body is None:
+            if self._compress and len(self.raw) >= GZIP_MIN_BYTES:
+                self._body = gzip.compress(self.raw, compresslevel=GZIP_LEVEL)
+                self._gzipped = True
+            else:
+                self._body = self.raw
+        return self._body
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Headers HTTP correspondentes ao body."""
+        self.body  # garante que a decisão de compressão já foi tomada
+        headers = {'Content-Type': 'application/json'}
+        if self._gzipped:
+            headers['Content-Encoding'] = 'gzip'
+        return headers
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.raw)
+
+    def text(self) -> str:
+        """JSON como str (para colunas JSONB / logs)."""
+        return self.raw.decode('utf-8')
+
+    def post(self, url: str, timeout: float, session=None, **kwargs):
+        """
+        Envia o payload via HTTP POST reutilizando os bytes codificados.
+
+        Args:
+            url: Endpoint de destino
+            timeout: Timeout da requisição
+            session: requests.Session opcional (reuso de conexão)
+        """
+        import requests
+
+        sender = session or requests
+        headers = dict(self.headers)
+        headers.update(kwargs.pop('headers', None) or {})
+        return sender.post(url, data=self.body, headers=headers, timeout=timeout, **kwargs)
+
+    def describe(self) -> str:
+        """Resumo curto para logs."""
+        body = self.body
+        if self._gzipped:
+            return f"{len(self.raw) / 1024:.0f}KB → {len(body) / 1024:.0f}KB gzip"
+        return f"{len(self.raw) / 1024:.0f}KB"
+
+
+# Para uso direto como script (benchmark com payload sintético de 20 minutos)
+if __name__ == "__main__":
+    import copy
+    import time
+
+    url_map = {
+        "https://services.vinicius.ai": "http://v-services:5000",
+        "https://api.vinicius.ai": "http://supabase-custom-api:5000",
+    }
+
+    def _legacy_convert(obj):
+        if isinstance(obj, str):
+            for external, internal in url_map.items():
+                if external in obj:
+                    return obj.replace(external, internal)
+            return obj
+        if isinstance(obj, dict):
+            return {k: _legacy_convert(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [_legacy_convert(i) for i in obj]
+        return obj
+
+    # 20 minutos @ ~2.6 palavras/s ≈ 3100 palavras, 1 PNG por palavra
+    fps = 30
+    words = int(20 * 60 * 2.6)
+    subtitles = []
+    for i in range(words):
+        start_ms = int(i * 1000 / 2.6)
+        subtitles.append({
+            "id": f"word_{i}",
+            "src": f"https://services.vinicius.ai/shared-files/pngs/job_x/phrase_{i // 6}/word_{i}.png",
+            "shadow_src": f"https://services.vinicius.ai/shared-files/pngs/job_x/phrase_{i // 6}/word_{i}_shadow.png",
+            "start_time": start_ms,
+            "end_time": start_ms + 380,
+            "position": {"x": 120 + (i % 6) * 140, "y": 1400, "width": 132, "height": 88},
+            "animation": {"type_in": "fade-in", "type_out": "fade-out", "duration_in_frames": 6},
+            "style_type": "default" if i % 7 else "emphasis",
+            "z_index": 100,
+            "text": f"palavra{i}",
+        })
+    payload = {
+        "canvas": {"width": 1080, "height": 1920},
+        "fps": fps,
+        "duration_in_frames": 20 * 60 * fps,
+        "video_url": "https://services.vinicius.ai/shared-files/videos/job_x/phase1.mp4",
+        "tracks": {
+            "subtitles": subtitles,
+            "word_bgs": [dict(s, src=s["src"].replace(".png", "_bg.png")) for s in subtitles[::3]],
+            "video_segments": [{"src": "https://services.vinicius.ai/shared-files/clip.mp4",
+                                "duration": 4.0} for _ in range(300)],
+        },
+        "render_settings": {},
+        "quality_settings": {"crf": 18},
+    }
+    chunks = 6
+
+    print("\n📦 JSON Payload - Benchmark (payload sintético de 20 min)\n")
+    print("=" * 60)
+    print(f"   orjson disponível: {ORJSON_AVAILABLE}")
+
+    t0 = time.perf_counter()
+    legacy_sizes = 0
+    for c in range(chunks):
+        chunk = dict(payload, job_id=f"job_x_chunk_{c}", frame_range={"start_frame": c, "end_frame": c + 1})
+        chunk = _legacy_convert(copy.copy(chunk))
+        legacy_sizes += len(json.dumps(chunk).encode('utf-8'))
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new_sizes = 0
+    tracks_raw = encode_json(payload["tracks"], url_map=url_map)
+    for c in range(chunks):
+        head = {k: v for k, v in payload.items() if k != "tracks"}
+        head.update(job_id=f"job_x_chunk_{c}", frame_range={"start_frame": c, "end_frame": c + 1})
+        new_sizes += len(splice_json(head, {"tracks": tracks_raw}, url_map=url_map))
+    new_s = time.perf_counter() - t0
+
+    single = EncodedPayload(tracks_raw, compress=True)
+    t0 = time.perf_counter()
+    single.body
+    gzip_s = time.perf_counter() - t0
+
+    print(f"   Palavras/PNGs: {words} | chunks: {chunks}")
+    print(f"   Payload por chunk: {legacy_sizes / chunks / 1024 / 1024:.2f}MB (legado) "
+          f"| {new_sizes / chunks / 1024 / 1024:.2f}MB (novo)")
+    print(f"   Legado (deep-walk + json.dumps por chunk): {legacy_s * 1000:.0f}ms")
+    print(f"   Novo (encode único + splice por chunk):    {new_s * 1000:.0f}ms")
+    print(f"   Speedup: {legacy_s / new_s:.1f}x")
+    print(f"   gzip das tracks: {single.describe()} em {gzip_s * 1000:.0f}ms")
+    print("=" * 60)
@@ -0,0 +1,98 @@
+"""
+📦 JSON Response - Respostas JSON grandes com encoder rápido e compressão
+
+🆕 v4.8.0: GET /video/job/{id}/results devolvia transcription_words e
+phrase_groups inteiros via jsonify (json stdlib, sem compressão): vários MB
+montados em Python num worker gthread para vídeos longos.
+
+Este módulo:
+1. Serializa com encode_json (orjson, fallback json stdlib)
+2. Comprime conforme Accept-Encoding do cliente: br (se o pacote brotli
+   estiver instalado) ou gzip, acima de RESPONSE_COMPRESS_MIN_BYTES
+3. Oferece codificação colunar para listas de registros homogêneos
+   (palavras): arrays paralelos em vez de um dict por item
+
+Uso:
+    return json_response(request, {"job_id": ..., "transcription_words": words})
+
+    columnar_records(words)
+    # → {"text": ["Olá", ...], "start": [0.0, ...], "end": [0.5, ...], "confidence": [...]}
+"""
+
+import os
+import gzip
+import logging
+from typing import Any, Dict, List, Optional
+
+from flask import Response
+
+from .json_payload import encode_json
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Feature flag (ROLLBACK: 'false' responde sempre sem compressão)
+RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION', 'true').lower() == 'true'
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', 2048))
+RESPONSE_GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', 5))
+RESPONSE_BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', 5))
+
+
+def _pick_encoding(flask_request) -> Optional[str]:
+    """Melhor Content-Encoding aceito pelo cliente (br > gzip), ou None."""
+    accepted = flask_request.accept_encodings
+    if BROTLI_AVAILABLE and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def json_response(flask_request, obj: Any, status: int = 200) -> Response:
+    """
+    Response JSON serializada uma vez e comprimida se o cliente aceitar.
+
+    Args:
+        flask_request: request atual (lê Accept-Encoding)
+        obj: Estrutura serializável
+        status: Código HTTP
+    """
+    raw = encode_json(obj)
+    body = raw
+    encoding = None
+
+    if RESPONSE_COMPRESSION_ENABLED and len(raw) >= RESPONSE_COMPRESS_MIN_BYTES:
+        encoding = _pick_encoding(flask_request)
+        if encoding == 'br':
+            body = brotli.compress(raw, quality=RESPONSE_BROTLI_QUALITY)
+        elif encoding == 'gzip':
+            body = gzip.compress(raw, compresslevel=RESPONSE_GZIP_LEVEL)
+
+    response = Response(body, status=status, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        logger.debug(f"📦 [JSON RESPONSE] {len(raw) / 1024:.0f}KB → {len(body) / 1024:.0f}KB {encoding}")
+    return response
+
+
+def columnar_records(records: Optional[List[Dict[str, Any]]]) -> Dict[str, List[Any]]:
+    """
+    [{text, start, end, ...}, ...] → {text: [...], start: [...], end: [...], ...}
+
+    Chaves ausentes em um registro viram None na posição correspondente,
+    então todos os arrays têm o mesmo tamanho.
+    """
+    records = records or []
+    fields: List[str] = []
+    for record in records:
+        for key in record:
+            if key not in fields:
+                fields.append(key)
+    return {key: [record.get(key) for record in records] for key in fields}
@@ -0,0 +1,144 @@
+"""
+🆕 v4.8.0: Redis JSON Cache - Base dos índices hash → entrada JSON no Redis
+
+Render chunks, clips de motion graphics, segmentos de matting e respostas
+LLM usam o mesmo esquema: uma chave por hash (PREFIX:hash) com a entrada em
+JSON e TTL fixo, client Redis compartilhado do processo obtido na primeira
+chamada, e falhas do Redis viram miss (nunca derrubam o job).
+
+Cada módulo define só a chave/hash e o formato da entrada:
+    class MattingSegmentCache(RedisJSONCache):
+        PREFIX = 'matting:segment_cache'
+        LOG_TAG = 'MATTING CACHE'
+
+        def _is_hit(self, entry):
+            return bool(entry.get('foreground_url'))
+
+        def _build_entry(self, modal_result):
+            ...  # None → não grava
+
+    cache = MattingSegmentCache(ttl_seconds=...)
+    hits = cache.get_many([key, ...])
+    cache.put(key, modal_result)
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from .json_payload import encode_json, decode_json
+
+logger = logging.getLogger(__name__)
+
+
+class RedisJSONCache:
+    """
+    Índice hash → entrada JSON (Redis).
+
+    Sem Redis o cache fica desabilitado: consultas retornam miss e gravações
+    são ignoradas.
+    """
+
+    PREFIX = 'cache'
+    LOG_TAG = 'CACHE'
+
+    def __init__(self, redis_client=None, ttl_seconds: int = 0):
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    def _client(self):
+        if self._redis is None:
+            from app.video_orchestrator.queue import get_redis_client
+            self._redis = get_redis_client()
+        return self._redis
+
+    @property
+    def available(self) -> bool:
+        return self._client() is not None
+
+    def _key(self, entry_hash: str) -> str:
+        return f"{self.PREFIX}:{entry_hash}"
+
+    # ─── Operações por chave (usadas também por índices com escopo) ───
+
+    def _mget_json(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Entradas das chaves (None para ausentes/ilegíveis ou Redis indisponível)."""
+        client = self._client()
+        if not client or not keys:
+            return [None] * len(keys)
+        try:
+            values = client.mget(keys)
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.LOG_TAG}] Falha ao consultar: {e}")
+            return [None] * len(keys)
+
+        entries = []
+        for value in values:
+            try:
+                entries.append(decode_json(value) if value else None)
+            except (TypeError, ValueError):
+                entries.append(None)
+        return entries
+
+    def _set_json(self, key: str, entry: Dict[str, Any]) -> None:
+        client = self._client()
+        if not client:
+            return
+        try:
+            client.set(key, encode_json(entry), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.LOG_TAG}] Falha ao gravar: {e}")
+
+    def _delete_keys(self, keys: List[str]) -> None:
+        client = self._client()
+        if not client or not keys:
+            return
+        try:
+            client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"⚠️ [{self.LOG_TAG}] Falha ao invalidar: {e}")
+
+    # ─── Formato da entrada (sobrescrito por cada cache) ───
+
+    def _is_hit(self, entry: Dict[str, Any]) -> bool:
+        """Entrada ainda utilizável (ex: arquivo existe). False → removida do índice."""
+        return True
+
+    def _build_entry(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Entrada a gravar a partir do resultado (None → não grava)."""
+        return result
+
+    # ─── Índice hash → entrada ───
+
+    def get_many(self, entry_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retorna {hash: entrada} para os hashes encontrados e utilizáveis."""
+        if not entry_hashes:
+            return {}
+        hits = {}
+        stale = []
+        for entry_hash, entry in zip(entry_hashes, self._mget_json([self._key(h) for h in entry_hashes])):
+            if entry is None:
+                continue
+            if self._is_hit(entry):
+                hits[entry_hash] = entry
+            else:
+                stale.append(entry_hash)
+
+        if stale:
+            logger.info(f"🧹 [{self.LOG_TAG}] {len(stale)} entrada(s) não utilizável(is), removida(s)")
+            self.invalidate(stale)
+        return hits
+
+    def get(self, entry_hash: str) -> Optional[Dict[str, Any]]:
+        if not entry_hash:
+            return None
+        return self.get_many([entry_hash]).get(entry_hash)
+
+    def put(self, entry_hash: str, result: Dict[str, Any]) -> None:
+        if not entry_hash:
+            return
+        entry = self._build_entry(result)
+        if entry is not None:
+            self._set_json(self._key(entry_hash), entry)
+
+    def invalidate(self, entry_hashes: List[str]) -> None:
+        self._delete_keys([self._key(h) for h in entry_hashes or []])
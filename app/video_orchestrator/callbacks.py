@@ -368,6 +368,16 @@ def render_complete_webhook():
         """, (video_url, video_url, job_id))
         
         logger.info(f"✅ video_processing_jobs atualizado: job_id={job_id}")
+        
+        # 🆕 v4.8.0: Projeção de status (o polling lê do Redis, não desta tabela)
+        from .job_status_projection import get_job_status_projection
+        get_job_status_projection().patch(
+            job_id,
+            output_video_url=video_url,
+            phase2_video_url=video_url,
+            status='completed',
+            completed_at=datetime.now(timezone.utc).isoformat(),
+        )
         logger.info(f"   • output_video_url = {video_url[:60]}...")
         logger.info(f"   • phase2_video_url = {video_url[:60]}...")
         
@@ -14,9 +14,11 @@ import json
 import logging
 import os
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
 
-from ..engine.models import PipelineState, StepResult
+from ..engine.models import PipelineState
+from ..job_cancellation import JobCancelledError, get_cancellation_token
 from ..engine.pipeline_engine import PipelineEngine
 from ..engine.state_manager import StateManager
 from .tool_builder import ToolBuilder
@@ -28,6 +30,14 @@ MAX_ITERATIONS = 40
 MAX_CONSECUTIVE_ERRORS = 5
 DIRECTOR_TIMEOUT_S = 600  # 10 min total
 
+# 🆕 v4.8.0: Tool calls independentes do mesmo turno rodam em paralelo
+# (ROLLBACK: 'false' executa uma a uma, na ordem do LLM)
+DIRECTOR_PARALLEL_TOOLS = os.environ.get('DIRECTOR_PARALLEL_TOOLS', 'true').lower() == 'true'
+DIRECTOR_MAX_PARALLEL_TOOLS = int(os.environ.get('DIRECTOR_MAX_PARALLEL_TOOLS', 4))
+
+# Tools auxiliares: leem/alteram o state inteiro, então separam as ondas paralelas
+AUXILIARY_TOOLS = ('get_pipeline_status', 'skip_step', 'finish_pipeline')
+
 
 class LLMDirector:
     """
@@ -91,16 +101,20 @@ class LLMDirector:
         ]
 
         consecutive_errors = 0
+        cancel_token = get_cancellation_token(job_id)
 
         for iteration in range(MAX_ITERATIONS):
+            # 🆕 v4.8.0: Job cancelado → não chamar o LLM de novo
+            cancel_token.raise_if_cancelled()
+
             elapsed = time.time() - start_time
             if elapsed > DIRECTOR_TIMEOUT_S:
                 logger.warning(f"⏰ [DIRECTOR] Timeout após {elapsed:.0f}s ({iteration} iterações)")
                 break
 
             try:
-                import openai
-                client = openai.OpenAI(api_key=self.api_key)
+                from app.ai_config import get_llm_client
+                client = get_llm_client('openai', self.api_key)
 
                 response = client.chat.completions.create(
                     model=self.model,
@@ -123,40 +137,66 @@ class LLMDirector:
                 # Processar tool calls
                 messages.append(message)  # Adicionar assistant message com tool_calls
 
+                calls = []
                 for tool_call in message.tool_calls:
                     tool_name = tool_call.function.name
                     tool_args = json.loads(tool_call.function.arguments) if tool_call.function.arguments else {}
-
                     logger.info(f"🔧 [DIRECTOR] Tool call: {tool_name}({tool_args})")
-
-                    # Executar tool e obter resultado
-                    tool_result = self._execute_tool(
-                        job_id, tool_name, tool_args, state
-                    )
-
-                    # Atualizar state se foi um step
-                    if tool_result.get('_new_state'):
-                        state = tool_result.pop('_new_state')
-
-                    # Adicionar resultado como tool response
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": json.dumps(tool_result, ensure_ascii=False, default=str),
-                    })
-
-                    # Resetar erro consecutivo em sucesso
-                    if tool_result.get('success', True):
-                        consecutive_errors = 0
-                    else:
-                        consecutive_errors += 1
-                        if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
-                            logger.error(f"❌ [DIRECTOR] {MAX_CONSECUTIVE_ERRORS} erros consecutivos, abortando")
+                    calls.append((tool_call, tool_name, tool_args))
+
+                # 🆕 v4.8.0: Ondas de tools independentes (depends_on), state em memória
+                state_changed = False
+                aborted = False
+                try:
+                    for wave in self._plan_waves(calls):
+                        base_state = state
+                        results = self._execute_wave(job_id, wave, base_state)
+
+                        step_states = []
+                        for (tool_call, tool_name, _), tool_result in zip(wave, results):
+                            # Atualizar state se foi um step
+                            new_state = tool_result.pop('_new_state', None)
+                            if new_state is not None:
+                                step_states.append(new_state)
+
+                            # Adicionar resultado como tool response
+                            messages.append({
+                                "role": "tool",
+                                "tool_call_id": tool_call.id,
+                                "content": json.dumps(tool_result, ensure_ascii=False, default=str),
+                            })
+
+                            # Resetar erro consecutivo em sucesso
+                            if tool_result.get('success', True):
+                                consecutive_errors = 0
+                            else:
+                                consecutive_errors += 1
+                                if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                                    aborted = True
+
+                        if len(step_states) == 1:
+                            state = step_states[0]
+                        elif step_states:
+                            state = self.engine.merge_step_states(base_state, step_states)
+                        state_changed = state_changed or bool(step_states)
+
+                        if aborted:
                             break
+                finally:
+                    # Persistir uma vez por turno (em vez de a cada step)
+                    if state_changed:
+                        self.engine.state_manager.save(job_id, state, f"director_turn_{iteration + 1}")
+
+                if aborted:
+                    logger.error(f"❌ [DIRECTOR] {MAX_CONSECUTIVE_ERRORS} erros consecutivos, abortando")
+                    break
 
             except ImportError:
                 logger.error("❌ [DIRECTOR] openai não instalado. pip install openai")
                 raise
+            except JobCancelledError:
+                logger.warning(f"🛑 [DIRECTOR] Job {job_id[:8]}... cancelado na iteração {iteration}")
+                raise
             except Exception as e:
                 logger.error(f"❌ [DIRECTOR] Erro na iteração {iteration}: {e}")
                 consecutive_errors += 1
@@ -168,13 +208,76 @@ class LLMDirector:
                     "content": f"Erro interno: {str(e)}. Tente uma abordagem diferente."
                 })
 
-        # Recarregar state final do banco (mais atualizado)
-        final_state = self.engine.state_manager.load(job_id) or state
+        # State em memória já foi persistido ao fim de cada turno
         elapsed = time.time() - start_time
         logger.info(f"🏁 [DIRECTOR] Concluído em {elapsed:.1f}s | "
-                     f"Steps: {final_state.completed_steps}")
+                     f"Steps: {state.completed_steps}")
+
+        return state
+
+    def _plan_waves(self, calls: List[tuple]) -> List[List[tuple]]:
+        """
+        Agrupa as tool calls de um turno em ondas executáveis em paralelo.
 
-        return final_state
+        Mantém a ordem do LLM: uma call entra na onda atual se for um step
+        sem relação de dependência (depends_on/await_async, transitivo) com
+        os steps já na onda. Tools auxiliares rodam sozinhas, entre ondas.
+        """
+        if not DIRECTOR_PARALLEL_TOOLS:
+            return [[call] for call in calls]
+
+        waves: List[List[tuple]] = []
+        current: List[tuple] = []
+        for call in calls:
+            tool_name = call[1]
+            if tool_name in AUXILIARY_TOOLS or not self.engine.registry.get(tool_name):
+                if current:
+                    waves.append(current)
+                    current = []
+                waves.append([call])
+                continue
+
+            if any(not self._independent(tool_name, other[1]) for other in current) \
+                    or len(current) >= DIRECTOR_MAX_PARALLEL_TOOLS:
+                waves.append(current)
+                current = []
+            current.append(call)
+
+        if current:
+            waves.append(current)
+        return waves
+
+    def _dependencies(self, step_name: str, seen: Optional[Set[str]] = None) -> Set[str]:
+        """Todas as dependências (diretas e transitivas) de um step."""
+        seen = set() if seen is None else seen
+        step_def = self.engine.registry.get(step_name)
+        if not step_def:
+            return seen
+        for dep in list(step_def.depends_on) + list(step_def.await_async):
+            if dep not in seen:
+                seen.add(dep)
+                self._dependencies(dep, seen)
+        return seen
+
+    def _independent(self, step_a: str, step_b: str) -> bool:
+        """Dois steps podem rodar juntos se nenhum depende (mesmo indiretamente) do outro."""
+        if step_a == step_b:
+            return False
+        return step_a not in self._dependencies(step_b) and step_b not in self._dependencies(step_a)
+
+    def _execute_wave(self, job_id: str, wave: List[tuple], state: PipelineState) -> List[Dict]:
+        """Executa as tools de uma onda (em paralelo se houver mais de uma) sobre o mesmo state."""
+        if len(wave) == 1:
+            _, tool_name, tool_args = wave[0]
+            return [self._execute_tool(job_id, tool_name, tool_args, state)]
+
+        logger.info(f"⚡ [DIRECTOR] Executando em paralelo: {[call[1] for call in wave]}")
+        with ThreadPoolExecutor(max_workers=len(wave), thread_name_prefix="director_tool") as executor:
+            futures = [
+                executor.submit(self._execute_tool, job_id, tool_name, tool_args, state)
+                for _, tool_name, tool_args in wave
+            ]
+            return [future.result() for future in futures]
 
     def _execute_tool(
         self,
@@ -208,7 +311,6 @@ class LLMDirector:
             new_state = current_state.with_updates(
                 skipped_steps=(current_state.skipped_steps or []) + [step_name]
             )
-            self.engine.state_manager.save(job_id, new_state)
             return {
                 "success": True,
                 "step_skipped": step_name,
@@ -242,22 +344,20 @@ class LLMDirector:
                 "message": f"Step '{tool_name}' já foi executado anteriormente.",
             }
 
-        # Executar via engine
-        result: StepResult = self.engine.run_step(
+        # Executar via engine sobre o state em memória (persistido ao fim do turno)
+        result, new_state = self.engine.run_step_on_state(
             job_id=job_id,
             step_name=tool_name,
+            state=current_state,
             params=tool_args,
+            persist=False,
         )
 
         # Construir resposta para o LLM
         response = result.to_dict()
 
-        # Se sucesso, recarregar state atualizado
         if result.success:
-            new_state = self.engine.state_manager.load(job_id)
-            if new_state:
-                response['_new_state'] = new_state
-                response['state_summary'] = new_state.summary()
+            response['_new_state'] = new_state
 
         return response
 
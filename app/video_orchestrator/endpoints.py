@@ -38,6 +38,11 @@ def get_job_status(job_id: str):
     
     Retorna status atual de um job de processamento.
     
+    🆕 v4.8.0: Servido da projeção no Redis (job_status_projection), sem
+    tocar no Postgres a cada poll. Responde com ETag; If-None-Match igual
+    → 304 sem corpo. phrase_groups/transcription_words/speech_segments
+    ficam em /video/job/{job_id}/results (ou ?full=1, resposta legada).
+    
     Response:
     {
         "job_id": "uuid",
@@ -54,9 +59,77 @@ def get_job_status(job_id: str):
         "current_step": 1,
         "progress_percent": 40,
         "output_video_url": null,
-        "transcription_text": null
+        "transcription_text": null,
+        "phrase_groups_count": 0,
+        "can_review_classification": false,
+        "version": 12
     }
     """
+    from .job_status_projection import (
+        JOB_STATUS_PROJECTION_ENABLED, calculate_progress, get_job_status_projection,
+    )
+    
+    if request.args.get('full', '').lower() in ('1', 'true') or not JOB_STATUS_PROJECTION_ENABLED:
+        return _get_job_status_full(job_id)
+    
+    try:
+        projection = get_job_status_projection()
+        snapshot = projection.get(job_id)
+        
+        if snapshot is None:
+            # Projeção ausente (job antigo, TTL expirado, Redis fora): lê só as colunas leves
+            fields = get_job_manager().load_job_status_fields(job_id)
+            if not fields:
+                return jsonify({"error": "Job não encontrado"}), 404
+            snapshot = {**fields, "version": projection.publish(job_id, fields)}
+        
+        phrase_groups_count = snapshot.get("phrase_groups_count") or 0
+        response_data = {
+            "job_id": snapshot.get("job_id"),
+            "status": snapshot.get("status"),
+            "conversation_id": snapshot.get("conversation_id"),
+            "project_id": snapshot.get("project_id"),
+            "created_at": snapshot.get("created_at"),
+            "started_at": snapshot.get("started_at"),
+            "completed_at": snapshot.get("completed_at"),
+            "steps": snapshot.get("steps") or [],
+            "current_step": snapshot.get("current_step") or 0,
+            "progress_percent": calculate_progress(snapshot.get("steps") or []),
+            "output_video_url": snapshot.get("output_video_url"),
+            "phase1_video_url": snapshot.get("phase1_video_url"),
+            "phase2_video_url": snapshot.get("phase2_video_url"),
+            "transcription_text": snapshot.get("transcription_text"),
+            "transcription_words_count": snapshot.get("transcription_words_count") or 0,
+            "phrase_groups_count": phrase_groups_count,
+            "total_duration_ms": snapshot.get("total_duration_ms"),
+            "error_message": snapshot.get("error_message"),
+            "is_awaiting_review": snapshot.get("status") == JobStatus.AWAITING_REVIEW.value,
+            "phase1_source": snapshot.get("phase1_source"),
+            "phase1_metadata": snapshot.get("phase1_metadata"),
+            # Dados de revisão (frases, palavras, segmentos): GET /results
+            "can_review_classification": phrase_groups_count > 0,
+            "version": snapshot.get("version"),
+        }
+        
+        response = jsonify(response_data)
+        if snapshot.get("version") is not None:
+            response.set_etag(f"{job_id}-{snapshot['version']}")
+        else:
+            response.add_etag()
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        logger.error(f"❌ Erro ao buscar job {job_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+def _get_job_status_full(job_id: str):
+    """
+    Resposta legada de GET /video/job/{job_id} (job completo do banco).
+    
+    Usada com ?full=1 ou JOB_STATUS_PROJECTION=false.
+    """
     try:
         jm = get_job_manager()
         job = jm.get_job(job_id, force_reload=True)
@@ -251,6 +324,44 @@ def get_project_jobs(project_id: str):
         return jsonify({"error": str(e)}), 500
 
 
+# 🆕 v4.8.0: Campos de /results → colunas de video_processing_jobs necessárias
+RESULT_FIELD_COLUMNS = {
+    "output_video_url": ["output_video_url"],
+    "phase2_video_url": ["phase2_video_url"],
+    "transcription_text": ["transcription_text"],
+    "transcription_words": ["transcription_words"],
+    "phrase_groups": ["phrase_groups"],
+    "total_duration_ms": ["total_duration_ms"],
+    "completed_at": ["completed_at"],
+    "is_awaiting_review": [],
+    "phase_1_video_url": ["phase1_video_url"],
+    "original_video_url": ["original_video_url"],
+    "speech_segments": ["speech_segments"],
+    "phase1_audio_url": ["phase1_audio_url"],
+    "cut_timestamps": ["cut_timestamps"],
+    "untranscribed_segments": ["untranscribed_segments"],
+    "review_video_url": ["phase1_video_url", "original_video_url", "output_video_url"],
+    "can_review": [],
+}
+# Parâmetros de paginação: campo → (cursor, limit)
+RESULT_PAGINATION_PARAMS = {
+    "transcription_words": ("words_cursor", "words_limit"),
+    "phrase_groups": ("phrases_cursor", "phrases_limit"),
+}
+RESULTS_DEFAULT_PAGE_SIZE = 500
+RESULTS_MAX_PAGE_SIZE = 5000
+
+
+def _parse_page_param(value, default: int, minimum: int, maximum: int = None) -> int:
+    """Inteiro de query string dentro de [minimum, maximum]; ValueError se inválido."""
+    if value in (None, ''):
+        return default
+    parsed = int(value)
+    if parsed < minimum or (maximum is not None and parsed > maximum):
+        raise ValueError(value)
+    return parsed
+
+
 @video_orchestrator_bp.route('/video/job/<job_id>/results', methods=['GET'])
 def get_job_results(job_id: str):
     """
@@ -259,6 +370,16 @@ def get_job_results(job_id: str):
     Retorna resultados completos do job incluindo transcription_words e phrase_groups.
     Usar este endpoint após job completado para obter dados de renderização.
     
+    🆕 v4.8.0: Query parameters (todos opcionais; sem eles a resposta é a completa):
+        - fields: campos a retornar, separados por vírgula (job_id e status sempre vêm)
+        - words_cursor / words_limit: página de transcription_words
+        - phrases_cursor / phrases_limit: página de phrase_groups
+        - words_format=columnar: palavras como arrays paralelos
+          ({"text": [...], "start": [...], "end": [...], "confidence": [...]})
+    
+    Com paginação, `pagination.{campo}` traz total e next_cursor (null na última
+    página). A resposta é comprimida (br/gzip) conforme Accept-Encoding.
+    
     Response:
     {
         "job_id": "uuid",
@@ -279,29 +400,73 @@ def get_job_results(job_id: str):
                 ...
             },
             ...
-        ]
+        ],
+        "pagination": {
+            "phrase_groups": {"cursor": "0", "limit": 50, "total": 212, "next_cursor": "50"}
+        }
     }
     """
+    from app.utils.json_response import json_response, columnar_records
+    
+    # Projeção de campos
+    fields_param = request.args.get('fields')
+    if fields_param:
+        fields = [f.strip() for f in fields_param.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in RESULT_FIELD_COLUMNS and f not in ('job_id', 'status')]
+        if unknown:
+            return jsonify({
+                "error": f"Campos desconhecidos: {', '.join(unknown)}",
+                "available_fields": sorted(RESULT_FIELD_COLUMNS)
+            }), 400
+    else:
+        fields = list(RESULT_FIELD_COLUMNS)
+    
+    # Paginação (cursor = posição no array, opaco para o cliente)
+    slices = {}
+    try:
+        for field, (cursor_param, limit_param) in RESULT_PAGINATION_PARAMS.items():
+            if field not in fields:
+                continue
+            if cursor_param not in request.args and limit_param not in request.args:
+                continue
+            offset = _parse_page_param(request.args.get(cursor_param), 0, 0)
+            limit = _parse_page_param(request.args.get(limit_param), RESULTS_DEFAULT_PAGE_SIZE,
+                                      1, RESULTS_MAX_PAGE_SIZE)
+            slices[field] = (offset, limit)
+    except ValueError as e:
+        return jsonify({
+            "error": f"Parâmetro de paginação inválido: {e}",
+            "hint": f"cursor >= 0, 1 <= limit <= {RESULTS_MAX_PAGE_SIZE}"
+        }), 400
+    
+    columnar_words = request.args.get('words_format') == 'columnar'
+    
     try:
+        columns = []
+        for field in fields:
+            for col in RESULT_FIELD_COLUMNS.get(field, []):
+                if col not in columns:
+                    columns.append(col)
+        
         jm = get_job_manager()
-        job = jm.get_job(job_id, force_reload=True)
+        row = jm.load_job_result_fields(job_id, columns, slices=slices)
         
-        if not job:
+        if not row:
             return jsonify({"error": "Job não encontrado"}), 404
         
         # 🆕 v2.9.123: Permitir ver results em mais status para revisão pós-pipeline
         # COMPLETED: Job finalizado
         # AWAITING_REVIEW: Fase 1 concluída, aguardando aprovação
         # RENDERING: Renderização em andamento (permite ver classificação enquanto renderiza)
-        valid_statuses = [JobStatus.COMPLETED, JobStatus.AWAITING_REVIEW, JobStatus.RENDERING]
+        valid_statuses = [JobStatus.COMPLETED.value, JobStatus.AWAITING_REVIEW.value, 'rendering']
         
         # 🆕 v2.9.123: Se tem phrase_groups, permitir acesso mesmo em outros status
-        has_results = job.phrase_groups and len(job.phrase_groups) > 0
+        has_results = (row.get('phrase_groups_total') or 0) > 0
         
-        if job.status not in valid_statuses and not has_results:
+        if row['status'] not in valid_statuses and not has_results:
             return jsonify({
                 "error": "Job ainda não tem resultados disponíveis",
-                "status": job.status.value,
+                "status": row['status'],
                 "hint": "Aguarde o job completar ou entrar em revisão (phase_1_only)"
             }), 400
         
@@ -313,30 +478,55 @@ def get_job_results(job_id: str):
         # 2. phase1_video_url - vídeo cortado
         # 3. original_video_url - vídeo original
         # 4. output_video_url (fallback - pode ser vídeo renderizado)
-        review_video_url = (
-            job.phase1_video_url or 
-            job.original_video_url or 
-            job.output_video_url
-        )
-        
-        return jsonify({
-            "job_id": job.job_id,
-            "status": job.status.value,
-            "output_video_url": job.output_video_url,
-            "phase2_video_url": job.phase2_video_url,  # 🔧 v3.7.0: Frontend precisa deste campo para Fase 2
-            "transcription_text": job.transcription_text,
-            "transcription_words": job.transcription_words,
-            "phrase_groups": job.phrase_groups,
-            "total_duration_ms": job.total_duration_ms,
-            "completed_at": job.completed_at,
+        values = {
+            "output_video_url": lambda: row.get('output_video_url'),
+            "phase2_video_url": lambda: row.get('phase2_video_url'),  # 🔧 v3.7.0: Frontend precisa deste campo para Fase 2
+            "transcription_text": lambda: row.get('transcription_text'),
+            "transcription_words": lambda: (
+                columnar_records(row.get('transcription_words'))
+                if columnar_words else row.get('transcription_words')
+            ),
+            "phrase_groups": lambda: row.get('phrase_groups'),
+            "total_duration_ms": lambda: row.get('total_duration_ms'),
+            "completed_at": lambda: row.get('completed_at'),
             # 🆕 v2.9.170: SEMPRE retornar dados para o revisor
-            "is_awaiting_review": job.status == JobStatus.AWAITING_REVIEW,
-            "phase_1_video_url": job.phase1_video_url,  # 🔧 Sempre retornar se disponível
-            "original_video_url": job.original_video_url,  # 🆕 Para player seek-based
-            "speech_segments": job.speech_segments,  # 🆕 Para modo híbrido
-            "review_video_url": review_video_url,  # 🆕 URL recomendada para revisor
-            "can_review": True  # 🆕 Flag indicando que revisão está disponível
-        }), 200
+            "is_awaiting_review": lambda: row['status'] == JobStatus.AWAITING_REVIEW.value,
+            "phase_1_video_url": lambda: row.get('phase1_video_url'),  # 🔧 Sempre retornar se disponível
+            "original_video_url": lambda: row.get('original_video_url'),  # 🆕 Para player seek-based
+            "speech_segments": lambda: row.get('speech_segments'),  # 🆕 Para modo híbrido
+            # 🆕 v4.8.0: Antes vinham no polling de status (agora só aqui)
+            "phase1_audio_url": lambda: row.get('phase1_audio_url'),
+            "cut_timestamps": lambda: row.get('cut_timestamps'),
+            "untranscribed_segments": lambda: row.get('untranscribed_segments'),
+            "review_video_url": lambda: (  # 🆕 URL recomendada para revisor
+                row.get('phase1_video_url') or
+                row.get('original_video_url') or
+                row.get('output_video_url')
+            ),
+            "can_review": lambda: True,  # 🆕 Flag indicando que revisão está disponível
+        }
+        
+        response_data = {"job_id": row['job_id'], "status": row['status']}
+        for field in fields:
+            if field in values:
+                response_data[field] = values[field]()
+        
+        if columnar_words and "transcription_words" in response_data:
+            response_data["transcription_words_format"] = "columnar"
+        
+        if slices:
+            pagination = {}
+            for field, (offset, limit) in slices.items():
+                total = row.get(f"{field}_total") or 0
+                pagination[field] = {
+                    "cursor": str(offset),
+                    "limit": limit,
+                    "total": total,
+                    "next_cursor": str(offset + limit) if offset + limit < total else None,
+                }
+            response_data["pagination"] = pagination
+        
+        return json_response(request, response_data)
         
     except Exception as e:
         logger.error(f"❌ Erro ao buscar resultados do job {job_id}: {e}")
@@ -606,6 +796,10 @@ def cancel_job(job_id: str):
         # Atualizar status
         jm.update_job_status(job_id, JobStatus.CANCELLED)
         
+        # 🆕 v4.8.0: Interromper o trabalho em andamento (engine, Modal, render)
+        from .job_cancellation import request_job_cancellation
+        request_job_cancellation(job_id)
+        
         logger.info(f"🛑 Job cancelado: {job_id}")
         
         return jsonify({
@@ -965,6 +1159,10 @@ def replay_from_step(job_id: str, step_name: str):
         jm._jobs_cache[new_job_id] = new_job
         jm._persist_job(new_job)
         
+        # 🆕 v4.8.0: Linhagem indexada (parent_job_id / root_job_id)
+        from .replay_lineage import record_replay_lineage
+        record_replay_lineage(new_job_id, job_id)
+        
         # 6. Salvar PipelineState modificado no banco (para o bridge carregar)
         from app.video_orchestrator.engine.state_manager import StateManager
         from app.supabase_client import get_direct_db_connection
@@ -1105,7 +1303,8 @@ def get_job_checkpoints(job_id: str):
         # mesmo para steps que não foram re-executados no replay (ex: detect_silence)
         root_job_id = None
         if include_parent:
-            root_job_id = _find_root_job_id(job_id)
+            from .replay_lineage import find_root_job_id
+            root_job_id = find_root_job_id(job_id)
             if root_job_id and root_job_id != job_id:
                 current_steps = {cp['step_name'] for cp in checkpoints}
                 parent_checkpoints = debug.get_checkpoints(root_job_id)
@@ -1183,7 +1382,8 @@ def get_step_checkpoint(job_id: str, step_name: str):
         
         # 🆕 v4.4.2: Se não encontrou e include_parent, buscar no job raiz
         if payload is None and include_parent:
-            root_job_id = _find_root_job_id(job_id)
+            from .replay_lineage import find_root_job_id
+            root_job_id = find_root_job_id(job_id)
             if root_job_id and root_job_id != job_id:
                 payload = debug.get_step_checkpoint(root_job_id, step_name)
                 if payload:
@@ -1218,6 +1418,43 @@ def get_step_checkpoint(job_id: str, step_name: str):
         return jsonify({"error": str(e)}), 500
 
 
+@video_orchestrator_bp.route('/video/job/<job_id>/lineage', methods=['GET'])
+def get_job_lineage(job_id: str):
+    """
+    GET /api/video/job/{job_id}/lineage
+    
+    🆕 v4.8.0: Cadeia de replays do job (raiz + todos os replays), em uma query.
+    
+    Response:
+    {
+        "job_id": "uuid",
+        "root_job_id": "uuid",
+        "lineage": [
+            {"job_id": "uuid", "parent_job_id": null, "root_job_id": null, "status": "completed", ...},
+            {"job_id": "uuid", "parent_job_id": "uuid", "root_job_id": "uuid", "status": "processing", ...}
+        ]
+    }
+    """
+    try:
+        from .replay_lineage import get_replay_lineage
+        
+        lineage = get_replay_lineage(job_id)
+        if not lineage:
+            return jsonify({"error": "Job não encontrado"}), 404
+        
+        return jsonify({
+            "job_id": job_id,
+            "root_job_id": next(
+                (j["root_job_id"] for j in lineage if j["root_job_id"]), lineage[0]["job_id"]
+            ),
+            "lineage": lineage,
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"❌ Erro ao buscar linhagem do job {job_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 # ═══════════════════════════════════════════════════════════════
 # 🆕 v3.4.0: Pipeline Engine v3 - Debug & Status Endpoints
 # ═══════════════════════════════════════════════════════════════
@@ -1319,54 +1556,3 @@ def engine_job_state(job_id: str):
         logger.error(f"❌ Erro ao buscar engine state para {job_id}: {e}")
         return jsonify({"error": str(e)}), 500
 
-
-# ═══════════════════════════════════════════════════════════════
-# 🆕 v4.4.2: Helper para encontrar root job (cadeia de replays)
-# ═══════════════════════════════════════════════════════════════
-
-def _find_root_job_id(job_id: str, max_depth: int = 5) -> str:
-    """
-    Percorre a cadeia de replays para encontrar o job raiz (que tem todos os checkpoints).
-    
-    Replay jobs têm pipeline_state.options._replay_params.original_job_id apontando
-    para o job anterior. Seguimos essa cadeia até encontrar o job original.
-    
-    Args:
-        job_id: ID do job atual
-        max_depth: Profundidade máxima para evitar loops infinitos
-    
-    Returns:
-        ID do job raiz, ou o próprio job_id se não for um replay
-    """
-    try:
-        from app.db import get_db_connection
-        
-        current_id = job_id
-        for _ in range(max_depth):
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT pipeline_state->'options'->'_replay_params'->>'original_job_id'
-                FROM video_processing_jobs
-                WHERE job_id = %s
-            """, (current_id,))
-            row = cur.fetchone()
-            cur.close()
-            conn.close()
-            
-            if not row or not row[0]:
-                # Não é replay ou não tem parent → este é o root
-                return current_id
-            
-            parent_id = row[0]
-            if parent_id == current_id:
-                # Safety: evitar loop
-                return current_id
-            current_id = parent_id
-        
-        return current_id
-        
-    except Exception as e:
-        logger.warning(f"⚠️ [CHECKPOINTS] Erro ao buscar root job para {job_id}: {e}")
-        return job_id
-
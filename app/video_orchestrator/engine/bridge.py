@@ -206,7 +206,15 @@ class EngineBridge:
             # 2. Ler parâmetros de replay do job.options
             opts = dict(state.options or {})
             replay_params = opts.pop('_replay_params', {})
-            
+
+            # 🆕 v4.8.0: Job retomado pelo reaper (job_leases) — o pipeline_state
+            # salvo já não tem _replay_params (removido no passo 3); o job.options tem
+            if not replay_params:
+                from ..jobs import JobManager
+                job_manager = JobManager(db_connection_func=self.db_connection_func)
+                job = job_manager.get_job(job_id, force_reload=True)
+                replay_params = ((job.options if job else None) or {}).get('_replay_params', {})
+
             target_step = replay_params.get('target_step')
             steps_to_run = replay_params.get('steps_to_run', [])
             original_job_id = replay_params.get('original_job_id')
@@ -478,6 +486,12 @@ class EngineBridge:
 
     def _mark_job_failed(self, job_id: str, error: str):
         """Marca job como FAILED no banco."""
+        # 🆕 v4.8.0: Job cancelado pelo usuário mantém o status 'cancelled'
+        from ..job_cancellation import is_job_cancelled
+        if is_job_cancelled(job_id):
+            logger.info(f"🛑 [ENGINE] Job {job_id[:8]}... cancelado, não marcado como failed")
+            return
+
         try:
             from ..jobs import JobManager, JobStatus
             job_manager = JobManager(db_connection_func=self.db_connection_func)
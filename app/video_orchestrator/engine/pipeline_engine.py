@@ -10,14 +10,19 @@ para suportar Pipeline Replay (Director).
 🆕 v4.3.0: Async Subflows (Fire-and-Wait) — steps marcados com
 async_mode=True rodam em thread separada enquanto o pipeline continua.
 Steps com await_async=["step_name"] esperam o resultado antes de rodar.
+
+🆕 v4.8.0: Cancelamento cooperativo (job_cancellation) — verificado antes
+de cada step, em cada tentativa e no backoff de retry, e na espera de
+steps async. O job termina como 'cancelled' (JobCancelledError).
 """
 
 import logging
 import time
-from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from ..job_cancellation import JOB_CANCEL_CHECK_SECONDS, JobCancelledError, get_cancellation_token
 from .events import EngineEvents
 from .models import PipelineState, StepResult
 from .state_manager import StateManager
@@ -34,6 +39,15 @@ except ImportError:
     logger.warning("⚠️ debug_logger não disponível, checkpoints desabilitados")
 
 
+def _renew_job_lease(job_id: str, step_name: str):
+    """🆕 v4.8.0: Renova o lease do job (job_leases) e registra o step em execução."""
+    try:
+        from ..job_leases import renew_job_lease
+        renew_job_lease(job_id, step=step_name)
+    except Exception as e:
+        logger.debug(f"⚠️ [ENGINE] Falha ao renovar lease: {e}")
+
+
 class PipelineEngine:
     """
     Motor principal do pipeline.
@@ -87,6 +101,10 @@ class PipelineEngine:
         logger.info(f"   Steps: {ordered_steps}")
         logger.info(f"   Já completados: {state.completed_steps}")
 
+        # 🆕 v4.8.0: Job cancelado antes de começar (ex: enquanto estava na fila)
+        cancel_token = get_cancellation_token(job_id)
+        cancel_token.raise_if_cancelled()
+
         # 3. Atualizar status do job
         self.state_manager.update_job_status(job_id, 'processing')
 
@@ -100,6 +118,10 @@ class PipelineEngine:
 
         # 5. Executar cada step
         for step_name in ordered_steps:
+            # 🆕 v4.8.0: Parar entre steps se o job foi cancelado
+            if cancel_token.is_cancelled():
+                self._cancel_pipeline(job_id, step_name, async_futures)
+
             step_def = self.registry.get(step_name)
             if step_def is None:
                 logger.warning(f"⚠️ [ENGINE] Step '{step_name}' não registrado, pulando")
@@ -131,8 +153,11 @@ class PipelineEngine:
                 continue  # NÃO bloqueia, vai para o próximo step
 
             # Executar step normalmente (sequencial)
+            _renew_job_lease(job_id, step_name)
             try:
                 state = self._execute_step(job_id, step_def, state)
+            except JobCancelledError:
+                self._cancel_pipeline(job_id, step_name, async_futures)
             except Exception as e:
                 # Step não-opcional falhou definitivamente
                 logger.error(f"❌ [ENGINE] Pipeline falhou no step '{step_name}': {e}")
@@ -203,35 +228,84 @@ class PipelineEngine:
                 error=f"Job {job_id} não encontrado",
             )
 
+        result, _ = self.run_step_on_state(job_id, step_name, state, params)
+        return result
+
+    def run_step_on_state(self, job_id: str, step_name: str, state: PipelineState,
+                          params: Dict = None,
+                          persist: bool = True) -> Tuple[StepResult, PipelineState]:
+        """
+        🆕 v4.8.0: Executa um step sobre um state já em memória.
+
+        O LLM Director mantém o state entre tool calls (sem recarregar do
+        banco a cada step) e, com persist=False, salva uma vez por turno.
+
+        Returns:
+            (StepResult, novo state — o mesmo state se o step falhou)
+        """
         step_def = self.registry.get(step_name)
         if step_def is None:
             return StepResult(
                 step_name=step_name,
                 success=False,
                 error=f"Step '{step_name}' não registrado",
-            )
+            ), state
 
         try:
             started = time.time()
-            state = self._execute_step(job_id, step_def, state, params)
+            new_state = self._execute_step(job_id, step_def, state, params, persist=persist)
             duration_ms = int((time.time() - started) * 1000)
 
             return StepResult(
                 step_name=step_name,
                 success=True,
                 duration_ms=duration_ms,
-                state_summary=state.summary(),
-            )
+                state_summary=new_state.summary(),
+            ), new_state
+        except JobCancelledError:
+            raise  # Não é um erro do step: o Director deve parar
         except Exception as e:
             return StepResult(
                 step_name=step_name,
                 success=False,
                 error=str(e),
                 state_summary=state.summary(),
-            )
+            ), state
+
+    def merge_step_states(self, base_state: PipelineState,
+                          step_states: List[PipelineState]) -> PipelineState:
+        """
+        🆕 v4.8.0: Junta os states de steps executados em paralelo a partir do mesmo base.
+
+        Cada step contribui com os campos que alterou em relação ao base
+        (steps independentes escrevem campos diferentes). completed_steps,
+        skipped_steps e step_timings são unidos.
+        """
+        base_dict = base_state.to_dict()
+        updates: Dict[str, Any] = {}
+        completed = list(base_state.completed_steps or [])
+        skipped = list(base_state.skipped_steps or [])
+        timings = dict(base_state.step_timings or {})
+        merge_keys = ('completed_steps', 'skipped_steps', 'step_timings')
+
+        for step_state in step_states:
+            step_dict = step_state.to_dict()
+            for field_name, value in step_dict.items():
+                if field_name not in merge_keys and value != base_dict.get(field_name):
+                    updates[field_name] = value
+            completed += [s for s in step_state.completed_steps or [] if s not in completed]
+            skipped += [s for s in step_state.skipped_steps or [] if s not in skipped]
+            timings.update(step_state.step_timings or {})
+
+        return base_state.with_updates(
+            completed_steps=completed,
+            skipped_steps=skipped,
+            step_timings=timings,
+            **updates,
+        )
 
     def _execute_step(self, job_id: str, step_def, state: PipelineState,
-                      params: dict = None) -> PipelineState:
+                      params: dict = None, persist: bool = True) -> PipelineState:
         """
         Executa um step com retry, timeout, logging e persistência.
         
@@ -240,6 +314,7 @@ class PipelineEngine:
             step_def: StepDefinition com metadata
             state: Estado atual
             params: Parâmetros extras (opcional)
+            persist: Se False, não salva o state no banco (o chamador salva)
             
         Returns:
             Novo PipelineState após execução
@@ -256,7 +331,10 @@ class PipelineEngine:
         logger.info(f"▶️ [{step_name}] Iniciando... "
                      f"(category={step_def.category}, retries={step_def.max_retries})")
 
+        cancel_token = get_cancellation_token(job_id)
+
         for attempt in range(step_def.max_retries + 1):
+            cancel_token.raise_if_cancelled()
             try:
                 # Executar a função do step
                 new_state = step_def.fn(state, params or {})
@@ -282,7 +360,8 @@ class PipelineEngine:
                 )
 
                 # Persistir estado (APÓS CADA STEP - crash recovery)
-                self.state_manager.save(job_id, new_state, step_name)
+                if persist:
+                    self.state_manager.save(job_id, new_state, step_name)
 
                 # 🆕 v3.10.0: Salvar checkpoint para Pipeline Replay
                 if _checkpoint_logger:
@@ -305,13 +384,17 @@ class PipelineEngine:
 
                 return new_state
 
+            except JobCancelledError:
+                raise  # Sem retry nem skip de step opcional
             except Exception as e:
                 last_error = e
                 if attempt < step_def.max_retries and step_def.retryable:
-                    wait = 2 ** attempt  # 1s, 2s, 4s
+                    backoff = 2 ** attempt  # 1s, 2s, 4s
                     logger.warning(f"⚠️ [{step_name}] Tentativa {attempt + 1} falhou: {e}. "
-                                   f"Retry em {wait}s...")
-                    time.sleep(wait)
+                                   f"Retry em {backoff}s...")
+                    # 🆕 v4.8.0: Backoff interrompível pelo cancelamento
+                    if cancel_token.wait(backoff):
+                        raise JobCancelledError(job_id)
                     continue
 
                 # Falha definitiva
@@ -388,16 +471,27 @@ class PipelineEngine:
         """
         future = async_futures.pop(async_name)
         step_def = self.registry.get(async_name)
+        timeout_s = step_def.timeout_s if step_def else 600
 
         if future.done():
             logger.info(f"✅ [AWAIT] '{async_name}' já terminou — coletando resultado")
         else:
-            timeout_s = step_def.timeout_s if step_def else 600
             logger.info(f"⏳ [AWAIT] Esperando '{async_name}' terminar "
                          f"(timeout={timeout_s}s)...")
 
+        # 🆕 v4.8.0: Espera em fatias para notar o cancelamento do job
+        cancel_token = get_cancellation_token(job_id)
+        deadline = time.time() + timeout_s
+        while not future.done() and time.time() < deadline:
+            if cancel_token.is_cancelled():
+                future.cancel()
+                self._cancel_pipeline(job_id, async_name, async_futures)
+            wait([future], timeout=min(JOB_CANCEL_CHECK_SECONDS, max(0, deadline - time.time())))
+
         try:
-            async_state = future.result(timeout=step_def.timeout_s if step_def else 600)
+            async_state = future.result(timeout=0)
+        except JobCancelledError:
+            self._cancel_pipeline(job_id, async_name, async_futures)
         except Exception as e:
             # Step async falhou
             if step_def and step_def.optional:
@@ -462,6 +556,27 @@ class PipelineEngine:
 
         return merged_state
 
+    def _cancel_pipeline(self, job_id: str, step_name: str,
+                         async_futures: Dict[str, Future]) -> None:
+        """
+        🆕 v4.8.0: Encerra o pipeline de um job cancelado.
+
+        Steps async ainda não iniciados são descartados; os que estão
+        rodando param no próximo ponto de verificação do token. O status
+        volta a 'cancelled' (o início do run() marca 'processing').
+
+        Raises:
+            JobCancelledError: sempre
+        """
+        for future in async_futures.values():
+            future.cancel()
+        async_futures.clear()
+
+        logger.warning(f"🛑 [ENGINE] Pipeline de {job_id[:8]}... cancelado em '{step_name}'")
+        self.state_manager.update_job_status(job_id, 'cancelled')
+        self.events.job_error(job_id, 'Job cancelado', step=step_name)
+        raise JobCancelledError(job_id, f"cancelado em '{step_name}'")
+
     def get_state(self, job_id: str) -> Optional[PipelineState]:
         """Carrega estado atual de um job."""
         return self.state_manager.load(job_id)
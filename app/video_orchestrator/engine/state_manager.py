@@ -150,6 +150,7 @@ class StateManager:
 
             logger.info(f"💾 [STATE] Salvo: {job_id[:8]}... "
                         f"(step={step_name}, completed={len(state.completed_steps)})")
+            self._patch_status_projection(job_id, state, steps_json)
             return True
 
         except Exception as e:
@@ -185,6 +186,12 @@ class StateManager:
                         (status, job_id)
                     )
             conn.commit()
+            # 🆕 v4.8.0: Projeção de status para o polling
+            from ..job_status_projection import get_job_status_projection
+            if error_message:
+                get_job_status_projection().patch(job_id, status=status, error_message=error_message)
+            else:
+                get_job_status_projection().patch(job_id, status=status)
             return True
         except Exception as e:
             logger.error(f"❌ [STATE] Erro ao atualizar status: {e}")
@@ -201,6 +208,32 @@ class StateManager:
                 except Exception:
                     pass
 
+    def _patch_status_projection(self, job_id: str, state: PipelineState, steps_json: list):
+        """🆕 v4.8.0: Replica no Redis os campos de status gravados por save()."""
+        from ..job_status_projection import (
+            TRANSCRIPTION_PREVIEW_CHARS, get_job_status_projection,
+        )
+        fields = {
+            'steps': steps_json,
+            'output_video_url': state.output_video_url,
+            'phase1_video_url': state.phase1_video_url,
+            'phase2_video_url': state.phase2_video_url,
+            'total_duration_ms': state.total_duration_ms,
+            'error_message': state.error_message,
+            'phase1_source': state.phase1_source,
+            'phase1_metadata': state.phase1_metadata,
+        }
+        if state.transcription_text:
+            fields['transcription_text'] = state.transcription_text[:TRANSCRIPTION_PREVIEW_CHARS]
+        if state.transcription_words:
+            fields['transcription_words_count'] = len(state.transcription_words)
+        if state.phrase_groups:
+            fields['phrase_groups_count'] = len(state.phrase_groups)
+        # Mesmo COALESCE do UPDATE: None não sobrescreve
+        get_job_status_projection().patch(
+            job_id, **{name: value for name, value in fields.items() if value is not None}
+        )
+
     def _reconstruct_from_legacy(self, row: Dict) -> PipelineState:
         """Reconstroi PipelineState a partir das colunas legacy do banco."""
         # Desserializar campos JSONB
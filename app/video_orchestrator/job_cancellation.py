@@ -0,0 +1,208 @@
+"""
+🆕 v4.8.0: Job Cancellation - Cancelamento cooperativo de jobs em execução
+
+POST /video/job/{id}/cancel só mudava o status no banco: o PipelineEngine
+seguia executando os steps (e sobrescrevia o status), retries dormiam o
+backoff inteiro, steps async, segmentos do Modal e chunks de render
+distribuído continuavam consumindo GPU/CPU até o fim.
+
+O endpoint grava uma flag no Redis (job:cancel:{job_id}); quem executa o
+job consulta um CancellationToken nos pontos seguros:
+- PipelineEngine: antes de cada step, nas tentativas e no backoff de retry,
+  na espera de steps async
+- ModalMattingService: antes de cada chamada ao Modal, no backoff, e na
+  coleta dos segmentos (segmentos pendentes são descartados)
+- WorkerPoolService / RenderCoordinator: no polling dos chunks (o cancel é
+  repassado ao v-editor) e na distribuição de chunks
+
+Trabalho cancelado levanta JobCancelledError; o job termina como
+`cancelled` e o worker libera a vaga em poucos segundos (as esperas
+acordam a cada JOB_CANCEL_CHECK_SECONDS).
+
+Uso:
+    request_job_cancellation(job_id)           # endpoint
+    token = get_cancellation_token(job_id)     # quem executa
+    token.raise_if_cancelled()
+    if token.wait(backoff): ...                # sleep interrompível
+    for future in as_completed_or_cancelled(futures, token): ...
+"""
+
+import os
+import time
+import logging
+import threading
+import weakref
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' volta ao cancelamento só de status)
+JOB_CANCELLATION_ENABLED = os.environ.get('JOB_CANCELLATION', 'true').lower() == 'true'
+# Intervalo máximo entre consultas ao Redis por token (latência do cancelamento)
+JOB_CANCEL_CHECK_SECONDS = float(os.environ.get('JOB_CANCEL_CHECK_SECONDS', 1.0))
+JOB_CANCEL_TTL_SECONDS = 24 * 3600
+
+JOB_CANCEL_PREFIX = 'job:cancel'
+
+
+class JobCancelledError(Exception):
+    """O job foi cancelado pelo usuário (não é falha: não há retry nem skip)."""
+
+    def __init__(self, job_id: str, reason: str = None):
+        self.job_id = job_id
+        self.reason = reason
+        super().__init__(f"Job {job_id} cancelado" + (f": {reason}" if reason else ""))
+
+
+def _client():
+    from .queue import get_redis_client
+    return get_redis_client()
+
+
+def _key(job_id: str) -> str:
+    return f"{JOB_CANCEL_PREFIX}:{job_id}"
+
+
+class CancellationToken:
+    """
+    Estado de cancelamento de um job neste processo.
+
+    A consulta ao Redis é limitada a uma a cada JOB_CANCEL_CHECK_SECONDS,
+    então is_cancelled() pode ser chamado em loops apertados.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._event = threading.Event()
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if not JOB_CANCELLATION_ENABLED:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < JOB_CANCEL_CHECK_SECONDS:
+                return False
+            self._checked_at = now
+
+        client = _client()
+        if not client:
+            return False
+        try:
+            if client.exists(_key(self.job_id)):
+                logger.warning(f"🛑 [CANCEL] Cancelamento detectado para {self.job_id[:8]}...")
+                self._event.set()
+        except Exception as e:
+            logger.debug(f"⚠️ [CANCEL] Falha ao consultar cancelamento: {e}")
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.is_cancelled():
+            raise JobCancelledError(self.job_id)
+
+    def wait(self, seconds: float) -> bool:
+        """
+        Sleep interrompível pelo cancelamento.
+
+        Returns:
+            True se o job foi cancelado durante a espera
+        """
+        deadline = time.monotonic() + max(0.0, seconds)
+        while True:
+            if self.is_cancelled():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._event.wait(min(remaining, JOB_CANCEL_CHECK_SECONDS)):
+                return True
+
+
+# Tokens vivos do processo (some quando ninguém mais referencia o job)
+_tokens: "weakref.WeakValueDictionary[str, CancellationToken]" = weakref.WeakValueDictionary()
+_tokens_lock = threading.Lock()
+
+
+def get_cancellation_token(job_id: str) -> CancellationToken:
+    """Token compartilhado pelas threads que executam o job neste processo."""
+    with _tokens_lock:
+        token = _tokens.get(job_id)
+        if token is None:
+            token = CancellationToken(job_id)
+            _tokens[job_id] = token
+        return token
+
+
+def request_job_cancellation(job_id: str) -> bool:
+    """
+    Pede o cancelamento de um job (em qualquer worker).
+
+    Returns:
+        True se o pedido foi propagado via Redis
+    """
+    with _tokens_lock:
+        token = _tokens.get(job_id)
+    if token is not None:
+        token.cancel()
+
+    if not JOB_CANCELLATION_ENABLED:
+        return False
+    client = _client()
+    if not client:
+        logger.warning(f"⚠️ [CANCEL] Redis indisponível, cancelamento de {job_id[:8]}... só local")
+        return False
+    try:
+        client.set(_key(job_id), time.time(), ex=JOB_CANCEL_TTL_SECONDS)
+        logger.info(f"🛑 [CANCEL] Cancelamento de {job_id[:8]}... solicitado")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ [CANCEL] Falha ao solicitar cancelamento de {job_id[:8]}...: {e}")
+        return False
+
+
+def is_job_cancelled(job_id: str) -> bool:
+    """Consulta direta (sem token), ex: antes de marcar um job como failed."""
+    with _tokens_lock:
+        token = _tokens.get(job_id)
+    if token is not None and token._event.is_set():
+        return True
+    if not JOB_CANCELLATION_ENABLED:
+        return False
+    client = _client()
+    if not client:
+        return False
+    try:
+        return bool(client.exists(_key(job_id)))
+    except Exception:
+        return False
+
+
+def is_cancellation(error: Optional[BaseException]) -> bool:
+    return isinstance(error, JobCancelledError)
+
+
+def as_completed_or_cancelled(futures: Iterable, token: CancellationToken) -> Iterator:
+    """
+    as_completed que para quando o job é cancelado.
+
+    Futures ainda não iniciados são cancelados e JobCancelledError é
+    levantado; o chamador deve fazer shutdown(wait=False) do executor
+    para não esperar as chamadas já em andamento.
+    """
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=JOB_CANCEL_CHECK_SECONDS, return_when=FIRST_COMPLETED)
+        yield from done
+        if pending and token.is_cancelled():
+            for future in pending:
+                future.cancel()
+            logger.warning(f"🛑 [CANCEL] {len(pending)} tarefa(s) de {token.job_id[:8]}... descartada(s)")
+            raise JobCancelledError(token.job_id)
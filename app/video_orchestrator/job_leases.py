@@ -0,0 +1,287 @@
+"""
+🆕 v4.8.0: Job Leases - Detecção de jobs órfãos e retomada automática
+
+Se o worker morre no meio de um job (preempção da Spot, OOM, deploy), o
+job ficava em `processing` para sempre e precisava de retry manual — mesmo
+com o engine sabendo retomar do último step (completed_steps no
+pipeline_state, PipelineEngine.run pula o que já foi feito).
+
+Cada job em execução tem um lease no Redis:
+- job:lease:{job_id}  → hash {worker_id, action, step, resume_count, ...}
+- job:leases          → sorted set job_id → expiração (epoch)
+
+O lease é renovado pela thread do processo que o segura (a cada
+JOB_LEASE_RENEW_SECONDS) e pelo engine a cada step. Processo morto →
+lease expira em JOB_LEASE_TTL_SECONDS.
+
+O reaper (thread em cada worker) pega leases vencidos, confirma que o job
+ainda não terminou (pending/queued/processing) e re-enfileira
+{"action": "resume_pipeline", "job_id", "resume_action"}. O worker roda a
+action original, que carrega o pipeline_state e continua dos steps
+pendentes. Após JOB_MAX_RESUMES retomadas o job é marcado como failed.
+
+Uso:
+    acquire_job_lease(job_id, 'execute_pipeline', worker_id)
+    renew_job_lease(job_id, step='transcribe')   # engine, a cada step
+    release_job_lease(job_id)                    # job terminou (ok ou falha)
+    reap_stale_jobs()                            # reaper
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' não cria leases nem retoma jobs)
+JOB_LEASES_ENABLED = os.environ.get('JOB_LEASES', 'true').lower() == 'true'
+JOB_LEASE_TTL_SECONDS = int(os.environ.get('JOB_LEASE_TTL_SECONDS', 120))
+JOB_LEASE_RENEW_SECONDS = int(os.environ.get('JOB_LEASE_RENEW_SECONDS', 30))
+JOB_MAX_RESUMES = int(os.environ.get('JOB_MAX_RESUMES', 3))
+JOB_REAPER_INTERVAL_SECONDS = int(os.environ.get('JOB_REAPER_INTERVAL_SECONDS', 60))
+
+JOB_LEASE_PREFIX = 'job:lease'
+JOB_LEASES_INDEX = 'job:leases'
+# Hash do lease sobrevive ao vencimento (o reaper precisa de action/resume_count)
+JOB_LEASE_META_TTL_SECONDS = 7 * 24 * 3600
+
+RESUME_ACTION = 'resume_pipeline'
+# Status em que o job ainda não terminou (o worker pode ter morrido antes do 'processing')
+RESUMABLE_STATUSES = ('pending', 'queued', 'processing')
+
+_held: Set[str] = set()
+_held_lock = threading.Lock()
+_renewer_started = False
+
+
+def _client():
+    if not JOB_LEASES_ENABLED:
+        return None
+    from .queue import get_redis_client
+    return get_redis_client()
+
+
+def _key(job_id: str) -> str:
+    return f"{JOB_LEASE_PREFIX}:{job_id}"
+
+
+# ═══════════════════════════════════════════════════════════════
+# LEASE
+# ═══════════════════════════════════════════════════════════════
+
+def acquire_job_lease(job_id: str, action: str, worker_id: str) -> bool:
+    """
+    Registra que este processo está rodando o job.
+
+    resume_count é preservado (o job pode estar sendo retomado).
+    """
+    client = _client()
+    if not client or not job_id:
+        return False
+    now = time.time()
+    try:
+        pipe = client.pipeline(transaction=True)
+        pipe.hset(_key(job_id), mapping={
+            'job_id': job_id,
+            'worker_id': worker_id,
+            'action': action,
+            'acquired_at': now,
+            'renewed_at': now,
+        })
+        pipe.hsetnx(_key(job_id), 'resume_count', 0)
+        pipe.expire(_key(job_id), JOB_LEASE_META_TTL_SECONDS)
+        pipe.zadd(JOB_LEASES_INDEX, {job_id: now + JOB_LEASE_TTL_SECONDS})
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️ [LEASE] Falha ao adquirir lease de {job_id[:8]}...: {e}")
+        return False
+
+    with _held_lock:
+        _held.add(job_id)
+    _ensure_renewer()
+    logger.info(f"🔐 [LEASE] {job_id[:8]}... ({action}) adquirido por {worker_id}")
+    return True
+
+
+def renew_job_lease(job_id: str, step: Optional[str] = None) -> None:
+    """Estende o lease (no-op se o job não tem lease, ex: execução local sem worker)."""
+    client = _client()
+    if not client or not job_id:
+        return
+    now = time.time()
+    try:
+        pipe = client.pipeline(transaction=False)
+        # XX: só atualiza leases existentes (não ressuscita lease liberado)
+        pipe.zadd(JOB_LEASES_INDEX, {job_id: now + JOB_LEASE_TTL_SECONDS}, xx=True)
+        pipe.execute()
+        mapping: Dict[str, Any] = {'renewed_at': now}
+        if step:
+            mapping['step'] = step
+        if client.exists(_key(job_id)):
+            client.hset(_key(job_id), mapping=mapping)
+    except Exception as e:
+        logger.warning(f"⚠️ [LEASE] Falha ao renovar lease de {job_id[:8]}...: {e}")
+
+
+def release_job_lease(job_id: str) -> None:
+    """Job terminou neste processo (sucesso ou falha tratada): remove o lease."""
+    with _held_lock:
+        _held.discard(job_id)
+    client = _client()
+    if not client or not job_id:
+        return
+    try:
+        pipe = client.pipeline(transaction=True)
+        pipe.zrem(JOB_LEASES_INDEX, job_id)
+        pipe.delete(_key(job_id))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️ [LEASE] Falha ao liberar lease de {job_id[:8]}...: {e}")
+
+
+def get_job_lease(job_id: str) -> Optional[Dict[str, Any]]:
+    """Lease atual do job (com expires_at), ou None."""
+    client = _client()
+    if not client:
+        return None
+    try:
+        lease = client.hgetall(_key(job_id))
+        expires_at = client.zscore(JOB_LEASES_INDEX, job_id)
+    except Exception as e:
+        logger.warning(f"⚠️ [LEASE] Falha ao ler lease de {job_id[:8]}...: {e}")
+        return None
+    if not lease:
+        return None
+    lease['expires_at'] = expires_at
+    return lease
+
+
+def _ensure_renewer() -> None:
+    """Inicia (uma vez por processo) a thread que renova os leases deste processo."""
+    global _renewer_started
+    with _held_lock:
+        if _renewer_started:
+            return
+        _renewer_started = True
+    threading.Thread(target=_renew_loop, name="job-lease-renewer", daemon=True).start()
+
+
+def _renew_loop() -> None:
+    while True:
+        time.sleep(JOB_LEASE_RENEW_SECONDS)
+        with _held_lock:
+            job_ids = list(_held)
+        for job_id in job_ids:
+            renew_job_lease(job_id)
+
+
+# ═══════════════════════════════════════════════════════════════
+# REAPER
+# ═══════════════════════════════════════════════════════════════
+
+def _job_status(job_id: str) -> Optional[str]:
+    from app.db import get_db_connection
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT status FROM video_processing_jobs WHERE job_id = %s", (job_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    return row['status'] if isinstance(row, dict) else row[0]
+
+
+def _fail_job(job_id: str, error_message: str) -> None:
+    from app.db import get_db_connection
+    from .engine.state_manager import StateManager
+    StateManager(get_db_connection).update_job_status(job_id, 'failed', error_message=error_message)
+
+
+def reap_stale_jobs(now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Retoma (ou falha) jobs cujo lease venceu.
+
+    ZREM é o "claim": se vários reapers veem o mesmo lease vencido,
+    só um o processa.
+
+    Returns:
+        [{job_id, outcome: resumed|failed|skipped, ...}, ...]
+    """
+    client = _client()
+    if not client:
+        return []
+    now = now or time.time()
+
+    try:
+        expired = client.zrangebyscore(JOB_LEASES_INDEX, '-inf', now)
+    except Exception as e:
+        logger.warning(f"⚠️ [REAPER] Falha ao listar leases: {e}")
+        return []
+
+    outcomes = []
+    for job_id in expired:
+        try:
+            if not client.zrem(JOB_LEASES_INDEX, job_id):
+                continue  # Outro reaper pegou
+            outcomes.append(_reap(client, job_id))
+        except Exception as e:
+            logger.error(f"❌ [REAPER] Erro ao tratar {job_id[:8]}...: {e}")
+    return outcomes
+
+
+def _reap(client, job_id: str) -> Dict[str, Any]:
+    lease = client.hgetall(_key(job_id)) or {}
+    action = lease.get('action') or 'execute_pipeline'
+    resume_count = int(lease.get('resume_count') or 0)
+    worker_id = lease.get('worker_id', '?')
+
+    status = _job_status(job_id)
+    if status not in RESUMABLE_STATUSES:
+        # Job terminou/falhou sem liberar o lease (ou foi removido)
+        client.delete(_key(job_id))
+        logger.info(f"🧹 [REAPER] Lease vencido de {job_id[:8]}... removido (status={status})")
+        return {'job_id': job_id, 'outcome': 'skipped', 'status': status}
+
+    if resume_count >= JOB_MAX_RESUMES:
+        client.delete(_key(job_id))
+        error = (f"Worker perdido durante o processamento ({resume_count} retomadas "
+                 f"automáticas esgotadas, último worker: {worker_id}, step: {lease.get('step', '?')})")
+        _fail_job(job_id, error)
+        logger.error(f"❌ [REAPER] {job_id[:8]}... marcado como failed: {error}")
+        return {'job_id': job_id, 'outcome': 'failed', 'resume_count': resume_count}
+
+    client.hincrby(_key(job_id), 'resume_count', 1)
+    message = json.dumps({
+        'action': RESUME_ACTION,
+        'job_id': job_id,
+        'resume_action': action,
+    })
+    from .queue import QUEUE_NAME
+    client.lpush(QUEUE_NAME, message)  # Frente da fila: o job já estava em andamento
+    logger.warning(f"♻️ [REAPER] {job_id[:8]}... retomado ({action}, tentativa "
+                   f"{resume_count + 1}/{JOB_MAX_RESUMES}; worker {worker_id} perdido "
+                   f"no step {lease.get('step', '?')})")
+    return {'job_id': job_id, 'outcome': 'resumed', 'action': action, 'resume_count': resume_count + 1}
+
+
+def run_reaper_loop(should_run=lambda: True) -> None:
+    """Loop do reaper (thread daemon do worker)."""
+    while should_run():
+        try:
+            reap_stale_jobs()
+        except Exception as e:
+            logger.warning(f"⚠️ [REAPER] Erro no ciclo: {e}")
+        time.sleep(JOB_REAPER_INTERVAL_SECONDS)
+
+
+# Para uso direto como script (uma passada do reaper)
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for outcome in reap_stale_jobs():
+        print(outcome)
@@ -0,0 +1,175 @@
+"""
+🆕 v4.8.0: Job Status Projection - Status do job para polling, servido do Redis
+
+O frontend faz polling em GET /api/video/job/{id} a cada poucos segundos.
+Cada chamada fazia `SELECT *` em video_processing_jobs, trazendo junto
+transcription_words, phrase_groups, png_results e pipeline_state (centenas
+de KB por job) só para ler status e progresso.
+
+Quem escreve no job mantém uma projeção leve no Redis:
+- JobManager._persist_job → snapshot completo (publish)
+- StateManager.save / update_job_status (engine) → campos alterados (patch)
+- Webhook render-complete → URLs finais + status completed (patch)
+
+Cada escrita incrementa `version`, usado como ETag pelo endpoint
+(If-None-Match → 304 sem corpo). Dados pesados (palavras, frases,
+segmentos) ficam só em GET /video/job/{id}/results.
+
+Redis: hash job:status:{job_id}, um campo JSON por atributo.
+
+Uso:
+    projection = get_job_status_projection()
+    projection.publish(job.job_id, job_status_fields(job))
+    projection.patch(job_id, status='failed', error_message='...')
+    snapshot = projection.get(job_id)  # None → fallback no banco
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' volta o polling a ler o job completo do banco)
+JOB_STATUS_PROJECTION_ENABLED = os.environ.get('JOB_STATUS_PROJECTION', 'true').lower() == 'true'
+JOB_STATUS_TTL_SECONDS = int(os.environ.get('JOB_STATUS_TTL_SECONDS', 7 * 24 * 3600))
+JOB_STATUS_PREFIX = 'job:status'
+TRANSCRIPTION_PREVIEW_CHARS = 500
+
+
+def job_status_fields(job) -> Dict[str, Any]:
+    """Campos da projeção a partir de um VideoJob (sem os dados pesados)."""
+    return {
+        'job_id': job.job_id,
+        'status': job.status.value if hasattr(job.status, 'value') else job.status,
+        'conversation_id': job.conversation_id,
+        'project_id': job.project_id,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'completed_at': job.completed_at,
+        'steps': [s.to_dict() for s in job.steps],
+        'current_step': job.current_step,
+        'output_video_url': job.output_video_url,
+        'phase1_video_url': job.phase1_video_url,
+        'phase2_video_url': job.phase2_video_url,
+        'transcription_text': job.transcription_text[:TRANSCRIPTION_PREVIEW_CHARS] if job.transcription_text else None,
+        'transcription_words_count': len(job.transcription_words) if job.transcription_words else 0,
+        'phrase_groups_count': len(job.phrase_groups) if job.phrase_groups else 0,
+        'total_duration_ms': job.total_duration_ms,
+        'error_message': job.error_message,
+        'phase1_source': job.phase1_source,
+        'phase1_metadata': job.phase1_metadata,
+    }
+
+
+def calculate_progress(steps: List[Dict[str, Any]]) -> int:
+    """Percentual de steps concluídos (mesma regra de VideoJob._calculate_progress)."""
+    if not steps:
+        return 0
+    completed = sum(1 for s in steps if s.get('status') in ('completed', 'skipped'))
+    return int((completed / len(steps)) * 100)
+
+
+class JobStatusProjection:
+    """
+    Projeção job_id → status leve (Redis hash).
+
+    Sem Redis (ou com a flag desligada) todas as operações viram no-op
+    e o endpoint lê do banco.
+    """
+
+    def __init__(self, redis_client=None, ttl_seconds: int = JOB_STATUS_TTL_SECONDS):
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    def _client(self):
+        if not JOB_STATUS_PROJECTION_ENABLED:
+            return None
+        if self._redis is None:
+            from .queue import get_redis_client
+            self._redis = get_redis_client()
+        return self._redis
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"{JOB_STATUS_PREFIX}:{job_id}"
+
+    def publish(self, job_id: str, fields: Dict[str, Any]) -> Optional[int]:
+        """Grava o snapshot completo. Retorna a nova versão."""
+        return self._write(job_id, {**fields, 'job_id': job_id})
+
+    def patch(self, job_id: str, **fields) -> Optional[int]:
+        """
+        Atualiza só os campos informados (escritas do engine).
+
+        Se a projeção não existe, o patch cria um hash sem `job_id` que
+        get() trata como ausente — o próximo poll reconstrói do banco.
+        """
+        fields.pop('job_id', None)
+        if not fields:
+            return None
+        return self._write(job_id, fields)
+
+    def _write(self, job_id: str, fields: Dict[str, Any]) -> Optional[int]:
+        client = self._client()
+        if not client or not job_id:
+            return None
+        key = self._key(job_id)
+        try:
+            pipe = client.pipeline(transaction=True)
+            pipe.hset(key, mapping={
+                name: json.dumps(value, ensure_ascii=False, default=str)
+                for name, value in fields.items()
+            })
+            pipe.hincrby(key, 'version', 1)
+            pipe.expire(key, self.ttl_seconds)
+            return int(pipe.execute()[1])
+        except Exception as e:
+            logger.warning(f"⚠️ [JOB STATUS] Falha ao gravar projeção {job_id[:8]}...: {e}")
+            return None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot com `version`, ou None se ausente/incompleto."""
+        client = self._client()
+        if not client:
+            return None
+        try:
+            raw = client.hgetall(self._key(job_id))
+        except Exception as e:
+            logger.warning(f"⚠️ [JOB STATUS] Falha ao ler projeção {job_id[:8]}...: {e}")
+            return None
+        if not raw or 'job_id' not in raw:
+            return None
+
+        snapshot: Dict[str, Any] = {}
+        for name, value in raw.items():
+            if name == 'version':
+                snapshot['version'] = int(value)
+                continue
+            try:
+                snapshot[name] = json.loads(value)
+            except (TypeError, ValueError):
+                snapshot[name] = value
+        return snapshot
+
+    def invalidate(self, job_id: str) -> None:
+        client = self._client()
+        if not client:
+            return
+        try:
+            client.delete(self._key(job_id))
+        except Exception as e:
+            logger.warning(f"⚠️ [JOB STATUS] Falha ao invalidar {job_id[:8]}...: {e}")
+
+
+# Singleton
+_job_status_projection = None
+
+
+def get_job_status_projection() -> JobStatusProjection:
+    """Retorna instância singleton do JobStatusProjection."""
+    global _job_status_projection
+    if _job_status_projection is None:
+        _job_status_projection = JobStatusProjection()
+    return _job_status_projection
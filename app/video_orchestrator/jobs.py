@@ -896,6 +896,137 @@ class JobManager:
             
         except Exception as e:
             logger.error(f"❌ Erro ao persistir job {job.job_id}: {e}")
+            return
+        
+        # 🆕 v4.8.0: Projeção leve no Redis para o polling de status
+        from .job_status_projection import get_job_status_projection, job_status_fields
+        get_job_status_projection().publish(job.job_id, job_status_fields(job))
+    
+    def load_job_status_fields(self, job_id: str) -> Optional[Dict]:
+        """
+        🆕 v4.8.0: Carrega só os campos de status (sem palavras/frases/pipeline_state).
+        
+        Usado pelo polling quando a projeção no Redis não existe.
+        Retorna o mesmo formato de job_status_fields(job), ou None.
+        """
+        if not self.db_connection_func:
+            return None
+        
+        try:
+            from psycopg2.extras import RealDictCursor
+            from .job_status_projection import TRANSCRIPTION_PREVIEW_CHARS
+            
+            conn = self.db_connection_func()
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute("""
+                SELECT job_id, status, conversation_id, project_id,
+                       created_at, started_at, completed_at,
+                       steps, current_step,
+                       output_video_url, phase1_video_url, phase2_video_url,
+                       LEFT(transcription_text, %s) AS transcription_text,
+                       CASE WHEN jsonb_typeof(transcription_words::jsonb) = 'array'
+                            THEN jsonb_array_length(transcription_words::jsonb) ELSE 0 END
+                           AS transcription_words_count,
+                       CASE WHEN jsonb_typeof(phrase_groups::jsonb) = 'array'
+                            THEN jsonb_array_length(phrase_groups::jsonb) ELSE 0 END
+                           AS phrase_groups_count,
+                       total_duration_ms, error_message,
+                       phase1_source, phase1_metadata
+                FROM video_processing_jobs
+                WHERE job_id = %s
+            """, (TRANSCRIPTION_PREVIEW_CHARS, job_id))
+            row = cursor.fetchone()
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Erro ao carregar status do job {job_id}: {e}")
+            return None
+        
+        if not row:
+            return None
+        
+        fields = dict(row)
+        for col in ('created_at', 'started_at', 'completed_at'):
+            if fields.get(col) is not None and hasattr(fields[col], 'isoformat'):
+                fields[col] = fields[col].isoformat()
+        fields['steps'] = fields.get('steps') or []
+        fields['current_step'] = fields.get('current_step') or 0
+        return fields
+    
+    # 🆕 v4.8.0: Colunas JSONB (arrays) que load_job_result_fields pode paginar
+    PAGINATED_RESULT_COLUMNS = ('transcription_words', 'phrase_groups')
+    
+    def load_job_result_fields(
+        self,
+        job_id: str,
+        columns: List[str],
+        slices: Optional[Dict[str, tuple]] = None
+    ) -> Optional[Dict]:
+        """
+        🆕 v4.8.0: Carrega só as colunas pedidas, com fatias dos arrays no SQL.
+        
+        Args:
+            job_id: ID do job
+            columns: Colunas de video_processing_jobs (nomes fixos, não vêm do cliente)
+            slices: {coluna: (offset, limit)} para colunas em PAGINATED_RESULT_COLUMNS;
+                    o Postgres devolve só a fatia
+        
+        O total de cada coluna paginável vem sempre em `{coluna}_total`.
+        
+        Returns:
+            Dict coluna → valor, ou None se o job não existe
+        """
+        if not self.db_connection_func:
+            return None
+        
+        slices = slices or {}
+        select = ['job_id', 'status']
+        params: List[Any] = []
+        for col in columns:
+            if col in select:
+                continue
+            if col in slices and col in self.PAGINATED_RESULT_COLUMNS:
+                offset, limit = slices[col]
+                select.append(f"""
+                    CASE WHEN jsonb_typeof({col}::jsonb) = 'array' THEN (
+                        SELECT COALESCE(jsonb_agg(item ORDER BY idx), '[]'::jsonb)
+                        FROM jsonb_array_elements({col}::jsonb) WITH ORDINALITY AS t(item, idx)
+                        WHERE idx > %s AND idx <= %s
+                    ) END AS {col}""")
+                params.extend([offset, offset + limit])
+            else:
+                select.append(col)
+        # Totais sempre (validação de status usa phrase_groups_total)
+        for col in self.PAGINATED_RESULT_COLUMNS:
+            select.append(f"""
+                CASE WHEN jsonb_typeof({col}::jsonb) = 'array'
+                     THEN jsonb_array_length({col}::jsonb) ELSE 0 END AS {col}_total""")
+        params.append(job_id)
+        
+        try:
+            from psycopg2.extras import RealDictCursor
+            
+            conn = self.db_connection_func()
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor.execute(
+                f"SELECT {', '.join(select)} FROM video_processing_jobs WHERE job_id = %s",
+                params
+            )
+            row = cursor.fetchone()
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            logger.error(f"❌ Erro ao carregar resultados do job {job_id}: {e}")
+            raise
+        
+        if not row:
+            return None
+        
+        fields = dict(row)
+        for col, value in fields.items():
+            if hasattr(value, 'isoformat'):
+                fields[col] = value.isoformat()
+        return fields
     
     def _load_job_from_db(self, job_id: str) -> Optional[VideoJob]:
         """Carrega job do banco de dados"""
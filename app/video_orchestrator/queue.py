@@ -6,37 +6,109 @@ Funções:
 - enqueue_continue_job: enfileira job para continue_pipeline (Fase 2)
 - enqueue_replay_job: enfileira job para replay_pipeline (Pipeline Replay)
 - get_redis_client: obtém conexão Redis
+
+🆕 v4.8.0: Um ConnectionPool thread-safe por processo, compartilhado por
+get_redis_client (API, caches, worker, SSE). Antes cada chamada criava um
+Redis() novo e fazia ping() — 2 round-trips extras por enqueue. Conexões
+ociosas são verificadas pelo health_check_interval do redis-py.
+
+O enqueue é um único pipeline: RPUSH (o retorno já é o tamanho da fila)
++ PUBLISH do evento job_queued no canal SSE do job.
+
+Benchmark de latência do enqueue (antes × depois):
+    python -m app.video_orchestrator.queue --iterations 500
 """
 
 import os
 import json
+import time
 import logging
+import threading
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 QUEUE_NAME = 'video_orchestrator'
 
+# Feature flag (ROLLBACK: 'false' volta a criar um client + ping por chamada)
+REDIS_SHARED_POOL_ENABLED = os.environ.get('REDIS_SHARED_POOL', 'true').lower() == 'true'
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 100))
+REDIS_POOL_TIMEOUT_SECONDS = int(os.environ.get('REDIS_POOL_TIMEOUT_SECONDS', 10))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get('REDIS_HEALTH_CHECK_INTERVAL', 30))
+# Após falha de conexão, não tentar de novo antes disso (evita timeout em toda chamada)
+REDIS_RETRY_AFTER_SECONDS = 5
+
+_client = None
+_client_lock = threading.Lock()
+_unavailable_until = 0.0
+
+
+def _redis_settings() -> dict:
+    return {
+        'host': os.environ.get('REDIS_HOST', 'localhost'),
+        'port': int(os.environ.get('REDIS_PORT', 6379)),
+        'password': os.environ.get('REDIS_PASSWORD', None),
+        'decode_responses': True,
+    }
+
+
+def _create_pooled_client():
+    """Redis client sobre um BlockingConnectionPool (espera conexão livre em vez de falhar)."""
+    from redis import BlockingConnectionPool, Redis
+
+    pool = BlockingConnectionPool(
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT_SECONDS,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        socket_keepalive=True,
+        **_redis_settings(),
+    )
+    client = Redis(connection_pool=pool)
+    client.ping()
+    return client
+
 
 def get_redis_client():
     """
     Obtém conexão Redis.
-    
+
+    🆕 v4.8.0: Client compartilhado do processo (pool thread-safe).
+    O ping é feito só na criação; depois o pool valida conexões ociosas.
+
     Returns:
         Redis client conectado, ou None se indisponível
     """
+    global _client, _unavailable_until
+
+    if not REDIS_SHARED_POOL_ENABLED:
+        return _create_legacy_client()
+
+    if _client is not None:
+        return _client
+    if time.time() < _unavailable_until:
+        return None
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+        try:
+            _client = _create_pooled_client()
+            settings = _redis_settings()
+            logger.info(f"✅ Redis pool criado: {settings['host']}:{settings['port']} "
+                        f"(max_connections={REDIS_MAX_CONNECTIONS})")
+            return _client
+        except Exception as e:
+            _unavailable_until = time.time() + REDIS_RETRY_AFTER_SECONDS
+            logger.warning(f"⚠️ Falha ao conectar ao Redis: {e}")
+            return None
+
+
+def _create_legacy_client():
+    """Client novo + ping por chamada (comportamento anterior, usado no rollback e no benchmark)."""
     try:
         from redis import Redis
 
-        redis_host = os.environ.get('REDIS_HOST', 'localhost')
-        redis_port = int(os.environ.get('REDIS_PORT', 6379))
-        redis_password = os.environ.get('REDIS_PASSWORD', None)
-
-        client = Redis(
-            host=redis_host,
-            port=redis_port,
-            password=redis_password,
-            decode_responses=True
-        )
+        client = Redis(**_redis_settings())
         client.ping()
         return client
 
@@ -45,22 +117,44 @@ def get_redis_client():
         return None
 
 
+def _enqueue(message: str, job_id: str, action: str) -> Optional[int]:
+    """
+    RPUSH + evento SSE job_queued em um único round-trip.
+
+    Returns:
+        Tamanho da fila após o push, ou None se o Redis está indisponível
+    """
+    client = get_redis_client()
+    if not client:
+        return None
+
+    event = json.dumps({
+        'event': 'job_queued',
+        'timestamp': time.time(),
+        'job_id': job_id,
+        'action': action,
+    })
+    pipe = client.pipeline(transaction=False)
+    pipe.rpush(QUEUE_NAME, message)
+    pipe.publish(f"job:{job_id}:events", event)
+    queue_size, _ = pipe.execute()
+    return queue_size
+
+
 def enqueue_job(job_id: str) -> bool:
     """
     Enfileira job para execute_pipeline (Fase 1 ou pipeline completo).
-    
+
     Mensagem: string pura com job_id (retrocompatível com worker).
-    
+
     Returns:
         True se enfileirou com sucesso, False caso contrário
     """
     try:
-        client = get_redis_client()
-        if not client:
+        queue_size = _enqueue(job_id, job_id, 'execute_pipeline')
+        if queue_size is None:
             return False
 
-        client.rpush(QUEUE_NAME, job_id)
-        queue_size = client.llen(QUEUE_NAME)
         logger.info(f"📤 Job {job_id[:8]}... enfileirado no Redis "
                      f"(fila: {queue_size})")
         return True
@@ -73,25 +167,23 @@ def enqueue_job(job_id: str) -> bool:
 def enqueue_continue_job(job_id: str) -> bool:
     """
     Enfileira job para continue_pipeline (Fase 2).
-    
+
     Mensagem: JSON com action e job_id, para que o worker diferencie
     de um job normal (execute_pipeline).
-    
+
     Returns:
         True se enfileirou com sucesso, False caso contrário
     """
     try:
-        client = get_redis_client()
-        if not client:
-            return False
-
         message = json.dumps({
             'action': 'continue_pipeline',
             'job_id': job_id
         })
 
-        client.rpush(QUEUE_NAME, message)
-        queue_size = client.llen(QUEUE_NAME)
+        queue_size = _enqueue(message, job_id, 'continue_pipeline')
+        if queue_size is None:
+            return False
+
         logger.info(f"📤 [CONTINUE] Job {job_id[:8]}... enfileirado no Redis "
                      f"(fila: {queue_size})")
         return True
@@ -104,25 +196,23 @@ def enqueue_continue_job(job_id: str) -> bool:
 def enqueue_replay_job(job_id: str) -> bool:
     """
     🆕 v3.10.0: Enfileira job para replay_pipeline (Pipeline Replay).
-    
+
     O worker reconhece a action 'replay_pipeline' e chama
     bridge.replay_pipeline() com os parâmetros salvos no job.options.
-    
+
     Returns:
         True se enfileirou com sucesso, False caso contrário
     """
     try:
-        client = get_redis_client()
-        if not client:
-            return False
-
         message = json.dumps({
             'action': 'replay_pipeline',
             'job_id': job_id
         })
 
-        client.rpush(QUEUE_NAME, message)
-        queue_size = client.llen(QUEUE_NAME)
+        queue_size = _enqueue(message, job_id, 'replay_pipeline')
+        if queue_size is None:
+            return False
+
         logger.info(f"📤 [REPLAY] Job {job_id[:8]}... enfileirado no Redis "
                      f"(fila: {queue_size})")
         return True
@@ -130,3 +220,65 @@ def enqueue_replay_job(job_id: str) -> bool:
     except Exception as e:
         logger.warning(f"⚠️ Falha ao enfileirar replay job no Redis: {e}")
         return False
+
+
+# ═══════════════════════════════════════════════════════════════
+# BENCHMARK
+# ═══════════════════════════════════════════════════════════════
+
+def benchmark_enqueue(iterations: int = 500) -> dict:
+    """
+    Latência do enqueue (ms) numa fila descartável:
+    - legacy: Redis() + ping + RPUSH + LLEN (antes)
+    - pooled: client do pool + pipeline RPUSH/PUBLISH (agora)
+    """
+    bench_queue = f"{QUEUE_NAME}:bench:{os.getpid()}"
+
+    def legacy_once(i):
+        client = _create_legacy_client()
+        client.rpush(bench_queue, f"bench-{i}")
+        client.llen(bench_queue)
+        client.close()
+
+    def pooled_once(i):
+        pipe = get_redis_client().pipeline(transaction=False)
+        pipe.rpush(bench_queue, f"bench-{i}")
+        pipe.publish(f"job:bench-{i}:events", '{"event": "job_queued"}')
+        pipe.execute()
+
+    def measure(fn):
+        samples = []
+        for i in range(iterations):
+            started = time.perf_counter()
+            fn(i)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        return {
+            'p50_ms': round(samples[len(samples) // 2], 3),
+            'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 3),
+            'mean_ms': round(sum(samples) / len(samples), 3),
+        }
+
+    if get_redis_client() is None:
+        raise RuntimeError("Redis indisponível")
+    try:
+        return {'iterations': iterations, 'legacy': measure(legacy_once), 'pooled': measure(pooled_once)}
+    finally:
+        get_redis_client().delete(bench_queue)
+
+
+# Para uso direto como script (benchmark)
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de latência do enqueue Redis")
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    result = benchmark_enqueue(args.iterations)
+    for mode in ('legacy', 'pooled'):
+        stats = result[mode]
+        print(f"{mode:>7}: p50={stats['p50_ms']}ms  p95={stats['p95_ms']}ms  mean={stats['mean_ms']}ms")
+    speedup = result['legacy']['mean_ms'] / max(result['pooled']['mean_ms'], 1e-6)
+    print(f"speedup: {speedup:.1f}x ({result['iterations']} iterações)")
@@ -0,0 +1,321 @@
+"""
+🆕 v4.8.0: Replay Lineage - Cadeia de replays em colunas indexadas
+
+Replays (Director, reprocessamento de assets) criam um job novo a partir
+de outro. A origem ficava só em options._replay_params.original_job_id
+(e o bridge remove do pipeline_state ao iniciar o replay), então achar o
+job raiz exigia uma conexão + query JSONB por salto da cadeia — e os
+endpoints de checkpoints faziam isso a cada request.
+
+Colunas em video_processing_jobs:
+    parent_job_id → job de onde o replay partiu
+    root_job_id   → job original da cadeia (NULL no próprio job original)
+
+As colunas e o backfill dos jobs antigos (a partir de _replay_params) são
+criados no deploy, fora do caminho das requests:
+    python -m app.video_orchestrator.replay_lineage
+
+Replay sem root_job_id (backfill não rodou ou falhou, record_replay_lineage
+falhou, replay criado por código antigo durante o deploy) cai na busca
+legada por _replay_params, e a raiz encontrada é gravada nas colunas.
+
+Uso:
+    record_replay_lineage(new_job_id, parent_job_id)
+    root = find_root_job_id(job_id)         # 1 query
+    chain = get_replay_lineage(job_id)      # 1 query, todos os jobs da cadeia
+"""
+
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Limite de profundidade do backfill recursivo (proteção contra ciclos)
+LINEAGE_BACKFILL_MAX_DEPTH = 100
+# Limite de saltos da busca legada por _replay_params (fallback por request)
+LINEAGE_LEGACY_MAX_DEPTH = 20
+
+# Origem do replay nos dados legados (options persistido pelo JobManager ou pipeline_state)
+_LEGACY_PARENT_SQL = """
+    COALESCE(
+        options::jsonb->'_replay_params'->>'original_job_id',
+        pipeline_state::jsonb->'options'->'_replay_params'->>'original_job_id'
+    )
+"""
+
+
+def _job_id_type(cursor) -> str:
+    """Tipo SQL de video_processing_jobs.job_id (uuid, text, varchar(n)...)."""
+    cursor.execute("""
+        SELECT format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = 'video_processing_jobs'::regclass AND attname = 'job_id'
+    """)
+    return cursor.fetchone()[0]
+
+
+def ensure_lineage_schema() -> bool:
+    """
+    Cria as colunas/índices de linhagem (idempotente).
+
+    Roda no deploy (__main__), não no primeiro request: o ALTER TABLE pega
+    lock exclusivo em video_processing_jobs.
+
+    Returns:
+        True se as colunas foram criadas agora (backfill necessário)
+    """
+    from app.db import get_db_connection
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = 'video_processing_jobs'
+              AND column_name IN ('root_job_id', 'parent_job_id')
+        """)
+        existing = {row[0] for row in cursor.fetchall()}
+        if len(existing) == 2:
+            cursor.close()
+            return False
+
+        # Mesmo tipo de job_id (UUID ou texto) para comparar sem cast
+        job_id_type = _job_id_type(cursor)
+        cursor.execute(f"""
+            ALTER TABLE video_processing_jobs
+                ADD COLUMN IF NOT EXISTS parent_job_id {job_id_type},
+                ADD COLUMN IF NOT EXISTS root_job_id {job_id_type};
+        """)
+        conn.commit()
+        logger.info(f"🧬 [LINEAGE] Colunas parent_job_id/root_job_id criadas ({job_id_type})")
+    finally:
+        conn.close()
+
+    # Índices sem bloquear escrita (CONCURRENTLY exige autocommit)
+    conn = get_db_connection()
+    try:
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_video_processing_jobs_root_job_id
+                ON video_processing_jobs(root_job_id) WHERE root_job_id IS NOT NULL
+        """)
+        cursor.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_video_processing_jobs_parent_job_id
+                ON video_processing_jobs(parent_job_id) WHERE parent_job_id IS NOT NULL
+        """)
+        cursor.close()
+    finally:
+        conn.close()
+    return True
+
+
+def backfill_replay_lineage() -> int:
+    """
+    Preenche parent_job_id/root_job_id dos replays antigos (uma única query).
+
+    Só atualiza replays cujo pai e raiz existem na tabela (o valor vem do
+    próprio job_id, sem cast de texto que derrubaria a query inteira). Os
+    que ficarem de fora resolvem pela busca legada em find_root_job_id.
+
+    Returns:
+        Número de jobs atualizados
+    """
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            WITH RECURSIVE edges AS (
+                SELECT job_id::text AS job_id, {_LEGACY_PARENT_SQL} AS parent_id
+                FROM video_processing_jobs
+            ),
+            chain AS (
+                SELECT job_id, parent_id, parent_id AS ancestor, 1 AS depth
+                FROM edges
+                WHERE parent_id IS NOT NULL AND parent_id <> job_id
+                UNION ALL
+                SELECT chain.job_id, chain.parent_id, edges.parent_id, chain.depth + 1
+                FROM chain
+                JOIN edges ON edges.job_id = chain.ancestor
+                WHERE edges.parent_id IS NOT NULL
+                  AND edges.parent_id <> edges.job_id
+                  AND chain.depth < %s
+            ),
+            lineage AS (
+                SELECT DISTINCT ON (job_id) job_id, parent_id, ancestor AS root_id
+                FROM chain
+                ORDER BY job_id, depth DESC
+            )
+            UPDATE video_processing_jobs vpj
+            SET parent_job_id = parent.job_id,
+                root_job_id = root.job_id
+            FROM lineage
+            JOIN video_processing_jobs parent ON parent.job_id::text = lineage.parent_id
+            JOIN video_processing_jobs root ON root.job_id::text = lineage.root_id
+            WHERE vpj.job_id::text = lineage.job_id
+              AND vpj.root_job_id IS NULL
+        """, (LINEAGE_BACKFILL_MAX_DEPTH,))
+        updated = cursor.rowcount
+        conn.commit()
+        cursor.close()
+        conn.close()
+        logger.info(f"🧬 [LINEAGE] Backfill: {updated} replay(s) com linhagem preenchida")
+        return updated
+    except Exception as e:
+        logger.error(f"❌ [LINEAGE] Falha no backfill: {e}")
+        raise
+
+
+def record_replay_lineage(job_id: str, parent_job_id: str) -> None:
+    """
+    Registra a origem de um replay recém-criado.
+
+    root_job_id herda a raiz do pai (ou o próprio pai, se ele é o original).
+    Se falhar, find_root_job_id ainda acha a raiz pela busca legada.
+    """
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE video_processing_jobs
+            SET parent_job_id = %s,
+                root_job_id = COALESCE(
+                    (SELECT root_job_id FROM video_processing_jobs WHERE job_id = %s),
+                    %s
+                )
+            WHERE job_id = %s
+        """, (parent_job_id, parent_job_id, parent_job_id, job_id))
+        conn.commit()
+        cursor.close()
+        conn.close()
+    except Exception as e:
+        logger.warning(f"⚠️ [LINEAGE] Falha ao registrar linhagem de {job_id[:8]}...: {e}")
+
+
+def _legacy_root_job_id(cursor, job_id: str) -> str:
+    """
+    Busca legada: segue _replay_params.original_job_id salto a salto.
+
+    Returns:
+        ID do job raiz, ou o próprio job_id se não for um replay
+    """
+    current_id = job_id
+    for _ in range(LINEAGE_LEGACY_MAX_DEPTH):
+        cursor.execute(f"""
+            SELECT {_LEGACY_PARENT_SQL}
+            FROM video_processing_jobs
+            WHERE job_id = %s
+        """, (current_id,))
+        row = cursor.fetchone()
+        if not row or not row[0] or row[0] == current_id:
+            return current_id
+        current_id = row[0]
+    return current_id
+
+
+def find_root_job_id(job_id: str) -> str:
+    """
+    Job raiz da cadeia de replays (o que tem todos os checkpoints).
+
+    Uma query pelo root_job_id indexado; replay ainda sem linhagem nas
+    colunas cai na busca legada e tem a linhagem gravada.
+
+    Returns:
+        ID do job raiz, ou o próprio job_id se não for um replay
+    """
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+    except Exception as e:
+        logger.warning(f"⚠️ [LINEAGE] Erro ao buscar root job para {job_id}: {e}")
+        return job_id
+
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT root_job_id::text, {_LEGACY_PARENT_SQL}
+                FROM video_processing_jobs
+                WHERE job_id = %s
+            """, (job_id,))
+            row = cursor.fetchone()
+        except Exception as e:
+            # Colunas ainda não criadas (migração não rodou): só a busca legada
+            logger.warning(f"⚠️ [LINEAGE] root_job_id indisponível ({e}), usando _replay_params")
+            conn.rollback()
+            return _legacy_root_job_id(cursor, job_id)
+
+        if not row:
+            return job_id
+        root_job_id, legacy_parent = row
+        if root_job_id:
+            return root_job_id
+        if not legacy_parent or legacy_parent == job_id:
+            return job_id
+
+        root_job_id = _legacy_root_job_id(cursor, job_id)
+        try:
+            cursor.execute("""
+                UPDATE video_processing_jobs
+                SET parent_job_id = %s, root_job_id = %s
+                WHERE job_id = %s AND root_job_id IS NULL
+            """, (legacy_parent, root_job_id, job_id))
+            conn.commit()
+            logger.info(f"🧬 [LINEAGE] Linhagem de {job_id[:8]}... gravada pela busca legada")
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"⚠️ [LINEAGE] Falha ao gravar linhagem de {job_id[:8]}...: {e}")
+        return root_job_id
+    except Exception as e:
+        logger.warning(f"⚠️ [LINEAGE] Erro ao buscar root job para {job_id}: {e}")
+        return job_id
+    finally:
+        conn.close()
+
+
+def get_replay_lineage(job_id: str) -> List[Dict]:
+    """
+    Todos os jobs da cadeia de job_id (raiz + replays), do mais antigo ao mais novo.
+
+    Returns:
+        [{job_id, parent_job_id, root_job_id, status, created_at}, ...]
+    """
+    # Resolve (e grava, se preciso) a raiz antes de listar a cadeia
+    root_job_id = find_root_job_id(job_id)
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT job_id::text, parent_job_id::text, root_job_id::text, status, created_at
+            FROM video_processing_jobs
+            WHERE job_id = %s OR root_job_id = %s
+            ORDER BY created_at
+        """, (root_job_id, root_job_id))
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+    except Exception as e:
+        logger.warning(f"⚠️ [LINEAGE] Erro ao buscar linhagem de {job_id}: {e}")
+        return []
+
+    return [
+        {
+            'job_id': row[0],
+            'parent_job_id': row[1],
+            'root_job_id': row[2],
+            'status': row[3],
+            'created_at': row[4].isoformat() if row[4] else None,
+        }
+        for row in rows
+    ]
+
+
+# Migração no deploy: colunas/índices + backfill (idempotente, pode rodar de novo)
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ensure_lineage_schema()
+    print(f"🧬 Replays atualizados: {backfill_replay_lineage()}")
@@ -0,0 +1,162 @@
+"""
+🆕 v4.8.0: Adaptive Concurrency - Limite de chamadas simultâneas que se ajusta sozinho
+
+O matting enviava clips ao Modal com um pool fixo (PIPELINE_MAX_CONCURRENT_MATTING=4):
+baixo demais quando o Modal tem GPUs sobrando, alto demais quando começa
+a responder 429/5xx (cold start, plano Starter).
+
+O limitador segue AIMD (como controle de congestionamento TCP):
+
+- Aumento aditivo: a cada `limit` respostas OK com latência próxima da
+  linha de base, o limite sobe +1 (até max_limit)
+- Redução multiplicativa: 429/5xx/timeout cortam o limite pela metade
+  (no máximo uma vez por cooldown, para uma rajada de erros não zerar tudo)
+- Latência normalizada pelo peso da chamada (ex: segundos de vídeo do
+  clip), então clips longos não parecem "lentidão" do Modal
+
+O limite aprendido fica no processo, por nome (ex: um por endpoint Modal),
+e vale para os próximos jobs.
+
+Uso:
+    limiter = get_adaptive_limiter('modal_matting:modal-t4', initial=4, max_limit=12)
+    with limiter.slot(weight=clip_duration) as slot:
+        response = requests.post(...)
+        slot.status_code = response.status_code
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' mantém o limite fixo em `initial`)
+ADAPTIVE_CONCURRENCY_ENABLED = os.environ.get('ADAPTIVE_CONCURRENCY', 'true').lower() == 'true'
+# Latência até baseline × tolerância conta como "estável" (permite subir o limite)
+ADAPTIVE_LATENCY_TOLERANCE = float(os.environ.get('ADAPTIVE_LATENCY_TOLERANCE', 1.5))
+ADAPTIVE_BACKOFF_COOLDOWN_S = float(os.environ.get('ADAPTIVE_BACKOFF_COOLDOWN_S', 10))
+
+
+def is_overload_status(status_code: Optional[int]) -> bool:
+    """429 e 5xx indicam que o serviço está saturado."""
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+class _Slot:
+    __slots__ = ('status_code', 'overloaded')
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+        self.overloaded = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """Semáforo com limite AIMD guiado por latência e erros de sobrecarga."""
+
+    def __init__(self, name: str, initial: int = 4, min_limit: int = 1,
+                 max_limit: int = 12, latency_tolerance: float = ADAPTIVE_LATENCY_TOLERANCE):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.latency_tolerance = latency_tolerance
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._baseline: Optional[float] = None
+        self._stable_streak = 0
+        self._last_backoff = 0.0
+        self._counters = {'calls': 0, 'overloads': 0, 'increases': 0, 'decreases': 0}
+
+    @contextmanager
+    def slot(self, weight: float = 1.0):
+        """
+        Reserva uma vaga (bloqueia enquanto in_flight >= limit).
+
+        Exceções dentro do bloco contam como sobrecarga (timeout/conexão).
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+        slot = _Slot()
+        t0 = time.time()
+        try:
+            yield slot
+        except Exception:
+            slot.overloaded = True
+            raise
+        finally:
+            elapsed = time.time() - t0
+            with self._cond:
+                self._in_flight -= 1
+                overloaded = slot.overloaded or is_overload_status(slot.status_code)
+                self._observe(elapsed / max(weight, 1.0), overloaded)
+                self._cond.notify_all()
+
+    def _observe(self, normalized_latency: float, overloaded: bool) -> None:
+        """Atualiza o limite (chamado com self._cond adquirido)."""
+        self._counters['calls'] += 1
+        if not ADAPTIVE_CONCURRENCY_ENABLED:
+            return
+
+        now = time.time()
+        if overloaded:
+            self._counters['overloads'] += 1
+            self._stable_streak = 0
+            if now - self._last_backoff >= ADAPTIVE_BACKOFF_COOLDOWN_S and self.limit > self.min_limit:
+                self._last_backoff = now
+                previous = self.limit
+                self.limit = max(self.min_limit, self.limit // 2)
+                self._counters['decreases'] += 1
+                logger.warning(f"📉 [ADAPTIVE {self.name}] Sobrecarga: limite {previous} → {self.limit}")
+            return
+
+        # Linha de base: acompanha quedas na hora, subidas devagar
+        if self._baseline is None or normalized_latency < self._baseline:
+            self._baseline = normalized_latency
+        else:
+            self._baseline = self._baseline * 0.95 + normalized_latency * 0.05
+
+        if normalized_latency <= self._baseline * self.latency_tolerance:
+            self._stable_streak += 1
+            if self._stable_streak >= self.limit and self.limit < self.max_limit:
+                self._stable_streak = 0
+                self.limit += 1
+                self._counters['increases'] += 1
+                logger.info(f"📈 [ADAPTIVE {self.name}] Latência estável: limite → {self.limit}")
+        else:
+            # Latência subindo: o serviço está enfileirando, para de crescer
+            self._stable_streak = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'name': self.name,
+                'enabled': ADAPTIVE_CONCURRENCY_ENABLED,
+                'limit': self.limit,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'in_flight': self._in_flight,
+                'baseline_latency': round(self._baseline, 3) if self._baseline is not None else None,
+                **self._counters,
+            }
+
+
+# Registro por nome (limite aprendido sobrevive entre jobs do processo)
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_adaptive_limiter(name: str, initial: int = 4, min_limit: int = 1,
+                         max_limit: int = 12) -> AdaptiveConcurrencyLimiter:
+    """Retorna o limitador `name`, criando na primeira chamada."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = AdaptiveConcurrencyLimiter(
+                name, initial=initial, min_limit=min_limit, max_limit=max_limit,
+            )
+        return _limiters[name]
@@ -0,0 +1,309 @@
+"""
+🆕 v4.8.0: Chunk Boundary Planner - Cortes de chunk alinhados a cenas
+
+calculate_frame_ranges corta em frames arbitrários: o chunk começa no meio
+de uma animação (warm-up maior no renderer) e o concat em
+v-services /ffmpeg/concat-chunks precisa re-encodar para não gerar glitch.
+
+As placas tectônicas (speech_segments / tracks.video_segments) e os
+intervalos entre frases já são pontos de corte naturais. Este planner
+escolhe, perto de cada alvo de divisão igualitária, o limite natural mais
+próximo:
+
+1. Borda de placa tectônica (prioridade - troca de clip)
+2. Intervalo sem legenda na tela (entre frases)
+3. Sem limite na janela de tolerância → frame sugerido (comportamento antigo)
+
+Todos os limites são em frames, no índice do PRIMEIRO frame do próximo chunk.
+Nenhum chunk fica menor que RENDER_MIN_CHUNK_SECONDS: uma sobra curta no
+final é incorporada ao chunk anterior.
+"""
+
+import os
+import bisect
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tolerância para buscar limite natural (fração do tamanho do chunk)
+BOUNDARY_TOLERANCE_RATIO = float(os.environ.get('RENDER_BOUNDARY_TOLERANCE_RATIO', 0.25))
+# Chunk mínimo (o warm-up do renderer domina chunks de poucos frames).
+# Definido só aqui: RenderCoordinator importa o mesmo valor para o guided slicing
+RENDER_MIN_CHUNK_SECONDS = float(os.environ.get('RENDER_MIN_CHUNK_SECONDS', 4))
+# Tracks consideradas "texto na tela" para achar intervalos entre frases
+PHRASE_TRACKS = ('subtitles', 'highlights', 'word_bgs')
+
+
+def _ms_to_frame(ms: float, fps: int) -> int:
+    return int(round((ms / 1000.0) * fps))
+
+
+def plate_windows_ms(
+    video_segments: List[Dict[str, Any]] = None,
+    speech_segments: List[Dict[str, Any]] = None
+) -> List[Tuple[float, float]]:
+    """
+    Intervalos (start_ms, end_ms) de cada placa na timeline de saída.
+
+    Aceita os formatos já usados no pipeline:
+    - audio_offset + duration (segundos, hybrid cut / tectonic_plates_service)
+    - start_time / end_time (ms, tracks do payload)
+    - apenas duration (acumulada; < 1000 = segundos, igual render_distributed)
+
+    Entradas que não são dict recebem janela None (mantém o índice da placa).
+    """
+    segments = video_segments or speech_segments or []
+    windows = []
+    cursor_ms = 0.0
+
+    for seg in segments:
+        if not isinstance(seg, dict):
+            windows.append(None)
+            continue
+        duration = seg.get('duration') or 0
+        duration_ms = duration * 1000 if duration < 1000 else duration
+
+        if seg.get('audio_offset') is not None:
+            start_ms = float(seg['audio_offset']) * 1000
+            end_ms = start_ms + duration_ms
+        elif seg.get('end_time') is not None:
+            start_ms = float(seg.get('start_time') or 0)
+            end_ms = float(seg['end_time'])
+        else:
+            start_ms = cursor_ms
+            end_ms = cursor_ms + duration_ms
+
+        windows.append((start_ms, end_ms))
+        cursor_ms = end_ms
+
+    return windows
+
+
+def plate_boundaries_ms(
+    video_segments: List[Dict[str, Any]] = None,
+    speech_segments: List[Dict[str, Any]] = None
+) -> List[float]:
+    """
+    Extrai os instantes (ms, timeline de saída) onde uma placa termina e outra começa.
+
+    Formatos aceitos: ver plate_windows_ms.
+    """
+    boundaries = []
+    for window in plate_windows_ms(video_segments, speech_segments):
+        if window is None:
+            continue
+        start_ms, end_ms = window
+        if start_ms > 0:
+            boundaries.append(start_ms)
+        boundaries.append(end_ms)
+
+    return sorted(set(b for b in boundaries if b > 0))
+
+
+def phrase_gap_midpoints_ms(tracks: Dict[str, Any]) -> List[float]:
+    """
+    Retorna o ponto médio de cada intervalo sem texto na tela.
+
+    Une os intervalos [start_time, end_time] das tracks de texto e devolve
+    o meio de cada buraco entre eles (longe de animações de entrada/saída).
+    """
+    intervals = []
+    for track_name in PHRASE_TRACKS:
+        for item in tracks.get(track_name) or []:
+            if not isinstance(item, dict):
+                continue
+            start, end = item.get('start_time'), item.get('end_time')
+            if start is None or end is None or end <= start:
+                continue
+            intervals.append((float(start), float(end)))
+
+    if not intervals:
+        return []
+
+    intervals.sort()
+    midpoints = []
+    current_end = intervals[0][1]
+    for start, end in intervals[1:]:
+        if start > current_end:
+            midpoints.append((current_end + start) / 2)
+        current_end = max(current_end, end)
+    return midpoints
+
+
+class SceneAwareChunkPlanner:
+    """
+    Ajusta limites de chunk para bordas de placas e intervalos entre frases.
+
+    Uso:
+        planner = SceneAwareChunkPlanner.from_payload(payload, fps, speech_segments)
+        ranges = planner.plan_ranges(duration_in_frames, num_workers)
+        end = planner.plan_end(start_frame, suggested_end_frame)  # RenderCoordinator
+        ranges = planner.plan_grid(duration_in_frames, chunk_frames)  # render incremental
+    """
+
+    def __init__(
+        self,
+        plate_frames: List[int],
+        phrase_frames: List[int],
+        tolerance_ratio: float = BOUNDARY_TOLERANCE_RATIO,
+        min_chunk_frames: int = 1
+    ):
+        self.plate_frames = sorted(set(f for f in plate_frames if f > 0))
+        self.phrase_frames = sorted(set(f for f in phrase_frames if f > 0))
+        self.tolerance_ratio = tolerance_ratio
+        self.min_chunk_frames = max(1, min_chunk_frames)
+        self._aligned = set(self.plate_frames) | set(self.phrase_frames)
+
+    @classmethod
+    def from_payload(
+        cls,
+        payload: Dict[str, Any],
+        fps: int,
+        speech_segments: List[Dict[str, Any]] = None,
+        **kwargs
+    ) -> 'SceneAwareChunkPlanner':
+        """Constrói o planner a partir do payload de render (tracks) e das placas."""
+        tracks = payload.get('tracks') or {}
+        kwargs.setdefault('min_chunk_frames', max(1, int(RENDER_MIN_CHUNK_SECONDS * fps)))
+        plates_ms = plate_boundaries_ms(tracks.get('video_segments'), speech_segments)
+        phrases_ms = phrase_gap_midpoints_ms(tracks)
+
+        planner = cls(
+            plate_frames=[_ms_to_frame(ms, fps) for ms in plates_ms],
+            phrase_frames=[_ms_to_frame(ms, fps) for ms in phrases_ms],
+            **kwargs
+        )
+        logger.info(f"🌍 [CHUNK PLANNER] {len(planner.plate_frames)} bordas de placa, "
+                    f"{len(planner.phrase_frames)} intervalos entre frases")
+        return planner
+
+    @property
+    def has_boundaries(self) -> bool:
+        return bool(self.plate_frames or self.phrase_frames)
+
+    def is_aligned(self, boundary_frame: int) -> bool:
+        """True se o corte (primeiro frame do próximo chunk) cai em limite natural."""
+        return boundary_frame in self._aligned
+
+    @staticmethod
+    def _closest(candidates: List[int], target: int, low: int, high: int) -> Optional[int]:
+        """Candidato mais próximo de target dentro de [low, high]."""
+        if low > high:
+            return None
+        i = bisect.bisect_left(candidates, low)
+        best = None
+        while i < len(candidates) and candidates[i] <= high:
+            c = candidates[i]
+            if best is None or abs(c - target) < abs(best - target):
+                best = c
+            i += 1
+        return best
+
+    def snap_boundary(self, start_frame: int, target: int, max_frame: int,
+                      tolerance: int) -> int:
+        """
+        Retorna o limite natural (primeiro frame do próximo chunk) perto de target.
+
+        Garante chunk mínimo em ambos os lados e nunca passa de max_frame.
+        """
+        low = max(start_frame + self.min_chunk_frames, target - tolerance)
+        high = min(max_frame - self.min_chunk_frames + 1, target + tolerance)
+
+        for candidates in (self.plate_frames, self.phrase_frames):
+            snapped = self._closest(candidates, target, low, high)
+            if snapped is not None:
+                return snapped
+        return target
+
+    def _merge_short_tail(self, ranges: List[Dict[str, int]]) -> List[Dict[str, int]]:
+        """Incorpora o último chunk ao anterior se ele ficou menor que min_chunk_frames."""
+        if len(ranges) > 1 and ranges[-1]["frame_count"] < self.min_chunk_frames:
+            tail = ranges.pop()
+            last = ranges[-1]
+            last["end_frame"] = tail["end_frame"]
+            last["frame_count"] = last["end_frame"] - last["start_frame"] + 1
+        return ranges
+
+    def plan_end(self, start_frame: int, suggested_end: int, max_frame: int = None) -> int:
+        """
+        Ajusta o fim de um chunk [start_frame, suggested_end] (hook do RenderCoordinator).
+        """
+        size = suggested_end - start_frame + 1
+        tolerance = max(1, int(size * self.tolerance_ratio))
+        upper = max_frame if max_frame is not None else suggested_end + tolerance
+        boundary = self.snap_boundary(start_frame, suggested_end + 1, upper, tolerance)
+        return boundary - 1
+
+    def plan_ranges(self, duration_in_frames: int, num_chunks: int) -> List[Dict[str, int]]:
+        """
+        Divide [0, duration_in_frames - 1] em num_chunks com cortes alinhados a cenas.
+
+        Mesmo formato de WorkerPoolService.calculate_frame_ranges.
+        """
+        max_frame = duration_in_frames - 1
+        num_chunks = max(1, min(num_chunks, duration_in_frames))
+        ideal = duration_in_frames / num_chunks
+        tolerance = max(1, int(ideal * self.tolerance_ratio))
+
+        ranges = []
+        start = 0
+        aligned_cuts = 0
+        for i in range(num_chunks):
+            if i == num_chunks - 1:
+                end = max_frame
+            else:
+                target = int(round(ideal * (i + 1)))
+                boundary = self.snap_boundary(start, target, max_frame, tolerance)
+                boundary = max(start + 1, min(boundary, max_frame))
+                aligned_cuts += 1 if self.is_aligned(boundary) else 0
+                end = boundary - 1
+            ranges.append({
+                "worker_index": i,
+                "start_frame": start,
+                "end_frame": end,
+                "frame_count": end - start + 1
+            })
+            start = end + 1
+            if start > max_frame:
+                break
+
+        ranges = self._merge_short_tail(ranges)
+        logger.info(f"📐 [CHUNK PLANNER] {len(ranges)} chunks, "
+                    f"{aligned_cuts}/{max(0, len(ranges) - 1)} cortes em limites naturais")
+        return ranges
+
+    def plan_grid(self, duration_in_frames: int, chunk_frames: int) -> List[Dict[str, int]]:
+        """
+        🆕 v4.8.0: Divide em chunks de tamanho fixo, com alvos em múltiplos de chunk_frames.
+
+        Usado pelo render incremental: os alvos não dependem do número de
+        workers nem da duração total, então editar um trecho (ou mudar o
+        final do vídeo) mantém os mesmos cortes - e o mesmo hash - nos demais
+        chunks. Cada corte ainda é ajustado para o limite natural mais próximo.
+
+        Mesmo formato de WorkerPoolService.calculate_frame_ranges.
+        """
+        max_frame = duration_in_frames - 1
+        chunk_frames = max(1, chunk_frames)
+        tolerance = max(1, int(chunk_frames * self.tolerance_ratio))
+
+        ranges = []
+        start = 0
+        while start <= max_frame:
+            target = (len(ranges) + 1) * chunk_frames
+            # Sobra menor que meio chunk → incorpora no último
+            if target > max_frame - chunk_frames // 2:
+                end = max_frame
+            else:
+                boundary = self.snap_boundary(start, target, max_frame, tolerance)
+                end = max(start + 1, min(boundary, max_frame)) - 1
+            ranges.append({
+                "worker_index": len(ranges),
+                "start_frame": start,
+                "end_frame": end,
+                "frame_count": end - start + 1
+            })
+            start = end + 1
+
+        return self._merge_short_tail(ranges)
@@ -14,15 +14,24 @@ Modos Suportados:
 - TECTONIC: Usar placas do silence_cut (speech_segments disponíveis)
 - VIRTUAL: Criar placas virtuais agrupando frases (sem speech_segments)
 - HYBRID: Processar múltiplos clips separadamente
+
+🆕 v4.8.0: Cache de segmentos (MattingSegmentCache) — trechos do vídeo fonte
+já processados com a mesma configuração não voltam ao Modal; em acertos
+parciais só os intervalos que faltam são cortados/enviados.
 """
 
 import os
 import logging
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+from app.video_orchestrator.job_cancellation import JobCancelledError, as_completed_or_cancelled, get_cancellation_token
 
 logger = logging.getLogger(__name__)
 
+# ROLLBACK: MATTING_SEGMENT_CACHE=false envia todos os clips ao Modal em todo run
+MATTING_SEGMENT_CACHE_ENABLED = os.environ.get('MATTING_SEGMENT_CACHE', 'true').lower() == 'true'
+
 
 class MattingOrchestratorService:
     """
@@ -184,7 +193,8 @@ class MattingOrchestratorService:
                     job_id=job_id,
                     job=job,
                     matting_segments=matting_segments,
-                    template_config=template_config
+                    template_config=template_config,
+                    original_video_url=original_video_url
                 )
             else:
                 # Modo VIRTUAL ou LEGACY: Processar com vídeo único
@@ -203,9 +213,12 @@ class MattingOrchestratorService:
                 'status': result.get('status', 'success'),
                 'time': elapsed,
                 'mode': matting_mode,
-                'clips_processed': result.get('clips_processed', 0)
+                'clips_processed': result.get('clips_processed', 0),
+                'clips_from_cache': result.get('clips_from_cache', 0)
             }
         
+        except JobCancelledError:
+            raise  # 🆕 v4.8.0: Cancelamento não é erro de matting
         except Exception as e:
             logger.error(f"❌ [MATTING ORCHESTRATOR] Erro: {e}")
             import traceback
@@ -301,7 +314,8 @@ class MattingOrchestratorService:
         job_id: str,
         job,
         matting_segments: list,
-        template_config: dict
+        template_config: dict,
+        original_video_url: str = None
     ) -> dict:
         """
         Executa matting em modo HYBRID (placas tectônicas).
@@ -314,6 +328,7 @@ class MattingOrchestratorService:
             job: Objeto VideoJob
             matting_segments: Segments com _hybrid_mode=True
             template_config: Configurações do template
+            original_video_url: Vídeo fonte das placas (chave do cache de segmentos)
         
         Returns:
             {
@@ -373,16 +388,79 @@ class MattingOrchestratorService:
             use_alpha_only = editor_worker_id == 'python'
         logger.info(f"   🎭 [OUTPUT_FORMAT] use_alpha_only={use_alpha_only} (env={os.environ.get('MODAL_OUTPUT_FORMAT', 'N/A')})")
         
-        # Queue Router - Roteamento inteligente entre workers Modal
-        from app.video_orchestrator.services.queue_router_service import get_queue_router
+        # 🆕 v4.8.0: Trechos já processados saem do cache; só o resto vai ao Modal
+        cached_foregrounds, clips_to_process = self._split_cached_clips(
+            clips_to_process,
+            source_url=original_video_url,
+            template_configs=template_configs,
+            use_alpha_only=use_alpha_only
+        )
+        
         from app.video_orchestrator.pipeline_events import emit_step_start, emit_step_complete, emit_step_error
         
         total_matting_duration = sum(clip.get('duration', 0) for clip in clips_to_process)
         
         emit_step_start(job_id, 'MATTING', metadata={
-            'segments': len(clips_to_process),
+            'segments': len(clips_to_process) + len(cached_foregrounds),
+            'from_cache': len(cached_foregrounds),
             'total_duration': round(total_matting_duration, 2)
         })
+        
+        result = self._dispatch_missing_clips(
+            clips_to_process=clips_to_process,
+            cached_foregrounds=cached_foregrounds,
+            job_id=job_id,
+            job=job,
+            template_config=template_config,
+            project_path=project_path,
+            template_configs=template_configs,
+            use_alpha_only=use_alpha_only
+        )
+        
+        # Salvar resultados no job
+        if result['foreground_segments']:
+            logger.info(f"✅ [MATTING HYBRID] {len(result['foreground_segments'])} foregrounds gerados!")
+            self.job_manager.set_output(
+                job_id,
+                matted_video_url=None,
+                matting_segments=matting_segments,
+                foreground_segments=result['foreground_segments']
+            )
+            # Emitir evento de sucesso
+            emit_step_complete(job_id, 'MATTING', metadata={'segments': len(result['foreground_segments'])})
+        else:
+            logger.warning("⚠️ [MATTING HYBRID] Nenhum foreground gerado!")
+            emit_step_error(job_id, 'MATTING', 'No foreground segments generated')
+        
+        return {
+            'status': 'success' if result['foreground_segments'] else 'error',
+            'clips_processed': result['clips_processed'],
+            'clips_from_cache': len(cached_foregrounds)
+        }
+    
+    def _dispatch_missing_clips(
+        self,
+        clips_to_process: list,
+        cached_foregrounds: list,
+        job_id: str,
+        job,
+        template_config: dict,
+        project_path: str,
+        template_configs: dict,
+        use_alpha_only: bool
+    ) -> dict:
+        """
+        🆕 v4.8.0: Roteia e processa no Modal só os clips sem cache e junta
+        com os foregrounds do cache (ordenados por segment_index).
+        """
+        if not clips_to_process:
+            logger.info(f"   ♻️ [MATTING CACHE] Todos os {len(cached_foregrounds)} clips vieram do cache, Modal não chamado")
+            return {'foreground_segments': cached_foregrounds, 'clips_processed': len(cached_foregrounds)}
+        
+        # Queue Router - Roteamento inteligente entre workers Modal
+        from app.video_orchestrator.services.queue_router_service import get_queue_router
+        
+        total_matting_duration = sum(clip.get('duration', 0) for clip in clips_to_process)
         num_segments = len(clips_to_process)
         
         queue_router = get_queue_router()
@@ -416,26 +494,85 @@ class MattingOrchestratorService:
             selected_worker=selected_worker
         )
         
-        # Salvar resultados no job
-        if result['foreground_segments']:
-            logger.info(f"✅ [MATTING HYBRID] {len(result['foreground_segments'])} foregrounds gerados!")
-            self.job_manager.set_output(
-                job_id,
-                matted_video_url=None,
-                matting_segments=matting_segments,
-                foreground_segments=result['foreground_segments']
-            )
-            # Emitir evento de sucesso
-            emit_step_complete(job_id, 'MATTING', metadata={'segments': len(result['foreground_segments'])})
-        else:
-            logger.warning("⚠️ [MATTING HYBRID] Nenhum foreground gerado!")
-            emit_step_error(job_id, 'MATTING', 'No foreground segments generated')
-        
+        foreground_segments = cached_foregrounds + result['foreground_segments']
+        foreground_segments.sort(key=lambda s: s.get('segment_index', 0))
         return {
-            'status': 'success' if result['foreground_segments'] else 'error',
-            'clips_processed': result['clips_processed']
+            'foreground_segments': foreground_segments,
+            'clips_processed': result['clips_processed'] + len(cached_foregrounds)
         }
     
+    def _split_cached_clips(
+        self,
+        clips: list,
+        source_url: Optional[str],
+        template_configs: dict,
+        use_alpha_only: bool
+    ) -> Tuple[list, list]:
+        """
+        🆕 v4.8.0: Separa clips já processados (cache) dos que faltam.
+        
+        Cada clip ganha '_position' (id estável do foreground) e
+        '_cache_key' (gravado em _process_via_modal quando o Modal responde).
+        A chave usa o conteúdo do vídeo fonte; clips cuja fonte não tem
+        fingerprint ficam sem '_cache_key' e vão sempre ao Modal.
+        Só luma matte (alpha_only) é cacheado: o PNG sequence do modo
+        legado fica no volume local do worker, não no B2.
+        
+        Returns:
+            (foreground_segments do cache, clips que precisam do Modal)
+        """
+        for position, clip in enumerate(clips):
+            clip['_position'] = position
+        
+        if not MATTING_SEGMENT_CACHE_ENABLED or not use_alpha_only:
+            return [], clips
+        
+        from app.video_orchestrator.services.matting_segment_cache import (
+            get_matting_segment_cache, matting_output_config_hash, matting_segment_key,
+            source_fingerprint,
+        )
+        
+        config_hash = matting_output_config_hash(template_configs, use_alpha_only)
+        fingerprints = {}
+        for clip in clips:
+            url = source_url or clip.get('url')
+            if url not in fingerprints:
+                fingerprints[url] = source_fingerprint(url)
+            if not fingerprints[url]:
+                continue
+            clip['_cache_key'] = matting_segment_key(
+                fingerprints[url],
+                clip.get('original_start', clip.get('start', 0)),
+                clip.get('original_end', clip.get('end', 0)),
+                config_hash
+            )
+        
+        keys = [clip['_cache_key'] for clip in clips if clip.get('_cache_key')]
+        hits = get_matting_segment_cache().get_many(keys)
+        cached_foregrounds = []
+        missing = []
+        for clip in clips:
+            entry = hits.get(clip.get('_cache_key'))
+            if not entry:
+                missing.append(clip)
+                continue
+            start = clip.get('original_start', clip.get('start', 0))
+            end = clip.get('original_end', clip.get('end', 0))
+            cached_clip = {
+                **clip,
+                'original_start': start,
+                'original_end': end,
+                'segment_index': clip.get('segment_index', clip.get('index', clip['_position'])),
+                'duration': clip.get('duration', end - start),
+            }
+            cached_foregrounds.append(
+                self._build_foreground_segment(clip['_position'], cached_clip, entry, use_alpha_only)
+            )
+        
+        logger.info(f"   ♻️ [MATTING CACHE] {len(cached_foregrounds)}/{len(clips)} clips do cache, "
+                    f"{len(missing)} para o Modal")
+        return cached_foregrounds, missing
+    
     def _execute_virtual_or_legacy_matting(
         self,
         job_id: str,
@@ -485,7 +622,6 @@ class MattingOrchestratorService:
             }
         
         logger.info(f"   📹 Vídeo original: {virtual_video_url[:80] if len(virtual_video_url) > 80 else virtual_video_url}...")
-        logger.info(f"   ✂️ Enviando {len(matting_segments)} segmentos para pré-corte no v-services...")
         
         # Preparar segmentos para corte
         segments_to_cut = []
@@ -500,130 +636,122 @@ class MattingOrchestratorService:
                 "_audio_offset": seg.get('_audio_offset', seg.get('start', 0))
             })
         
-        # Chamar v-services para pré-cortar
+        # Preparar configurações do template
+        from app.utils.b2_paths import generate_project_path
+        project_path = None
+        if job.user_id and job.project_id and job.conversation_id:
+            project_path = generate_project_path(
+                user_id=job.user_id,
+                project_id=job.project_id,
+                conversation_id=job.conversation_id
+            )
+        
+        # Extrair configurações do template
+        template_configs = self._extract_template_configs(template_config)
+        
+        logger.info(f"   📐 Template: FPS={template_configs['fps']}, Resolution={template_configs['resolution']}")
+        
+        # 🆕 v3.8.2: Sempre usar alpha_only (luma matte) para v-editor-python
         import os
+        use_alpha_only = os.environ.get('MODAL_OUTPUT_FORMAT', 'alpha_only') == 'alpha_only'
+        if not use_alpha_only:
+            editor_worker_id = job.options.get('editor_worker_id') if job.options else None
+            use_alpha_only = editor_worker_id == 'python'
+        logger.info(f"   🎭 [OUTPUT_FORMAT] use_alpha_only={use_alpha_only}")
+        
+        # 🆕 v4.8.0: Só os intervalos sem cache são cortados e enviados ao Modal
+        cached_foregrounds, segments_to_cut = self._split_cached_clips(
+            segments_to_cut,
+            source_url=virtual_video_url,
+            template_configs=template_configs,
+            use_alpha_only=use_alpha_only
+        )
+        cut_meta_by_index = {
+            seg['index']: (seg['_position'], seg.get('_cache_key'))
+            for seg in segments_to_cut
+        }
+        
+        # Chamar v-services para pré-cortar
         import requests
+        from app.video_orchestrator.pipeline_events import emit_step_start, emit_step_complete, emit_step_error
         v_services_url = os.environ.get('V_SERVICES_URL', 'https://services.vinicius.ai')
         
         try:
-            logger.info(f"   🔗 Chamando {v_services_url}/ffmpeg/cut_segments...")
-            cut_response = requests.post(
-                f"{v_services_url}/ffmpeg/cut_segments",
-                json={
-                    "video_url": virtual_video_url,
-                    "segments": segments_to_cut,
-                    "job_id": job_id,
-                    "output_prefix": "virtual_plate",
-                    "quality": 23,
-                    "preset": "fast"
-                },
-                timeout=300  # 5 minutos
-            )
-            
-            if cut_response.status_code != 200:
-                logger.error(f"   ❌ Erro ao cortar segmentos: HTTP {cut_response.status_code}")
-                logger.error(f"      {cut_response.text[:200]}")
-                return {
-                    'status': 'error',
-                    'error': f'Failed to cut segments: HTTP {cut_response.status_code}',
-                    'clips_processed': 0
-                }
-            
-            cut_result = cut_response.json()
-            pre_cut_segments = cut_result.get('segments', [])
-            
-            if not pre_cut_segments:
-                logger.error(f"   ❌ Nenhum segmento cortado retornado!")
-                return {
-                    'status': 'error',
-                    'error': 'No segments returned from cut service',
-                    'clips_processed': 0
-                }
-            
-            logger.info(f"   ✅ {len(pre_cut_segments)} segmentos pré-cortados!")
-            
-            # Converter para formato de clips_to_process (como no modo tectônico)
             clips_to_process = []
-            for seg in pre_cut_segments:
-                clips_to_process.append({
-                    'url': seg['url'],
-                    'shared_path': seg.get('shared_path'),
-                    'duration': seg.get('actual_duration', seg.get('requested_duration', 0)),
-                    'original_start': seg.get('original_start', seg.get('start', 0)),
-                    'original_end': seg.get('original_end', seg.get('end', 0)),
-                    'segment_index': seg.get('index', 0),
-                    'audio_offset': seg.get('_audio_offset', seg.get('start', 0)),
-                    '_audio_offset': seg.get('_audio_offset', seg.get('start', 0)),
-                    'phrase_indices': seg.get('phrase_indices', [])
-                })
-            
-            logger.info(f"   🎭 Processando {len(clips_to_process)} clips no v-matting...")
-            
-            # Preparar configurações do template
-            from app.utils.b2_paths import generate_project_path
-            project_path = None
-            if job.user_id and job.project_id and job.conversation_id:
-                project_path = generate_project_path(
-                    user_id=job.user_id,
-                    project_id=job.project_id,
-                    conversation_id=job.conversation_id
+            if segments_to_cut:
+                logger.info(f"   ✂️ Enviando {len(segments_to_cut)} segmentos para pré-corte no v-services...")
+                logger.info(f"   🔗 Chamando {v_services_url}/ffmpeg/cut_segments...")
+                cut_response = requests.post(
+                    f"{v_services_url}/ffmpeg/cut_segments",
+                    json={
+                        "video_url": virtual_video_url,
+                        "segments": segments_to_cut,
+                        "job_id": job_id,
+                        "output_prefix": "virtual_plate",
+                        "quality": 23,
+                        "preset": "fast"
+                    },
+                    timeout=300  # 5 minutos
                 )
-            
-            # Extrair configurações do template
-            template_configs = self._extract_template_configs(template_config)
-            
-            logger.info(f"   📐 Template: FPS={template_configs['fps']}, Resolution={template_configs['resolution']}")
-            
-            # 🆕 v3.8.2: Sempre usar alpha_only (luma matte) para v-editor-python
-            import os
-            use_alpha_only = os.environ.get('MODAL_OUTPUT_FORMAT', 'alpha_only') == 'alpha_only'
-            if not use_alpha_only:
-                editor_worker_id = job.options.get('editor_worker_id') if job.options else None
-                use_alpha_only = editor_worker_id == 'python'
-            logger.info(f"   🎭 [OUTPUT_FORMAT] use_alpha_only={use_alpha_only}")
-            
-            # Queue Router para selecionar worker Modal
-            from app.video_orchestrator.services.queue_router_service import get_queue_router
-            from app.video_orchestrator.pipeline_events import emit_step_start, emit_step_complete, emit_step_error
+                
+                if cut_response.status_code != 200:
+                    logger.error(f"   ❌ Erro ao cortar segmentos: HTTP {cut_response.status_code}")
+                    logger.error(f"      {cut_response.text[:200]}")
+                    return {
+                        'status': 'error',
+                        'error': f'Failed to cut segments: HTTP {cut_response.status_code}',
+                        'clips_processed': 0
+                    }
+                
+                cut_result = cut_response.json()
+                pre_cut_segments = cut_result.get('segments', [])
+                
+                if not pre_cut_segments:
+                    logger.error(f"   ❌ Nenhum segmento cortado retornado!")
+                    return {
+                        'status': 'error',
+                        'error': 'No segments returned from cut service',
+                        'clips_processed': 0
+                    }
+                
+                logger.info(f"   ✅ {len(pre_cut_segments)} segmentos pré-cortados!")
+                
+                # Converter para formato de clips_to_process (como no modo tectônico)
+                for seg in pre_cut_segments:
+                    position, cache_key = cut_meta_by_index.get(seg.get('index', 0), (None, None))
+                    clips_to_process.append({
+                        'url': seg['url'],
+                        'shared_path': seg.get('shared_path'),
+                        'duration': seg.get('actual_duration', seg.get('requested_duration', 0)),
+                        'original_start': seg.get('original_start', seg.get('start', 0)),
+                        'original_end': seg.get('original_end', seg.get('end', 0)),
+                        'segment_index': seg.get('index', 0),
+                        'audio_offset': seg.get('_audio_offset', seg.get('start', 0)),
+                        '_audio_offset': seg.get('_audio_offset', seg.get('start', 0)),
+                        'phrase_indices': seg.get('phrase_indices', []),
+                        '_position': position if position is not None else seg.get('index', 0),
+                        '_cache_key': cache_key
+                    })
+                
+                logger.info(f"   🎭 Processando {len(clips_to_process)} clips no v-matting...")
             
             total_matting_duration = sum(clip.get('duration', 0) for clip in clips_to_process)
-            num_segments = len(clips_to_process)
             
             emit_step_start(job_id, 'MATTING', metadata={
-                'segments': num_segments,
+                'segments': len(clips_to_process) + len(cached_foregrounds),
+                'from_cache': len(cached_foregrounds),
                 'total_duration': round(total_matting_duration, 2)
             })
             
-            queue_router = get_queue_router()
-            worker_override = job.options.get('worker_override') if job.options else None
-            current_template_id = template_config.get('template_id') if template_config else None
-            if not current_template_id:
-                current_template_id = getattr(job, 'template_id', None)
-            
-            routing_decision = queue_router.route(
-                job_id=job_id,
-                video_duration=total_matting_duration,
-                segments=num_segments,
-                template_id=current_template_id,
-                applies_to='matting',
-                worker_override=worker_override
-            )
-            
-            selected_worker = routing_decision['worker_id']
-            
-            logger.info(f"   🚦 [QUEUE_ROUTER] Worker selecionado: {selected_worker}")
-            logger.info(f"      Regra: {routing_decision.get('rule_name', 'N/A')}")
-            logger.info(f"      Razão: {routing_decision.get('reason', 'N/A')}")
-            
-            # Processar via Modal
-            result = self._process_via_modal(
+            result = self._dispatch_missing_clips(
                 clips_to_process=clips_to_process,
+                cached_foregrounds=cached_foregrounds,
                 job_id=job_id,
                 job=job,
+                template_config=template_config,
                 project_path=project_path,
                 template_configs=template_configs,
-                use_alpha_only=use_alpha_only,
-                selected_worker=selected_worker
+                use_alpha_only=use_alpha_only
             )
             
             # Salvar resultados no job
@@ -642,7 +770,8 @@ class MattingOrchestratorService:
             
             return {
                 'status': 'success' if result['foreground_segments'] else 'error',
-                'clips_processed': result['clips_processed']
+                'clips_processed': result['clips_processed'],
+                'clips_from_cache': len(cached_foregrounds)
             }
         
         except requests.exceptions.Timeout:
@@ -653,6 +782,8 @@ class MattingOrchestratorService:
                 'error': 'Timeout cutting segments',
                 'clips_processed': 0
             }
+        except JobCancelledError:
+            raise
         except Exception as e:
             logger.error(f"   ❌ Erro ao processar modo virtual: {e}")
             import traceback
@@ -746,6 +877,10 @@ class MattingOrchestratorService:
         Processa clips via Modal.com em PARALELO.
         
         v4.2: Usa ThreadPoolExecutor para enviar múltiplos clips simultaneamente.
+        🆕 v4.8.0: Concorrência adaptativa (limiter do ModalMattingService sobe
+        enquanto a latência está estável e recua em 429/5xx/timeout). Cada clip
+        concluído emite progresso (foregrounds prontos, limite atual); o
+        resultado continua saindo só depois do último clip.
         
         Args:
             clips_to_process: Lista de clips
@@ -763,20 +898,28 @@ class MattingOrchestratorService:
             }
         """
         import os
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor
         from app.video_orchestrator.services.modal_matting_service import ModalMattingService
+        from app.video_orchestrator.services.adaptive_concurrency import ADAPTIVE_CONCURRENCY_ENABLED
+        from app.video_orchestrator.services.matting_segment_cache import get_matting_segment_cache
+        from app.video_orchestrator.pipeline_events import emit_step_progress
         
         MAX_CONCURRENT_MATTING = int(os.environ.get('PIPELINE_MAX_CONCURRENT_MATTING', '4'))
         
         # Criar instância com worker específico
         modal_service = ModalMattingService(worker_id=selected_worker)
+        limiter = modal_service.limiter
         num_clips = len(clips_to_process)
-        max_workers = min(MAX_CONCURRENT_MATTING, num_clips)
+        # 🆕 v4.8.0: Pool no teto do limitador; a concorrência efetiva é limiter.limit
+        pool_ceiling = limiter.max_limit if ADAPTIVE_CONCURRENCY_ENABLED else MAX_CONCURRENT_MATTING
+        max_workers = max(1, min(pool_ceiling, num_clips))
         logger.info(f"   🚀 [MODAL] Usando Modal.com (worker: {selected_worker})")
-        logger.info(f"   🔀 [MODAL] Processamento PARALELO: {num_clips} clips, max_concurrent={max_workers}")
+        logger.info(f"   🔀 [MODAL] Processamento PARALELO: {num_clips} clips, "
+                    f"limite adaptativo={limiter.limit} (máx {max_workers})")
         
         foreground_segments = []
         clips_processed = 0
+        clips_done = 0
         
         def _process_single_clip(clip_idx, clip):
             """Processa um único clip via Modal (thread-safe)."""
@@ -784,7 +927,7 @@ class MattingOrchestratorService:
             logger.info(f"      URL: {clip['url'][:80] if len(clip['url']) > 80 else clip['url']}...")
             logger.info(f"      Duração: {clip.get('duration', 0):.2f}s")
             
-            result = modal_service.process_segment(
+            result = modal_service.process_segment_with_retry(
                 video_url=clip['url'],
                 job_id=job_id,
                 segment_index=clip.get('segment_index', clip_idx),
@@ -800,67 +943,90 @@ class MattingOrchestratorService:
             return clip_idx, clip, result
         
         # ─── Executar em paralelo ───
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 🆕 v4.8.0: Cancelamento do job descarta clips pendentes e não espera os em andamento
+        cancel_token = get_cancellation_token(job_id)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
             futures = {
                 executor.submit(_process_single_clip, idx, clip): idx
                 for idx, clip in enumerate(clips_to_process)
             }
             
-            for future in as_completed(futures):
+            for future in as_completed_or_cancelled(futures, cancel_token):
                 clip_idx = futures[future]
                 try:
                     clip_idx, clip, result = future.result()
                     
                     if result.get('foreground_url'):
-                        original_start_ms = int(clip.get('original_start', 0) * 1000) if isinstance(clip.get('original_start', 0), float) else clip.get('original_start', 0)
-                        original_end_ms = int(clip.get('original_end', 0) * 1000) if isinstance(clip.get('original_end', 0), float) else clip.get('original_end', 0)
-                        
-                        foreground_segment = {
-                            'foreground_url': result['foreground_url'],
-                            'segment_index': clip.get('segment_index', clip_idx),
-                            'original_start': clip.get('original_start', 0),
-                            'original_end': clip.get('original_end', 0),
-                            'audio_offset': clip.get('_audio_offset', 0),
-                            'duration': clip.get('duration', 0),
-                            'phrase_indices': clip.get('phrase_indices', []),
-                            'id': f"person_overlay_{clip_idx}",
-                            'zIndex': 600,
-                            'start_time': original_start_ms,
-                            'end_time': original_end_ms,
-                            'position': {
-                                'x': 0,
-                                'y': 0,
-                                'width': "100%",
-                                'height': "100%"
-                            }
-                        }
-                        
-                        if use_alpha_only and result.get('base_video_url'):
-                            foreground_segment['base_video_url'] = result['base_video_url']
-                            foreground_segment['mask_url'] = result['foreground_url']
-                            foreground_segment['original_video_url'] = result['base_video_url']
-                            foreground_segment['src'] = result['foreground_url']
-                            logger.info(f"      🎭 Luma Matte: mask_url + original_video_url, zIndex=600, timing={original_start_ms}-{original_end_ms}ms")
-                        
-                        foreground_segments.append(foreground_segment)
+                        foreground_segments.append(self._build_foreground_segment(
+                            clip.get('_position', clip_idx), clip, result, use_alpha_only
+                        ))
                         clips_processed += 1
+                        # 🆕 v4.8.0: Trecho processado fica disponível para os próximos runs
+                        if clip.get('_cache_key'):
+                            get_matting_segment_cache().put(clip['_cache_key'], result)
                         logger.info(f"      ✅ [{clip_idx+1}/{num_clips}] Foreground gerado: {result['foreground_url'][:80]}...")
                     else:
                         logger.warning(f"      ⚠️ [{clip_idx+1}/{num_clips}] Nenhum foreground gerado")
                 
+                except JobCancelledError:
+                    raise
                 except Exception as e:
                     logger.error(f"      ❌ [{clip_idx+1}/{num_clips}] Erro ao processar clip via Modal: {e}")
                     import traceback
                     logger.error(traceback.format_exc())
-                    continue
+                
+                # 🆕 v4.8.0: Só progresso para o frontend (não antecipa o resultado)
+                clips_done += 1
+                emit_step_progress(job_id, 'MATTING', current=clips_done, total=num_clips, metadata={
+                    'foregrounds_ready': len(foreground_segments),
+                    'concurrency_limit': limiter.limit
+                })
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         # Ordenar por segment_index para manter ordem correta
         foreground_segments.sort(key=lambda s: s.get('segment_index', 0))
         
-        logger.info(f"   ✅ [MODAL] {clips_processed}/{num_clips} clips processados (paralelo, max={max_workers})")
+        logger.info(f"   ✅ [MODAL] {clips_processed}/{num_clips} clips processados "
+                    f"(paralelo, limite final={limiter.limit}, máx={max_workers})")
         
         return {
             'foreground_segments': foreground_segments,
             'clips_processed': clips_processed
         }
     
+    def _build_foreground_segment(self, clip_idx: int, clip: dict, result: dict, use_alpha_only: bool) -> dict:
+        """Converte o resultado do Modal em um foreground_segment para o editor."""
+        original_start_ms = int(clip.get('original_start', 0) * 1000) if isinstance(clip.get('original_start', 0), float) else clip.get('original_start', 0)
+        original_end_ms = int(clip.get('original_end', 0) * 1000) if isinstance(clip.get('original_end', 0), float) else clip.get('original_end', 0)
+        
+        foreground_segment = {
+            'foreground_url': result['foreground_url'],
+            'segment_index': clip.get('segment_index', clip_idx),
+            'original_start': clip.get('original_start', 0),
+            'original_end': clip.get('original_end', 0),
+            'audio_offset': clip.get('_audio_offset', 0),
+            'duration': clip.get('duration', 0),
+            'phrase_indices': clip.get('phrase_indices', []),
+            'id': f"person_overlay_{clip_idx}",
+            'zIndex': 600,
+            'start_time': original_start_ms,
+            'end_time': original_end_ms,
+            'position': {
+                'x': 0,
+                'y': 0,
+                'width': "100%",
+                'height': "100%"
+            }
+        }
+        
+        if use_alpha_only and result.get('base_video_url'):
+            foreground_segment['base_video_url'] = result['base_video_url']
+            foreground_segment['mask_url'] = result['foreground_url']
+            foreground_segment['original_video_url'] = result['base_video_url']
+            foreground_segment['src'] = result['foreground_url']
+            logger.info(f"      🎭 Luma Matte: mask_url + original_video_url, zIndex=600, timing={original_start_ms}-{original_end_ms}ms")
+        
+        return foreground_segment
+    
@@ -0,0 +1,120 @@
+"""
+🆕 v4.8.0: Matting Segment Cache - Foregrounds do Modal por trecho do vídeo fonte
+
+O matting_config_hash do PipelineState só evita refazer o step quando
+nada mudou. Um replay que invalida `matting`, ou o mesmo projeto com
+outro template, chamava o Modal de novo para os mesmos trechos de vídeo.
+
+A chave de cada clip é o sha256 de:
+- CONTEÚDO do vídeo fonte (source_fingerprint), não da URL: o fallback do
+  orquestrador é o phase1_video_url, um path fixo por job
+  (jobs/{job_id}/phase1/...) que é sobrescrito quando um replay refaz o
+  corte. Sem fingerprint disponível o cache é ignorado.
+- intervalo (original_start/original_end, em ms)
+- hash da configuração que muda a saída do Modal (formato, downsample,
+  fp16, resolução/fps do template)
+
+O Redis guarda hash → {foreground_url, base_video_url}; os arquivos
+continuam no B2 onde o Modal os gravou.
+
+Uso:
+    cache = get_matting_segment_cache()
+    config_hash = matting_output_config_hash(template_configs, use_alpha_only)
+    fingerprint = source_fingerprint(source_url)        # None → sem cache
+    key = matting_segment_key(fingerprint, start, end, config_hash)
+    hits = cache.get_many([key, ...])
+    cache.put(key, modal_result)
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from ...utils.content_fingerprint import content_fingerprint
+from ...utils.redis_json_cache import RedisJSONCache
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato da chave (incrementar invalida todos os segmentos, ex: novo modelo)
+MATTING_SEGMENT_KEY_VERSION = 'v2'
+MATTING_SEGMENT_CACHE_TTL_SECONDS = int(os.environ.get('MATTING_SEGMENT_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+MATTING_SEGMENT_CACHE_PREFIX = 'matting:segment_cache'
+
+
+def source_fingerprint(url: str) -> Optional[str]:
+    """
+    Hash do conteúdo do vídeo fonte, sem baixá-lo.
+
+    Arquivo local: sha256; B2: X-Bz-Content-Sha1 (HEAD); outros: ETag forte
+    + Content-Length. None se o conteúdo não pôde ser identificado (o cache
+    é ignorado).
+    """
+    return content_fingerprint(url, allow_etag=True)
+
+
+def matting_output_config_hash(template_configs: Dict[str, Any], use_alpha_only: bool) -> str:
+    """Hash do que muda a saída do Modal para um mesmo trecho de vídeo."""
+    from .modal_matting_service import ModalMattingService
+    data = {
+        'output_format': 'alpha_only' if use_alpha_only else 'webm',
+        'downsample_ratio': ModalMattingService.DOWNSAMPLE_RATIO,
+        'use_fp16': ModalMattingService.USE_FP16,
+        'resolution': (template_configs or {}).get('resolution'),
+        'fps': (template_configs or {}).get('fps'),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def matting_segment_key(source_fingerprint: str, start: float, end: float, config_hash: str) -> str:
+    """Chave de um trecho [start, end] (segundos) do vídeo fonte (por conteúdo)."""
+    raw = json.dumps({
+        'v': MATTING_SEGMENT_KEY_VERSION,
+        'source': source_fingerprint,
+        'start_ms': int(round(float(start or 0) * 1000)),
+        'end_ms': int(round(float(end or 0) * 1000)),
+        'config': config_hash,
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class MattingSegmentCache(RedisJSONCache):
+    """
+    Índice hash → resultado do Modal (Redis).
+
+    Sem Redis o cache fica desabilitado e todos os clips vão ao Modal.
+    """
+
+    PREFIX = MATTING_SEGMENT_CACHE_PREFIX
+    LOG_TAG = 'MATTING CACHE'
+
+    def __init__(self, redis_client=None, ttl_seconds: int = MATTING_SEGMENT_CACHE_TTL_SECONDS):
+        super().__init__(redis_client, ttl_seconds)
+
+    def _is_hit(self, entry: Dict[str, Any]) -> bool:
+        return bool(entry.get('foreground_url'))
+
+    def _build_entry(self, modal_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Resultado do Modal (somente se tem foreground_url)."""
+        if not modal_result.get('foreground_url'):
+            return None
+        return {
+            'foreground_url': modal_result.get('foreground_url'),
+            'base_video_url': modal_result.get('base_video_url'),
+            'output_format': modal_result.get('output_format'),
+            'matted_at': time.time(),
+        }
+
+
+# Singleton
+_matting_segment_cache = None
+
+
+def get_matting_segment_cache() -> MattingSegmentCache:
+    """Retorna instância singleton do MattingSegmentCache."""
+    global _matting_segment_cache
+    if _matting_segment_cache is None:
+        _matting_segment_cache = MattingSegmentCache()
+    return _matting_segment_cache
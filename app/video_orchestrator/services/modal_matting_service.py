@@ -7,15 +7,32 @@ v2.9.284 - Luma Matte para v-editor-python:
   - foreground_url: máscara grayscale (H.264)
   - base_video_url: vídeo RGB sincronizado (H.264)
 - NÃO faz merge para PNG quando for para v-editor-python
+
+🆕 v4.8.0: Concorrência adaptativa
+- Chamadas ao Modal passam por um AdaptiveConcurrencyLimiter por worker:
+  o paralelismo sobe enquanto a latência fica estável e cai pela metade
+  em 429/5xx/timeout (segmentos com 429/5xx são reenviados com backoff;
+  timeout só reduz o limite e falha o segmento, sem reenvio)
+- A vaga do Modal é liberada assim que a resposta chega: o merge para
+  PNG de cada segmento roda sem segurar a concorrência do Modal
+
+🆕 v4.8.0: Cancelamento cooperativo (job_cancellation)
+- Segmentos ainda não enviados são descartados e o backoff é interrompido
+- A coleta para no cancelamento sem esperar as chamadas em andamento
+  (o endpoint síncrono do Modal não tem cancelamento remoto)
 """
 
 import os
 import time
+import random
 import logging
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Any
 
+from .adaptive_concurrency import get_adaptive_limiter, is_overload_status
+from ..job_cancellation import JobCancelledError, as_completed_or_cancelled, get_cancellation_token
+
 logger = logging.getLogger(__name__)
 
 class ModalMattingService:
@@ -32,6 +49,10 @@ class ModalMattingService:
         'modal-cpu': 'https://fotovinicius2--v-matting-matting-cpu-sync.modal.run',  # CPU
     }
     
+    # Parâmetros do modelo enviados ao Modal (entram na chave do MattingSegmentCache)
+    DOWNSAMPLE_RATIO = 0.25
+    USE_FP16 = True
+    
     def __init__(self, worker_id: str = None):
         # 🆕 v2.9.261: Selecionar endpoint baseado no worker
         self.worker_id = worker_id or 'modal-cpu-light'  # Default: CPU Light (mais barato)
@@ -49,6 +70,15 @@ class ModalMattingService:
         self.max_parallel_jobs = int(os.environ.get('MODAL_MAX_PARALLEL_JOBS', '5'))
         self.timeout = int(os.environ.get('MODAL_MATTING_TIMEOUT', '600'))
         
+        # 🆕 v4.8.0: Limite adaptativo compartilhado por worker (aprende entre jobs)
+        self.max_concurrency = int(os.environ.get('MODAL_MATTING_MAX_CONCURRENCY', '12'))
+        self.throttle_retries = int(os.environ.get('MODAL_THROTTLE_RETRIES', '2'))
+        self.limiter = get_adaptive_limiter(
+            f"modal_matting:{self.worker_id}",
+            initial=self.max_parallel_jobs,
+            max_limit=max(self.max_concurrency, self.max_parallel_jobs),
+        )
+        
         # Formato de saída: 'webm', 'alpha_only', 'png_sequence'
         self.output_format = os.environ.get('MODAL_OUTPUT_FORMAT', 'alpha_only')
         
@@ -107,8 +137,8 @@ class ModalMattingService:
             "project_path": project_path,
             "output_format": format_to_use,
             "upload_to_b2": True,
-            "downsample_ratio": 0.25,
-            "use_fp16": True
+            "downsample_ratio": self.DOWNSAMPLE_RATIO,
+            "use_fp16": self.USE_FP16
         }
         
         start_time = time.time()
@@ -117,12 +147,19 @@ class ModalMattingService:
         logger.info(f"   - Video URL: {video_url[:80]}...")
         logger.info(f"   - Format: {format_to_use}")
         
+        # 🆕 v4.8.0: Job cancelado → não enviar o segmento
+        cancel_token = get_cancellation_token(job_id)
+        cancel_token.raise_if_cancelled()
+        
         try:
-            response = requests.post(
-                self.endpoint_url,
-                json=payload,
-                timeout=self.timeout
-            )
+            # 🆕 v4.8.0: Só a chamada ao Modal ocupa vaga no limitador (merge fica fora)
+            with self.limiter.slot(weight=duration or 1.0) as slot:
+                response = requests.post(
+                    self.endpoint_url,
+                    json=payload,
+                    timeout=self.timeout
+                )
+                slot.status_code = response.status_code
             response.raise_for_status()
             result = response.json()
             
@@ -162,6 +199,7 @@ class ModalMattingService:
                     }
                 
                 # 🆕 v2.9.141: Se alpha_only (sem skip), fazer merge para PNG sequence no Hetzner
+                cancel_token.raise_if_cancelled()
                 if format_to_use == 'alpha_only':
                     logger.info(f"   🔄 [MERGE] alpha_only detectado, chamando merge-to-png-sequence...")
                     try:
@@ -232,22 +270,51 @@ class ModalMattingService:
         except requests.exceptions.Timeout:
             elapsed = time.time() - start_time
             logger.error(f"❌ [MODAL] Timeout no segmento {segment_index} após {elapsed:.2f}s")
+            # O limitador já contou o timeout como sobrecarga; reenviar com o mesmo
+            # timeout longo só alongaria a cauda (não é marcado como throttled)
             return {
                 "status": "error",
                 "segment_index": segment_index,
                 "error": "Timeout",
-                "elapsed": elapsed
+                "elapsed": elapsed,
+                "throttled": False
             }
         except requests.exceptions.RequestException as e:
             elapsed = time.time() - start_time
+            http_status = getattr(getattr(e, 'response', None), 'status_code', None)
             logger.error(f"❌ [MODAL] Erro no segmento {segment_index}: {e}")
             return {
                 "status": "error",
                 "segment_index": segment_index,
                 "error": str(e),
-                "elapsed": elapsed
+                "elapsed": elapsed,
+                "http_status": http_status,
+                "throttled": is_overload_status(http_status)
             }
     
+    def process_segment_with_retry(self, **kwargs) -> Dict[str, Any]:
+        """
+        🆕 v4.8.0: process_segment com reenvio em sobrecarga (429/5xx).
+        
+        O limitador já reduziu a concorrência; aqui o segmento espera um
+        backoff exponencial com jitter e tenta de novo. Timeout não é
+        reenviado: falha uma vez, como antes.
+        """
+        result = self.process_segment(**kwargs)
+        for attempt in range(self.throttle_retries):
+            if not result.get('throttled'):
+                break
+            delay = min(2 ** (attempt + 1), 20) * (0.5 + random.random())
+            logger.warning(
+                f"⏳ [MODAL] Segmento {kwargs.get('segment_index')} com sobrecarga, "
+                f"reenviando em {delay:.1f}s (tentativa {attempt + 2}/{self.throttle_retries + 1}, "
+                f"limite={self.limiter.limit})"
+            )
+            if get_cancellation_token(kwargs.get('job_id')).wait(delay):
+                raise JobCancelledError(kwargs.get('job_id'))
+            result = self.process_segment(**kwargs)
+        return result
+    
     def process_segments_parallel(
         self,
         segments: List[Dict[str, Any]],
@@ -279,14 +346,16 @@ class ModalMattingService:
         total_segments = len(segments)
         
         logger.info(f"🚀 [MODAL] Iniciando processamento paralelo de {total_segments} segmentos")
-        logger.info(f"   - Max parallel: {self.max_parallel_jobs}")
+        logger.info(f"   - Limite adaptativo: {self.limiter.limit} (máx {self.limiter.max_limit})")
         
         results = []
         successful = 0
         failed = 0
         
-        # Usar ThreadPoolExecutor para processamento paralelo
-        with ThreadPoolExecutor(max_workers=self.max_parallel_jobs) as executor:
+        # 🆕 v4.8.0: Pool no teto do limitador; quem controla a concorrência real é o limiter
+        cancel_token = get_cancellation_token(job_id)
+        executor = ThreadPoolExecutor(max_workers=min(self.limiter.max_limit, total_segments))
+        try:
             futures = {}
             
             for segment in segments:
@@ -304,7 +373,7 @@ class ModalMattingService:
                 duration = segment.get('duration', original_end - original_start)
                 
                 future = executor.submit(
-                    self.process_segment,
+                    self.process_segment_with_retry,
                     video_url=video_url,
                     job_id=job_id,
                     segment_index=segment_index,
@@ -321,8 +390,8 @@ class ModalMattingService:
                 )
                 futures[future] = segment_index
             
-            # Coletar resultados
-            for future in as_completed(futures):
+            # Coletar resultados (🆕 v4.8.0: para no cancelamento do job)
+            for future in as_completed_or_cancelled(futures, cancel_token):
                 segment_index = futures[future]
                 try:
                     result = future.result()
@@ -334,6 +403,8 @@ class ModalMattingService:
                     else:
                         failed += 1
                         
+                except JobCancelledError:
+                    raise
                 except Exception as e:
                     logger.error(f"❌ [MODAL] Exceção no segmento {segment_index}: {e}")
                     results.append({
@@ -342,6 +413,9 @@ class ModalMattingService:
                         "error": str(e)
                     })
                     failed += 1
+        finally:
+            # Não esperar chamadas em andamento se o job foi cancelado
+            executor.shutdown(wait=False, cancel_futures=True)
         
         total_time = time.time() - start_time
         
@@ -356,7 +430,8 @@ class ModalMattingService:
             "total_segments": total_segments,
             "successful": successful,
             "failed": failed,
-            "total_time": total_time
+            "total_time": total_time,
+            "concurrency": self.limiter.stats()
         }
     
     def poll_job_status(self, call_id: str, timeout: int = 600) -> Dict[str, Any]:
@@ -425,6 +500,9 @@ class ModalMattingService:
             "target_fps": 30
         }
         
+        cancel_token = get_cancellation_token(job_id)
+        cancel_token.raise_if_cancelled()
+        
         try:
             modal_start = time.time()
             response = requests.post(
@@ -456,6 +534,7 @@ class ModalMattingService:
             }
         
         # === STEP 2: Chamar Hetzner para merge-to-png-sequence ===
+        cancel_token.raise_if_cancelled()
         logger.info(f"📤 [STEP 2/2] Chamando Hetzner merge-to-png-sequence...")
         
         merge_endpoint = os.environ.get(
@@ -556,7 +635,9 @@ class ModalMattingService:
         failed = 0
         
         # Processar segmentos em paralelo com ThreadPool
-        with ThreadPoolExecutor(max_workers=self.max_parallel_jobs) as executor:
+        cancel_token = get_cancellation_token(job_id)
+        executor = ThreadPoolExecutor(max_workers=self.max_parallel_jobs)
+        try:
             futures = {}
             
             for i, segment in enumerate(segments):
@@ -579,8 +660,8 @@ class ModalMattingService:
                 )
                 futures[future] = segment_id
             
-            # Coletar resultados
-            for future in as_completed(futures):
+            # Coletar resultados (🆕 v4.8.0: para no cancelamento do job)
+            for future in as_completed_or_cancelled(futures, cancel_token):
                 segment_id = futures[future]
                 try:
                     result = future.result()
@@ -591,6 +672,8 @@ class ModalMattingService:
                     else:
                         failed += 1
                         
+                except JobCancelledError:
+                    raise
                 except Exception as e:
                     logger.error(f"❌ Exceção no segmento {segment_id}: {e}")
                     results.append({
@@ -599,6 +682,8 @@ class ModalMattingService:
                         "error": str(e)
                     })
                     failed += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
         
         total_time = time.time() - start_time
         
@@ -0,0 +1,92 @@
+"""
+🆕 v4.8.0: Motion Graphics Clip Cache - Clips Manim endereçados por conteúdo
+
+O render de um motion graphic depende apenas do template e do config
+enriquecido (dimensões, duration, target_position...). O mesmo MG era
+renderizado de novo em cada job e em cada replay.
+
+A chave é o sha256 do JSON canônico (chaves ordenadas) de
+{template, config}. O Redis guarda hash → output_path: o .mp4 continua no
+volume compartilhado (/app/shared/manim/) onde o v-services o gravou.
+Entradas cujo arquivo sumiu do volume são descartadas na leitura.
+
+Uso:
+    cache = get_motion_graphics_clip_cache()
+    key = mg_clip_key(template, enriched_config)
+    hits = cache.get_many([key, ...])
+    cache.put(key, render_result)
+"""
+
+import os
+import time
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from ...utils.json_payload import encode_json
+from ...utils.redis_json_cache import RedisJSONCache
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato da chave (incrementar invalida todos os clips em cache)
+MG_CLIP_KEY_VERSION = 'v1'
+MG_CLIP_CACHE_TTL_SECONDS = int(os.environ.get('MG_CLIP_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+MG_CLIP_CACHE_PREFIX = 'mg:clip_cache'
+# Raiz do volume compartilhado (se não estiver montado aqui, não dá para validar o arquivo)
+SHARED_VOLUME_ROOT = os.environ.get('SHARED_VOLUME_ROOT', '/app/shared')
+
+
+def mg_clip_key(template: str, enriched_config: Dict[str, Any]) -> str:
+    """Hash canônico do que determina o clip renderizado."""
+    raw = encode_json({'template': template, 'config': enriched_config}, sort_keys=True)
+    return hashlib.sha256(MG_CLIP_KEY_VERSION.encode() + b'|' + raw).hexdigest()
+
+
+def _clip_available(path: str) -> bool:
+    """True se o clip ainda existe (URLs e volume não montado são aceitos)."""
+    if not path:
+        return False
+    if not path.startswith(SHARED_VOLUME_ROOT) or not os.path.isdir(SHARED_VOLUME_ROOT):
+        return True
+    return os.path.exists(path)
+
+
+class MotionGraphicsClipCache(RedisJSONCache):
+    """
+    Índice hash → clip renderizado (Redis).
+
+    Sem Redis o cache fica desabilitado e todos os MGs são renderizados.
+    Clips que não existem mais no volume saem do índice na consulta.
+    """
+
+    PREFIX = MG_CLIP_CACHE_PREFIX
+    LOG_TAG = 'MG CACHE'
+
+    def __init__(self, redis_client=None, ttl_seconds: int = MG_CLIP_CACHE_TTL_SECONDS):
+        super().__init__(redis_client, ttl_seconds)
+
+    def _is_hit(self, entry: Dict[str, Any]) -> bool:
+        return _clip_available(entry.get('output_path'))
+
+    def _build_entry(self, render_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Clip renderizado (somente se tem output_path)."""
+        if not render_result.get('output_path'):
+            return None
+        return {
+            'output_path': render_result.get('output_path'),
+            'dimensions': render_result.get('dimensions') or {},
+            'render_time': render_result.get('render_time', 0),
+            'rendered_at': time.time(),
+        }
+
+
+# Singleton
+_mg_clip_cache = None
+
+
+def get_motion_graphics_clip_cache() -> MotionGraphicsClipCache:
+    """Retorna instância singleton do MotionGraphicsClipCache."""
+    global _mg_clip_cache
+    if _mg_clip_cache is None:
+        _mg_clip_cache = MotionGraphicsClipCache()
+    return _mg_clip_cache
@@ -17,8 +17,11 @@ import os
 import json
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
+from .motion_graphics_clip_cache import mg_clip_key, get_motion_graphics_clip_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +30,13 @@ logger = logging.getLogger(__name__)
 # Isso garante que quando a palavra é falada, a seta/destaque já está visível.
 MG_TIMING_BUFFER_SECONDS = 2.5
 
+# 🆕 v4.8.0: Render paralelo + cache de clips por conteúdo (_render_individual)
+# ROLLBACK: MG_RENDER_PARALLEL=false / MG_CLIP_CACHE=false voltam ao render sequencial completo
+MG_RENDER_PARALLEL = os.environ.get('MG_RENDER_PARALLEL', 'true').lower() == 'true'
+# Renders simultâneos no v-services/manim (ajustar à capacidade do backend)
+MG_RENDER_MAX_PARALLEL = int(os.environ.get('MG_RENDER_MAX_PARALLEL', 3))
+MG_CLIP_CACHE_ENABLED = os.environ.get('MG_CLIP_CACHE', 'true').lower() == 'true'
+
 
 class MotionGraphicsRenderService:
     """
@@ -308,6 +318,90 @@ class MotionGraphicsRenderService:
                 job_id=job_id
             )
     
+    def _enrich_config(self, mg: Dict) -> Dict:
+        """
+        Config enviado ao template Manim: config do Director + defaults de
+        dimensão, duration do timing e target_position (step 11.6.5).
+        """
+        mg_type = mg.get('type')
+        mg_timing = mg.get('timing', {})
+        mg_target_position = mg.get('target_position', {})
+        
+        enriched_config = {**mg.get('config', {})}
+        defaults = self.TYPE_DEFAULTS.get(mg_type, {'width': 300, 'height': 200})
+        if 'width' not in enriched_config:
+            enriched_config['width'] = defaults['width']
+        if 'height' not in enriched_config:
+            enriched_config['height'] = defaults['height']
+        
+        # Adicionar duration do timing ao config
+        if 'duration' not in enriched_config and 'duration' in mg_timing:
+            enriched_config['duration'] = mg_timing['duration']
+        
+        # Incluir target_position no config para que o template Manim possa posicionar
+        if mg_target_position:
+            enriched_config['target_position'] = mg_target_position
+        
+        return enriched_config
+    
+    def _render_clip(self, template: str, enriched_config: Dict, label: str) -> Dict:
+        """
+        Renderiza um clip via /render.
+        
+        Returns:
+            {"status": "success", "output_path", "dimensions", "cache_hit", "render_time"}
+            ou {"status": "error", "error": "..."}
+        """
+        payload = {
+            "template": template,
+            "config": enriched_config
+        }
+        
+        try:
+            response = requests.post(
+                self.render_endpoint,
+                json=payload,
+                timeout=self.timeout
+            )
+        except requests.exceptions.Timeout:
+            logger.error(f"❌ [MANIM] {label} timeout (>{self.timeout}s)")
+            return {"status": "error", "error": "timeout"}
+        except Exception as e:
+            logger.error(f"❌ [MANIM] {label} erro: {e}", exc_info=True)
+            return {"status": "error", "error": str(e)}
+        
+        if response.status_code != 200:
+            logger.error(f"❌ [MANIM] {label} HTTP Error {response.status_code}")
+            logger.error(f"   Response: {response.text[:200]}")
+            return {"status": "error", "error": f"HTTP {response.status_code}"}
+        
+        try:
+            result = response.json()
+        except ValueError as e:
+            logger.error(f"❌ [MANIM] {label} resposta inválida: {e}")
+            return {"status": "error", "error": "invalid JSON response"}
+        
+        logger.info(f"   📋 [RENDER RESPONSE] {label}: {json.dumps(result, default=str)[:300]}")
+        
+        if result.get('status') != 'success':
+            error_msg = result.get('error', 'Unknown error')
+            logger.error(f"❌ [MANIM] {label} falhou: {error_msg}")
+            return {"status": "error", "error": error_msg}
+        
+        # output_path já é o path no volume compartilhado (/app/shared/manim/...)
+        output_path = result.get('output_path', '')
+        if not output_path:
+            logger.error(f"❌ [MANIM] {label}: output_path vazio!")
+            return {"status": "error", "error": "output_path vazio"}
+        
+        return {
+            "status": "success",
+            "output_path": output_path,
+            "dimensions": result.get('dimensions', {}),
+            "cache_hit": result.get('cache_hit', False),
+            "render_time": result.get('render_time', 0),
+        }
+    
     def _render_individual(
         self,
         motion_graphics_plan: List[Dict],
@@ -316,147 +410,148 @@ class MotionGraphicsRenderService:
         """
         Fallback: renderiza cada MG individualmente via /render.
         Posição vem do orchestrator (target_position calculado no step 11.6.5).
+        
+        🆕 v4.8.0: MGs com o mesmo template + config enriquecido são renderizados
+        uma única vez; clips já renderizados (outros jobs, replays) vêm do
+        MotionGraphicsClipCache, e os restantes são renderizados em paralelo
+        (no máximo MG_RENDER_MAX_PARALLEL chamadas simultâneas ao manim).
         """
         logger.info(f"🎨 [MANIM] Usando /render individual (sem layout_service)")
         
         rendered_mgs = []
         failed_mgs = []
         
+        # 1. Config enriquecido + chave de conteúdo de cada MG (um MG inválido não derruba os outros)
+        prepared = []
+        unique: Dict[str, tuple] = {}
         for idx, mg in enumerate(motion_graphics_plan):
+            mg_id = mg.get('id', 'unknown') if isinstance(mg, dict) else 'unknown'
+            try:
+                mg_type = mg.get('type')
+                enriched_config = self._enrich_config(mg)
+                clip_key = mg_clip_key(mg_type, enriched_config)
+                
+                logger.info(f"🎨 [MANIM] {mg_id} ({mg_type}) target_word='{mg.get('target_word', '')}'")
+                logger.info(f"   📋 [PLAN INPUT] timing={mg.get('timing', {})}")
+                logger.info(f"   📋 [ENRICHED CONFIG] {enriched_config}")
+            except Exception as e:
+                logger.error(f"❌ [MANIM] {mg_id} erro: {e}", exc_info=True)
+                failed_mgs.append({
+                    "id": mg_id,
+                    "error": str(e)
+                })
+                continue
+            
+            prepared.append((idx, mg, clip_key))
+            if clip_key not in unique:
+                unique[clip_key] = (mg_type, enriched_config, mg_id)
+        
+        # 2. Clips já renderizados
+        clips: Dict[str, Dict] = {}
+        clip_cache = get_motion_graphics_clip_cache() if MG_CLIP_CACHE_ENABLED else None
+        if clip_cache:
+            for clip_key, entry in clip_cache.get_many(list(unique.keys())).items():
+                clips[clip_key] = {
+                    "status": "success",
+                    "output_path": entry['output_path'],
+                    "dimensions": entry.get('dimensions', {}),
+                    "cache_hit": True,
+                    "render_time": 0,
+                }
+        
+        # 3. Renderizar apenas os clips únicos que faltam
+        to_render = [k for k in unique if k not in clips]
+        logger.info(f"🎨 [MANIM] {len(motion_graphics_plan)} MGs → {len(unique)} únicos, "
+                    f"{len(unique) - len(to_render)} em cache, {len(to_render)} para renderizar")
+        
+        def _render_key(clip_key: str) -> Dict:
+            mg_type, enriched_config, label = unique[clip_key]
+            clip = self._render_clip(mg_type, enriched_config, label)
+            if clip_cache and clip['status'] == 'success':
+                clip_cache.put(clip_key, clip)
+            return clip
+        
+        max_parallel = min(MG_RENDER_MAX_PARALLEL, len(to_render))
+        if MG_RENDER_PARALLEL and max_parallel > 1:
+            with ThreadPoolExecutor(max_workers=max_parallel,
+                                    thread_name_prefix='mg-render') as executor:
+                for clip_key, clip in zip(to_render, executor.map(_render_key, to_render)):
+                    clips[clip_key] = clip
+        else:
+            for clip_key in to_render:
+                clips[clip_key] = _render_key(clip_key)
+        
+        # 4. Montar resultado na ordem do plano — com timing e posição de cada MG
+        for idx, mg, clip_key in prepared:
             mg_id = mg.get('id', 'unknown')
-            mg_type = mg.get('type')
-            mg_config = mg.get('config', {})
-            mg_timing = mg.get('timing', {})
-            mg_target_word = mg.get('target_word', '')
-            mg_target_position = mg.get('target_position', {})
-            mg_justification = mg.get('justification', '')
+            clip = clips[clip_key]
+            
+            if clip['status'] != 'success':
+                failed_mgs.append({
+                    "id": mg_id,
+                    "error": clip['error']
+                })
+                continue
             
             try:
-                logger.info(f"🎨 [MANIM] Renderizando {mg_id} ({mg_type})...")
-                logger.info(f"   📋 [PLAN INPUT] target_word='{mg_target_word}'")
-                logger.info(f"   📋 [PLAN INPUT] timing={mg_timing}")
-                logger.info(f"   📋 [PLAN INPUT] config={mg_config}")
-                logger.info(f"   📋 [PLAN INPUT] target_position={mg_target_position}")
-                
-                # Adicionar defaults de dimensão se não presentes no config
-                enriched_config = {**mg_config}
-                defaults = self.TYPE_DEFAULTS.get(mg_type, {'width': 300, 'height': 200})
-                if 'width' not in enriched_config:
-                    enriched_config['width'] = defaults['width']
-                if 'height' not in enriched_config:
-                    enriched_config['height'] = defaults['height']
+                mg_timing = mg.get('timing', {})
+                mg_target_position = mg.get('target_position', {})
+                output_path = clip['output_path']
+                dimensions = clip['dimensions']
                 
-                # Adicionar duration do timing ao config
-                if 'duration' not in enriched_config and 'duration' in mg_timing:
-                    enriched_config['duration'] = mg_timing['duration']
+                # Extrair timing do plano do Director
+                raw_start_time = (
+                    mg_timing.get('start_time') or 
+                    mg_timing.get('start') or 
+                    0
+                )
+                duration = mg_timing.get('duration', 0)
                 
-                # Incluir target_position no config para que o template Manim possa posicionar
-                if mg_target_position:
-                    enriched_config['target_position'] = mg_target_position
+                # 🔧 v3.2.0: Buffer de timing — iniciar MG ANTES da palavra
+                start_time = max(0, raw_start_time - MG_TIMING_BUFFER_SECONDS)
+                logger.info(f"   ⏱️ [TIMING BUFFER] {mg_id}: raw={raw_start_time}s → buffered={start_time}s")
                 
-                logger.info(f"   📋 [ENRICHED CONFIG] {enriched_config}")
+                # Extrair posição calculada pelo orchestrator (step 11.6.5)
+                mg_x = mg_target_position.get('x', 0)
+                mg_y = mg_target_position.get('y', 0)
                 
-                # Payload para v-services/manim
-                payload = {
-                    "template": mg_type,
-                    "config": enriched_config
+                # Montar resultado — com timing e posição propagados
+                render_data = {
+                    'id': mg_id,
+                    'type': mg.get('type'),
+                    'target_word': mg.get('target_word', ''),
+                    'timing': mg_timing,
+                    # Campos que v-editor-python lê diretamente:
+                    'start_time': start_time,
+                    'duration': duration,
+                    'x': mg_x,
+                    'y': mg_y,
+                    'position': {'x': mg_x, 'y': mg_y},
+                    # Dimensões do render
+                    'width': dimensions.get('width'),
+                    'height': dimensions.get('height'),
+                    'dimensions': dimensions,
+                    # Arquivo
+                    'local_path': output_path,
+                    'src': output_path,
+                    'url': output_path,
+                    'video_url': output_path,
+                    # 🔧 v3.1.0: z-index na faixa correta (acima de subtitles 2000)
+                    'zIndex': 2200 + idx,
+                    # Metadata
+                    'config': mg.get('config', {}),
+                    'justification': mg.get('justification', ''),
+                    'cache_hit': clip['cache_hit'],
+                    'render_time': clip['render_time']
                 }
                 
-                # Chamar v-services/manim
-                response = requests.post(
-                    self.render_endpoint,
-                    json=payload,
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    logger.info(f"   📋 [RENDER RESPONSE] {json.dumps(result, default=str)[:300]}")
-                    
-                    if result.get('status') == 'success':
-                        # output_path já é o path no volume compartilhado (/app/shared/manim/...)
-                        output_path = result.get('output_path', '')
-                        dimensions = result.get('dimensions', {})
-                        
-                        if not output_path:
-                            logger.error(f"❌ [MANIM] {mg_id}: output_path vazio!")
-                            failed_mgs.append({"id": mg_id, "error": "output_path vazio"})
-                            continue
-                        
-                        # Extrair timing do plano do Director
-                        raw_start_time = (
-                            mg_timing.get('start_time') or 
-                            mg_timing.get('start') or 
-                            0
-                        )
-                        duration = mg_timing.get('duration', 0)
-                        
-                        # 🔧 v3.2.0: Buffer de timing — iniciar MG ANTES da palavra
-                        start_time = max(0, raw_start_time - MG_TIMING_BUFFER_SECONDS)
-                        logger.info(f"   ⏱️ [TIMING BUFFER] raw={raw_start_time}s → buffered={start_time}s")
-                        
-                        # Extrair posição calculada pelo orchestrator (step 11.6.5)
-                        mg_x = mg_target_position.get('x', 0)
-                        mg_y = mg_target_position.get('y', 0)
-                        
-                        # Montar resultado — com timing e posição propagados
-                        render_data = {
-                            'id': mg_id,
-                            'type': mg_type,
-                            'target_word': mg_target_word,
-                            'timing': mg_timing,
-                            # Campos que v-editor-python lê diretamente:
-                            'start_time': start_time,
-                            'duration': duration,
-                            'x': mg_x,
-                            'y': mg_y,
-                            'position': {'x': mg_x, 'y': mg_y},
-                            # Dimensões do render
-                            'width': dimensions.get('width'),
-                            'height': dimensions.get('height'),
-                            'dimensions': dimensions,
-                            # Arquivo
-                            'local_path': output_path,
-                            'src': output_path,
-                            'url': output_path,
-                            'video_url': output_path,
-                            # 🔧 v3.1.0: z-index na faixa correta (acima de subtitles 2000)
-                            'zIndex': 2200 + idx,
-                            # Metadata
-                            'config': mg_config,
-                            'justification': mg_justification,
-                            'cache_hit': result.get('cache_hit', False),
-                            'render_time': result.get('render_time', 0)
-                        }
-                        
-                        rendered_mgs.append(render_data)
-                        logger.info(f"✅ [MANIM] {mg_id} renderizado:")
-                        logger.info(f"   src={output_path}")
-                        logger.info(f"   start_time={start_time}s, duration={duration}s")
-                        logger.info(f"   position=({mg_x}, {mg_y})")
-                        logger.info(f"   dimensions={dimensions}")
-                    else:
-                        error_msg = result.get('error', 'Unknown error')
-                        logger.error(f"❌ [MANIM] {mg_id} falhou: {error_msg}")
-                        failed_mgs.append({
-                            "id": mg_id,
-                            "error": error_msg
-                        })
-                else:
-                    logger.error(f"❌ [MANIM] {mg_id} HTTP Error {response.status_code}")
-                    logger.error(f"   Response: {response.text[:200]}")
-                    failed_mgs.append({
-                        "id": mg_id,
-                        "error": f"HTTP {response.status_code}"
-                    })
+                rendered_mgs.append(render_data)
+                logger.info(f"✅ [MANIM] {mg_id} pronto{' (cache)' if clip['cache_hit'] else ''}:")
+                logger.info(f"   src={output_path}")
+                logger.info(f"   start_time={start_time}s, duration={duration}s")
+                logger.info(f"   position=({mg_x}, {mg_y})")
+                logger.info(f"   dimensions={dimensions}")
             
-            except requests.exceptions.Timeout:
-                logger.error(f"❌ [MANIM] {mg_id} timeout (>{self.timeout}s)")
-                failed_mgs.append({
-                    "id": mg_id,
-                    "error": "timeout"
-                })
             except Exception as e:
                 logger.error(f"❌ [MANIM] {mg_id} erro: {e}", exc_info=True)
                 failed_mgs.append({
@@ -480,6 +575,8 @@ class MotionGraphicsRenderService:
             "total_success": total_success,
             "total_failed": total_failed,
             "total": len(motion_graphics_plan),
+            "total_unique": len(unique),
+            "total_rendered": len(to_render),
             "method": "render-individual"
         }
     
@@ -1092,7 +1092,7 @@ class PhraseClassifierService:
         cartela_enabled = cartela_enabled or {'default': False, 'emphasis': False, 'letter_effect': False}
         
         try:
-            from openai import OpenAI
+            from app.ai_config import get_llm_client
             import re
             
             # Montar texto das frases - sanitizar COMPLETAMENTE para evitar quebra de JSON
@@ -1150,7 +1150,7 @@ class PhraseClassifierService:
                 logger.error("❌ API key não encontrada")
                 return None
             
-            client = OpenAI(api_key=api_key)
+            client = get_llm_client('openai', api_key)
             
             # ✅ Extrair nome do modelo corretamente (ai_config retorna dict)
             model_config = self.config.get('model', {})
@@ -1182,25 +1182,49 @@ class PhraseClassifierService:
             last_error = None
             max_retries = 3
             
-            for attempt in range(max_retries):
-                try:
-                    # 🆕 Usar response_format para GARANTIR JSON válido
-                    # Isso força a OpenAI a retornar apenas JSON estruturado
-                    response = client.chat.completions.create(
-                        model=model_name,
-                        messages=[
-                            {
-                                "role": "system", 
-                                "content": """Você é um classificador de frases para legendas de vídeo.
+            # 🆕 Usar response_format para GARANTIR JSON válido
+            # Isso força a OpenAI a retornar apenas JSON estruturado
+            llm_request = {
+                "model": model_name,
+                "messages": [
+                    {
+                        "role": "system", 
+                        "content": """Você é um classificador de frases para legendas de vídeo.
 REGRA ABSOLUTA: Retorne APENAS um objeto JSON válido, sem texto antes ou depois.
 O JSON deve ter a estrutura exata: {"classifications": [...], "regroupings": [...]}"""
-                            },
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.3,
-                        max_tokens=max_tokens,
-                        response_format={"type": "json_object"}  # 🆕 FORÇA JSON VÁLIDO
-                    )
+                    },
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.3,
+                "max_tokens": max_tokens,
+                "response_format": {"type": "json_object"},  # 🆕 FORÇA JSON VÁLIDO
+            }
+            
+            # 🆕 v4.8.0: Mesmas frases + mesmo template → resposta do cache (Redis)
+            # cache_sampled: replays do job devem manter a mesma classificação
+            from app.services import llm_response_cache
+            response_cache = llm_response_cache.get_llm_response_cache()
+            request_hash = None
+            if llm_response_cache.is_cacheable(llm_request, cache_sampled=True):
+                request_hash = llm_response_cache.llm_request_key(llm_request)
+                cached_entry = response_cache.get(request_hash)
+                if cached_entry is not None:
+                    try:
+                        cached_content = llm_response_cache.response_content(cached_entry)
+                        parsed_response = self._normalize_classifications(json.loads(cached_content), len(phrases))
+                        if not parsed_response or not self._validate_classification_response(parsed_response, len(phrases)):
+                            parsed_response = None
+                    except (TypeError, ValueError):
+                        parsed_response = None
+                    if parsed_response is not None:
+                        logger.info(f"♻️ Classificação reaproveitada do cache ({request_hash[:12]})")
+                        llm_response_cache.record_lookup('phrase_classifier', model_name, True, cached_entry.get('usage'))
+                    else:
+                        response_cache.invalidate(request_hash)
+            
+            for attempt in range(max_retries if parsed_response is None else 0):
+                try:
+                    response = client.chat.completions.create(**llm_request)
                     
                     content = response.choices[0].message.content
                     logger.info(f"📝 [Attempt {attempt+1}/{max_retries}] Resposta LLM: {len(content)} chars")
@@ -1219,6 +1243,9 @@ O JSON deve ter a estrutura exata: {"classifications": [...], "regroupings": [..
                         raise ValueError("JSON válido mas estrutura incorreta")
                     
                     logger.info(f"✅ JSON parseado com sucesso na tentativa {attempt+1}")
+                    if request_hash:
+                        response_cache.put(request_hash, response.model_dump())
+                        llm_response_cache.record_lookup('phrase_classifier', model_name, False)
                     break  # Sucesso, sair do loop
                     
                 except json.JSONDecodeError as e:
@@ -11,32 +11,422 @@ Regras suportadas:
 - queue_size_lt/gt: Tamanho da fila de um worker
 - hour_between: Horário do dia
 - template_id_eq/in: Template específico
+
+🆕 v4.8.0: route() não acessa banco nem Redis no caminho crítico:
+- Regras compiladas em closures ao carregar (CompiledRule)
+- Regras/workers/tamanhos de fila em snapshots com TTL curto, recarregados
+  em background quando vencem
+- Decisões gravadas em lote por uma thread (RoutingDecisionLog)
 """
 
 import os
 import time
+import queue
+import atexit
 import logging
+import threading
 import redis
+from collections import Counter
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Callable, Dict, Any, Optional, List, Tuple
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+# 🆕 Rollups do dashboard (decisões por worker por minuto/hora)
+from app.services.pipeline_stats_rollup import STATS_ROLLUPS_ENABLED, record_routing_decision
+
 logger = logging.getLogger(__name__)
 
+# 🆕 v4.8.0: Snapshots em memória (TTL curto, refresh em background depois do TTL)
+ROUTER_RULES_TTL_SECONDS = float(os.environ.get('ROUTER_RULES_TTL_SECONDS', 60))
+ROUTER_WORKERS_TTL_SECONDS = float(os.environ.get('ROUTER_WORKERS_TTL_SECONDS', 10))
+ROUTER_QUEUE_SIZES_TTL_SECONDS = float(os.environ.get('ROUTER_QUEUE_SIZES_TTL_SECONDS', 2))
+# Depois de TTL × ROUTER_MAX_STALE_FACTOR o snapshot é recarregado de forma síncrona
+ROUTER_MAX_STALE_FACTOR = 5
+
+# 🆕 v4.8.0: Log de decisões em lote numa thread (ROLLBACK: 'false' grava síncrono no route)
+ROUTER_ASYNC_LOG_ENABLED = os.environ.get('ROUTER_ASYNC_LOG', 'true').lower() == 'true'
+ROUTER_LOG_BATCH_SIZE = int(os.environ.get('ROUTER_LOG_BATCH_SIZE', 200))
+ROUTER_LOG_FLUSH_SECONDS = float(os.environ.get('ROUTER_LOG_FLUSH_SECONDS', 1.0))
+ROUTER_LOG_QUEUE_MAX = 10000
+
+# Filas Modal sempre consultadas (mesmo sem worker cadastrado)
+DEFAULT_QUEUE_WORKERS = ('modal', 'modal-cpu-light')
+
+
+# ═══════════════════════════════════════════════════════════════
+# REGRAS COMPILADAS
+# ═══════════════════════════════════════════════════════════════
+
+# Predicado: contexto → (match, razão)
+Predicate = Callable[[Dict[str, Any]], Tuple[bool, str]]
+
+
+def compile_condition(condition_key: str, condition_value: Any, target_worker_id: str,
+                      conditions: Dict[str, Any]) -> Optional[Predicate]:
+    """
+    Compila uma condição em closure (chave e limites resolvidos uma vez).
+
+    O contexto tem: video_duration, segments, template_id, hour, queue_sizes.
+
+    Returns:
+        Predicado, ou None para campos auxiliares/condições desconhecidas
+        (ignoradas, não bloqueiam a regra)
+    """
+    # Duração do vídeo
+    if condition_key == 'video_duration_lt':
+        def predicate(ctx):
+            d = ctx['video_duration']
+            return (True, f"duration {d:.1f}s < {condition_value}s") if d < condition_value else (False, "")
+        return predicate
+
+    if condition_key == 'video_duration_gt':
+        def predicate(ctx):
+            d = ctx['video_duration']
+            return (True, f"duration {d:.1f}s > {condition_value}s") if d > condition_value else (False, "")
+        return predicate
+
+    if condition_key == 'video_duration_between':
+        min_d, max_d = condition_value
+
+        def predicate(ctx):
+            d = ctx['video_duration']
+            return (True, f"duration {d:.1f}s in [{min_d}, {max_d}]") if min_d <= d <= max_d else (False, "")
+        return predicate
+
+    # Segmentos
+    if condition_key == 'segments_lt':
+        def predicate(ctx):
+            n = ctx['segments']
+            return (True, f"segments {n} < {condition_value}") if n < condition_value else (False, "")
+        return predicate
+
+    if condition_key == 'segments_lte':
+        def predicate(ctx):
+            n = ctx['segments']
+            return (True, f"segments {n} <= {condition_value}") if n <= condition_value else (False, "")
+        return predicate
+
+    if condition_key == 'segments_gt':
+        def predicate(ctx):
+            n = ctx['segments']
+            return (True, f"segments {n} > {condition_value}") if n > condition_value else (False, "")
+        return predicate
+
+    if condition_key == 'segments_between':
+        min_s, max_s = condition_value
+
+        def predicate(ctx):
+            n = ctx['segments']
+            return (True, f"segments {n} in [{min_s}, {max_s}]") if min_s <= n <= max_s else (False, "")
+        return predicate
+
+    # Fila (do worker em conditions['worker'] ou do target da regra)
+    if condition_key in ('queue_size_gt', 'queue_size_lt'):
+        worker = conditions.get('worker', target_worker_id or '')
+        if condition_key == 'queue_size_gt':
+            def predicate(ctx):
+                size = ctx['queue_sizes'].get(worker, 0)
+                return (True, f"queue({worker}) {size} > {condition_value}") if size > condition_value else (False, "")
+        else:
+            def predicate(ctx):
+                size = ctx['queue_sizes'].get(worker, 0)
+                return (True, f"queue({worker}) {size} < {condition_value}") if size < condition_value else (False, "")
+        return predicate
+
+    # Horário
+    if condition_key == 'hour_between':
+        min_h, max_h = condition_value
+
+        def predicate(ctx):
+            h = ctx['hour']
+            return (True, f"hour {h} in [{min_h}, {max_h}]") if min_h <= h <= max_h else (False, "")
+        return predicate
+
+    # Template
+    if condition_key == 'template_id_eq':
+        def predicate(ctx):
+            return (True, "template matches") if ctx['template_id'] == condition_value else (False, "")
+        return predicate
+
+    if condition_key == 'template_id_in':
+        allowed = frozenset(condition_value or [])
+
+        def predicate(ctx):
+            return (True, "template in list") if ctx['template_id'] in allowed else (False, "")
+        return predicate
+
+    # Campos auxiliares (não são condição)
+    if condition_key in ('worker',):
+        return None
+
+    logger.warning(f"🚦 [QueueRouter] Condição desconhecida: {condition_key}")
+    return None  # Ignorar condições desconhecidas (não bloquear)
+
+
+class CompiledRule:
+    """Regra de roteamento com as condições já compiladas em predicados (AND)."""
+
+    __slots__ = ('rule', 'applies_to', 'predicates', 'is_fallback')
+
+    def __init__(self, rule: Dict):
+        self.rule = rule
+        self.applies_to = rule.get('applies_to')
+        conditions = rule.get('conditions') or {}
+        target = rule.get('target_worker_id', '')
+        self.is_fallback = not conditions
+        self.predicates: List[Predicate] = [
+            predicate for predicate in (
+                compile_condition(key, value, target, conditions)
+                for key, value in conditions.items()
+            )
+            if predicate is not None
+        ]
+
+    def evaluate(self, ctx: Dict[str, Any]) -> Optional[List[str]]:
+        """Razões do match, ou None se alguma condição falhou."""
+        # Regra sem condições = fallback (sempre match)
+        if self.is_fallback:
+            return ["fallback (no conditions)"]
+        reasons = []
+        for predicate in self.predicates:
+            match, reason = predicate(ctx)
+            if not match:
+                return None  # AND: qualquer falha invalida a regra
+            if reason:
+                reasons.append(reason)
+        return reasons
+
+
+# ═══════════════════════════════════════════════════════════════
+# SNAPSHOTS EM MEMÓRIA
+# ═══════════════════════════════════════════════════════════════
+
+class _Snapshot:
+    """
+    Valor carregado por `loader` e servido da memória.
+
+    - Dentro do TTL: servido direto
+    - Vencido (até TTL × ROUTER_MAX_STALE_FACTOR): servido e recarregado em background
+    - Ausente ou muito velho: recarregado de forma síncrona
+    Se o loader falha, o último valor é mantido (ou `default`).
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any], ttl_seconds: float, default: Any):
+        self.name = name
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._default = default
+        self._value = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self) -> Any:
+        age = time.monotonic() - self._loaded_at
+        if self._value is not None and age < self.ttl_seconds:
+            return self._value
+        if self._value is not None and age < self.ttl_seconds * ROUTER_MAX_STALE_FACTOR:
+            self._refresh_in_background()
+            return self._value
+        return self.refresh()
+
+    def refresh(self) -> Any:
+        try:
+            value = self._loader()
+        except Exception as e:
+            logger.warning(f"🚦 [QueueRouter] Erro ao carregar {self.name}: {e}")
+            return self._value if self._value is not None else self._default
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic()
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def _run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name=f"router_{self.name}", daemon=True).start()
+
+
+# ═══════════════════════════════════════════════════════════════
+# LOG DE DECISÕES (ASYNC, EM LOTE)
+# ═══════════════════════════════════════════════════════════════
+
+class RoutingDecisionLog:
+    """
+    Grava decisões em routing_logs fora do caminho crítico do job.
+
+    route() só enfileira; uma thread daemon grava em lotes (uma conexão,
+    um INSERT multi-linha, contadores de regra agregados por lote). Se o
+    lote falha, as decisões são regravadas uma a uma.
+    """
+
+    def __init__(self, connection_factory: Callable, async_enabled: bool = ROUTER_ASYNC_LOG_ENABLED):
+        self._connection_factory = connection_factory
+        self.async_enabled = async_enabled
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=ROUTER_LOG_QUEUE_MAX)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, decision: Dict[str, Any]) -> None:
+        if not self.async_enabled:
+            self._write([decision])
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(decision)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"🚦 [QueueRouter] Fila de log cheia, decisão descartada ({self.dropped} no total)")
+
+    def flush(self) -> None:
+        """Grava tudo o que está na fila (usado no shutdown)."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def _ensure_thread(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="router_decision_log", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + ROUTER_LOG_FLUSH_SECONDS
+            while len(batch) < ROUTER_LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Grava o lote numa transação. Se o INSERT do lote falha (ex: uma
+        decisão com valor inválido), grava linha a linha para que só as
+        decisões problemáticas sejam descartadas.
+        """
+        try:
+            conn = self._connection_factory()
+        except Exception as e:
+            logger.warning(f"🚦 [QueueRouter] Erro ao logar {len(batch)} decisões: {e}")
+            return
+
+        try:
+            try:
+                self._insert(conn, batch)
+                logger.debug(f"🚦 [QueueRouter] {len(batch)} decisões gravadas")
+                return
+            except Exception as e:
+                conn.rollback()
+                if len(batch) == 1:
+                    logger.warning(f"🚦 [QueueRouter] Erro ao logar decisão: {e}")
+                    return
+                logger.warning(f"🚦 [QueueRouter] Lote de {len(batch)} decisões falhou ({e}), gravando uma a uma")
+
+            failed = 0
+            for decision in batch:
+                try:
+                    self._insert(conn, [decision])
+                except Exception as e:
+                    conn.rollback()
+                    failed += 1
+                    logger.warning(f"🚦 [QueueRouter] Decisão do job {decision.get('job_id')} descartada: {e}")
+            if failed:
+                logger.warning(f"🚦 [QueueRouter] {failed}/{len(batch)} decisões descartadas")
+        except Exception as e:
+            logger.warning(f"🚦 [QueueRouter] Erro ao logar {len(batch)} decisões: {e}")
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _insert(conn, batch: List[Dict[str, Any]]) -> None:
+        """INSERT multi-linha + contadores das regras + rollups, em uma transação."""
+        with conn.cursor() as cur:
+            values_sql = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(batch))
+            params: List[Any] = []
+            for d in batch:
+                params.extend((
+                    d['job_id'], d['rule_id'], d['rule_name'],
+                    d['video_duration'], d['segments'], d['template_id'],
+                    d['selected_worker'], d['was_fallback'],
+                    d['evaluation_time_ms'], d['rules_evaluated'],
+                ))
+            cur.execute(f"""
+                INSERT INTO routing_logs (
+                    job_id, rule_id, rule_name, 
+                    video_duration_seconds, segments_count, template_id,
+                    selected_worker_id, was_fallback,
+                    evaluation_time_ms, rules_evaluated
+                ) VALUES {values_sql}
+            """, params)
+
+            # Incrementar contador de matches das regras (agregado por lote)
+            for rule_id, count in Counter(d['rule_id'] for d in batch if d['rule_id']).items():
+                cur.execute("""
+                    UPDATE routing_rules 
+                    SET times_matched = times_matched + %s, 
+                        last_matched_at = NOW()
+                    WHERE id = %s
+                """, (count, rule_id))
+
+            if STATS_ROLLUPS_ENABLED:
+                for d in batch:
+                    record_routing_decision(cur, d['selected_worker'], d['was_fallback'])
+
+        conn.commit()
+
 
 class QueueRouterService:
     """
     Roteador de filas inteligente.
     Avalia regras de roteamento e retorna o worker mais adequado.
+
+    🆕 v4.8.0: Regras compiladas em predicados ao carregar; regras, workers
+    e tamanhos de fila servidos de snapshots em memória; decisões gravadas
+    em lote fora do route().
     """
     
     def __init__(self):
         self.db_url = os.environ.get('DATABASE_URL')
         self.redis_url = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
-        self._rules_cache = None
-        self._rules_cache_time = 0
-        self._cache_ttl = 60  # Recarregar regras a cada 60 segundos
+        self._redis = None
+        
+        self._rules = _Snapshot('rules', self._fetch_rules, ROUTER_RULES_TTL_SECONDS, default=[])
+        self._workers = _Snapshot('workers', self._fetch_workers, ROUTER_WORKERS_TTL_SECONDS, default={})
+        self._queue_sizes = _Snapshot('queue_sizes', self._fetch_queue_sizes, ROUTER_QUEUE_SIZES_TTL_SECONDS, default={})
+        self.decision_log = RoutingDecisionLog(self._get_db_connection)
         
         logger.info("🚦 [QueueRouter] Serviço inicializado")
     
@@ -47,19 +437,20 @@ class QueueRouterService:
         return psycopg2.connect(self.db_url)
     
     def _get_redis_connection(self):
-        """Obtém conexão com Redis."""
-        return redis.from_url(self.redis_url)
+        """Obtém conexão com Redis (reutilizada entre chamadas)."""
+        if self._redis is None:
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
     
-    def _load_rules(self, applies_to: str = 'matting') -> List[Dict]:
-        """Carrega regras do banco de dados (com cache)."""
-        now = time.time()
-        
-        # Usar cache se ainda válido
-        if self._rules_cache and (now - self._rules_cache_time) < self._cache_ttl:
-            return [r for r in self._rules_cache if r['applies_to'] in (applies_to, 'all')]
-        
+    def invalidate(self) -> None:
+        """Força recarga de regras e workers (após alterações no admin)."""
+        self._rules.invalidate()
+        self._workers.invalidate()
+    
+    def _fetch_rules(self) -> List[CompiledRule]:
+        """Carrega e compila as regras habilitadas (ordem de prioridade)."""
+        conn = self._get_db_connection()
         try:
-            conn = self._get_db_connection()
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT * FROM routing_rules 
@@ -67,183 +458,80 @@ class QueueRouterService:
                     ORDER BY priority DESC
                 """)
                 rules = cur.fetchall()
+        finally:
             conn.close()
-            
-            self._rules_cache = [dict(r) for r in rules]
-            self._rules_cache_time = now
-            
-            logger.debug(f"🚦 [QueueRouter] {len(rules)} regras carregadas")
-            return [r for r in self._rules_cache if r['applies_to'] in (applies_to, 'all')]
-            
-        except Exception as e:
-            logger.error(f"🚦 [QueueRouter] Erro ao carregar regras: {e}")
-            return []
+        
+        compiled = [CompiledRule(dict(r)) for r in rules]
+        logger.debug(f"🚦 [QueueRouter] {len(compiled)} regras carregadas e compiladas")
+        return compiled
     
-    def _load_workers(self) -> Dict[str, Dict]:
-        """Carrega workers do banco de dados."""
+    def _fetch_workers(self) -> Dict[str, Dict]:
+        """Carrega workers habilitados do banco de dados."""
+        conn = self._get_db_connection()
         try:
-            conn = self._get_db_connection()
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 cur.execute("""
                     SELECT * FROM workers 
                     WHERE enabled = true
                 """)
                 workers = cur.fetchall()
+        finally:
             conn.close()
-            
-            return {w['worker_id']: dict(w) for w in workers}
-            
-        except Exception as e:
-            logger.error(f"🚦 [QueueRouter] Erro ao carregar workers: {e}")
-            return {}
+        
+        return {w['worker_id']: dict(w) for w in workers}
     
-    def _get_queue_sizes(self) -> Dict[str, int]:
-        """Obtém tamanho das filas Redis."""
-        try:
-            r = self._get_redis_connection()
-            sizes = {}
-            
-            # Padrões de filas conhecidas (Modal workers)
-            for worker_id in ['modal', 'modal-cpu-light']:
-                queue_key = f"video:queue:{worker_id}"
-                sizes[worker_id] = r.llen(queue_key)
-            
-            return sizes
-            
-        except Exception as e:
-            logger.warning(f"🚦 [QueueRouter] Erro ao buscar filas Redis: {e}")
-            return {}
+    def _fetch_queue_sizes(self) -> Dict[str, int]:
+        """Tamanho das filas Redis dos workers conhecidos (um round-trip)."""
+        worker_ids = list(dict.fromkeys([*DEFAULT_QUEUE_WORKERS, *self._workers.get().keys()]))
+        pipe = self._get_redis_connection().pipeline(transaction=False)
+        for worker_id in worker_ids:
+            pipe.llen(f"video:queue:{worker_id}")
+        return dict(zip(worker_ids, pipe.execute()))
     
-    def _evaluate_condition(
-        self,
-        condition_key: str,
-        condition_value: Any,
-        context: Dict[str, Any],
-        queue_sizes: Dict[str, int]
-    ) -> Tuple[bool, str]:
-        """
-        Avalia uma condição individual.
-        
-        Returns:
-            Tuple (match: bool, reason: str)
-        """
-        video_duration = context.get('video_duration', 0)
-        segments = context.get('segments', 1)
-        template_id = context.get('template_id')
-        
-        # Duração do vídeo
-        if condition_key == 'video_duration_lt':
-            if video_duration < condition_value:
-                return True, f"duration {video_duration:.1f}s < {condition_value}s"
-            return False, ""
-        
-        if condition_key == 'video_duration_gt':
-            if video_duration > condition_value:
-                return True, f"duration {video_duration:.1f}s > {condition_value}s"
-            return False, ""
-        
-        if condition_key == 'video_duration_between':
-            min_d, max_d = condition_value
-            if min_d <= video_duration <= max_d:
-                return True, f"duration {video_duration:.1f}s in [{min_d}, {max_d}]"
-            return False, ""
-        
-        # Segmentos
-        if condition_key == 'segments_lt':
-            if segments < condition_value:
-                return True, f"segments {segments} < {condition_value}"
-            return False, ""
-        
-        if condition_key == 'segments_lte':
-            if segments <= condition_value:
-                return True, f"segments {segments} <= {condition_value}"
-            return False, ""
-        
-        if condition_key == 'segments_gt':
-            if segments > condition_value:
-                return True, f"segments {segments} > {condition_value}"
-            return False, ""
-        
-        if condition_key == 'segments_between':
-            min_s, max_s = condition_value
-            if min_s <= segments <= max_s:
-                return True, f"segments {segments} in [{min_s}, {max_s}]"
-            return False, ""
-        
-        # Fila
-        if condition_key == 'queue_size_gt':
-            # Verificar qual worker está sendo verificado
-            worker = context.get('_conditions', {}).get('worker', context.get('target_worker_id', ''))
-            queue_size = queue_sizes.get(worker, 0)
-            if queue_size > condition_value:
-                return True, f"queue({worker}) {queue_size} > {condition_value}"
-            return False, ""
-        
-        if condition_key == 'queue_size_lt':
-            worker = context.get('_conditions', {}).get('worker', context.get('target_worker_id', ''))
-            queue_size = queue_sizes.get(worker, 0)
-            if queue_size < condition_value:
-                return True, f"queue({worker}) {queue_size} < {condition_value}"
-            return False, ""
-        
-        # Horário
-        if condition_key == 'hour_between':
-            current_hour = datetime.now().hour
-            min_h, max_h = condition_value
-            if min_h <= current_hour <= max_h:
-                return True, f"hour {current_hour} in [{min_h}, {max_h}]"
-            return False, ""
-        
-        # Template
-        if condition_key == 'template_id_eq':
-            if template_id == condition_value:
-                return True, "template matches"
-            return False, ""
-        
-        if condition_key == 'template_id_in':
-            if template_id in condition_value:
-                return True, "template in list"
-            return False, ""
-        
-        # Ignorar campos especiais
-        if condition_key in ('worker',):
-            return True, ""  # Campo auxiliar, não é condição
-        
-        logger.warning(f"🚦 [QueueRouter] Condição desconhecida: {condition_key}")
-        return True, ""  # Ignorar condições desconhecidas (não bloquear)
+    def _load_rules(self, applies_to: str = 'matting') -> List[CompiledRule]:
+        """Regras compiladas que se aplicam ao serviço."""
+        return [r for r in self._rules.get() if r.applies_to in (applies_to, 'all')]
     
-    def _evaluate_rule(
-        self,
-        rule: Dict,
-        context: Dict[str, Any],
-        queue_sizes: Dict[str, int]
-    ) -> Tuple[bool, List[str]]:
+    def _load_workers(self) -> Dict[str, Dict]:
+        """Workers habilitados (snapshot)."""
+        return self._workers.get()
+    
+    def _get_queue_sizes(self) -> Dict[str, int]:
+        """Tamanhos de fila (snapshot)."""
+        return self._queue_sizes.get()
+    
+    @staticmethod
+    def _select(
+        rules: List[CompiledRule],
+        workers: Dict[str, Dict],
+        ctx: Dict[str, Any]
+    ) -> Tuple[Optional[Dict], Optional[str], bool, List[str], int]:
         """
-        Avalia se uma regra faz match com o contexto.
+        Primeira regra (por prioridade) que faz match e o worker resultante.
         
         Returns:
-            Tuple (match: bool, reasons: List[str])
+            (regra, worker, was_fallback, razões, regras avaliadas até o match)
         """
-        conditions = rule.get('conditions', {})
-        
-        # Regra sem condições = fallback (sempre match)
-        if not conditions:
-            return True, ["fallback (no conditions)"]
-        
-        # Adicionar condições ao contexto para acesso em avaliação
-        context['_conditions'] = conditions
-        context['target_worker_id'] = rule.get('target_worker_id', '')
-        
-        match_reasons = []
-        
-        for key, value in conditions.items():
-            match, reason = self._evaluate_condition(key, value, context, queue_sizes)
-            if not match:
-                return False, []  # AND: qualquer falha invalida a regra
-            if reason:
-                match_reasons.append(reason)
-        
-        return True, match_reasons
+        for evaluated, compiled in enumerate(rules, start=1):
+            reasons = compiled.evaluate(ctx)
+            if reasons is None:
+                continue
+            
+            rule = compiled.rule
+            # Verificar se o target está disponível
+            target = rule['target_worker_id']
+            target_worker = workers.get(target)
+            
+            if target_worker and target_worker['status'] == 'online':
+                return rule, target, False, reasons, evaluated
+            if rule.get('fallback_worker_id'):
+                fallback_id = rule['fallback_worker_id']
+                fallback_worker = workers.get(fallback_id)
+                if fallback_worker and fallback_worker['status'] == 'online':
+                    return rule, fallback_id, True, reasons, evaluated
+            return rule, target, False, reasons, evaluated  # Tentar mesmo assim
+        
+        return None, None, False, [], len(rules)
     
     def _log_routing_decision(
         self,
@@ -255,44 +543,52 @@ class QueueRouterService:
         rules_evaluated: int,
         evaluation_time_ms: int
     ):
-        """Loga a decisão de roteamento para auditoria."""
-        try:
-            conn = self._get_db_connection()
-            with conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO routing_logs (
-                        job_id, rule_id, rule_name, 
-                        video_duration_seconds, segments_count, template_id,
-                        selected_worker_id, was_fallback,
-                        evaluation_time_ms, rules_evaluated
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    job_id if job_id and len(job_id) == 36 else None,  # Apenas UUIDs válidos
-                    rule['id'] if rule else None,
-                    rule['name'] if rule else None,
-                    context.get('video_duration'),
-                    context.get('segments'),
-                    context.get('template_id') if context.get('template_id') and len(context.get('template_id', '')) == 36 else None,
-                    selected_worker,
-                    was_fallback,
-                    evaluation_time_ms,
-                    rules_evaluated
-                ))
-                
-                # Incrementar contador de matches da regra
-                if rule:
-                    cur.execute("""
-                        UPDATE routing_rules 
-                        SET times_matched = times_matched + 1, 
-                            last_matched_at = NOW()
-                        WHERE id = %s
-                    """, (rule['id'],))
-                
-                conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            logger.warning(f"🚦 [QueueRouter] Erro ao logar decisão: {e}")
+        """Enfileira a decisão de roteamento para auditoria."""
+        template_id = context.get('template_id')
+        self.decision_log.submit({
+            'job_id': job_id if job_id and len(job_id) == 36 else None,  # Apenas UUIDs válidos
+            'rule_id': rule['id'] if rule else None,
+            'rule_name': rule['name'] if rule else None,
+            'video_duration': context.get('video_duration'),
+            'segments': context.get('segments'),
+            'template_id': template_id if template_id and len(template_id) == 36 else None,
+            'selected_worker': selected_worker,
+            'was_fallback': was_fallback,
+            'evaluation_time_ms': evaluation_time_ms,
+            'rules_evaluated': rules_evaluated,
+        })
+    
+    def simulate(self, contexts: List[Dict[str, Any]], applies_to: str = 'matting') -> List[Dict[str, Any]]:
+        """
+        Avalia vários contextos com os snapshots atuais, sem logar decisões.
+        
+        Args:
+            contexts: [{video_duration, segments, template_id}, ...]
+        
+        Returns:
+            [{worker_id, rule_id, was_fallback}, ...] na mesma ordem
+        """
+        rules = self._load_rules(applies_to)
+        workers = self._load_workers()
+        queue_sizes = self._get_queue_sizes()
+        hour = datetime.now().hour
+        
+        decisions = []
+        for context in contexts:
+            ctx = {
+                'video_duration': context.get('video_duration', 0),
+                'segments': context.get('segments', 1),
+                'template_id': context.get('template_id'),
+                'hour': hour,
+                'queue_sizes': queue_sizes,
+            }
+            rule, worker, was_fallback, _, _ = self._select(rules, workers, ctx)
+            decisions.append({
+                'worker_id': worker or 'modal',
+                'rule_id': str(rule['id']) if rule else None,
+                'was_fallback': was_fallback,
+            })
+        return decisions
     
     def route(
         self,
@@ -343,18 +639,15 @@ class QueueRouterService:
                 logger.info(f"   🎯 [OVERRIDE] Worker forçado: {worker_override} (bypass das regras)")
                 
                 # Logar decisão com override
-                try:
-                    self._log_routing_decision(
-                        job_id=job_id,
-                        applies_to=applies_to,
-                        input_data=context,
-                        evaluated_rules=[],
-                        selected_rule_id=None,
-                        selected_worker_id=worker_override,
-                        was_fallback=False
-                    )
-                except Exception as e:
-                    logger.warning(f"🚦 [QueueRouter] Erro ao logar override: {e}")
+                self._log_routing_decision(
+                    job_id=job_id,
+                    rule=None,
+                    selected_worker=worker_override,
+                    was_fallback=False,
+                    context=context,
+                    rules_evaluated=0,
+                    evaluation_time_ms=int((time.time() - start_time) * 1000)
+                )
                 
                 return {
                     'worker_id': worker_override,
@@ -381,40 +674,22 @@ class QueueRouterService:
                 'reasons': ['no rules configured']
             }
         
-        # Avaliar cada regra por ordem de prioridade
-        selected_rule = None
-        selected_worker = None
-        was_fallback = False
-        match_reasons = []
+        # Avaliar regras compiladas por ordem de prioridade
+        ctx = {
+            **context,
+            'hour': datetime.now().hour,
+            'queue_sizes': queue_sizes,
+        }
+        selected_rule, selected_worker, was_fallback, match_reasons, rules_evaluated = self._select(
+            rules, workers, ctx
+        )
         
-        for rule in rules:
-            match, reasons = self._evaluate_rule(rule, context.copy(), queue_sizes)
-            
-            if match:
-                selected_rule = rule
-                match_reasons = reasons
-                
-                # Verificar se o target está disponível
-                target = rule['target_worker_id']
-                target_worker = workers.get(target)
-                
-                if target_worker and target_worker['status'] == 'online':
-                    selected_worker = target
-                    logger.info(f"   ✅ Regra '{rule['name']}' → {target}")
-                elif rule.get('fallback_worker_id'):
-                    fallback_id = rule['fallback_worker_id']
-                    fallback_worker = workers.get(fallback_id)
-                    if fallback_worker and fallback_worker['status'] == 'online':
-                        selected_worker = fallback_id
-                        was_fallback = True
-                        logger.info(f"   ⚠️ Regra '{rule['name']}' → {target} offline, usando fallback {fallback_id}")
-                    else:
-                        selected_worker = target  # Tentar mesmo assim
-                        logger.warning(f"   ⚠️ Target e fallback offline, tentando {target} mesmo assim")
-                else:
-                    selected_worker = target
-                    
-                break  # Primeira regra que faz match
+        if selected_rule:
+            target = selected_rule['target_worker_id']
+            if was_fallback:
+                logger.info(f"   ⚠️ Regra '{selected_rule['name']}' → {target} offline, usando fallback {selected_worker}")
+            else:
+                logger.info(f"   ✅ Regra '{selected_rule['name']}' → {selected_worker}")
         
         # Fallback absoluto se nenhuma regra fez match
         if not selected_worker:
@@ -431,7 +706,7 @@ class QueueRouterService:
             selected_worker=selected_worker,
             was_fallback=was_fallback,
             context=context,
-            rules_evaluated=len(rules),
+            rules_evaluated=rules_evaluated,
             evaluation_time_ms=evaluation_time_ms
         )
         
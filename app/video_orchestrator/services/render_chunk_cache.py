@@ -0,0 +1,319 @@
+"""
+🆕 v4.8.0: Render Chunk Cache - Re-render incremental por chunk
+
+Corrigir um erro de digitação em uma legenda e re-renderizar (routes/debug,
+render_versions) renderizava o vídeo inteiro de novo. Com a timeline cortada
+em uma grade fixa (SceneAwareChunkPlanner.plan_grid), cada chunk tem uma
+entrada efetiva bem definida:
+
+- configurações globais (canvas, fps, base layer, render/quality settings)
+- o próprio frame range
+- os itens de cada track (legendas, PNGs, overlays, placas) que intersectam
+  o chunk, com margem para animações de entrada/saída
+
+O hash dessa entrada identifica o chunk. Chunks já renderizados ficam no
+Redis (hash → chunk_path no volume compartilhado) e, no re-render, só os
+chunks cujo hash mudou voltam para os workers antes do concat.
+
+Os arquivos saem do volume quando a entrada expira (pop_expired, varredura
+periódica) ou quando o mesmo job re-renderiza aquele trecho com outro hash
+(evict_job).
+
+Uso:
+    hasher = ChunkInputHasher(payload, fps)
+    key = hasher.hash_range(start_frame, end_frame)
+
+    cache = get_render_chunk_cache()
+    hits = cache.get_many(project_id, [key, ...])
+    cache.put(project_id, key, chunk_result, job_id=job_id)
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...utils.json_payload import encode_json
+from ...utils.redis_json_cache import RedisJSONCache
+from .chunk_boundary_planner import plate_windows_ms
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato do hash (incrementar invalida todos os chunks em cache)
+CHUNK_HASH_VERSION = 'v1'
+# Margem ao redor do chunk para itens com animação que "vaza" do intervalo
+CHUNK_HASH_MARGIN_MS = int(os.environ.get('RENDER_CHUNK_HASH_MARGIN_MS', 1000))
+# Tempo de vida das entradas no Redis (renovado a cada reaproveitamento); ao
+# expirar, o arquivo do chunk é removido do volume pela varredura
+CHUNK_CACHE_TTL_SECONDS = int(os.environ.get('RENDER_CHUNK_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+CHUNK_CACHE_PREFIX = 'render:chunk_cache'
+# Sorted set dos arquivos de chunk registrados (score = expiração da entrada)
+CHUNK_FILES_KEY = f'{CHUNK_CACHE_PREFIX}:files'
+# Varredura dos arquivos expirados: no máximo uma por intervalo, em lotes
+CHUNK_SWEEP_INTERVAL_SECONDS = int(os.environ.get('RENDER_CHUNK_SWEEP_INTERVAL_SECONDS', 3600))
+CHUNK_SWEEP_BATCH = int(os.environ.get('RENDER_CHUNK_SWEEP_BATCH', 200))
+CHUNK_SWEEP_LOCK_KEY = f'{CHUNK_CACHE_PREFIX}:sweep_lock'
+
+# Campos do payload que afetam todos os frames
+GLOBAL_INPUT_KEYS = (
+    'canvas', 'fps', 'video_url', 'base_type', 'base_layer',
+    'render_settings', 'quality_settings',
+)
+
+
+def _digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _item_window_ms(item: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """Intervalo (ms) de um item de track, ou None se não tem tempo definido."""
+    start, end = item.get('start_time'), item.get('end_time')
+    if start is None or end is None:
+        return None
+    try:
+        return float(start), float(end)
+    except (TypeError, ValueError):
+        return None
+
+
+class ChunkInputHasher:
+    """
+    Calcula o hash da entrada efetiva de um trecho da timeline.
+
+    Os itens são serializados e hasheados uma única vez no construtor;
+    hash_range apenas filtra os que intersectam o trecho.
+    """
+
+    def __init__(self, payload: Dict[str, Any], fps: int,
+                 margin_ms: int = CHUNK_HASH_MARGIN_MS):
+        self.fps = fps or 30
+        self.margin_ms = margin_ms
+
+        tracks = payload.get('tracks') or {}
+        global_parts = {k: payload.get(k) for k in GLOBAL_INPUT_KEYS}
+        untimed: Dict[str, List[str]] = {}
+        # (start_ms, end_ms, track_name, digest) dos itens com tempo
+        self._timed: List[Tuple[float, float, str, str]] = []
+
+        for track_name in sorted(tracks.keys()):
+            items = tracks[track_name]
+            if not isinstance(items, list):
+                untimed.setdefault(track_name, []).append(_digest(encode_json(items, sort_keys=True)))
+                continue
+
+            windows = plate_windows_ms(items) if track_name == 'video_segments' else None
+            for i, item in enumerate(items):
+                item_digest = _digest(encode_json(item, sort_keys=True))
+                window = windows[i] if windows is not None else (
+                    _item_window_ms(item) if isinstance(item, dict) else None
+                )
+                if window is None:
+                    untimed.setdefault(track_name, []).append(item_digest)
+                else:
+                    self._timed.append((window[0], window[1], track_name, item_digest))
+
+        global_parts['untimed_tracks'] = untimed
+        self._global_digest = _digest(encode_json(global_parts, sort_keys=True))
+
+    def hash_range(self, start_frame: int, end_frame: int) -> str:
+        """Hash de [start_frame, end_frame] (frames inclusivos)."""
+        window_start = start_frame * 1000.0 / self.fps - self.margin_ms
+        window_end = (end_frame + 1) * 1000.0 / self.fps + self.margin_ms
+
+        h = hashlib.sha256()
+        h.update(f"{CHUNK_HASH_VERSION}|{self._global_digest}|{start_frame}-{end_frame}".encode())
+        for item_start, item_end, track_name, item_digest in self._timed:
+            if item_end >= window_start and item_start <= window_end:
+                h.update(f"|{track_name}:{item_digest}".encode())
+        return h.hexdigest()
+
+
+class RenderChunkCache(RedisJSONCache):
+    """
+    Índice hash → chunk renderizado (Redis).
+
+    Guarda apenas a referência (chunk_path/b2_url): o arquivo continua no
+    volume compartilhado onde o worker o gravou. Sem Redis o cache fica
+    desabilitado e o render segue completo.
+
+    Cada arquivo registrado entra num sorted set (score = expiração, renovada
+    a cada reaproveitamento) e no índice do job que o renderizou. Quem
+    remove os arquivos é o chamador (WorkerPoolService): este índice só
+    devolve as referências que saíram do cache (pop_expired, evict_job,
+    invalidate).
+    """
+
+    PREFIX = CHUNK_CACHE_PREFIX
+    LOG_TAG = 'CHUNK CACHE'
+
+    def __init__(self, redis_client=None, ttl_seconds: int = CHUNK_CACHE_TTL_SECONDS):
+        super().__init__(redis_client, ttl_seconds)
+
+    def _project_key(self, project_id: str, chunk_hash: str) -> str:
+        return self._key(f"{project_id or 'none'}:{chunk_hash}")
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"{CHUNK_CACHE_PREFIX}:job:{job_id}"
+
+    @staticmethod
+    def _file_ref(entry: Dict[str, Any]) -> str:
+        """Membro do sorted set de arquivos (chunk_path + job_id do chunk)."""
+        return json.dumps([entry.get('chunk_path'), entry.get('chunk_job_id')])
+
+    @staticmethod
+    def _parse_ref(ref) -> Dict[str, Any]:
+        chunk_path, chunk_job_id = json.loads(ref)
+        return {'chunk_path': chunk_path, 'chunk_job_id': chunk_job_id}
+
+    def get_many(self, project_id: str, chunk_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retorna {hash: entrada} para os hashes encontrados (e renova o TTL deles)."""
+        if not chunk_hashes:
+            return {}
+        entries = self._mget_json([self._project_key(project_id, h) for h in chunk_hashes])
+        hits = {
+            chunk_hash: entry
+            for chunk_hash, entry in zip(chunk_hashes, entries)
+            if entry and entry.get('chunk_path')
+        }
+
+        client = self._client()
+        if hits and client:
+            expires_at = time.time() + self.ttl_seconds
+            try:
+                pipe = client.pipeline()
+                for chunk_hash, entry in hits.items():
+                    pipe.expire(self._project_key(project_id, chunk_hash), self.ttl_seconds)
+                    pipe.zadd(CHUNK_FILES_KEY, {self._file_ref(entry): expires_at})
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"⚠️ [CHUNK CACHE] Falha ao renovar TTL: {e}")
+        return hits
+
+    def put(self, project_id: str, chunk_hash: str, chunk_result: Dict[str, Any],
+            job_id: str = None) -> None:
+        """Registra o chunk renderizado (somente se tem chunk_path)."""
+        client = self._client()
+        if not client or not chunk_result.get('chunk_path'):
+            return
+        entry = {
+            'chunk_path': chunk_result.get('chunk_path'),
+            'chunk_job_id': chunk_result.get('chunk_job_id'),
+            'b2_url': chunk_result.get('b2_url'),
+            'start_frame': chunk_result.get('start_frame'),
+            'end_frame': chunk_result.get('end_frame'),
+            'rendered_at': time.time(),
+        }
+        ref = self._file_ref(entry)
+        try:
+            pipe = client.pipeline()
+            pipe.set(self._project_key(project_id, chunk_hash), json.dumps(entry), ex=self.ttl_seconds)
+            pipe.zadd(CHUNK_FILES_KEY, {ref: entry['rendered_at'] + self.ttl_seconds})
+            if job_id:
+                pipe.hset(self._job_key(job_id), chunk_hash, ref)
+                pipe.expire(self._job_key(job_id), self.ttl_seconds)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ [CHUNK CACHE] Falha ao gravar: {e}")
+
+    def _drop(self, client, project_id: str, refs_by_hash: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Remove as entradas cujo arquivo é o de refs_by_hash (outra entrada com
+        o mesmo hash, de outro job, é mantida) e tira os arquivos do índice.
+        """
+        hashes = list(refs_by_hash)
+        entries = self._mget_json([self._project_key(project_id, h) for h in hashes])
+        pipe = client.pipeline()
+        for chunk_hash, entry in zip(hashes, entries):
+            if entry is None or self._file_ref(entry) == refs_by_hash[chunk_hash]:
+                pipe.delete(self._project_key(project_id, chunk_hash))
+        pipe.zrem(CHUNK_FILES_KEY, *refs_by_hash.values())
+        pipe.execute()
+        return [self._parse_ref(ref) for ref in refs_by_hash.values()]
+
+    def invalidate(self, project_id: str, chunk_hashes: List[str]) -> List[Dict[str, Any]]:
+        """
+        Remove entradas (ex: arquivo não existe mais no volume).
+
+        Returns:
+            Referências ({chunk_path, chunk_job_id}) dos arquivos removidos do índice
+        """
+        client = self._client()
+        if not client or not chunk_hashes:
+            return []
+        keys = [self._project_key(project_id, h) for h in chunk_hashes]
+        live = [self._file_ref(entry) for entry in self._mget_json(keys) if entry]
+        try:
+            client.delete(*keys)
+            if live:
+                client.zrem(CHUNK_FILES_KEY, *live)
+            return [self._parse_ref(ref) for ref in live]
+        except Exception as e:
+            logger.warning(f"⚠️ [CHUNK CACHE] Falha ao invalidar: {e}")
+            return []
+
+    def evict_job(self, project_id: str, job_id: str, keep_hashes: List[str]) -> List[Dict[str, Any]]:
+        """
+        Tira do cache os chunks que o job renderizou antes e que o render
+        atual não reaproveita (ex: trecho cuja legenda foi corrigida).
+
+        Returns:
+            Referências dos arquivos que podem ser removidos do volume
+        """
+        client = self._client()
+        if not client or not job_id:
+            return []
+        try:
+            previous = client.hgetall(self._job_key(job_id)) or {}
+            keep = set(keep_hashes)
+            stale = {}
+            for chunk_hash, ref in previous.items():
+                chunk_hash = chunk_hash.decode() if isinstance(chunk_hash, bytes) else chunk_hash
+                if chunk_hash not in keep:
+                    stale[chunk_hash] = ref.decode() if isinstance(ref, bytes) else ref
+            if not stale:
+                return []
+            client.hdel(self._job_key(job_id), *stale)
+            return self._drop(client, project_id, stale)
+        except Exception as e:
+            logger.warning(f"⚠️ [CHUNK CACHE] Falha ao remover chunks antigos do job: {e}")
+            return []
+
+    def pop_expired(self, limit: int = CHUNK_SWEEP_BATCH) -> List[Dict[str, Any]]:
+        """
+        Retira do índice os arquivos cuja entrada expirou (varredura periódica).
+
+        No máximo uma varredura por CHUNK_SWEEP_INTERVAL_SECONDS entre todos os
+        processos (lock no Redis); fora da janela retorna [].
+
+        Returns:
+            Referências dos arquivos que podem ser removidos do volume
+        """
+        client = self._client()
+        if not client:
+            return []
+        try:
+            if not client.set(CHUNK_SWEEP_LOCK_KEY, '1', nx=True, ex=CHUNK_SWEEP_INTERVAL_SECONDS):
+                return []
+            refs = client.zrangebyscore(CHUNK_FILES_KEY, '-inf', time.time(), start=0, num=limit)
+            if not refs:
+                return []
+            client.zrem(CHUNK_FILES_KEY, *refs)
+            return [self._parse_ref(ref.decode() if isinstance(ref, bytes) else ref) for ref in refs]
+        except Exception as e:
+            logger.warning(f"⚠️ [CHUNK CACHE] Falha na varredura de expirados: {e}")
+            return []
+
+
+# Singleton
+_render_chunk_cache = None
+
+
+def get_render_chunk_cache() -> RenderChunkCache:
+    """Retorna instância singleton do RenderChunkCache."""
+    global _render_chunk_cache
+    if _render_chunk_cache is None:
+        _render_chunk_cache = RenderChunkCache()
+    return _render_chunk_cache
@@ -0,0 +1,452 @@
+"""
+🆕 v4.8.0: Render Coordinator - Distribuição de chunks com work stealing
+
+Substitui a divisão estática (1 chunk fixo por worker) do WorkerPoolService.
+Com a divisão estática o job fica tão lento quanto o worker mais lento, e um
+worker travado ou morto bloqueia tudo.
+
+FUNCIONAMENTO:
+1. A timeline é cortada sob demanda em chunks pequenos (guided scheduling):
+   cada worker livre "puxa" o próximo trecho, com tamanho proporcional à
+   sua vazão histórica (frames/s) e decrescente no final da timeline.
+2. Chunks que falham voltam para a fila e são reenviados para outro worker.
+3. Execução especulativa: se um chunk demora muito além do esperado para o
+   worker e há worker ocioso, uma cópia é disparada - vence quem terminar primeiro.
+4. A vazão de cada worker é registrada (EWMA) e usada nos próximos cortes.
+
+Com planned_ranges (render incremental, RENDER_INCREMENTAL=true, o padrão)
+os cortes vêm prontos da grade fixa e o passo 1 não roda: o tamanho dos
+chunks não depende da vazão (a grade precisa ser estável entre renders para
+o hash dos chunks bater). Reenvio, execução especulativa e o registro de
+vazão continuam valendo.
+
+O coordenador não sabe nada de HTTP: recebe uma função render_fn(worker, chunk)
+que retorna {"status": "success", "chunk_path": ...}. Em produção ela é o
+WorkerPoolService._render_chunk_on_worker; localmente pode ser um fake.
+
+Uso:
+    coordinator = RenderCoordinator(workers, render_fn, fps=30)
+    result = coordinator.run(duration_in_frames)
+    paths = [c["chunk_path"] for c in result["chunks"]]
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Mesmo mínimo dos cortes alinhados a cenas (uma única leitura do env)
+from .chunk_boundary_planner import RENDER_MIN_CHUNK_SECONDS as MIN_CHUNK_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Configuração (env)
+CHUNKS_PER_WORKER = int(os.environ.get('RENDER_CHUNKS_PER_WORKER', 3))
+SPECULATIVE_FACTOR = float(os.environ.get('RENDER_SPECULATIVE_FACTOR', 2.0))
+SPECULATIVE_GRACE_SECONDS = float(os.environ.get('RENDER_SPECULATIVE_GRACE_SECONDS', 30))
+MAX_CHUNK_ATTEMPTS = int(os.environ.get('RENDER_MAX_CHUNK_ATTEMPTS', 3))
+MAX_WORKER_FAILURES = int(os.environ.get('RENDER_MAX_WORKER_FAILURES', 2))
+
+
+@dataclass
+class RenderChunk:
+    """Trecho da timeline (frames inclusivos) e seu estado de execução."""
+    index: int
+    start_frame: int
+    end_frame: int
+    attempts: int = 0
+    done: bool = False
+    result: Optional[Dict[str, Any]] = None
+    running_on: List[str] = field(default_factory=list)
+
+    @property
+    def frame_count(self) -> int:
+        return self.end_frame - self.start_frame + 1
+
+    def to_frame_range(self) -> Dict[str, int]:
+        """Formato usado por WorkerPoolService._prepare_chunk_payload."""
+        return {
+            "worker_index": self.index,
+            "start_frame": self.start_frame,
+            "end_frame": self.end_frame,
+            "frame_count": self.frame_count,
+        }
+
+
+class WorkerThroughputTracker:
+    """
+    Vazão por worker (frames/s) com média móvel exponencial.
+
+    Compartilhado entre jobs do mesmo processo: os cortes de um job usam
+    o que foi medido nos anteriores.
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self._fps: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, worker_name: str, frames: int, seconds: float) -> None:
+        if frames <= 0 or seconds <= 0:
+            return
+        sample = frames / seconds
+        with self._lock:
+            previous = self._fps.get(worker_name)
+            self._fps[worker_name] = sample if previous is None else (
+                self.alpha * sample + (1 - self.alpha) * previous
+            )
+
+    def get(self, worker_name: str) -> Optional[float]:
+        with self._lock:
+            return self._fps.get(worker_name)
+
+    def relative_speed(self, worker_name: str, worker_names: List[str]) -> float:
+        """Vazão do worker relativa à média dos workers conhecidos (1.0 = média)."""
+        with self._lock:
+            known = [self._fps[w] for w in worker_names if w in self._fps]
+            own = self._fps.get(worker_name)
+        if not known or own is None:
+            return 1.0
+        mean = sum(known) / len(known)
+        return max(0.25, min(4.0, own / mean)) if mean > 0 else 1.0
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {k: round(v, 2) for k, v in self._fps.items()}
+
+
+_throughput_tracker = WorkerThroughputTracker()
+
+
+def get_throughput_tracker() -> WorkerThroughputTracker:
+    """Retorna o tracker global de vazão dos workers."""
+    return _throughput_tracker
+
+
+class RenderCoordinator:
+    """
+    Coordena a renderização de uma timeline entre N workers (pull + work stealing).
+
+    Args:
+        workers: Objetos worker (precisam de atributo .name)
+        render_fn: (worker, chunk, attempt) -> {"status": "success"|"error", "chunk_path": ...}
+        fps: Frames por segundo (para converter os limites em frames)
+        tracker: Tracker de vazão (default: global)
+        chunk_planner: (start_frame, suggested_end_frame, max_frame) -> end_frame ajustado.
+            Permite alinhar os cortes a limites naturais do vídeo.
+        should_stop: () -> bool. Se retornar True (ex: job cancelado), para de
+            distribuir chunks e retorna status "cancelled" sem esperar os em andamento.
+    """
+
+    def __init__(
+        self,
+        workers: List[Any],
+        render_fn: Callable[[Any, RenderChunk, int], Dict[str, Any]],
+        fps: int = 30,
+        tracker: WorkerThroughputTracker = None,
+        min_chunk_seconds: float = MIN_CHUNK_SECONDS,
+        chunks_per_worker: int = CHUNKS_PER_WORKER,
+        speculative_factor: float = SPECULATIVE_FACTOR,
+        speculative_grace_seconds: float = SPECULATIVE_GRACE_SECONDS,
+        max_chunk_attempts: int = MAX_CHUNK_ATTEMPTS,
+        max_worker_failures: int = MAX_WORKER_FAILURES,
+        poll_interval: float = 1.0,
+        chunk_planner: Callable[[int, int, int], int] = None,
+        should_stop: Callable[[], bool] = None,
+    ):
+        self.workers = list(workers)
+        self.render_fn = render_fn
+        self.fps = fps or 30
+        self.tracker = tracker or get_throughput_tracker()
+        self.min_chunk_frames = max(1, int(min_chunk_seconds * self.fps))
+        self.chunks_per_worker = max(1, chunks_per_worker)
+        self.speculative_factor = speculative_factor
+        self.speculative_grace_seconds = speculative_grace_seconds
+        self.max_chunk_attempts = max_chunk_attempts
+        self.max_worker_failures = max_worker_failures
+        self.poll_interval = poll_interval
+        self.chunk_planner = chunk_planner
+        self.should_stop = should_stop
+
+    # ─── Corte da timeline ───
+
+    def _next_chunk_end(self, cursor: int, max_frame: int, worker) -> int:
+        """Calcula o fim do próximo chunk (guided scheduling ponderado pela vazão)."""
+        remaining = max_frame - cursor + 1
+        active = max(1, len(self.workers))
+        base = math.ceil(remaining / (self.chunks_per_worker * active))
+        speed = self.tracker.relative_speed(worker.name, [w.name for w in self.workers])
+        size = max(self.min_chunk_frames, int(base * speed))
+
+        # Não deixar sobra menor que o mínimo no final
+        if remaining - size < self.min_chunk_frames:
+            size = remaining
+
+        end_frame = min(max_frame, cursor + size - 1)
+        if self.chunk_planner and end_frame < max_frame:
+            planned = self.chunk_planner(cursor, end_frame, max_frame)
+            if cursor <= planned <= max_frame:
+                end_frame = planned
+        return end_frame
+
+    def _expected_seconds(self, chunk: RenderChunk, worker) -> Optional[float]:
+        fps = self.tracker.get(worker.name)
+        if not fps:
+            known = [v for v in self.tracker.snapshot().values() if v > 0]
+            fps = (sum(known) / len(known)) if known else None
+        return (chunk.frame_count / fps) if fps else None
+
+    # ─── Execução ───
+
+    def run(self, duration_in_frames: int,
+            planned_ranges: List[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Renderiza [0, duration_in_frames - 1] usando os workers.
+
+        Args:
+            duration_in_frames: Total de frames da timeline
+            planned_ranges: Chunks pré-definidos (start_frame, end_frame,
+                chunk_index opcional). Quando informado, não há corte sob
+                demanda: apenas esses trechos são distribuídos (render
+                incremental). Reenvio e execução especulativa continuam valendo.
+
+        Returns:
+            {
+                "status": "success" | "error" | "cancelled",
+                "chunks": [resultados ordenados por start_frame],
+                "speculative_launches": N,
+                "reissued_chunks": N,
+                "throughput": {worker: frames/s},
+                "error": "..." (se falhou)
+            }
+        """
+        max_frame = duration_in_frames - 1
+        if max_frame < 0 or not self.workers:
+            return {"status": "error", "error": "Sem frames ou sem workers", "chunks": []}
+
+        chunks: List[RenderChunk] = []
+        pending: Deque[RenderChunk] = deque()
+        requeue: Deque[RenderChunk] = deque()
+        idle: Deque[Any] = deque(self.workers)
+        failures: Dict[str, int] = {}
+        running: Dict[Any, tuple] = {}  # future → (chunk, worker, started_at)
+        cursor = 0
+        speculative_launches = 0
+        reissued = 0
+        fatal_error = None
+        stopped = False
+
+        if planned_ranges is not None:
+            for i, r in enumerate(planned_ranges):
+                chunk = RenderChunk(index=r.get("chunk_index", i),
+                                    start_frame=r["start_frame"], end_frame=r["end_frame"])
+                chunks.append(chunk)
+                pending.append(chunk)
+            cursor = max_frame + 1
+            if not chunks:
+                return {"status": "success", "chunks": [], "total_chunks": 0,
+                        "speculative_launches": 0, "reissued_chunks": 0,
+                        "throughput": self.tracker.snapshot()}
+
+        executor = ThreadPoolExecutor(
+            max_workers=len(self.workers),
+            thread_name_prefix="render_chunk"
+        )
+
+        def _launch(chunk: RenderChunk, worker) -> None:
+            chunk.attempts += 1
+            chunk.running_on.append(worker.name)
+            future = executor.submit(self.render_fn, worker, chunk, chunk.attempts - 1)
+            running[future] = (chunk, worker, time.time())
+
+        def _speculative_candidate(worker) -> Optional[RenderChunk]:
+            now = time.time()
+            best, best_overdue = None, 0.0
+            for chunk, running_worker, started in running.values():
+                if chunk.done or len(chunk.running_on) > 1 or chunk.attempts >= self.max_chunk_attempts:
+                    continue
+                if running_worker.name == worker.name:
+                    continue
+                expected = self._expected_seconds(chunk, running_worker)
+                if expected is None:
+                    continue
+                threshold = expected * self.speculative_factor + self.speculative_grace_seconds
+                overdue = (now - started) - threshold
+                if overdue > best_overdue:
+                    best, best_overdue = chunk, overdue
+            return best
+
+        try:
+            while True:
+                if all(c.done for c in chunks) and cursor > max_frame:
+                    break
+
+                # 🆕 v4.8.0: Parada externa (cancelamento do job)
+                if self.should_stop and self.should_stop():
+                    logger.warning(f"🛑 [COORD] Render interrompido "
+                                   f"({len(running)} chunk(s) em andamento descartado(s))")
+                    stopped = True
+                    break
+
+                # 1. Distribuir trabalho para workers ociosos
+                for _ in range(len(idle)):
+                    worker = idle.popleft()
+                    if requeue:
+                        chunk = requeue.popleft()
+                        reissued += 1
+                        logger.info(f"🔁 [COORD] Chunk {chunk.index} reenviado para {worker.name} "
+                                    f"(tentativa {chunk.attempts + 1})")
+                    elif pending:
+                        chunk = pending.popleft()
+                    elif cursor <= max_frame:
+                        end_frame = self._next_chunk_end(cursor, max_frame, worker)
+                        chunk = RenderChunk(index=len(chunks), start_frame=cursor, end_frame=end_frame)
+                        chunks.append(chunk)
+                        cursor = end_frame + 1
+                    else:
+                        chunk = _speculative_candidate(worker)
+                        if chunk is None:
+                            idle.append(worker)
+                            continue
+                        speculative_launches += 1
+                        logger.warning(f"🐢 [COORD] Chunk {chunk.index} atrasado em "
+                                       f"{chunk.running_on[0]} → cópia especulativa em {worker.name}")
+                    _launch(chunk, worker)
+
+                if not running:
+                    if requeue or pending or cursor <= max_frame:
+                        fatal_error = "Nenhum worker disponível para os chunks restantes"
+                    break
+
+                # 2. Esperar alguma conclusão (ou o próximo ciclo de verificação)
+                done, _ = wait(list(running.keys()), timeout=self.poll_interval,
+                               return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    chunk, worker, started = running.pop(future)
+                    elapsed = time.time() - started
+                    if worker.name in chunk.running_on:
+                        chunk.running_on.remove(worker.name)
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"status": "error", "error": str(e)}
+
+                    if result.get("status") == "success":
+                        self.tracker.record(worker.name, chunk.frame_count, elapsed)
+                        idle.append(worker)
+                        if not chunk.done:
+                            chunk.done = True
+                            chunk.result = {
+                                **result,
+                                "chunk_index": chunk.index,
+                                "start_frame": chunk.start_frame,
+                                "end_frame": chunk.end_frame,
+                                "frame_count": chunk.frame_count,
+                                "worker": worker.name,
+                                "attempts": chunk.attempts,
+                            }
+                            logger.info(f"✅ [COORD] Chunk {chunk.index} "
+                                        f"({chunk.start_frame}-{chunk.end_frame}) por {worker.name} "
+                                        f"em {elapsed:.1f}s")
+                        continue
+
+                    # Falha
+                    failures[worker.name] = failures.get(worker.name, 0) + 1
+                    logger.warning(f"⚠️ [COORD] Chunk {chunk.index} falhou em {worker.name}: "
+                                   f"{result.get('error')}")
+                    if failures[worker.name] < self.max_worker_failures:
+                        idle.append(worker)
+                    else:
+                        logger.error(f"❌ [COORD] Worker {worker.name} removido após "
+                                     f"{failures[worker.name]} falhas")
+                        self.workers = [w for w in self.workers if w.name != worker.name]
+
+                    if chunk.done or chunk.running_on:
+                        continue  # outra cópia ainda pode concluir
+                    if chunk.attempts >= self.max_chunk_attempts:
+                        fatal_error = (f"Chunk {chunk.index} falhou {chunk.attempts}x: "
+                                       f"{result.get('error')}")
+                        break
+                    requeue.append(chunk)
+
+                if fatal_error:
+                    break
+        finally:
+            # Cópias especulativas perdedoras continuam em background até o timeout
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        ordered = sorted(chunks, key=lambda c: c.start_frame)
+        summary = {
+            "chunks": [c.result for c in ordered if c.done],
+            "total_chunks": len(ordered),
+            "speculative_launches": speculative_launches,
+            "reissued_chunks": reissued,
+            "throughput": self.tracker.snapshot(),
+        }
+
+        if stopped:
+            summary.update({"status": "cancelled", "error": "Render cancelado"})
+            return summary
+
+        if fatal_error or not ordered or not all(c.done for c in ordered):
+            summary.update({
+                "status": "error",
+                "error": fatal_error or "Chunks incompletos",
+                "failed_chunks": [c.index for c in ordered if not c.done],
+            })
+            return summary
+
+        summary["status"] = "success"
+        return summary
+
+
+# Para uso direto como script (simulação com workers fake locais)
+if __name__ == "__main__":
+    import random
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    @dataclass
+    class _FakeWorker:
+        name: str
+        fps: float
+        dead: bool = False
+
+    def _fake_render(worker, chunk, attempt):
+        if worker.dead:
+            time.sleep(2.0)
+            raise RuntimeError("worker não responde")
+        time.sleep(chunk.frame_count / worker.fps * random.uniform(0.9, 1.1))
+        return {"status": "success", "chunk_path": f"/app/shared/{chunk.index}_{attempt}.mp4"}
+
+    fake_workers = [
+        _FakeWorker("w-1", fps=600), _FakeWorker("w-2", fps=600),
+        _FakeWorker("w-3", fps=600), _FakeWorker("w-4", fps=150),  # lento
+        _FakeWorker("w-5", fps=600, dead=True),                     # morto
+    ]
+
+    print("\n🎬 Render Coordinator - Simulação com workers fake\n")
+    print("=" * 60)
+    for run in range(2):
+        started = time.time()
+        coordinator = RenderCoordinator(
+            fake_workers, _fake_render, fps=30,
+            speculative_grace_seconds=0.5, poll_interval=0.05,
+        )
+        result = coordinator.run(duration_in_frames=30 * 60 * 5)
+        print(f"   Execução {run + 1}: {result['status']} em {time.time() - started:.1f}s | "
+              f"chunks={result['total_chunks']} especulativos={result['speculative_launches']} "
+              f"reenviados={result['reissued_chunks']}")
+        print(f"   Vazão: {result['throughput']}")
+
+    # Divisão estática equivalente: limitada pelo worker mais lento
+    static = (30 * 60 * 5 / len(fake_workers)) / 150
+    print(f"   Divisão estática (referência): ≥ {static:.1f}s e falha no worker morto")
+    print("=" * 60)
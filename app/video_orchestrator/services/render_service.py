@@ -20,6 +20,8 @@ from datetime import datetime
 
 # 🆕 v2.9.180: Import das funções de path
 from ...utils import b2_paths
+# 🆕 v4.8.0: Payload serializado uma vez (orjson) e reusado em log + envio
+from ...utils.json_payload import EncodedPayload
 
 logger = logging.getLogger(__name__)
 
@@ -340,17 +342,20 @@ class RenderService:
             webhook_url=webhook_url
         )
         
+        # 🆕 v4.8.0: Serializar UMA vez - mesmos bytes para o debug log e para o POST
+        encoded_payload = EncodedPayload.encode(render_payload)
+        logger.info(f"📦 Payload serializado: {encoded_payload.describe()}")
+        
         # 🆕 v3.8.0: Salvar payload no pipeline_debug_logs para o LLM Sandbox Director
         # O Director precisa acessar o payload via GET /api/video/payload/tracks/{job_id}
         try:
             from app.supabase_client import get_direct_db_connection
-            import json as _json
             from datetime import datetime as _dt
             _conn = get_direct_db_connection()
             _cur = _conn.cursor()
             _cur.execute(
                 "INSERT INTO pipeline_debug_logs (job_id, step_name, direction, payload, created_at) VALUES (%s, %s, %s, %s, %s)",
-                (job_id, 'render_service', 'input', _json.dumps(render_payload), _dt.utcnow())
+                (job_id, 'render_service', 'input', encoded_payload.text(), _dt.utcnow())
             )
             _conn.commit()
             _cur.close()
@@ -381,9 +386,8 @@ class RenderService:
             else:
                 timeout = 600  # FFmpeg é síncrono - aguarda render completo
             
-            response = requests.post(
+            response = encoded_payload.post(
                 self.endpoint,
-                json=render_payload,
                 timeout=timeout
             )
             
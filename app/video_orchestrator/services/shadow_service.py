@@ -8,6 +8,8 @@ Fluxo:
 1. Recebe lista de frases com PNGs gerados
 2. Busca configuração de sombra do template
 3. Chama V-Services para adicionar sombras
+   🚀 Batch mode: todas as frases de uma config em UMA chamada
+   (sub-lotes paralelos para vídeos longos, fallback por frase se falhar)
 4. Retorna PNGs atualizados com sombras
 """
 
@@ -15,13 +17,21 @@ import os
 import json
 import logging
 import requests
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 # URL do V-Services
 V_SERVICES_URL = os.environ.get('V_SERVICES_URL', 'https://services.vinicius.ai')
 
+# 🚀 Batch mode: todas as frases em O(1) chamadas (ROLLBACK: 'false' = uma chamada por frase)
+SHADOW_BATCH_MODE = os.environ.get('SHADOW_BATCH_MODE', 'true').lower() == 'true'
+# Palavras por chamada (vídeos muito longos viram sub-lotes paralelos)
+SHADOW_BATCH_MAX_WORDS = int(os.environ.get('SHADOW_BATCH_MAX_WORDS', 1500))
+SHADOW_BATCH_MAX_PARALLEL = int(os.environ.get('SHADOW_BATCH_MAX_PARALLEL', 4))
+SHADOW_BATCH_TIMEOUT = int(os.environ.get('SHADOW_BATCH_TIMEOUT', 180))
+
 
 class ShadowService:
     """
@@ -90,59 +100,70 @@ class ShadowService:
         logger.info(f"   • Canvas: {canvas_width}x{canvas_height}")
         logger.info(f"   • Estilos disponíveis: {list(text_styles.keys())}")
         
-        # Processar cada frase com seu shadow específico
-        updated_phrases = []
+        # Resolver o shadow de cada frase (por estilo)
+        updated_phrases: List[Optional[Dict[str, Any]]] = [None] * len(phrases)
         total_processed = 0
         errors = []
         styles_processed = {}
         shadow_config = {}  # Inicializar para evitar erro se nenhum shadow estiver habilitado
+        pending = []  # [(posição, frase, shadow_config)]
         
-        for phrase in phrases:
-            try:
-                style_type = phrase.get('style_type', 'default')
-                
-                # Buscar shadow config do estilo específico
-                # 🐛 FIX: Usar 'or {}' para tratar valores None explícitos
-                style_config = text_styles.get(style_type) or {}
-                shadow_raw = style_config.get('shadow') or {}
-                
-                # Verificar se shadow está habilitado para este estilo
-                shadow_enabled = self._get_value(shadow_raw, 'enabled', False)
-                
-                if not shadow_enabled:
-                    # Shadow desabilitado para este estilo - manter frase original
-                    updated_phrases.append(phrase)
-                    if style_type not in styles_processed:
-                        styles_processed[style_type] = 'skipped'
-                        logger.info(f"   ⏭️ {style_type}: shadow DESABILITADO")
-                    continue
-                
-                # Normalizar shadow config para este estilo
-                shadow_config = self._normalize_shadow_config(shadow_raw, canvas_height, canvas_width)
-                
+        for position, phrase in enumerate(phrases):
+            style_type = phrase.get('style_type', 'default')
+            
+            # Buscar shadow config do estilo específico
+            # 🐛 FIX: Usar 'or {}' para tratar valores None explícitos
+            style_config = text_styles.get(style_type) or {}
+            shadow_raw = style_config.get('shadow') or {}
+            
+            # Verificar se shadow está habilitado para este estilo
+            shadow_enabled = self._get_value(shadow_raw, 'enabled', False)
+            
+            if not shadow_enabled:
+                # Shadow desabilitado para este estilo - manter frase original
+                updated_phrases[position] = phrase
                 if style_type not in styles_processed:
-                    styles_processed[style_type] = 'enabled'
-                    logger.info(f"   ✅ {style_type}: shadow HABILITADO (blur={shadow_config.get('blur')})")
-                
-                result = self._add_shadow_to_phrase(phrase, shadow_config)
-                
-                if "error" in result:
-                    errors.append({
-                        "phrase_index": phrase.get('phrase_index', 0),
-                        "error": result["error"]
-                    })
-                    updated_phrases.append(phrase)  # Manter original
-                else:
-                    updated_phrases.append(result)
-                    total_processed += len(result.get('words', []))
-                    
-            except Exception as e:
-                logger.error(f"❌ Erro ao adicionar sombra na frase {phrase.get('phrase_index', '?')}: {e}")
+                    styles_processed[style_type] = 'skipped'
+                    logger.info(f"   ⏭️ {style_type}: shadow DESABILITADO")
+                continue
+            
+            # Normalizar shadow config para este estilo
+            shadow_config = self._normalize_shadow_config(shadow_raw, canvas_height, canvas_width)
+            
+            if style_type not in styles_processed:
+                styles_processed[style_type] = 'enabled'
+                logger.info(f"   ✅ {style_type}: shadow HABILITADO (blur={shadow_config.get('blur')})")
+            
+            pending.append((position, phrase, shadow_config))
+        
+        # 🚀 BATCH MODE: uma chamada por config de sombra (sub-lotes em paralelo)
+        if SHADOW_BATCH_MODE and pending:
+            import time
+            batch_start = time.time()
+            phrase_results = self._add_shadows_batched(pending)
+            logger.info(f"⚡ [SHADOW BATCH] {len(pending)} frases processadas em "
+                        f"{time.time() - batch_start:.2f}s")
+        else:
+            phrase_results = {}
+            for position, phrase, phrase_shadow in pending:
+                try:
+                    phrase_results[position] = self._add_shadow_to_phrase(phrase, phrase_shadow)
+                except Exception as e:
+                    phrase_results[position] = {"error": str(e)}
+        
+        for position, phrase, _ in pending:
+            result = phrase_results.get(position) or {"error": "Sem resultado"}
+            if "error" in result:
+                logger.error(f"❌ Erro ao adicionar sombra na frase {phrase.get('phrase_index', '?')}: "
+                             f"{result['error']}")
                 errors.append({
                     "phrase_index": phrase.get('phrase_index', 0),
-                    "error": str(e)
+                    "error": result["error"]
                 })
-                updated_phrases.append(phrase)
+                updated_phrases[position] = phrase  # Manter original
+            else:
+                updated_phrases[position] = result
+                total_processed += len(result.get('words', []))
         
         logger.info(f"✅ Sombras adicionadas: {total_processed} PNGs processados")
         
@@ -154,6 +175,140 @@ class ShadowService:
             "errors": errors if errors else None
         }
     
+    def _add_shadows_batched(
+        self,
+        pending: List[Tuple[int, Dict[str, Any], Dict[str, Any]]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        🚀 BATCH MODE - Sombras de TODAS as frases com O(1) chamadas HTTP.
+        
+        Igual ao PngGeneratorService._generate_pngs_batched: as palavras de
+        todas as frases vão em uma única lista e cada frase guarda o seu
+        range [start, end) para redistribuir o resultado.
+        
+        - Frases são agrupadas pela config de sombra (o endpoint aceita uma
+          config por chamada; na prática uma por estilo)
+        - Grupos com mais de SHADOW_BATCH_MAX_WORDS palavras viram sub-lotes
+          (sem quebrar frases) executados em paralelo, no máximo
+          SHADOW_BATCH_MAX_PARALLEL ao mesmo tempo
+        - Sub-lote que falha cai no modo por frase apenas para as suas frases
+        
+        Args:
+            pending: [(posição, frase, shadow_config)]
+            
+        Returns:
+            {posição: frase atualizada | {"error": "..."}}
+        """
+        # 1. Agrupar por config de sombra e montar sub-lotes
+        groups: Dict[str, List[Tuple[int, Dict[str, Any], Dict[str, Any]]]] = {}
+        for item in pending:
+            key = json.dumps(self._build_vservices_shadow_config(item[2]), sort_keys=True)
+            groups.setdefault(key, []).append(item)
+        
+        sub_batches = []
+        for items in groups.values():
+            current, current_words = [], 0
+            for item in items:
+                words_count = len(item[1].get('words', []))
+                if current and current_words + words_count > SHADOW_BATCH_MAX_WORDS:
+                    sub_batches.append(current)
+                    current, current_words = [], 0
+                current.append(item)
+                current_words += words_count
+            if current:
+                sub_batches.append(current)
+        
+        logger.info(f"🚀 [SHADOW BATCH] {len(pending)} frases → {len(groups)} config(s), "
+                    f"{len(sub_batches)} chamada(s) HTTP")
+        
+        # 2. Executar sub-lotes (em paralelo quando houver mais de um)
+        results: Dict[int, Dict[str, Any]] = {}
+        if len(sub_batches) == 1:
+            results.update(self._run_shadow_sub_batch(sub_batches[0]))
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(SHADOW_BATCH_MAX_PARALLEL, len(sub_batches)),
+                thread_name_prefix="shadow_batch"
+            ) as executor:
+                for sub_result in executor.map(self._run_shadow_sub_batch, sub_batches):
+                    results.update(sub_result)
+        
+        return results
+    
+    def _run_shadow_sub_batch(
+        self,
+        items: List[Tuple[int, Dict[str, Any], Dict[str, Any]]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Envia um sub-lote (mesma config de sombra) em UMA chamada HTTP.
+        
+        Se a chamada falhar ou o número de PNGs retornados não bater, as
+        frases deste sub-lote são processadas uma a uma (fallback).
+        """
+        all_words = []
+        phrase_word_ranges = []  # [(posição, frase, start_idx, end_idx)]
+        for position, phrase, _ in items:
+            words = phrase.get('words', [])
+            start_idx = len(all_words)
+            all_words.extend(words)
+            phrase_word_ranges.append((position, phrase, start_idx, len(all_words)))
+        
+        if not all_words:
+            return {position: phrase for position, phrase, _ in items}
+        
+        try:
+            payload = {
+                "words": all_words,
+                "shadow_config": self._build_vservices_shadow_config(items[0][2])
+            }
+            response = requests.post(
+                self.endpoint,
+                json=payload,
+                timeout=SHADOW_BATCH_TIMEOUT
+            )
+            
+            if response.status_code != 200:
+                raise Exception(f"V-Services retornou {response.status_code}: {response.text[:200]}")
+            
+            result = response.json()
+            if result.get('status') != 'success':
+                raise Exception(result.get('error', 'Erro desconhecido'))
+            
+            result_words = result.get('words', [])
+            if len(result_words) != len(all_words):
+                raise Exception(f"V-Services retornou {len(result_words)} PNGs "
+                                f"(esperado {len(all_words)})")
+            
+        except Exception as e:
+            logger.warning(f"⚠️ [SHADOW BATCH] Sub-lote de {len(items)} frases falhou ({e}), "
+                           f"usando fallback por frase...")
+            fallback = {}
+            for position, phrase, phrase_shadow in items:
+                try:
+                    fallback[position] = self._add_shadow_to_phrase(phrase, phrase_shadow)
+                except Exception as e2:
+                    fallback[position] = {"error": str(e2)}
+            return fallback
+        
+        # Distribuir resultados de volta para cada frase
+        return {
+            position: {
+                **phrase,
+                "words": result_words[start_idx:end_idx],
+                "shadow_applied": True
+            } if end_idx > start_idx else phrase
+            for position, phrase, start_idx, end_idx in phrase_word_ranges
+        }
+    
+    def _build_vservices_shadow_config(self, shadow_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Config de sombra no formato do endpoint add_shadow_batch."""
+        return {
+            "blur": shadow_config.get('blur', 3),
+            "distance_x": shadow_config.get('offset_x', 4),
+            "distance_y": shadow_config.get('offset_y', 4),
+            "color": shadow_config.get('color', [0, 0, 0, 255])
+        }
+    
     def _add_shadow_to_phrase(
         self,
         phrase: Dict[str, Any],
@@ -177,12 +332,7 @@ class ShadowService:
         # Montar payload para V-Services
         payload = {
             "words": words,
-            "shadow_config": {
-                "blur": shadow_config.get('blur', 3),
-                "distance_x": shadow_config.get('offset_x', 4),
-                "distance_y": shadow_config.get('offset_y', 4),
-                "color": shadow_config.get('color', [0, 0, 0, 255])
-            }
+            "shadow_config": self._build_vservices_shadow_config(shadow_config)
         }
         
         try:
@@ -18,6 +18,9 @@ import requests
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+# 🆕 v4.8.0: Serialização rápida (orjson) do payload grande de sentences
+from ...utils.json_payload import EncodedPayload, decode_json
+
 logger = logging.getLogger(__name__)
 
 # 🆕 Importar debug_logger para salvar payloads no banco
@@ -596,9 +599,12 @@ class SubtitlePipelineService:
             logger.info(f"   - video_url: {video_url[:60] if video_url else 'None'}...")
             logger.info(f"   - duration_ms: {duration_ms}")
             
-            response = requests.post(
+            # 🆕 v4.8.0: Serializar uma vez com encoder rápido e enviar os bytes
+            encoded_payload = EncodedPayload.encode(payload)
+            logger.info(f"   - payload: {encoded_payload.describe()}")
+            
+            response = encoded_payload.post(
                 self.payload_endpoint,
-                json=payload,
                 timeout=60
             )
             
@@ -609,7 +615,7 @@ class SubtitlePipelineService:
                 logger.error(f"❌ {error_msg}")
                 return {"error": error_msg}
             
-            result = response.json()
+            result = decode_json(response.content)
             logger.info(f"✅ Payload recebido: {list(result.keys()) if isinstance(result, dict) else type(result)}")
             
             # Debug: verificar se video_url está no payload retornado
@@ -0,0 +1,209 @@
+"""
+🆕 v4.8.0: Transcription Cache - Transcrições por fingerprint do áudio
+
+O step `transcribe` mandava o áudio da fase 1 para o AssemblyAI/Whisper em
+toda execução: reprocessar o mesmo upload com outro template ou um replay
+do Director que começa antes de `transcribe` pagava a transcrição de novo.
+
+A chave é o hash do CONTEÚDO do áudio cortado (não da URL, que muda a
+cada job) + provider + idioma:
+
+- B2 informa o SHA1 do arquivo no header X-Bz-Content-Sha1 (HEAD, sem baixar)
+- Sem o header (ou arquivo local no volume compartilhado), o arquivo é lido
+  em streaming e vira sha256 (até TRANSCRIPTION_CACHE_MAX_HASH_MB)
+  (utils.content_fingerprint, o mesmo do matting_segment_cache)
+
+As palavras ficam no Postgres em formato colunar compacto
+({"fields": [...], "rows": [[...], ...]}), ~3x menor que a lista de dicts.
+
+Tabela (criada automaticamente no primeiro uso):
+    transcription_cache (cache_key) → text, words, duration_ms
+
+Uso:
+    fingerprint = audio_fingerprint(audio_url)
+    key = transcription_cache_key(fingerprint, 'assemblyai', 'pt')
+    cached = get_cached_transcription(key)
+    store_transcription(key, fingerprint, 'assemblyai', 'pt', text, words, duration_ms)
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+from ...utils.content_fingerprint import content_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Feature flag (ROLLBACK: 'false' transcreve sempre no provider)
+TRANSCRIPTION_CACHE_ENABLED = os.environ.get('TRANSCRIPTION_CACHE', 'true').lower() == 'true'
+# Versão da chave (incrementar invalida todo o cache, ex: mudança de modelo no provider)
+TRANSCRIPTION_CACHE_VERSION = 'v1'
+TRANSCRIPTION_CACHE_MAX_HASH_MB = int(os.environ.get('TRANSCRIPTION_CACHE_MAX_HASH_MB', 500))
+
+_table_ensured = False
+
+
+# ═══════════════════════════════════════════════════════════════
+# FINGERPRINT
+# ═══════════════════════════════════════════════════════════════
+
+def audio_fingerprint(audio_url: str) -> Optional[str]:
+    """
+    Hash do conteúdo do áudio. None se não foi possível calcular
+    (nesse caso o cache é ignorado e a transcrição segue normal).
+    """
+    return content_fingerprint(
+        audio_url,
+        download=True,
+        max_bytes=TRANSCRIPTION_CACHE_MAX_HASH_MB * 1024 * 1024,
+    )
+
+
+def transcription_cache_key(fingerprint: str, provider: str, language: str) -> str:
+    """Chave do cache: conteúdo do áudio + provider + idioma."""
+    raw = f"{TRANSCRIPTION_CACHE_VERSION}|{fingerprint}|{provider}|{language or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ═══════════════════════════════════════════════════════════════
+# FORMATO COMPACTO DAS PALAVRAS
+# ═══════════════════════════════════════════════════════════════
+
+def pack_words(words: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """[{text, start, end, ...}, ...] → {fields: [...], rows: [[...], ...]}"""
+    fields: List[str] = []
+    for word in words or []:
+        for key in word:
+            if key not in fields:
+                fields.append(key)
+    return {
+        'fields': fields,
+        'rows': [[word.get(key) for key in fields] for word in words or []],
+    }
+
+
+def unpack_words(packed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverso de pack_words (campos ausentes na palavra original voltam como None)."""
+    fields = packed.get('fields') or []
+    return [
+        {key: value for key, value in zip(fields, row) if value is not None}
+        for row in packed.get('rows') or []
+    ]
+
+
+# ═══════════════════════════════════════════════════════════════
+# TABELA
+# ═══════════════════════════════════════════════════════════════
+
+def _ensure_table():
+    """Cria tabela transcription_cache se não existir."""
+    global _table_ensured
+    if _table_ensured:
+        return
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS transcription_cache (
+                cache_key VARCHAR(64) PRIMARY KEY,
+                audio_fingerprint VARCHAR(80) NOT NULL,
+                provider VARCHAR(30) NOT NULL,
+                language VARCHAR(10),
+                text TEXT,
+                words JSONB NOT NULL,
+                word_count INTEGER,
+                duration_ms INTEGER,
+                hit_count INTEGER DEFAULT 0,
+                created_at TIMESTAMPTZ DEFAULT NOW(),
+                last_hit_at TIMESTAMPTZ
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_transcription_cache_fingerprint
+                ON transcription_cache(audio_fingerprint);
+        """)
+        conn.commit()
+        cursor.close()
+        conn.close()
+        _table_ensured = True
+        logger.info("🎙️ [TRANSCRIPTION CACHE] Tabela transcription_cache OK")
+    except Exception as e:
+        logger.error(f"❌ [TRANSCRIPTION CACHE] Falha ao criar tabela: {e}")
+
+
+# ═══════════════════════════════════════════════════════════════
+# LEITURA / ESCRITA
+# ═══════════════════════════════════════════════════════════════
+
+def get_cached_transcription(cache_key: str) -> Optional[Dict[str, Any]]:
+    """Retorna {text, words, duration_ms} se essa transcrição já existe."""
+    if not TRANSCRIPTION_CACHE_ENABLED or not cache_key:
+        return None
+    _ensure_table()
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE transcription_cache
+            SET hit_count = hit_count + 1, last_hit_at = NOW()
+            WHERE cache_key = %s
+            RETURNING text, words, duration_ms
+        """, (cache_key,))
+        row = cursor.fetchone()
+        conn.commit()
+        cursor.close()
+        conn.close()
+    except Exception as e:
+        logger.warning(f"⚠️ [TRANSCRIPTION CACHE] Falha ao consultar: {e}")
+        return None
+
+    if not row:
+        return None
+    text, words, duration_ms = row
+    if isinstance(words, str):
+        try:
+            words = json.loads(words)
+        except (TypeError, ValueError):
+            return None
+    return {
+        'text': text or '',
+        'words': unpack_words(words or {}),
+        'duration_ms': duration_ms or 0,
+    }
+
+
+def store_transcription(cache_key: str, fingerprint: str, provider: str, language: str,
+                        text: str, words: List[Dict[str, Any]], duration_ms: int) -> None:
+    """Grava a transcrição (sobrescreve se a chave já existe)."""
+    if not TRANSCRIPTION_CACHE_ENABLED or not cache_key or not words:
+        return
+    _ensure_table()
+
+    try:
+        from app.db import get_db_connection
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO transcription_cache
+                (cache_key, audio_fingerprint, provider, language, text, words, word_count, duration_ms)
+            VALUES (%s, %s, %s, %s, %s, %s::jsonb, %s, %s)
+            ON CONFLICT (cache_key)
+            DO UPDATE SET text = EXCLUDED.text,
+                          words = EXCLUDED.words,
+                          word_count = EXCLUDED.word_count,
+                          duration_ms = EXCLUDED.duration_ms,
+                          created_at = NOW()
+        """, (cache_key, fingerprint, provider, language, text,
+              json.dumps(pack_words(words), ensure_ascii=False, separators=(',', ':')),
+              len(words), duration_ms))
+        conn.commit()
+        cursor.close()
+        conn.close()
+        logger.info(f"🎙️ [TRANSCRIPTION CACHE] {len(words)} palavras salvas ({provider}/{language})")
+    except Exception as e:
+        logger.warning(f"⚠️ [TRANSCRIPTION CACHE] Falha ao gravar: {e}")
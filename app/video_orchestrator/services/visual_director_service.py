@@ -30,6 +30,8 @@ import json
 import base64
 from typing import Dict, Optional, List
 
+from app.services.llm_response_cache import cached_chat_completion_post
+
 logger = logging.getLogger(__name__)
 
 # ─── Configuração ─────────────────────────────────────────────
@@ -444,7 +446,7 @@ class VisualDirectorService:
                 })
 
             # Chamar OpenAI API
-            response = requests.post(
+            response = cached_chat_completion_post(
                 "https://api.openai.com/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -460,6 +462,7 @@ class VisualDirectorService:
                     "temperature": 0.3,
                 },
                 timeout=60,
+                service_type="vision_llm",
             )
 
             time_ms = int((time.time() - t0) * 1000)
@@ -22,6 +22,21 @@ FUNCIONAMENTO:
 4. Monitora progresso de todos os workers
 5. Concatena chunks finais via v-services
 6. Retorna vídeo final
+
+🆕 v4.8.0: Com RENDER_WORK_STEALING=true (padrão), os passos 2-4 usam o
+RenderCoordinator: a timeline é cortada em vários chunks pequenos que os
+workers puxam de uma fila, chunks travados são reemitidos (execução
+especulativa) e a vazão de cada worker pondera os próximos cortes.
+
+🆕 v4.8.0: Com RENDER_INCREMENTAL=true (padrão, requer Redis), a timeline é
+cortada em uma grade fixa e cada chunk é identificado pelo hash da sua
+entrada (frame range + itens de track que o intersectam). Chunks com hash
+já renderizado são reaproveitados: um re-render após corrigir uma legenda
+só envia aos workers os chunks afetados.
+
+🆕 v4.8.0: Cancelamento cooperativo (job_cancellation): o polling dos chunks
+acorda a cada segundo, repassa o cancelamento ao v-editor
+(POST /job/{id}/cancel, best-effort) e o render para sem concatenar.
 """
 
 import os
@@ -30,13 +45,41 @@ import requests
 import asyncio
 import re
 from typing import Dict, Any, List, Optional, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 import time
 
+# 🆕 v4.8.0: Codificação única do payload (orjson + conversão de URLs nos bytes)
+from ...utils.json_payload import EncodedPayload, encode_json, decode_json, splice_json
+# 🆕 v4.8.0: Coordenador com work stealing (chunks pequenos + execução especulativa)
+from .render_coordinator import RenderCoordinator, RenderChunk
+# 🆕 v4.8.0: Cortes de chunk alinhados a placas tectônicas / intervalos entre frases
+from .chunk_boundary_planner import SceneAwareChunkPlanner
+# 🆕 v4.8.0: Re-render incremental (hash da entrada de cada chunk → chunk já renderizado)
+from .render_chunk_cache import ChunkInputHasher, get_render_chunk_cache
+# 🆕 v4.8.0: Cancelamento cooperativo do job
+from ..job_cancellation import JobCancelledError, as_completed_or_cancelled, get_cancellation_token
+
 logger = logging.getLogger(__name__)
 
+# 🆕 v4.8.0: Feature flag do coordenador (ROLLBACK: 'false' volta para divisão estática)
+RENDER_WORK_STEALING = os.environ.get('RENDER_WORK_STEALING', 'true').lower() == 'true'
+# 🆕 v4.8.0: Cortes alinhados a cenas + concat por stream copy quando todos alinhados
+RENDER_SCENE_AWARE_CHUNKS = os.environ.get('RENDER_SCENE_AWARE_CHUNKS', 'true').lower() == 'true'
+# Concat por stream copy (-c copy) exige suporte a "stream_copy" em v-services
+# /ffmpeg/concat-chunks — só ligar depois que o v-services em produção aceitar o campo
+RENDER_CONCAT_STREAM_COPY = os.environ.get('RENDER_CONCAT_STREAM_COPY', 'false').lower() == 'true'
+# 🆕 v4.8.0: Re-render incremental (ROLLBACK: 'false' renderiza todos os chunks sempre)
+RENDER_INCREMENTAL = os.environ.get('RENDER_INCREMENTAL', 'true').lower() == 'true'
+# Tamanho da grade fixa de chunks no modo incremental (menor = re-render mais fino).
+# No modo incremental esta grade substitui o guided slicing do RenderCoordinator
+# (cortes ponderados pela vazão dos workers), que só roda com RENDER_INCREMENTAL=false
+RENDER_INCREMENTAL_CHUNK_SECONDS = float(os.environ.get('RENDER_INCREMENTAL_CHUNK_SECONDS', 20))
+# Raiz do volume compartilhado; se não estiver montado aqui, os chunks são
+# removidos via v-services (/ffmpeg/cleanup-chunks)
+SHARED_VOLUME_ROOT = os.environ.get('SHARED_VOLUME_ROOT', '/app/shared')
+
 # 🆕 v2.9.67: Mapeamento de URLs externas para internas
 # 🔧 v2.9.80: Adicionado services-home.vinicius.ai (Linux Home tunnel)
 EXTERNAL_TO_INTERNAL_URL_MAP = {
@@ -153,6 +196,49 @@ class WorkerPoolService:
             # Não falhar o render por causa de limpeza
             logger.warning(f"⚠️ [CLEANUP] Erro ao limpar chunks: {e}")
     
+    def _remove_chunk_files(self, refs: List[Dict[str, Any]]) -> None:
+        """
+        🆕 v4.8.0: Remove do volume os chunks que saíram do cache incremental.
+        
+        Com o volume montado aqui apaga o arquivo direto; senão pede ao
+        v-services a limpeza pelo job_id do chunk (mesma rota do cleanup do job).
+        """
+        if not refs:
+            return
+        volume_mounted = os.path.isdir(SHARED_VOLUME_ROOT)
+        removed = 0
+        for ref in refs:
+            chunk_path = ref.get("chunk_path") or ""
+            if volume_mounted and chunk_path.startswith(SHARED_VOLUME_ROOT + "/"):
+                try:
+                    os.remove(chunk_path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"⚠️ [CLEANUP] Erro ao remover {chunk_path}: {e}")
+            elif ref.get("chunk_job_id"):
+                self._cleanup_old_chunks(ref["chunk_job_id"])
+        logger.info(f"🧹 [INCREMENTAL] {len(refs)} chunks fora do cache "
+                    f"({removed} removidos localmente)")
+    
+    def _cancel_remote_job(self, worker: WorkerInfo, job_id: str) -> None:
+        """
+        🆕 v4.8.0: Repassa o cancelamento de um chunk ao v-editor (best-effort).
+        
+        Workers sem a rota de cancelamento (404/405) terminam o chunk sozinhos;
+        o resultado é descartado.
+        """
+        try:
+            response = requests.post(f"{worker.url}/job/{job_id}/cancel", timeout=5)
+            if response.status_code in (200, 202, 204):
+                logger.info(f"🛑 [CANCEL] Chunk {job_id} cancelado no {worker.name}")
+            else:
+                logger.info(f"🛑 [CANCEL] {worker.name} não cancelou {job_id} "
+                            f"({response.status_code}), resultado será descartado")
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ [CANCEL] Falha ao cancelar {job_id} no {worker.name}: {e}")
+    
     def health_check_all(self) -> Dict[str, Any]:
         """
         Verifica saúde de todos os workers.
@@ -222,38 +308,21 @@ class WorkerPoolService:
         
         return url
     
-    def _convert_payload_urls_recursive(self, obj: Any) -> Any:
-        """
-        🆕 v2.9.67: Converte URLs recursivamente em qualquer estrutura de dados.
-        
-        Procura por campos que parecem ser URLs (contém 'services.vinicius.ai')
-        e converte para URLs internas.
-        """
-        if isinstance(obj, str):
-            # Se é uma string, verificar se é URL externa
-            return self._convert_external_to_internal_url(obj)
-        elif isinstance(obj, dict):
-            # Se é dict, processar cada valor
-            return {k: self._convert_payload_urls_recursive(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            # Se é lista, processar cada item
-            return [self._convert_payload_urls_recursive(item) for item in obj]
-        else:
-            # Outros tipos (int, float, bool, None) - retornar como está
-            return obj
-    
     def _convert_payload_urls(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         🆕 v2.9.67: Converte todas as URLs no payload para URLs internas.
         
-        Usa conversão recursiva para pegar todos os campos, incluindo:
+        Pega todos os campos, incluindo:
         - src (usado pelo Remotion)
         - video_url, audio_url, image_url, url
         - Qualquer campo aninhado em qualquer nível
+        
+        🆕 v4.8.0: Conversão em uma única passada sobre o JSON serializado
+        (antes era um deep-walk recursivo que recriava todo o dict).
         """
         logger.info("🔄 [URL CONVERT] Convertendo URLs externas para internas...")
         
-        converted = self._convert_payload_urls_recursive(payload)
+        converted = decode_json(encode_json(payload, url_map=EXTERNAL_TO_INTERNAL_URL_MAP))
         
         logger.info("✅ [URL CONVERT] Conversão concluída")
         
@@ -322,7 +391,10 @@ class WorkerPoolService:
         frame_range: Dict[str, int],
         payload: Dict[str, Any],
         user_id: str,
-        project_id: str
+        project_id: str,
+        encoded_tracks: bytes = None,
+        attempt: int = 0,
+        chunk_tag: str = None
     ) -> Dict[str, Any]:
         """
         Envia um chunk para um worker específico.
@@ -335,17 +407,27 @@ class WorkerPoolService:
             payload: Payload original
             user_id: ID do usuário
             project_id: ID do projeto
+            encoded_tracks: 🆕 v4.8.0: tracks já serializadas (compartilhadas entre chunks)
+            attempt: 🆕 v4.8.0: tentativa (>0 = reenvio/cópia especulativa, job_id próprio)
+            chunk_tag: 🆕 v4.8.0: sufixo do job_id do chunk (hash no render incremental)
             
         Returns:
             {"status": "success"|"error", "chunk_path": "...", ...}
         """
         chunk_job_id = f"{job_id}_chunk_{chunk_index}"
+        if chunk_tag:
+            chunk_job_id = f"{chunk_job_id}_{chunk_tag}"
+        if attempt > 0:
+            chunk_job_id = f"{chunk_job_id}_r{attempt}"
         start_time = time.time()
         
         logger.info(f"🎬 [CHUNK {chunk_index}] Enviando para {worker.name}")
         logger.info(f"   Frames: {frame_range['start_frame']}-{frame_range['end_frame']} ({frame_range['frame_count']} frames)")
         
         try:
+            # 🆕 v4.8.0: Job cancelado → não enviar o chunk
+            get_cancellation_token(job_id).raise_if_cancelled()
+            
             # Modificar payload para este chunk
             chunk_payload = self._prepare_chunk_payload(
                 payload=payload,
@@ -355,10 +437,20 @@ class WorkerPoolService:
                 project_id=project_id
             )
             
+            # 🆕 v4.8.0: Serializar apenas o cabeçalho do chunk e anexar as
+            # tracks já codificadas (sem deep-walk nem cópia por chunk)
+            if encoded_tracks is None:
+                encoded_tracks = encode_json(chunk_payload["tracks"], url_map=EXTERNAL_TO_INTERNAL_URL_MAP)
+            encoded = EncodedPayload(splice_json(
+                chunk_payload,
+                {"tracks": encoded_tracks},
+                url_map=EXTERNAL_TO_INTERNAL_URL_MAP
+            ))
+            logger.info(f"   Payload: {encoded.describe()}")
+            
             # Enviar para o worker
-            response = requests.post(
+            response = encoded.post(
                 f"{worker.url}/render-video",
-                json=chunk_payload,
                 timeout=300  # 5 minutos para iniciar
             )
             
@@ -372,7 +464,8 @@ class WorkerPoolService:
             final_result = self._wait_for_chunk_completion(
                 worker=worker,
                 job_id=chunk_job_id,
-                timeout_seconds=600  # 10 minutos por chunk
+                timeout_seconds=600,  # 10 minutos por chunk
+                cancel_token=get_cancellation_token(job_id)
             )
             
             duration = time.time() - start_time
@@ -381,13 +474,18 @@ class WorkerPoolService:
             return {
                 "status": "success",
                 "chunk_index": chunk_index,
+                "start_frame": frame_range["start_frame"],
+                "end_frame": frame_range["end_frame"],
                 "worker": worker.name,
                 "duration_seconds": duration,
                 # 🔧 v2.9.77: Priorizar shared_path (caminho no volume compartilhado)
                 "chunk_path": final_result.get("shared_path") or final_result.get("output_path"),
+                "chunk_job_id": chunk_job_id,
                 "b2_url": final_result.get("b2_url")
             }
             
+        except JobCancelledError:
+            raise
         except Exception as e:
             duration = time.time() - start_time
             logger.error(f"❌ [CHUNK {chunk_index}] Falhou no {worker.name} após {duration:.2f}s: {e}")
@@ -414,6 +512,10 @@ class WorkerPoolService:
         
         Adiciona frame_range para que o worker renderize apenas esse trecho.
         IMPORTANTE: Monta project_settings.video_settings igual ao render_service.py
+        
+        🆕 v4.8.0: Retorna o dict SEM converter URLs. A conversão é feita na
+        serialização (_render_chunk_on_worker), para que as tracks sejam
+        codificadas uma única vez para todos os chunks.
         """
         # Extrair dados do payload (igual render_service.py)
         canvas = payload.get("canvas", {"width": 1080, "height": 1920})
@@ -497,9 +599,6 @@ class WorkerPoolService:
         
         logger.debug(f"📦 [CHUNK] Payload preparado: fps={fps}, canvas={canvas}, duration_chunk={chunk_payload['duration_in_frames']} frames")
         
-        # 🆕 v2.9.67: Converter URLs externas para internas
-        chunk_payload = self._convert_payload_urls(chunk_payload)
-        
         return chunk_payload
     
     def _wait_for_chunk_completion(
@@ -509,7 +608,8 @@ class WorkerPoolService:
         timeout_seconds: int = 600,
         poll_interval: float = 5.0,  # 🔧 v2.9.75: Polling mais espaçado
         max_consecutive_errors: int = 5,
-        initial_wait: float = 10.0  # 🔧 v2.9.75: Esperar mais antes de começar polling
+        initial_wait: float = 10.0,  # 🔧 v2.9.75: Esperar mais antes de começar polling
+        cancel_token=None
     ) -> Dict[str, Any]:
         """
         Aguarda conclusão de um job em um worker (polling).
@@ -527,9 +627,13 @@ class WorkerPoolService:
             poll_interval: Intervalo entre polls
             max_consecutive_errors: Máximo de erros consecutivos antes de falhar
             initial_wait: Tempo para esperar antes do primeiro poll
+            cancel_token: 🆕 v4.8.0: CancellationToken do job (esperas interrompíveis)
             
         Returns:
             Resultado final do job
+            
+        Raises:
+            JobCancelledError: job cancelado durante a espera (cancel repassado ao worker)
         """
         start_time = time.time()
         consecutive_errors = 0
@@ -542,7 +646,7 @@ class WorkerPoolService:
         
         # 🆕 v2.9.74: Espera inicial para job iniciar
         logger.info(f"⏳ [POLL] Aguardando {initial_wait}s para job {job_id} iniciar no {worker.name}...")
-        time.sleep(initial_wait)
+        self._poll_sleep(worker, job_id, initial_wait, cancel_token)
         
         while (time.time() - start_time) < timeout_seconds:
             try:
@@ -611,16 +715,26 @@ class WorkerPoolService:
                 if consecutive_errors >= max_consecutive_errors:
                     raise Exception(f"Worker {worker.name} inacessível após {max_consecutive_errors} tentativas")
             
-            time.sleep(poll_interval)
+            self._poll_sleep(worker, job_id, poll_interval, cancel_token)
         
         elapsed = time.time() - start_time
         raise Exception(f"Timeout ({elapsed:.1f}s) aguardando job {job_id} no {worker.name}")
     
+    def _poll_sleep(self, worker: WorkerInfo, job_id: str, seconds: float, cancel_token=None) -> None:
+        """🆕 v4.8.0: Espera do polling; no cancelamento do job, cancela o chunk no worker."""
+        if cancel_token is None:
+            time.sleep(seconds)
+            return
+        if cancel_token.wait(seconds):
+            self._cancel_remote_job(worker, job_id)
+            raise JobCancelledError(cancel_token.job_id, f"chunk {job_id}")
+    
     def _concatenate_chunks(
         self,
         chunk_paths: List[str],
         job_id: str,
-        output_filename: str = None
+        output_filename: str = None,
+        stream_copy: bool = False
     ) -> Dict[str, Any]:
         """
         Concatena chunks usando v-services.
@@ -629,23 +743,29 @@ class WorkerPoolService:
             chunk_paths: Lista de paths dos chunks (em /app/shared)
             job_id: ID do job
             output_filename: Nome do arquivo final
+            stream_copy: 🆕 v4.8.0: Todos os cortes em limites de cena → concat com -c copy
             
         Returns:
             {"status": "success", "output_path": "...", "duration_seconds": ...}
         """
-        logger.info(f"🔗 [CONCAT] Concatenando {len(chunk_paths)} chunks...")
+        logger.info(f"🔗 [CONCAT] Concatenando {len(chunk_paths)} chunks"
+                    f"{' (stream copy)' if stream_copy else ''}...")
         
         start_time = time.time()
         
+        concat_request = {
+            "chunk_paths": chunk_paths,
+            "output_filename": output_filename or f"{job_id}_final.mp4",
+            "job_id": job_id
+        }
+        if stream_copy:
+            concat_request["stream_copy"] = True
+        
         try:
             # Chamar endpoint de concatenação no v-services
             response = requests.post(
                 f"{self.v_services_url}/ffmpeg/concat-chunks",
-                json={
-                    "chunk_paths": chunk_paths,
-                    "output_filename": output_filename or f"{job_id}_final.mp4",
-                    "job_id": job_id
-                },
+                json=concat_request,
                 timeout=120  # 2 minutos para concat
             )
             
@@ -711,6 +831,209 @@ class WorkerPoolService:
         
         return duration_in_frames
     
+    def _render_with_coordinator(
+        self,
+        workers: List[WorkerInfo],
+        job_id: str,
+        payload: Dict[str, Any],
+        user_id: str,
+        project_id: str,
+        fps: int,
+        duration_in_frames: int,
+        encoded_tracks: bytes,
+        planner: SceneAwareChunkPlanner = None,
+        planned_ranges: List[Dict[str, int]] = None,
+        chunk_tags: Dict[int, str] = None
+    ) -> Dict[str, Any]:
+        """
+        🆕 v4.8.0: Renderiza via RenderCoordinator (work stealing + especulativo).
+        
+        A timeline é cortada em chunks pequenos que os workers puxam de uma fila;
+        chunks travados são reemitidos em outro worker e a vazão de cada worker
+        pondera os próximos cortes.
+        
+        Com planned_ranges, apenas esses trechos são renderizados (render
+        incremental); chunk_tags ({chunk_index: tag}) entra no job_id do chunk.
+        
+        Returns:
+            Resultado do RenderCoordinator.run() com chunks ordenados por frame
+        """
+        def _render_fn(worker: WorkerInfo, chunk: RenderChunk, attempt: int) -> Dict[str, Any]:
+            return self._render_chunk_on_worker(
+                worker=worker,
+                job_id=job_id,
+                chunk_index=chunk.index,
+                frame_range=chunk.to_frame_range(),
+                payload=payload,
+                user_id=user_id,
+                project_id=project_id,
+                encoded_tracks=encoded_tracks,
+                attempt=attempt,
+                chunk_tag=(chunk_tags or {}).get(chunk.index)
+            )
+        
+        coordinator = RenderCoordinator(
+            workers=workers,
+            render_fn=_render_fn,
+            fps=fps,
+            chunk_planner=planner.plan_end if planner else None,
+            should_stop=get_cancellation_token(job_id).is_cancelled
+        )
+        result = coordinator.run(duration_in_frames, planned_ranges=planned_ranges)
+        if result.get("status") == "cancelled":
+            raise JobCancelledError(job_id, "render distribuído")
+        
+        logger.info(f"📦 [COORD] {result.get('total_chunks', 0)} chunks | "
+                    f"especulativos={result.get('speculative_launches', 0)} | "
+                    f"reenviados={result.get('reissued_chunks', 0)}")
+        logger.info(f"   Vazão (frames/s): {result.get('throughput', {})}")
+        
+        return result
+    
+    def _render_incremental(
+        self,
+        workers: List[WorkerInfo],
+        job_id: str,
+        payload: Dict[str, Any],
+        user_id: str,
+        project_id: str,
+        fps: int,
+        duration_in_frames: int,
+        encoded_tracks: bytes,
+        planner: SceneAwareChunkPlanner = None
+    ) -> Dict[str, Any]:
+        """
+        🆕 v4.8.0: Re-render incremental - só renderiza chunks cuja entrada mudou.
+        
+        1. Corta a timeline em grade fixa (cortes estáveis entre renders; o
+           tamanho não segue a vazão dos workers como no guided slicing)
+        2. Calcula o hash da entrada de cada chunk
+        3. Reaproveita chunks com hash em cache; o resto vai para o coordenador
+        4. Registra os chunks novos no cache
+        
+        Returns:
+            Mesmo formato de RenderCoordinator.run(), com "chunks" incluindo os
+            reaproveitados ("cached": True) e "cache_hits"
+        """
+        cache = get_render_chunk_cache()
+        grid_planner = planner or SceneAwareChunkPlanner([], [])
+        chunk_frames = max(1, int(RENDER_INCREMENTAL_CHUNK_SECONDS * fps))
+        frame_ranges = grid_planner.plan_grid(duration_in_frames, chunk_frames)
+        
+        hash_start = time.time()
+        hasher = ChunkInputHasher(payload, fps)
+        chunk_hashes = {
+            r["worker_index"]: hasher.hash_range(r["start_frame"], r["end_frame"])
+            for r in frame_ranges
+        }
+        hits = cache.get_many(project_id, list(chunk_hashes.values()))
+        logger.info(f"♻️ [INCREMENTAL] {len(hits)}/{len(frame_ranges)} chunks reaproveitados "
+                    f"(hash em {(time.time() - hash_start) * 1000:.0f}ms)")
+        
+        # Chunks de renders anteriores deste job que este render não reaproveita
+        self._remove_chunk_files(cache.evict_job(project_id, job_id, list(hits)))
+        
+        cached_results = []
+        to_render = []
+        for r in frame_ranges:
+            chunk_hash = chunk_hashes[r["worker_index"]]
+            entry = hits.get(chunk_hash)
+            if entry:
+                cached_results.append({
+                    "status": "success",
+                    "chunk_index": r["worker_index"],
+                    "start_frame": r["start_frame"],
+                    "end_frame": r["end_frame"],
+                    "frame_count": r["frame_count"],
+                    "chunk_path": entry.get("chunk_path"),
+                    "b2_url": entry.get("b2_url"),
+                    "chunk_hash": chunk_hash,
+                    "cached": True,
+                    "duration_seconds": 0
+                })
+            else:
+                to_render.append(dict(r, chunk_index=r["worker_index"]))
+        
+        result = self._render_with_coordinator(
+            workers=workers,
+            job_id=job_id,
+            payload=payload,
+            user_id=user_id,
+            project_id=project_id,
+            fps=fps,
+            duration_in_frames=duration_in_frames,
+            encoded_tracks=encoded_tracks,
+            planned_ranges=to_render,
+            chunk_tags={i: h[:12] for i, h in chunk_hashes.items()}
+        )
+        
+        for chunk_result in result.get("chunks", []):
+            chunk_hash = chunk_hashes.get(chunk_result.get("chunk_index"))
+            chunk_result["chunk_hash"] = chunk_hash
+            cache.put(project_id, chunk_hash, chunk_result, job_id=job_id)
+        
+        result["chunks"] = sorted(cached_results + result.get("chunks", []),
+                                  key=lambda c: c["start_frame"])
+        result["total_chunks"] = len(frame_ranges)
+        result["cache_hits"] = len(cached_results)
+        return result
+    
+    def _render_static_chunks(
+        self,
+        workers: List[WorkerInfo],
+        job_id: str,
+        payload: Dict[str, Any],
+        user_id: str,
+        project_id: str,
+        fps: int,
+        duration_in_frames: int,
+        num_workers: int,
+        encoded_tracks: bytes,
+        planner: SceneAwareChunkPlanner = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Divisão estática legada: um chunk fixo por worker (RENDER_WORK_STEALING=false).
+        """
+        if planner:
+            frame_ranges = planner.plan_ranges(duration_in_frames, num_workers)
+        else:
+            frame_ranges = self.calculate_frame_ranges(duration_in_frames, num_workers)
+        
+        logger.info(f"📦 Dividindo em {len(frame_ranges)} chunks:")
+        for r in frame_ranges:
+            chunk_seconds = r['frame_count'] / fps
+            logger.info(f"   Chunk {r['worker_index']}: frames {r['start_frame']}-{r['end_frame']} ({chunk_seconds:.2f}s)")
+        
+        chunk_results = []
+        
+        executor = ThreadPoolExecutor(max_workers=num_workers)
+        try:
+            futures = {}
+            
+            for i, frame_range in enumerate(frame_ranges):
+                worker = workers[i]
+                future = executor.submit(
+                    self._render_chunk_on_worker,
+                    worker=worker,
+                    job_id=job_id,
+                    chunk_index=i,
+                    frame_range=frame_range,
+                    payload=payload,
+                    user_id=user_id,
+                    project_id=project_id,
+                    encoded_tracks=encoded_tracks
+                )
+                futures[future] = i
+            
+            # Coletar resultados (🆕 v4.8.0: para no cancelamento do job)
+            for future in as_completed_or_cancelled(futures, get_cancellation_token(job_id)):
+                result = future.result()
+                chunk_results.append(result)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return chunk_results
+    
     def render_distributed(
         self,
         job_id: str,
@@ -728,7 +1051,7 @@ class WorkerPoolService:
         
         Esta é a função principal que:
         1. Verifica workers saudáveis
-        2. Divide o trabalho em chunks
+        2. Divide o trabalho em chunks (🆕 v4.8.0: sob demanda, via RenderCoordinator)
         3. Envia chunks para workers em paralelo
         4. Aguarda conclusão de todos
         5. Concatena resultado final
@@ -757,8 +1080,18 @@ class WorkerPoolService:
         
         logger.info(f"🚀 [DISTRIBUTED RENDER] Iniciando job {job_id}")
         
+        # 🆕 v4.8.0: Render incremental reaproveita chunks de renders anteriores
+        incremental = RENDER_INCREMENTAL and get_render_chunk_cache().available
+        
         # 🆕 v2.9.77: Limpar chunks antigos deste job antes de iniciar
-        self._cleanup_old_chunks(job_id)
+        # 🆕 v4.8.0: No modo incremental os chunks anteriores SÃO o cache (e o
+        # job_id de cada chunk leva o hash, então o polling não confunde renders);
+        # os que este render não reaproveita saem em _render_incremental (evict_job)
+        if not incremental:
+            self._cleanup_old_chunks(job_id)
+        else:
+            # Arquivos de chunks cuja entrada no cache expirou (varredura periódica)
+            self._remove_chunk_files(get_render_chunk_cache().pop_expired())
         
         # 1. Verificar workers saudáveis
         healthy_workers = self.get_healthy_workers()
@@ -848,16 +1181,11 @@ class WorkerPoolService:
         logger.info(f"📐 [DURATION] FONTE: {duration_source}")
         logger.info(f"   Vídeo: {duration_in_frames} frames @ {fps}fps = {estimated_seconds:.2f}s")
         
-        # 3. Dividir frames entre workers
-        frame_ranges = self.calculate_frame_ranges(duration_in_frames, num_workers)
-        
-        logger.info(f"📦 Dividindo em {len(frame_ranges)} chunks:")
-        for r in frame_ranges:
-            chunk_seconds = r['frame_count'] / fps
-            logger.info(f"   Chunk {r['worker_index']}: frames {r['start_frame']}-{r['end_frame']} ({chunk_seconds:.2f}s)")
-        
-        # 4. Enviar chunks para workers em paralelo
-        chunk_results = []
+        # 🆕 v4.8.0: Serializar tracks UMA vez (URLs já convertidas) para todos os chunks
+        encode_start = time.time()
+        encoded_tracks = encode_json(tracks, url_map=EXTERNAL_TO_INTERNAL_URL_MAP)
+        logger.info(f"📦 [ENCODE] Tracks serializadas uma vez: {len(encoded_tracks) / 1024:.0f}KB "
+                    f"em {(time.time() - encode_start) * 1000:.0f}ms")
         
         # 🔧 v2.9.80: Rotação de workers para diagnóstico
         # WORKER_ROTATION=0 (padrão): ED1→chunk0, ED2→chunk1, ED3→chunk2, ED4→chunk3
@@ -873,27 +1201,70 @@ class WorkerPoolService:
             rotated_workers = healthy_workers
             logger.info(f"🔄 [ROTATION] Sem rotação: {[w.name for w in rotated_workers]}")
         
-        with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            futures = {}
-            
-            for i, frame_range in enumerate(frame_ranges):
-                worker = rotated_workers[i]
-                future = executor.submit(
-                    self._render_chunk_on_worker,
-                    worker=worker,
-                    job_id=job_id,
-                    chunk_index=i,
-                    frame_range=frame_range,
-                    payload=payload,
-                    user_id=user_id,
-                    project_id=project_id
-                )
-                futures[future] = i
-            
-            # Coletar resultados
-            for future in as_completed(futures):
-                result = future.result()
-                chunk_results.append(result)
+        # 🆕 v4.8.0: Planner de cortes alinhados a placas tectônicas / frases
+        planner = None
+        if RENDER_SCENE_AWARE_CHUNKS:
+            planner = SceneAwareChunkPlanner.from_payload(payload, fps, speech_segments)
+            if not planner.has_boundaries:
+                planner = None
+        
+        if incremental:
+            # 🆕 v4.8.0: 3+4. Só os chunks cuja entrada mudou vão para os workers
+            coordinator_result = self._render_incremental(
+                workers=rotated_workers[:num_workers],
+                job_id=job_id,
+                payload=payload,
+                user_id=user_id,
+                project_id=project_id,
+                fps=fps,
+                duration_in_frames=duration_in_frames,
+                encoded_tracks=encoded_tracks,
+                planner=planner
+            )
+            chunk_results = coordinator_result["chunks"]
+            if coordinator_result.get("status") != "success":
+                logger.error(f"❌ [INCREMENTAL] {coordinator_result.get('error')}")
+                return {
+                    "status": "error",
+                    "error": coordinator_result.get("error"),
+                    "failed_chunks": coordinator_result.get("failed_chunks", []),
+                    "successful_chunks": chunk_results
+                }
+        elif RENDER_WORK_STEALING:
+            # 🆕 v4.8.0: 3+4. Chunks pequenos puxados pelos workers (work stealing)
+            coordinator_result = self._render_with_coordinator(
+                workers=rotated_workers[:num_workers],
+                job_id=job_id,
+                payload=payload,
+                user_id=user_id,
+                project_id=project_id,
+                fps=fps,
+                duration_in_frames=duration_in_frames,
+                encoded_tracks=encoded_tracks,
+                planner=planner
+            )
+            chunk_results = coordinator_result["chunks"]
+            if coordinator_result.get("status") != "success":
+                logger.error(f"❌ [COORD] {coordinator_result.get('error')}")
+                return {
+                    "status": "error",
+                    "error": coordinator_result.get("error"),
+                    "failed_chunks": coordinator_result.get("failed_chunks", []),
+                    "successful_chunks": chunk_results
+                }
+        else:
+            chunk_results = self._render_static_chunks(
+                workers=rotated_workers,
+                job_id=job_id,
+                payload=payload,
+                user_id=user_id,
+                project_id=project_id,
+                fps=fps,
+                duration_in_frames=duration_in_frames,
+                num_workers=num_workers,
+                encoded_tracks=encoded_tracks,
+                planner=planner
+            )
         
         # Ordenar por índice
         chunk_results.sort(key=lambda x: x.get("chunk_index", 0))
@@ -910,6 +1281,9 @@ class WorkerPoolService:
                 "successful_chunks": [r for r in chunk_results if r.get("status") == "success"]
             }
         
+        # 🆕 v4.8.0: Não concatenar/enviar o vídeo de um job cancelado
+        get_cancellation_token(job_id).raise_if_cancelled()
+        
         # 6. Concatenar chunks
         chunk_paths = [r.get("chunk_path") for r in chunk_results if r.get("chunk_path")]
         
@@ -921,7 +1295,47 @@ class WorkerPoolService:
                 "chunks": chunk_results
             }
         
-        concat_result = self._concatenate_chunks(chunk_paths, job_id)
+        # 🆕 v4.8.0: Se todos os cortes caem em limites de cena, concat sem re-encode
+        stream_copy = RENDER_CONCAT_STREAM_COPY and bool(planner) and all(
+            r.get("end_frame") is not None and planner.is_aligned(r["end_frame"] + 1)
+            for r in chunk_results[:-1]
+        )
+        
+        concat_result = self._concatenate_chunks(chunk_paths, job_id, stream_copy=stream_copy)
+        
+        # 🆕 v4.8.0: Chunk reaproveitado pode ter sido removido do volume →
+        # invalida os reaproveitados, renderiza esses trechos e tenta de novo
+        cached_chunks = [r for r in chunk_results if r.get("cached")]
+        if concat_result.get("status") != "success" and cached_chunks:
+            logger.warning(f"⚠️ [INCREMENTAL] Concat falhou com {len(cached_chunks)} chunks "
+                           f"reaproveitados, renderizando esses trechos novamente")
+            self._remove_chunk_files(
+                get_render_chunk_cache().invalidate(project_id, [r["chunk_hash"] for r in cached_chunks])
+            )
+            retry_result = self._render_with_coordinator(
+                workers=rotated_workers[:num_workers],
+                job_id=job_id,
+                payload=payload,
+                user_id=user_id,
+                project_id=project_id,
+                fps=fps,
+                duration_in_frames=duration_in_frames,
+                encoded_tracks=encoded_tracks,
+                planned_ranges=[
+                    {"chunk_index": r["chunk_index"], "start_frame": r["start_frame"],
+                     "end_frame": r["end_frame"]}
+                    for r in cached_chunks
+                ],
+                chunk_tags={r["chunk_index"]: r["chunk_hash"][:12] for r in cached_chunks}
+            )
+            if retry_result.get("status") == "success":
+                rerendered = {r["chunk_index"]: r for r in retry_result["chunks"]}
+                for i, r in enumerate(chunk_results):
+                    if r["chunk_index"] in rerendered:
+                        chunk_results[i] = dict(rerendered[r["chunk_index"]], chunk_hash=r["chunk_hash"])
+                        get_render_chunk_cache().put(project_id, r["chunk_hash"], chunk_results[i], job_id=job_id)
+                chunk_paths = [r.get("chunk_path") for r in chunk_results]
+                concat_result = self._concatenate_chunks(chunk_paths, job_id, stream_copy=stream_copy)
         
         if concat_result.get("status") != "success":
             return {
@@ -982,6 +1396,7 @@ class WorkerPoolService:
             "time_saved_seconds": round(time_saved, 2),
             "workers_used": num_workers,
             "chunks": chunk_results,
+            "reused_chunks": len([r for r in chunk_results if r.get("cached")]),
             "concat_duration": concat_result.get("duration_seconds", 0)
         }
 
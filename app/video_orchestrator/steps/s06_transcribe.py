@@ -4,6 +4,9 @@ Step 06: Transcrição de áudio (AssemblyAI ou Whisper).
 v4.1: SEMPRE transcreve o vídeo processado (phase1_video_url).
 Não reutiliza transcrições do upload porque os timestamps precisam
 corresponder ao vídeo após silence_cut + concat_plates.
+
+🆕 v4.8.0: Cache por fingerprint do áudio cortado (+ provider + idioma).
+O mesmo áudio (outro template, replay do Director) não é transcrito de novo.
 """
 
 from ._base import *
@@ -39,10 +42,40 @@ def transcribe_step(state: PipelineState, params: dict) -> PipelineState:
 
     # Tentar AssemblyAI primeiro, fallback para Whisper
     assembly_key = get_env('ASSEMBLY_API_KEY')
+    provider = 'assemblyai' if assembly_key else 'whisper'
+
+    # 🆕 v4.8.0: Mesmo áudio + provider + idioma → transcrição do cache
+    from ..services.transcription_cache import (
+        TRANSCRIPTION_CACHE_ENABLED, audio_fingerprint, transcription_cache_key,
+        get_cached_transcription, store_transcription,
+    )
+    cache_key = fingerprint = None
+    if TRANSCRIPTION_CACHE_ENABLED:
+        fingerprint = audio_fingerprint(audio_url)
+        if fingerprint:
+            cache_key = transcription_cache_key(fingerprint, provider, language)
+            cached = get_cached_transcription(cache_key)
+            if cached:
+                logger.info(f"♻️ [TRANSCRIBE] Cache hit ({provider}, {fingerprint[:18]}...): "
+                            f"{len(cached['words'])} palavras")
+                return state.with_updates(
+                    transcription_text=cached['text'],
+                    transcription_words=cached['words'],
+                    total_duration_ms=cached['duration_ms'] or state.total_duration_ms,
+                )
+
     if assembly_key:
-        return _transcribe_assembly(state, audio_url, language)
+        new_state = _transcribe_assembly(state, audio_url, language)
     else:
-        return _transcribe_whisper(state, audio_url, language)
+        new_state = _transcribe_whisper(state, audio_url, language)
+
+    if cache_key:
+        store_transcription(
+            cache_key, fingerprint, provider, language,
+            new_state.transcription_text, new_state.transcription_words,
+            new_state.total_duration_ms,
+        )
+    return new_state
 
 
 def _transcribe_assembly(state: PipelineState, audio_url: str, language: str) -> PipelineState:
@@ -74,7 +74,8 @@ def matting_step(state: PipelineState, params: dict) -> PipelineState:
 
     new_hash = _compute_matting_hash(state)
 
-    logger.info(f"✅ [MATTING] {result.get('clips_processed', 0)} clips | "
+    logger.info(f"✅ [MATTING] {result.get('clips_processed', 0)} clips "
+                f"({result.get('clips_from_cache', 0)} do cache) | "
                 f"Modo: {result.get('mode', '?')} | "
                 f"Tempo: {result.get('time', 0):.1f}s")
 
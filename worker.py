@@ -77,16 +77,12 @@ class VideoWorker:
         signal.signal(signal.SIGINT, self._handle_shutdown)
     
     def _connect_redis(self):
-        """Conecta ao Redis"""
+        """Conecta ao Redis (🆕 v4.8.0: client do pool compartilhado do processo)"""
         try:
-            from redis import Redis
-            self.redis = Redis(
-                host=self.redis_host,
-                port=self.redis_port,
-                password=self.redis_password,
-                decode_responses=True
-            )
-            self.redis.ping()
+            from app.video_orchestrator.queue import get_redis_client
+            self.redis = get_redis_client()
+            if self.redis is None:
+                raise ConnectionError(f"Redis indisponível em {self.redis_host}:{self.redis_port}")
             auth_status = "🔒 (com senha)" if self.redis_password else "⚠️ (sem senha)"
             logger.info(f"✅ Conectado ao Redis: {self.redis_host}:{self.redis_port} {auth_status}")
         except Exception as e:
@@ -263,6 +259,37 @@ class VideoWorker:
             
             time.sleep(30)
     
+    def _reaper(self):
+        """
+        🆕 v4.8.0: Retoma jobs órfãos (lease vencido = worker morreu no meio).
+        
+        Roda em todos os workers; o claim atômico no Redis garante que
+        cada job órfão é re-enfileirado uma vez só.
+        """
+        from app.video_orchestrator.job_leases import run_reaper_loop
+        run_reaper_loop(should_run=lambda: self.running)
+    
+    def _run_with_lease(self, job_id: str, action: str, target, *args):
+        """
+        🆕 v4.8.0: Executa o job segurando um lease no Redis (job_leases).
+        
+        O lease é renovado enquanto este processo estiver vivo e removido
+        ao terminar (sucesso ou falha). Se o processo morrer, o lease vence
+        e o reaper re-enfileira o job.
+        """
+        from app.video_orchestrator.job_leases import acquire_job_lease, release_job_lease
+        acquire_job_lease(job_id, action, self.worker_id)
+        try:
+            target(*args)
+        finally:
+            release_job_lease(job_id)
+    
+    @staticmethod
+    def _is_cancellation(error: Exception) -> bool:
+        """🆕 v4.8.0: Exceção de cancelamento cooperativo (job_cancellation)?"""
+        from app.video_orchestrator.job_cancellation import is_cancellation
+        return is_cancellation(error)
+    
     def _process_job(self, job_id: str, ec2_ip: str = None):
         """
         Processa um job específico (Fase 1 → execute_pipeline).
@@ -287,6 +314,11 @@ class VideoWorker:
             
         except Exception as e:
             elapsed = time.time() - start_time
+            if self._is_cancellation(e):
+                # 🆕 v4.8.0: Cancelado pelo usuário (engine já marcou 'cancelled')
+                logger.info(f"🛑 Job {job_id} cancelado após {elapsed:.1f}s")
+                self._log_job_result(job_id, 'cancelled', elapsed)
+                return
             logger.error(f"❌ Job {job_id} falhou após {elapsed:.1f}s: {e}")
             self.failed_count += 1
             self._log_job_result(job_id, 'failed', elapsed, str(e))
@@ -323,6 +355,11 @@ class VideoWorker:
             
         except Exception as e:
             elapsed = time.time() - start_time
+            if self._is_cancellation(e):
+                # 🆕 v4.8.0: Cancelado pelo usuário (engine já marcou 'cancelled')
+                logger.info(f"🛑 [CONTINUE] Job {job_id} cancelado após {elapsed:.1f}s")
+                self._log_job_result(job_id, 'cancelled', elapsed)
+                return
             logger.error(f"❌ [CONTINUE] Job {job_id} falhou após {elapsed:.1f}s: {e}")
             self.failed_count += 1
             self._log_job_result(job_id, 'failed', elapsed, str(e))
@@ -359,6 +396,11 @@ class VideoWorker:
             
         except Exception as e:
             elapsed = time.time() - start_time
+            if self._is_cancellation(e):
+                # 🆕 v4.8.0: Cancelado pelo usuário (engine já marcou 'cancelled')
+                logger.info(f"🛑 [REPLAY] Job {job_id} cancelado após {elapsed:.1f}s")
+                self._log_job_result(job_id, 'cancelled', elapsed)
+                return
             logger.error(f"❌ [REPLAY] Job {job_id} falhou após {elapsed:.1f}s: {e}")
             self.failed_count += 1
             self._log_job_result(job_id, 'failed', elapsed, str(e))
@@ -453,9 +495,11 @@ class VideoWorker:
         - String pura (UUID): job de _execute_pipeline (Fase 1)
         - JSON {"action": "continue_pipeline", "job_id": "xxx"}: Fase 2
         - JSON {"action": "replay_pipeline", "job_id": "xxx"}: Pipeline Replay
+        - JSON {"action": "resume_pipeline", "job_id": "xxx", "resume_action": "..."}:
+          job órfão re-enfileirado pelo reaper (🆕 v4.8.0)
         
         Returns:
-            dict com 'action' e 'job_id'
+            dict com 'action', 'job_id' e 'resume_action'
         """
         import json
         
@@ -465,7 +509,8 @@ class VideoWorker:
                 data = json.loads(raw_message)
                 return {
                     'action': data.get('action', 'execute_pipeline'),
-                    'job_id': data.get('job_id', raw_message)
+                    'job_id': data.get('job_id', raw_message),
+                    'resume_action': data.get('resume_action'),
                 }
             except (json.JSONDecodeError, KeyError):
                 pass
@@ -473,7 +518,8 @@ class VideoWorker:
         # Fallback: string pura = job_id para _execute_pipeline
         return {
             'action': 'execute_pipeline',
-            'job_id': raw_message
+            'job_id': raw_message,
+            'resume_action': None,
         }
     
     def run(self):
@@ -485,6 +531,10 @@ class VideoWorker:
         heartbeat_thread = threading.Thread(target=self._heartbeat, daemon=True)
         heartbeat_thread.start()
         
+        # 🆕 v4.8.0: Thread do reaper (retoma jobs de workers que morreram)
+        reaper_thread = threading.Thread(target=self._reaper, daemon=True)
+        reaper_thread.start()
+        
         while self.running:
             try:
                 # Verificar se pode processar mais jobs
@@ -521,6 +571,12 @@ class VideoWorker:
                     logger.info(f"↩️ Job {job_id[:8]}... devolvido para fila (não é para este worker: {self.worker_type})")
                     continue
                 
+                # 🆕 v4.8.0: Job órfão retomado pelo reaper → action original.
+                # O bridge carrega o pipeline_state e pula os steps já completados.
+                if action == 'resume_pipeline':
+                    action = parsed['resume_action'] or 'execute_pipeline'
+                    logger.info(f"♻️ [RESUME] Retomando job {job_id[:8]}... via {action}")
+                
                 # Incrementar contador de jobs ativos
                 with self.active_jobs_lock:
                     self.active_jobs += 1
@@ -529,23 +585,23 @@ class VideoWorker:
                 if action == 'continue_pipeline':
                     logger.info(f"🔄 [CONTINUE] Roteando job {job_id[:8]}... para continue_pipeline")
                     thread = threading.Thread(
-                        target=self._process_continue_job,
-                        args=(job_id,),
+                        target=self._run_with_lease,
+                        args=(job_id, action, self._process_continue_job, job_id),
                         daemon=True
                     )
                 elif action == 'replay_pipeline':
                     logger.info(f"🔄 [REPLAY] Roteando job {job_id[:8]}... para replay_pipeline")
                     thread = threading.Thread(
-                        target=self._process_replay_job,
-                        args=(job_id,),
+                        target=self._run_with_lease,
+                        args=(job_id, action, self._process_replay_job, job_id),
                         daemon=True
                     )
                 else:
                     # Padrão: _execute_pipeline (Fase 1 completa)
                     ec2_ip = None
                     thread = threading.Thread(
-                        target=self._process_job,
-                        args=(job_id, ec2_ip),
+                        target=self._run_with_lease,
+                        args=(job_id, 'execute_pipeline', self._process_job, job_id, ec2_ip),
                         daemon=True
                     )
                 